@@ -1,6 +1,18 @@
+import itertools
 import os
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, scoped_session, declarative_base
+import threading
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Callable, Iterator, Optional, TypeVar, Union
+
+import anyio
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker, scoped_session, declarative_base
+from starlette.concurrency import run_in_threadpool
 from dotenv import load_dotenv
 from .init_data import seed_initial_data
 
@@ -11,6 +23,41 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 if not DATABASE_URL:
     raise ValueError("DATABASE_URL is not set. Check your .env file.")
 
+# 1이면 메시지 처리/로그인 경로에서 비동기 엔진(AsyncSession)을 사용 (나머지 API와 스크립트는 동기 엔진)
+DB_ASYNC_ENABLED = os.getenv("DB_ASYNC", "0") == "1"
+
+# 동기 드라이버 → 비동기 드라이버
+_ASYNC_DRIVERS = {
+    "mysql": "mysql+aiomysql",
+    "mysql+pymysql": "mysql+aiomysql",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+}
+
+
+def to_async_url(url: str) -> str:
+    """
+    동기 DB URL을 같은 DB를 가리키는 비동기 드라이버 URL로 바꿉니다.
+
+    Args:
+        url: 동기 DB URL (예: mysql+pymysql://..., sqlite:///...)
+
+    Returns:
+        비동기 DB URL (예: mysql+aiomysql://..., sqlite+aiosqlite:///...)
+
+    Raises:
+        ValueError: 비동기 드라이버를 알 수 없는 경우
+    """
+    parsed = make_url(url)
+    if parsed.drivername in _ASYNC_DRIVERS.values():
+        return url
+    if parsed.drivername not in _ASYNC_DRIVERS:
+        raise ValueError(f"비동기 드라이버를 알 수 없습니다: {parsed.drivername} (ASYNC_DATABASE_URL을 지정하세요)")
+    return parsed.set(drivername=_ASYNC_DRIVERS[parsed.drivername]).render_as_string(hide_password=False)
+
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL")
+
 engine = create_engine(
     DATABASE_URL,
     pool_size=10,
@@ -20,22 +67,198 @@ engine = create_engine(
 )
 
 SessionFactory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-SessionLocal = scoped_session(SessionFactory)
+
+# 요청/작업 단위 DB 세션 범위
+# scoped_session의 기본 범위(스레드)는 이벤트 루프 스레드에서 동시에 처리되는 async 요청들이,
+# 또는 같은 스레드 풀 스레드를 거쳐 간 요청들이 세션과 identity map을 공유하게 만듭니다.
+# 요청(또는 작업)마다 범위 키를 ContextVar에 두면, 같은 요청 안에서 스레드 풀로 넘긴 코드(run_in_threadpool은
+# 컨텍스트를 복사함)는 같은 세션을, 다른 요청은 서로 다른 세션을 받습니다.
+_session_scope: ContextVar[Optional[int]] = ContextVar("db_session_scope", default=None)
+_scope_ids = itertools.count(1)
+
+
+def _scope_key():
+    # 범위 밖(스크립트 등)에서는 기존처럼 스레드 단위
+    scope = _session_scope.get()
+    return scope if scope is not None else ("thread", threading.get_ident())
+
+
+SessionLocal = scoped_session(SessionFactory, scopefunc=_scope_key)
+_session_close_limiter = anyio.CapacityLimiter(4)
 Base = declarative_base()
 Base.query = SessionLocal.query_property()
 
-def get_db_session():
+async def get_db_session() -> AsyncIterator[Session]:
+    """
+    요청 단위 DB 세션 의존성
+    요청마다 새 범위를 열고 그 범위의 세션을 돌려주며, 응답 후 세션을 닫고 범위를 정리합니다.
+    (세션 close의 롤백/커넥션 반납은 DB I/O이므로 이벤트 루프 밖에서 실행)
+    """
+    async with _request_session_scope() as db:
+        yield db
+
+@asynccontextmanager
+async def _request_session_scope() -> AsyncIterator[Session]:
+    token = _session_scope.set(next(_scope_ids))
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
+        # 요청 처리용 스레드 풀과 다른 limiter로 닫음: 스레드 풀이 커넥션을 기다리는 작업으로 가득 차도
+        # 커넥션을 쥔 세션은 닫혀서 커넥션을 반납할 수 있음 (FastAPI의 yield 의존성 종료와 같은 방식)
+        await anyio.to_thread.run_sync(db.close, limiter=_session_close_limiter)
+        SessionLocal.registry.clear()
+        _session_scope.reset(token)
+
+@contextmanager
+def db_session_scope() -> Iterator[Session]:
+    """
+    요청 밖(초기화, 스크립트, 백그라운드 작업)에서 쓰는 독립 DB 세션 범위
+
+    Yields:
+        Session: 이 범위 전용 세션 (범위를 벗어나면 닫힘)
+    """
+    token = _session_scope.set(next(_scope_ids))
+    try:
+        yield SessionLocal()
+    finally:
+        SessionLocal.remove()
+        _session_scope.reset(token)
 
 def init_db():
     import app.models  # 이 위치는 OK
     Base.metadata.create_all(bind=engine)
+    upgrade_schema(engine)
     seed_initial_data()
 
+def upgrade_schema(bind: Engine) -> None:
+    """
+    create_all이 추가하지 못하는 기존 테이블의 변경 사항을 반영합니다. (이미 반영되었으면 아무것도 하지 않음)
+
+    Args:
+        bind: 대상 DB 엔진
+    """
+    inspector = inspect(bind)
+    if not inspector.has_table("chat_sheet"):
+        return
+
+    columns = {column["name"] for column in inspector.get_columns("chat_sheet")}
+    if "version" not in columns:
+        # 시트 버전 (delta 응답 기준 버전, 낙관적 동시성 검사)
+        with bind.begin() as connection:
+            connection.execute(text("ALTER TABLE chat_sheet ADD COLUMN version INT NOT NULL DEFAULT 1"))
+        print("[DB] chat_sheet.version 컬럼 추가")
+
+    unique_columns = [constraint["column_names"] for constraint in inspector.get_unique_constraints("chat_sheet")]
+    unique_columns += [index["column_names"] for index in inspector.get_indexes("chat_sheet") if index.get("unique")]
+    if ["sessionId"] not in unique_columns:
+        # 세션당 시트 하나 (첫 저장 경쟁을 DB에서 막음). 이미 세션별로 시트가 여러 개면 정리해야 추가됨
+        try:
+            with bind.begin() as connection:
+                connection.execute(text("CREATE UNIQUE INDEX uq_chat_sheet_session ON chat_sheet (sessionId)"))
+            print("[DB] chat_sheet.sessionId 유니크 인덱스 추가")
+        except IntegrityError as e:
+            print(f"[DB] chat_sheet.sessionId 유니크 인덱스를 추가하지 못했습니다 (세션별 중복 시트 정리 필요): {str(e)}")
+
 def drop_db():
     Base.metadata.drop_all(bind=engine)
 
+
+#### 비동기 엔진 (DB_ASYNC=1) ####
+# 동기 엔진과 같은 DB를 비동기 드라이버(aiomysql, 테스트는 aiosqlite)로 연결합니다.
+# 엔진은 처음 쓸 때 만들므로 DB_ASYNC=0이면 비동기 드라이버가 없어도 됩니다.
+# 커밋 후 속성 재조회가 이벤트 루프에서 암묵적 I/O를 일으키지 않도록 expire_on_commit=False
+AsyncSessionFactory = async_sessionmaker(autoflush=False, expire_on_commit=False)
+_async_engine: Optional[AsyncEngine] = None
+
+T = TypeVar("T")
+
+
+def get_async_engine() -> AsyncEngine:
+    """비동기 엔진을 반환합니다. (처음 호출할 때 ASYNC_DATABASE_URL 또는 DATABASE_URL로 생성)"""
+    global _async_engine
+    if _async_engine is None:
+        url = ASYNC_DATABASE_URL or to_async_url(DATABASE_URL)
+        options = {"pool_pre_ping": True}
+        if not url.startswith("sqlite"):
+            options.update(pool_size=10, max_overflow=20, pool_recycle=3600)
+        _async_engine = create_async_engine(url, **options)
+    return _async_engine
+
+def new_async_session() -> AsyncSession:
+    """비동기 세션을 만듭니다. (AsyncSessionFactory에 엔진이 지정되지 않았으면 get_async_engine() 사용)"""
+    if AsyncSessionFactory.kw.get("bind") is None:
+        AsyncSessionFactory.configure(bind=get_async_engine())
+    return AsyncSessionFactory()
+
+@asynccontextmanager
+async def async_session_scope() -> AsyncIterator[AsyncSession]:
+    """
+    요청/작업 단위 비동기 DB 세션 범위
+
+    Yields:
+        AsyncSession: 이 범위 전용 세션 (범위를 벗어나면 닫힘)
+    """
+    db = new_async_session()
+    try:
+        yield db
+    finally:
+        await db.close()
+
+async def get_async_db_session() -> AsyncIterator[AsyncSession]:
+    """요청 단위 비동기 DB 세션 의존성"""
+    async with async_session_scope() as db:
+        yield db
+
+async def get_pipeline_db_session() -> AsyncIterator[Union[Session, AsyncSession]]:
+    """
+    비동기 경로를 지원하는 API(메시지 처리, 로그인)용 DB 세션 의존성
+    DB_ASYNC=1이면 AsyncSession을, 아니면 get_db_session과 같은 요청 단위 Session을 돌려줍니다.
+    """
+    scope = async_session_scope() if DB_ASYNC_ENABLED else _request_session_scope()
+    async with scope as db:
+        yield db
+
+def new_pipeline_session() -> Union[Session, AsyncSession]:
+    """요청 밖 작업(job 워커 등)용 DB 세션 (DB_ASYNC=1이면 AsyncSession)"""
+    return new_async_session() if DB_ASYNC_ENABLED else SessionFactory()
+
+
+#### 세션 종류에 무관한 실행 헬퍼 ####
+async def run_db(db: Union[Session, AsyncSession], func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    동기 ORM 함수를 세션 종류에 맞게 실행합니다. func에는 db 키워드 인자로 동기 Session이 전달됩니다.
+    AsyncSession이면 run_sync로 이벤트 루프에서(I/O는 비동기 드라이버가 처리하므로 스레드를 점유하지 않음),
+    Session이면 스레드 풀에서 실행합니다.
+
+    Args:
+        db: Session 또는 AsyncSession
+        func: db 키워드 인자를 받는 동기 함수 (DB 작업만 할 것 - CPU 작업은 이벤트 루프를 막음)
+
+    Returns:
+        func의 반환값
+    """
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(lambda session: func(*args, db=session, **kwargs))
+    return await run_in_threadpool(func, *args, db=db, **kwargs)
+
+async def commit_session(db: Union[Session, AsyncSession]) -> None:
+    """세션을 커밋합니다. (동기 Session은 스레드 풀에서)"""
+    if isinstance(db, AsyncSession):
+        await db.commit()
+    else:
+        await run_in_threadpool(db.commit)
+
+async def rollback_session(db: Union[Session, AsyncSession]) -> None:
+    """세션을 롤백합니다. (동기 Session은 스레드 풀에서)"""
+    if isinstance(db, AsyncSession):
+        await db.rollback()
+    else:
+        await run_in_threadpool(db.rollback)
+
+async def close_session(db: Union[Session, AsyncSession]) -> None:
+    """세션을 닫습니다. (동기 Session은 스레드 풀에서)"""
+    if isinstance(db, AsyncSession):
+        await db.close()
+    else:
+        await run_in_threadpool(db.close)
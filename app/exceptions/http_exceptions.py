@@ -30,3 +30,26 @@ class EmptyMessageAndSheetException(HTTPException):
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Either message or sheetData must be provided."
         )
+
+class JobNotFoundException(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found."
+        )
+
+class SheetVersionConflictException(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="The sheet was modified by another request. Reload the sheet and retry."
+        )
+
+
+#### Excel ####
+class ExcelJobTimeoutException(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail="Excel processing timed out."
+        )
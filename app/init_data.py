@@ -5,10 +5,9 @@ from openpyxl import Workbook
 
 def seed_initial_data():
     from app.models import User, ChatSession, Message, ChatSheet
-    from app.database import get_db_session
+    from app.database import db_session_scope
 
-    db = next(get_db_session())  # ✅ 세션 꺼내기
-    try:
+    with db_session_scope() as db:  # ✅ 초기화 전용 세션
         # 1. User 생성
         user = db.query(User).filter(User.username == "admin").first()
         if not user:
@@ -48,9 +47,6 @@ def seed_initial_data():
 
         db.commit()
 
-    finally:
-        db.close()
-
 
 def create_default_sheet_binary() -> bytes:
     data = [
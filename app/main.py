@@ -1,3 +1,5 @@
+from contextlib import asynccontextmanager
+
 from dotenv import load_dotenv
 from .database import init_db
 from fastapi import FastAPI
@@ -8,7 +10,28 @@ from fastapi.middleware.cors import CORSMiddleware
 
 load_dotenv()
 import os
-app = FastAPI(title="Excel-LLM Platform")
+from app.services.excel_worker_service import excel_process_pool, excel_worker_pool
+from app.services.job_service import chat_job_manager
+from app.services.llm_client_service import llm_client_manager
+from app.services.summary_service import summary_compactor
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 공유 OpenAI 클라이언트(커넥션 풀) 생성 → 종료 시 정리
+    try:
+        llm_client_manager.startup()
+    except ValueError as e:
+        print(f"⚠️ 공유 LLM 클라이언트를 생성하지 못했습니다: {e}")
+    yield
+    await chat_job_manager.shutdown()
+    summary_compactor.shutdown()  # 압축 중인 요약이 공유 클라이언트를 쓰므로 먼저 정리
+    await llm_client_manager.shutdown_async()
+    excel_worker_pool.shutdown()
+    excel_process_pool.shutdown()
+
+
+app = FastAPI(title="Excel-LLM Platform", lifespan=lifespan)
 
 
 app.add_middleware(
@@ -1,10 +1,12 @@
-from sqlalchemy import Column, Integer, ForeignKey, DateTime, JSON, func, LargeBinary
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, JSON, func, LargeBinary, UniqueConstraint
 from sqlalchemy.orm import relationship
 
 from app.database import Base
 
 class ChatSheet(Base):
     __tablename__ = "chat_sheet"
+    # 세션당 시트는 하나 (첫 저장이 동시에 일어나도 한 요청만 삽입되도록 DB에서 보장)
+    __table_args__ = (UniqueConstraint("sessionId", name="uq_chat_sheet_session"),)
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     sessionId = Column(
@@ -13,5 +15,6 @@ class ChatSheet(Base):
         nullable=False
     )
     sheetData = Column(LargeBinary, nullable=False)
+    version = Column(Integer, nullable=False, default=1, server_default="1")
 
     session = relationship("ChatSession", back_populates="sheet", passive_deletes=True)
\ No newline at end of file
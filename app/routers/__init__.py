@@ -1,8 +1,8 @@
 from fastapi import APIRouter
-from . import chat_router, auth_router, llm_router
+from . import chat_router, auth_router, metrics_router
 
 router = APIRouter()
 
 router.include_router(auth_router.router, prefix="/auth", tags=["auth"])
 router.include_router(chat_router.router, prefix="/chat", tags=["chat"])
-router.include_router(llm_router.router, prefix="/llm", tags=["llm"])
\ No newline at end of file
+router.include_router(metrics_router.router, prefix="/metrics", tags=["metrics"])
\ No newline at end of file
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, status, Response
 from sqlalchemy.orm import Session
-from app.database import get_db_session
-from app.services.auth_service import login
+from app.database import get_pipeline_db_session
+from app.services.auth_service import login_async
 from app.schemas.auth_schema import LoginRequest, LoginResponse
 
 router = APIRouter()
@@ -16,8 +16,8 @@ router = APIRouter()
         401: {"description": "login fail (Unauthorized)"},
     }
 )
-def login_route(data: LoginRequest, db: Session = Depends(get_db_session)):
-    user = login(db, data.username, data.password)
+async def login_route(data: LoginRequest, db: Session = Depends(get_pipeline_db_session)):
+    user = await login_async(db, data.username, data.password)
     return LoginResponse(
         username=user.username,
         userId=user.id
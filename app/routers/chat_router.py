@@ -1,12 +1,17 @@
 import base64
+from typing import Union
 
-from fastapi import APIRouter, Depends, Query, status, Form, UploadFile, File
+from fastapi import APIRouter, Depends, Query, status, Form, UploadFile, File, Response, WebSocket, \
+    WebSocketDisconnect
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from app.database import get_db_session
-from app.exceptions.http_exceptions import EmptyMessageAndSheetException
+from app.database import get_db_session, get_pipeline_db_session, run_db
+from app.exceptions.http_exceptions import EmptyMessageAndSheetException, JobNotFoundException
 from app.schemas.chat_schema import *
-from app.services.chat_service import get_sessions, create_session, \
-    delete_session, modify_session, get_messages, save_message_and_response
+from app.services.chat_service import get_sessions, create_session_async, \
+    delete_session, modify_session, get_messages, save_message_and_response_async, get_chat_sheet, \
+    stream_message_and_response, validate_session_exists
+from app.services.job_service import chat_job_manager
 
 router = APIRouter()
 
@@ -35,7 +40,7 @@ async def create_session_route(
     userId: int = Form(...),
     message: Optional[str] = Form(None),
     sheetData: Optional[UploadFile] = File(None),
-    db: Session = Depends(get_db_session)
+    db: Session = Depends(get_pipeline_db_session)
 ):
     if message is None and sheetData is None:
         raise EmptyMessageAndSheetException()
@@ -43,29 +48,135 @@ async def create_session_route(
     # sheetData를 byte로 읽기
     file_bytes = await sheetData.read() if sheetData is not None else None
 
-    return create_session(userId, message, file_bytes, db)
+    return await create_session_async(userId, message, file_bytes, db)
 
 @router.post(
     "/sessions/{sessionId}/message",
     summary="Save user message and sheet data, get LLM response",
-    response_model=LLMMessageResponse,
+    response_model=Union[LLMMessageResponse, ChatJobAcceptedResponse],
     status_code=status.HTTP_200_OK,
     responses={
         200: {"description": "Message saved and LLM response returned"},
+        202: {"description": "mode=job: job accepted (poll GET /chat/jobs/{jobId} or connect /chat/jobs/{jobId}/ws)"},
         404: {"description": "Chat session not found"},
         400: {"description": "Invalid message or sheet data"},
+        409: {"description": "Sheet was modified by another request (reload the sheet and retry)"},
     }
 )
 async def send_message_route(
     sessionId: int,
+    response: Response,
     message: str = Form(...),
     sheetData: Optional[UploadFile] = File(None),
-    db: Session = Depends(get_db_session)
+    sheetVersion: Optional[int] = Form(None, description="업로드한 시트가 기준으로 한 세션 시트 버전 (다르면 409)"),
+    responseMode: str = Query("full", pattern="^(full|delta)$",
+                              description="full: 수정된 시트 전체(Base64), delta: 변경된 셀 목록만"),
+    mode: str = Query("sync", pattern="^(sync|job)$",
+                      description="sync: 처리 결과를 바로 반환, job: job ID를 바로 반환하고 백그라운드에서 처리"),
+    db: Session = Depends(get_pipeline_db_session)
 ):
     # sheetData를 bytes로 읽음
     file_bytes = await sheetData.read() if sheetData is not None else None
 
-    return save_message_and_response(sessionId, message, file_bytes, db)
+    if mode == "job":
+        # 없는 세션은 접수 전에 404
+        await run_db(db, validate_session_exists, sessionId)
+        job = chat_job_manager.submit(
+            sessionId, message, file_bytes, response_mode=responseMode, sheet_version=sheetVersion
+        )
+        response.status_code = status.HTTP_202_ACCEPTED
+        return ChatJobAcceptedResponse(
+            jobId=job.id,
+            sessionId=sessionId,
+            status=job.status,
+            queuePosition=chat_job_manager.queue_depth
+        )
+
+    return await save_message_and_response_async(
+        sessionId, message, file_bytes, db, response_mode=responseMode, sheet_version=sheetVersion
+    )
+
+@router.get(
+    "/jobs/{jobId}",
+    response_model=ChatJobResponse,
+    summary="Get the status and result of a chat message job",
+    responses={
+        200: {"description": "Job status returned (result is included when succeeded)"},
+        404: {"description": "Job not found"},
+    }
+)
+def get_job_route(jobId: str):
+    job = chat_job_manager.get(jobId)
+    if job is None:
+        raise JobNotFoundException()
+    return job.snapshot()
+
+@router.websocket("/jobs/{jobId}/ws")
+async def job_websocket_route(websocket: WebSocket, jobId: str):
+    # 상태가 바뀔 때마다 ChatJobResponse JSON을 보내고, 완료(succeeded/failed) 상태를 보낸 뒤 닫음
+    job = chat_job_manager.get(jobId)
+    if job is None:
+        await websocket.close(code=4404)
+        return
+
+    await websocket.accept()
+    try:
+        async for snapshot in chat_job_manager.watch(job):
+            await websocket.send_json(snapshot.model_dump(mode="json"))
+    except WebSocketDisconnect:
+        return
+    await websocket.close()
+
+@router.post(
+    "/sessions/{sessionId}/message/stream",
+    summary="Save user message and stream the LLM response (Server-Sent Events)",
+    response_class=StreamingResponse,
+    status_code=status.HTTP_200_OK,
+    responses={
+        200: {
+            "description": "text/event-stream: 'delta' 이벤트로 응답 텍스트 조각을, "
+                           "마지막 'result' 이벤트로 LLMMessageResponse를 전송 (오류 시 'error' 이벤트)",
+            "content": {"text/event-stream": {}},
+        },
+        404: {"description": "Chat session not found"},
+    }
+)
+async def stream_message_route(
+    sessionId: int,
+    message: str = Form(...),
+    sheetData: Optional[UploadFile] = File(None),
+    sheetVersion: Optional[int] = Form(None, description="업로드한 시트가 기준으로 한 세션 시트 버전 (다르면 error 이벤트)"),
+    responseMode: str = Query("delta", pattern="^(full|delta)$",
+                              description="마지막 result 이벤트의 시트 형식 (full: Base64 전체, delta: 변경된 셀 목록)"),
+    db: Session = Depends(get_pipeline_db_session)
+):
+    file_bytes = await sheetData.read() if sheetData is not None else None
+
+    events = await stream_message_and_response(
+        sessionId, message, file_bytes, db, response_mode=responseMode, sheet_version=sheetVersion
+    )
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get(
+    "/sessions/{sessionId}/sheet",
+    response_model=ChatSheetResponse,
+    summary="Get the full sheet of a session",
+    responses={
+        200: {"description": "Full sheet (Base64) and its version returned"},
+        404: {"description": "Chat session or sheet not found"}
+    }
+)
+def get_session_sheet_route(sessionId: int, db: Session = Depends(get_db_session)):
+    sheet = get_chat_sheet(sessionId, db)
+    return ChatSheetResponse(
+        sessionId=sessionId,
+        version=sheet.version,
+        sheetData=base64.b64encode(sheet.sheetData).decode('utf-8')
+    )
 
 @router.delete(
     "/sessions/{sessionId}",
@@ -114,5 +225,6 @@ def get_session_messages_route(sessionId: int, db: Session = Depends(get_db_sess
         name=session.name,
         modifiedAt=session.modifiedAt,
         sheetData=encoded_sheet,
+        sheetVersion=session.sheet.version if session.sheet else None,
         messages=session.messages
     )
@@ -0,0 +1,39 @@
+from fastapi import APIRouter, status
+
+from app.services.command_parser_service import local_command_parser
+from app.services.excel_context_service import excel_context_cache
+from app.services.excel_service import command_registry
+from app.services.excel_worker_service import excel_process_pool, excel_worker_pool
+from app.services.job_service import chat_job_manager
+from app.services.llm_cache_service import llm_response_cache
+from app.services.llm_client_service import llm_client_manager
+from app.services.llm_router_service import model_router
+from app.services.session_lane_service import session_lanes
+from app.services.summary_service import summary_compactor
+from app.services.workbook_service import workbook_cache
+
+router = APIRouter()
+
+@router.get(
+    "",
+    summary="Get in-process performance metrics",
+    status_code=status.HTTP_200_OK,
+    responses={
+        200: {"description": "Metrics snapshot returned"},
+    }
+)
+def get_metrics_route():
+    return {
+        "workbook_cache": workbook_cache.stats(),
+        "excel_commands": command_registry.stats(),
+        "llm_client": llm_client_manager.stats(),
+        "llm_router": model_router.stats(),
+        "excel_context_cache": excel_context_cache.stats(),
+        "local_command_parser": local_command_parser.stats(),
+        "llm_cache": llm_response_cache.stats() if llm_response_cache is not None else None,
+        "excel_workers": excel_worker_pool.stats(),
+        "excel_process_workers": excel_process_pool.stats(),
+        "summary_compactor": summary_compactor.stats(),
+        "chat_jobs": chat_job_manager.stats(),
+        "session_lanes": session_lanes.stats(),
+    }
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import Optional, Any, List
+from typing import Optional, Any, List, Dict
 
 from app.models.message import SenderType
 
@@ -37,14 +37,55 @@ class ChatSessionUpdateRequest(BaseModel):
     name: str  # 수정할 제목
 
 
+class CellChange(BaseModel):
+    """ 셀 단위 변경 내역 스키마 """
+    address: str                       # 셀 주소 (예: "B11")
+    value: Any = None                  # 새 값 (수식 셀이면 서버에서 계산한 값)
+    formula: Optional[str] = None      # 새 수식 (예: "=SUM(B2:B10)")
+    style: Optional[Dict[str, Any]] = None  # 스타일이 적용된 셀의 스타일 정보
+
+
+class SheetDelta(BaseModel):
+    """ 이번 메시지로 변경된 시트 내용(diff) 스키마 """
+    baseVersion: Optional[int] = None  # diff를 적용할 기준 시트 버전
+    version: int                       # diff 적용 후 시트 버전
+    sheetName: Optional[str] = None
+    changes: List[CellChange]          # 명령어가 변경한 셀과 그 영향으로 다시 계산된 수식 셀
+    mergedRanges: List[str] = []
+    unmergedRanges: List[str] = []
+
+
 class LLMMessageResponse(BaseModel):
     """ message send에 대한 LLM 응답 스키마 """
     sheetData: Any
     message: MessageResponse
+    sheetVersion: Optional[int] = None
+    sheetDelta: Optional[SheetDelta] = None  # responseMode=delta일 때만 포함 (sheetData는 None)
+    circularReferences: List[str] = []       # 수식 재계산 중 감지된 순환 참조 셀 ("Sheet!A1" 형태)
 
     class Config:
         from_attributes = True
 
+class ChatJobAcceptedResponse(BaseModel):
+    """ job 모드 메시지 전송 접수 응답 스키마 """
+    jobId: str
+    sessionId: int
+    status: str        # queued
+    queuePosition: int # 접수 시점의 대기 작업 수
+
+class ChatJobResponse(BaseModel):
+    """ job 상태/결과 조회 응답 스키마 """
+    jobId: str
+    sessionId: int
+    status: str                                  # queued | running | succeeded | failed
+    stage: Optional[str] = None                  # 실행 중인 단계 (lane, prepare, llm, excel, save)
+    createdAt: datetime
+    startedAt: Optional[datetime] = None
+    finishedAt: Optional[datetime] = None
+    stageLatencies: Dict[str, float] = {}        # 단계별 소요 시간 (ms, queue 포함)
+    result: Optional[LLMMessageResponse] = None  # succeeded일 때만 포함
+    error: Optional[str] = None                  # failed일 때만 포함
+
 class ChatSessionWithMessagesResponse(BaseModel):
     """ Chat Session의 Message 로딩 스키마"""
     sessionId: int
@@ -52,9 +93,14 @@ class ChatSessionWithMessagesResponse(BaseModel):
     name: str
     modifiedAt: datetime
     sheetData: Optional[Any] = None
+    sheetVersion: Optional[int] = None
     messages: List[MessageResponse]
 
     class Config:
         from_attributes = True
 
-
+class ChatSheetResponse(BaseModel):
+    """ 세션 시트 전체 조회 응답 스키마 """
+    sessionId: int
+    version: int
+    sheetData: str  # Base64 인코딩된 엑셀 파일
@@ -1,10 +1,16 @@
+from typing import Union
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from app.database import run_db
 from app.exceptions.http_exceptions import UnauthorizedException
 from app.models import User
 
 """
 Interface Summary:
 - def login(db: Session, username: str, password: str) -> User
+- async def login_async(db: Session | AsyncSession, username: str, password: str) -> User
 """
 
 
@@ -13,4 +19,22 @@ def login(db: Session, username: str, password: str):
 
     if not user or user.password != password:
         raise UnauthorizedException()
-    return user
\ No newline at end of file
+    return user
+
+
+async def login_async(db: Union[Session, AsyncSession], username: str, password: str) -> User:
+    """
+    login의 비동기 버전 (AsyncSession이면 비동기 드라이버로 조회, Session이면 스레드 풀에서 login 실행)
+
+    Raises:
+        UnauthorizedException: 사용자가 없거나 비밀번호가 틀린 경우
+    """
+    if not isinstance(db, AsyncSession):
+        return await run_db(db, login, username=username, password=password)
+
+    result = await db.execute(select(User).where(User.username == username))
+    user = result.scalars().first()
+
+    if not user or user.password != password:
+        raise UnauthorizedException()
+    return user
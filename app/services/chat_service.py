@@ -1,17 +1,34 @@
 import base64
+import json
 from datetime import datetime
 
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+from app.database import commit_session, rollback_session, run_db
 from app.exceptions.http_exceptions import SessionNotFoundException, \
-    UserNotFoundException
+    UserNotFoundException, SheetVersionConflictException
 from app.models import ChatSession, Message, ChatSheet, User
-from typing import cast, List, Optional, Any
+from typing import cast, Callable, List, Optional, Any, Tuple, AsyncIterator, Union
 
+from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
 
-from app.schemas.chat_schema import ChatSessionCreateResponse, MessageResponse, LLMMessageResponse
 
-from app.services.llm_service import get_llm_response
-from app.services.excel_service import process_excel_with_commands
+from app.schemas.chat_schema import ChatSessionCreateResponse, MessageResponse, LLMMessageResponse, \
+    SheetDelta, CellChange
+
+from app.schemas.llm_schema import ResponseResult
+from app.services.excel_worker_service import EXCEL_WORKER_MODE, run_commands_in_process, run_in_excel_worker
+from app.services.session_lane_service import session_lanes
+from app.services.llm_service import get_llm_response, get_llm_response_async, \
+    stream_llm_response_async
+from app.services.excel_service import process_excel_with_commands, create_empty_excel, \
+    collect_cell_changes
+from app.services.summary_service import schedule_summary_compaction
+from app.services.workbook_service import ParsedWorkbook, open_session_workbook, \
+    release_session_workbook, workbook_cache
 from app.utils.timezone import KST
 
 """
@@ -19,15 +36,24 @@ Interface Summary:
 - def get_sessions(userId: int, db: Session) -> List[ChatSession]
 - def get_messages(session_id: int, db: Session) -> ChatSession
 - def create_session(userId: int, message: str, sheetData: bytes, db: Session) -> ChatSessionCreateResponse
-- def save_message_and_response(sessionId: int, message: str, sheetData: bytes, db: Session) -> LLMResponse
+- async def create_session_async(userId: int, message: str, sheetData: bytes, db: Session | AsyncSession) -> ChatSessionCreateResponse
+- def save_message_and_response(sessionId: int, message: str, sheetData: bytes, db: Session, response_mode: str = "full", sheet_version: Optional[int] = None) -> LLMResponse
+- async def save_message_and_response_async(sessionId: int, message: str, sheetData: bytes, db: Session | AsyncSession, response_mode: str = "full", on_stage=None, sheet_version: Optional[int] = None) -> LLMResponse
+- async def stream_message_and_response(sessionId: int, message: str, sheetData: bytes, db: Session | AsyncSession, response_mode: str = "delta", sheet_version: Optional[int] = None) -> AsyncIterator[str]
+- def get_chat_sheet(sessionId: int, db: Session) -> ChatSheet
 - def delete_session(sessionId: int, db: Session) -> None
 - def modify_session(sessionId: int, newName: str, db: Session) -> ChatSession
 
 Helper Summary:
 - def insert_message_to_db(sessionId: int, content: str, senderType: str, db: Session) -> Message
-- def upsert_chat_sheet(sessionId: int, sheetData: Optional[Any], db: Session) -> ChatSheet
+- def upsert_chat_sheet(sessionId: int, sheetData: Optional[Any], db: Session, expected_version: Optional[int] = None) -> ChatSheet
+- def resolve_sheet_bytes(sessionId: int, sheetData: Optional[bytes], db: Session) -> bytes
+- def get_sheet_version(sessionId: int, db: Session) -> Optional[int]
+- def build_sheet_delta(parsed_workbook: ParsedWorkbook, base_version: Optional[int], version: int) -> SheetDelta
+- def format_sse_event(event: str, data: Any) -> str
 - def update_session_summary(sessionId: int, summary: str, db: Session) -> None
 - def validate_user_exists(userId: int, db: Session) -> None
+- def validate_session_exists(sessionId: int, db: Session) -> None
 - def touch_session(sessionId: int, db: Session) -> None
 """
 
@@ -83,6 +109,7 @@ def get_messages(session_id: int, db: Session) -> ChatSession:
 def create_session(userId: int, message: str, sheetData: bytes, db: Session) -> ChatSessionCreateResponse:
     """
     새로운 채팅 세션을 생성하고 첫 사용자 메시지를 저장한 뒤 LLM 응답을 반환합니다.
+    (동기 경로: 메시지 처리는 save_message_and_response로, 세션 레인을 거치지 않음)
 
     Args:
         userId (int): 사용자 ID
@@ -93,11 +120,7 @@ def create_session(userId: int, message: str, sheetData: bytes, db: Session) ->
     Returns:
         ChatSessionCreateResponse: 생성된 세션 정보 및 초기 응답 데이터
     """
-    validate_user_exists(userId, db)
-
-    session = ChatSession(userId=userId, name="New Session")
-    db.add(session)
-    db.flush()
+    session = _create_session_row(userId, db)
     res = save_message_and_response(session.id, message, sheetData, db)
 
     return ChatSessionCreateResponse(
@@ -107,24 +130,323 @@ def create_session(userId: int, message: str, sheetData: bytes, db: Session) ->
         message=res.message
     )
 
-def save_message_and_response(sessionId: int, message: str, sheetData: bytes, db: Session) -> LLMMessageResponse:
+async def create_session_async(
+        userId: int,
+        message: str,
+        sheetData: bytes,
+        db: Union[Session, AsyncSession]
+) -> ChatSessionCreateResponse:
+    """
+    create_session의 비동기 버전 (메시지 처리는 save_message_and_response_async 사용)
+
+    Args:
+        userId (int): 사용자 ID
+        message (str): 사용자 입력 메시지
+        sheetData (bytes): 엑셀 시트 데이터
+        db (Session | AsyncSession): SQLAlchemy DB 세션
+
+    Returns:
+        ChatSessionCreateResponse: 생성된 세션 정보 및 초기 응답 데이터
+    """
+    session = await run_db(db, _create_session_row, userId)
+    # 커밋 후 속성 재조회(lazy load)가 이벤트 루프에서 일어나지 않도록 미리 읽어 둠
+    session_id, session_name = session.id, session.name
+    res = await save_message_and_response_async(session_id, message, sheetData, db)
+
+    return ChatSessionCreateResponse(
+        sessionId=session_id,
+        sessionName=session_name,
+        sheetData =res.sheetData,
+        message=res.message
+    )
+
+def _create_session_row(userId: int, db: Session) -> ChatSession:
+    """사용자를 검증하고 새 세션 행을 만듭니다. (flush만 하고 커밋은 메시지 처리 후)"""
+    validate_user_exists(userId, db)
+
+    session = ChatSession(userId=userId, name="New Session")
+    db.add(session)
+    db.flush()
+    return session
+
+def save_message_and_response(
+        sessionId: int,
+        message: str,
+        sheetData: bytes,
+        db: Session,
+        response_mode: str = "full",
+        sheet_version: Optional[int] = None
+) -> LLMMessageResponse:
     """
        세션에 사용자 메시지를 저장하고 LLM으로부터 응답을 받아 처리 및 저장합니다.
+       세션 레인(session_lanes)을 거치지 않으므로 같은 세션의 동시 요청은 직렬화되지 않고,
+       먼저 시트를 저장한 요청 외에는 SheetVersionConflictException(409)으로 거부됩니다.
 
        Args:
            sessionId (int): 채팅 세션 ID
            message (str): 사용자 입력 메시지
-           sheetData (bytes): 엑셀 시트 데이터
+           sheetData (bytes): 엑셀 시트 데이터 (None이면 세션에 저장된 시트 사용)
            db (Session): SQLAlchemy DB 세션
+           response_mode (str): "full"이면 수정된 시트 전체(Base64)를, "delta"이면 셀 단위 변경 목록만 반환
+           sheet_version (int | None): (선택) 업로드한 시트가 기준으로 한 세션 시트 버전 (시트가 없었으면 0)
 
        Returns:
-           LLMMessageResponse: LLM의 응답 메시지 및 수정된 엑셀 시트 데이터 (Base64 인코딩)
+           LLMMessageResponse: LLM의 응답 메시지 및 수정된 엑셀 시트 데이터 (Base64 인코딩 또는 diff)
 
        Raises:
            SessionNotFoundException: 세션이 존재하지 않을 경우
+           SheetVersionConflictException: 시트를 읽은 뒤(또는 sheet_version 이후) 다른 요청이 시트를 저장한 경우
        """
+    # 1~2. 사용자 메시지 저장, 세션 조회, 요청 단위 워크북 준비
+    session_summary, parsed_workbook, base_version = _prepare_message(sessionId, message, sheetData, db, sheet_version)
+
+    # 3. LLM을 호출하여 명령어 해석 및 응답 생성
+    response_result = get_llm_response(
+        #chat_session의 summary를 가져오도록 구현 필요
+        session_summary=session_summary,
+        user_command=message,
+        excel_bytes=parsed_workbook
+    )
+
+    # 4. LLM이 생성한 명령어 시퀀스를 바탕으로 엑셀 수정
+    modified_excel_bytes = process_excel_with_commands(
+        excel_bytes=parsed_workbook,
+        commands=response_result.cmd_seq  # ExcelCommand 리스트
+    )
+
+    # 5~9. AI 메시지·요약·시트 저장 및 응답 구성
+    return _complete_message(
+        sessionId, parsed_workbook, response_result, modified_excel_bytes, db, response_mode, base_version
+    )
+
+
+async def save_message_and_response_async(
+        sessionId: int,
+        message: str,
+        sheetData: bytes,
+        db: Union[Session, AsyncSession],
+        response_mode: str = "full",
+        on_stage: Optional[Callable[[str], None]] = None,
+        sheet_version: Optional[int] = None
+) -> LLMMessageResponse:
+    """
+    save_message_and_response의 비동기 버전
+    DB 접근은 AsyncSession이면 비동기 드라이버로(DB_ASYNC=1), Session이면 스레드 풀에서, 워크북 분석·명령어 실행은
+    엑셀 워커 풀에서, LLM 호출은 비동기 클라이언트로 처리하여 LLM 응답을 기다리는 동안 이벤트 루프가 다른 요청을
+    처리할 수 있게 합니다.
+    같은 세션의 메시지는 세션 레인에서 도착 순서대로 하나씩 처리합니다. (다른 세션은 병렬)
+
+    Args:
+        sessionId (int): 채팅 세션 ID
+        message (str): 사용자 입력 메시지
+        sheetData (bytes): 엑셀 시트 데이터 (None이면 세션에 저장된 시트 사용)
+        db (Session | AsyncSession): SQLAlchemy DB 세션
+        response_mode (str): "full" 또는 "delta"
+        on_stage (Callable): (선택) 단계가 시작될 때 단계 이름("lane", "prepare", "llm", "excel", "save")으로 호출
+        sheet_version (int | None): (선택) 업로드한 시트가 기준으로 한 세션 시트 버전 (시트가 없었으면 0)
+
+    Returns:
+        LLMMessageResponse: LLM의 응답 메시지 및 수정된 엑셀 시트 데이터
+
+    Raises:
+        SessionNotFoundException: 세션이 존재하지 않을 경우
+        SheetVersionConflictException: 시트를 읽은 뒤(또는 sheet_version 이후) 다른 요청이 시트를 저장한 경우
+    """
+    on_stage = on_stage or (lambda stage: None)
+
+    on_stage("lane")
+    async with session_lanes.hold(sessionId):
+        on_stage("prepare")
+        session_summary, parsed_workbook, base_version = await _prepare_message_async(
+            sessionId, message, sheetData, db, sheet_version
+        )
+
+        on_stage("llm")
+        response_result = await get_llm_response_async(
+            session_summary=session_summary,
+            user_command=message,
+            excel_bytes=parsed_workbook
+        )
+
+        on_stage("excel")
+        modified_excel_bytes = await _execute_commands_async(
+            sessionId, parsed_workbook, response_result.cmd_seq, response_mode
+        )
+
+        on_stage("save")
+        return await _complete_message_async(
+            sessionId, parsed_workbook, response_result, modified_excel_bytes, db, response_mode, base_version
+        )
+
+
+async def stream_message_and_response(
+        sessionId: int,
+        message: str,
+        sheetData: Optional[bytes],
+        db: Union[Session, AsyncSession],
+        response_mode: str = "delta",
+        sheet_version: Optional[int] = None
+) -> AsyncIterator[str]:
+    """
+    save_message_and_response의 스트리밍(SSE) 버전
+    세션 검증을 먼저 끝낸 뒤(404는 스트림 시작 전에 발생),
+    LLM 응답 텍스트를 생성되는 대로 "delta" 이벤트로, 명령어 실행·저장 결과를 마지막 "result" 이벤트로 내보내는
+    이벤트 스트림을 반환합니다. 메시지 처리는 스트림 안에서 세션 레인을 잡고 진행하므로,
+    그 이후의 오류(시트 버전 충돌 등)는 "error" 이벤트로 전달됩니다.
+
+    Args:
+        sessionId (int): 채팅 세션 ID
+        message (str): 사용자 입력 메시지
+        sheetData (bytes | None): 엑셀 시트 데이터 (None이면 세션에 저장된 시트 사용)
+        db (Session | AsyncSession): SQLAlchemy DB 세션
+        response_mode (str): 마지막 이벤트의 시트 형식 ("delta" 또는 "full")
+        sheet_version (int | None): (선택) 업로드한 시트가 기준으로 한 세션 시트 버전 (시트가 없었으면 0)
+
+    Returns:
+        AsyncIterator[str]: SSE 형식 문자열 스트림
+
+    Raises:
+        SessionNotFoundException: 세션이 존재하지 않을 경우
+    """
+    await run_db(db, validate_session_exists, sessionId)
+    return _stream_message_events(sessionId, message, sheetData, db, response_mode, sheet_version)
+
+
+async def _stream_message_events(
+        sessionId: int,
+        message: str,
+        sheetData: Optional[bytes],
+        db: Union[Session, AsyncSession],
+        response_mode: str,
+        sheet_version: Optional[int]
+) -> AsyncIterator[str]:
+    """stream_message_and_response의 이벤트 생성기 (세션 레인 → 준비 → LLM 스트림 → 명령어 실행 → 저장)"""
+    try:
+        async with session_lanes.hold(sessionId):
+            session_summary, parsed_workbook, base_version = await _prepare_message_async(
+                sessionId, message, sheetData, db, sheet_version
+            )
+
+            response_result = None
+            async for item in stream_llm_response_async(
+                    session_summary=session_summary,
+                    user_command=message,
+                    excel_bytes=parsed_workbook
+            ):
+                if isinstance(item, str):
+                    yield format_sse_event("delta", {"text": item})
+                else:
+                    response_result = item
+
+            modified_excel_bytes = await _execute_commands_async(
+                sessionId, parsed_workbook, response_result.cmd_seq, response_mode
+            )
+            response = await _complete_message_async(
+                sessionId, parsed_workbook, response_result, modified_excel_bytes, db, response_mode, base_version
+            )
+        yield format_sse_event("result", response.model_dump(mode="json"))
+    except Exception as e:
+        print(f"[스트림] session={sessionId} 처리 중 오류 발생: {str(e)}")
+        await rollback_session(db)
+        detail = e.detail if isinstance(e, HTTPException) else "메시지를 처리하는 중 오류가 발생했습니다."
+        yield format_sse_event("error", {"detail": detail})
+
+
+async def _execute_commands_async(
+        sessionId: int,
+        parsed_workbook: ParsedWorkbook,
+        commands: List[Any],
+        response_mode: str
+) -> bytes:
+    """
+    명령어 실행(로드·실행·재계산·저장)을 엑셀 워커에서 수행합니다.
+    EXCEL_WORKER_MODE=process이면 세션 고정 프로세스 워커에서, 아니면 엑셀 워커 스레드에서 실행합니다.
+
+    Args:
+        sessionId (int): 채팅 세션 ID
+        parsed_workbook (ParsedWorkbook): 이번 요청의 워크북
+        commands (List[ExcelCommand]): 실행할 명령어 목록
+        response_mode (str): "delta"이면 프로세스 워커에서 셀 단위 변경 목록도 만듦
+
+    Returns:
+        bytes: 수정된 엑셀 데이터
+    """
+    if EXCEL_WORKER_MODE == "process":
+        return await run_commands_in_process(
+            sessionId, parsed_workbook, commands, collect_changes=response_mode == "delta"
+        )
+    return await run_in_excel_worker(
+        process_excel_with_commands,
+        excel_bytes=parsed_workbook,
+        commands=commands
+    )
+
+
+def _prepare_message(
+        sessionId: int,
+        message: str,
+        sheetData: Optional[bytes],
+        db: Session,
+        sheet_version: Optional[int] = None
+) -> Tuple[str, ParsedWorkbook, int]:
+    """
+    사용자 메시지를 저장하고 세션 요약과 요청 단위 워크북을 준비합니다. (LLM 호출 전 단계)
+
+    Args:
+        sessionId (int): 채팅 세션 ID
+        message (str): 사용자 입력 메시지
+        sheetData (bytes | None): 업로드된 엑셀 데이터
+        db (Session): SQLAlchemy DB 세션
+        sheet_version (int | None): (선택) 업로드한 시트가 기준으로 한 세션 시트 버전
+
+    Returns:
+        Tuple[str, ParsedWorkbook, int]: 세션 요약, 요청 단위 워크북, 읽은 시점의 시트 버전 (시트가 없으면 0)
+
+    Raises:
+        SessionNotFoundException: 세션이 존재하지 않을 경우
+        SheetVersionConflictException: sheet_version이 현재 시트 버전과 다른 경우
+    """
+    session_summary, sheet_bytes, base_version = _load_message_context(
+        sessionId, message, sheetData, db, sheet_version
+    )
+
+    # 요청 단위 워크북: LLM 분석과 명령어 실행이 같은 파싱 결과를 공유
+    # 세션 캐시에 같은 내용의 워크북이 있으면 파싱 자체를 생략
+    parsed_workbook = open_session_workbook(sessionId, sheet_bytes)
+
+    return session_summary, parsed_workbook, base_version
+
+
+async def _prepare_message_async(
+        sessionId: int,
+        message: str,
+        sheetData: Optional[bytes],
+        db: Union[Session, AsyncSession],
+        sheet_version: Optional[int] = None
+) -> Tuple[str, ParsedWorkbook, int]:
+    """_prepare_message의 비동기 버전 (DB 단계는 run_db로, 워크북 파싱은 스레드 풀에서)"""
+    session_summary, sheet_bytes, base_version = await run_db(
+        db, _load_message_context, sessionId, message, sheetData, sheet_version=sheet_version
+    )
+    parsed_workbook = await run_in_threadpool(open_session_workbook, sessionId, sheet_bytes)
+    return session_summary, parsed_workbook, base_version
+
+
+def _load_message_context(
+        sessionId: int,
+        message: str,
+        sheetData: Optional[bytes],
+        db: Session,
+        sheet_version: Optional[int] = None
+) -> Tuple[str, bytes, int]:
+    """
+    _prepare_message의 DB 단계: 사용자 메시지 저장, 세션 요약·시트 버전 조회, 사용할 시트 바이트 결정
+
+    Returns:
+        Tuple[str, bytes, int]: 세션 요약, 시트 바이트, 읽은 시점의 시트 버전 (시트가 없으면 0)
+    """
     # 1. 사용자 메시지를 DB에 저장 (USER)
-    saved_message = insert_message_to_db(
+    insert_message_to_db(
         sessionId=sessionId,
         content=message,
         senderType="USER",
@@ -136,20 +458,96 @@ def save_message_and_response(sessionId: int, message: str, sheetData: bytes, db
     if session is None:
         raise SessionNotFoundException()
 
-    # 3. LLM을 호출하여 명령어 해석 및 응답 생성
-    response_result = get_llm_response(
-        #chat_session의 summary를 가져오도록 구현 필요
-        session_summary=session.summary,
-        user_command=message,
-        excel_bytes =sheetData
+    # 저장 시 낙관적 동시성 검사의 기준 버전
+    # 클라이언트가 올린 시트가 이미 다른 요청이 저장한 버전보다 오래됐으면 덮어쓰지 않음
+    base_version = get_sheet_version(sessionId, db) or 0
+    if sheet_version is not None and sheet_version != base_version:
+        raise SheetVersionConflictException()
+
+    sheet_bytes = resolve_sheet_bytes(sessionId, sheetData, db)
+    return session.summary, sheet_bytes, base_version
+
+
+def _complete_message(
+        sessionId: int,
+        parsed_workbook: ParsedWorkbook,
+        response_result: ResponseResult,
+        modified_excel_bytes: bytes,
+        db: Session,
+        response_mode: str,
+        base_version: int
+) -> LLMMessageResponse:
+    """
+    LLM 응답과 수정된 시트를 저장하고 응답을 구성합니다. (명령어 실행 후 단계)
+
+    Args:
+        sessionId (int): 채팅 세션 ID
+        parsed_workbook (ParsedWorkbook): 이번 요청의 워크북
+        response_result (ResponseResult): LLM 응답 결과
+        modified_excel_bytes (bytes): 명령어 실행 후 엑셀 데이터
+        db (Session): SQLAlchemy DB 세션
+        response_mode (str): "full" 또는 "delta"
+        base_version (int): 시트를 읽은 시점의 버전 (시트가 없었으면 0)
+
+    Returns:
+        LLMMessageResponse: LLM의 응답 메시지 및 수정된 엑셀 시트 데이터
+
+    Raises:
+        SheetVersionConflictException: 시트를 읽은 뒤 다른 요청이 시트를 저장한 경우
+    """
+    # 5~7. AI 메시지·요약·시트 저장
+    ai_message, sheet_version = _save_message_result(
+        sessionId, response_result, modified_excel_bytes, db, base_version
     )
 
-    # 4. LLM이 생성한 명령어 시퀀스를 바탕으로 엑셀 수정
-    modified_excel_bytes = process_excel_with_commands(
-        excel_bytes=sheetData,
-        commands=response_result.cmd_seq  # ExcelCommand 리스트
+    # 8. 응답 구성 (워크북을 세션 캐시에 돌려놓기 전에 읽어야 함)
+    response = _build_message_response(
+        sessionId, parsed_workbook, modified_excel_bytes, response_mode, base_version, sheet_version, ai_message
     )
 
+    # 9. 변경사항 모두 커밋
+    db.commit()
+
+    _finish_message(sessionId, parsed_workbook, response_result)
+    return response
+
+
+async def _complete_message_async(
+        sessionId: int,
+        parsed_workbook: ParsedWorkbook,
+        response_result: ResponseResult,
+        modified_excel_bytes: bytes,
+        db: Union[Session, AsyncSession],
+        response_mode: str,
+        base_version: int
+) -> LLMMessageResponse:
+    """_complete_message의 비동기 버전 (DB 단계는 run_db로, 응답 시트 구성은 스레드 풀에서)"""
+    ai_message, sheet_version = await run_db(
+        db, _save_message_result, sessionId, response_result, modified_excel_bytes, base_version=base_version
+    )
+    response = await run_in_threadpool(
+        _build_message_response,
+        sessionId, parsed_workbook, modified_excel_bytes, response_mode, base_version, sheet_version, ai_message
+    )
+    await commit_session(db)
+
+    _finish_message(sessionId, parsed_workbook, response_result)
+    return response
+
+
+def _save_message_result(
+        sessionId: int,
+        response_result: ResponseResult,
+        modified_excel_bytes: bytes,
+        db: Session,
+        base_version: int
+) -> Tuple[MessageResponse, int]:
+    """
+    _complete_message의 DB 단계: AI 메시지, 세션 요약, 시트를 저장합니다. (커밋은 하지 않음)
+
+    Returns:
+        Tuple[MessageResponse, int]: 저장한 AI 메시지, 저장 후 시트 버전
+    """
     # 5. AI의 응답 메시지를 DB에 저장 (AI)
     ai_message= insert_message_to_db(
         sessionId=sessionId,
@@ -165,26 +563,80 @@ def save_message_and_response(sessionId: int, message: str, sheetData: bytes, db
         db=db
     )
 
-    # 7. 수정된 엑셀 데이터를 chat_sheet에 업서트
-    upsert_chat_sheet(sessionId, modified_excel_bytes, db)
+    # 7. 수정된 엑셀 데이터를 chat_sheet에 업서트 (내용이 바뀌면 버전 증가)
+    #    읽은 뒤 다른 요청(다른 서버 프로세스 포함)이 먼저 저장했으면 409로 거절해 덮어쓰지 않음
+    chat_sheet = upsert_chat_sheet(sessionId, modified_excel_bytes, db, expected_version=base_version)
 
-    # 8. 변경사항 모두 커밋
-    db.commit()
+    # 메시지 ID를 받기 위해 flush (커밋 후 재조회 없이 응답을 만들 수 있도록 여기서 읽어 둠)
+    db.flush()
+    message = MessageResponse(
+        id= ai_message.id,
+        content=ai_message.content,
+        createdAt=ai_message.createdAt,
+        senderType=ai_message.senderType
+    )
+    return message, chat_sheet.version
+
+
+def _build_message_response(
+        sessionId: int,
+        parsed_workbook: ParsedWorkbook,
+        modified_excel_bytes: bytes,
+        response_mode: str,
+        base_version: int,
+        sheet_version: int,
+        message: MessageResponse
+) -> LLMMessageResponse:
+    """응답 시트 구성: delta 모드면 변경된 셀 목록만, 아니면 수정된 엑셀 sheet 전체를 base64로 인코딩"""
+    print(
+        f"[워크북] session={sessionId} cache_hit={parsed_workbook.cache_hit} "
+        f"parse={parsed_workbook.parse_count} save={parsed_workbook.save_count}"
+    )
 
-    # 9. 수정된 엑셀 sheet를 base64로 인코딩하여 JSON 응답에 포함
-    encoded_sheet = base64.b64encode(modified_excel_bytes).decode('utf-8')
+    encoded_sheet = None
+    sheet_delta = None
+    if response_mode == "delta":
+        sheet_delta = build_sheet_delta(parsed_workbook, base_version or None, sheet_version)
+    else:
+        encoded_sheet = base64.b64encode(modified_excel_bytes).decode('utf-8')
 
     return LLMMessageResponse(
         sheetData=encoded_sheet,
-        message = MessageResponse(
-            id= ai_message.id,
-            content=ai_message.content,
-            createdAt=ai_message.createdAt,
-            senderType=ai_message.senderType
-        )
+        sheetVersion=sheet_version,
+        sheetDelta=sheet_delta,
+        circularReferences=parsed_workbook.circular_references,
+        message=message
     )
 
 
+def _finish_message(sessionId: int, parsed_workbook: ParsedWorkbook, response_result: ResponseResult) -> None:
+    """커밋 후 정리: 워크북을 세션 캐시에 돌려놓고, 요약 압축을 예약합니다."""
+    # 커밋이 끝난 워크북만 세션 캐시에 보관
+    release_session_workbook(sessionId, parsed_workbook)
+
+    # 요약 윈도를 넘친 오래된 턴은 요청 경로 밖에서 압축
+    schedule_summary_compaction(sessionId, response_result.summary)
+
+
+def get_chat_sheet(sessionId: int, db: Session) -> ChatSheet:
+    """
+    세션의 시트 전체를 조회합니다. (delta 응답 모드에서 필요할 때만 전체 워크북을 받기 위한 용도)
+
+    Args:
+        sessionId (int): 세션 ID
+        db (Session): SQLAlchemy DB 세션
+
+    Returns:
+        ChatSheet: 세션의 시트 객체
+
+    Raises:
+        SessionNotFoundException: 세션 또는 시트가 존재하지 않을 경우
+    """
+    sheet = db.query(ChatSheet).filter(ChatSheet.sessionId == sessionId).first()
+    if not sheet:
+        raise SessionNotFoundException()
+    return sheet
+
 def delete_session(sessionId: int, db: Session) -> None:
     """
     특정 세션 ID에 해당하는 채팅 세션을 삭제합니다.
@@ -202,6 +654,7 @@ def delete_session(sessionId: int, db: Session) -> None:
 
     db.delete(session)
     db.commit()
+    workbook_cache.invalidate(sessionId)
 
 def modify_session(sessionId: int, newName: str, db: Session) -> ChatSession:
     """
@@ -251,7 +704,12 @@ def insert_message_to_db(sessionId: int, content: str, senderType: str, db: Sess
     db.add(message)
     return message
 
-def upsert_chat_sheet(sessionId: int, sheetData: Optional[Any], db: Session) -> ChatSheet:
+def upsert_chat_sheet(
+        sessionId: int,
+        sheetData: Optional[Any],
+        db: Session,
+        expected_version: Optional[int] = None
+) -> ChatSheet:
     """
     세션에 대응하는 ChatSheet 데이터를 삽입하거나 갱신합니다.
 
@@ -259,25 +717,145 @@ def upsert_chat_sheet(sessionId: int, sheetData: Optional[Any], db: Session) ->
         sessionId (int): 세션 ID
         sheetData (bytes | None): 엑셀 데이터
         db (Session): SQLAlchemy DB 세션
+        expected_version (int | None): (선택) 시트를 읽은 시점의 버전 (시트가 없었으면 0).
+            주면 버전이 그대로일 때만 갱신하는 조건부 UPDATE로 저장
 
     Returns:
-        ChatSheet: 삽입되거나 갱신된 시트 객체
+        ChatSheet: 삽입되거나 갱신된 시트 객체 (내용이 바뀌면 version이 1 증가)
+
+    Raises:
+        SheetVersionConflictException: expected_version 이후 다른 요청이 시트를 저장했거나,
+            시트가 없던 세션에 다른 요청이 먼저 시트를 삽입한 경우
     """
-    sheet = db.query(ChatSheet).filter(ChatSheet.sessionId == sessionId).first()
+    sheet = _find_sheet(sessionId, db)
+
+    if expected_version is not None and (sheet.version if sheet else 0) != expected_version:
+        raise SheetVersionConflictException()
 
     if sheet:
-        if sheetData is not None:
-            sheet.sheetData = sheetData
-        # else: sheetData가 None이면 그대로 유지
+        if sheetData is not None and sheetData != sheet.sheetData:
+            if expected_version is None:
+                sheet.sheetData = sheetData
+                sheet.version = (sheet.version or 1) + 1
+            else:
+                _update_sheet_if_version(sheet, sheetData, expected_version, db)
+        # else: sheetData가 None이거나 내용이 같으면 그대로 유지
     else:
         sheet = ChatSheet(
             sessionId=sessionId,
-            sheetData=sheetData if sheetData is not None else b""  # 빈 바이트
+            sheetData=sheetData if sheetData is not None else b"",  # 빈 바이트
+            version=1
         )
-        db.add(sheet)
+        # 다른 요청(다른 프로세스, 레인을 거치지 않는 동기 경로)이 먼저 삽입했으면 sessionId 유니크 제약에 걸림
+        # 세이브포인트 안에서 flush해 실패해도 이번 요청의 다른 변경(메시지 등)은 트랜잭션에 남김
+        try:
+            with db.begin_nested():
+                db.add(sheet)
+        except IntegrityError:
+            raise SheetVersionConflictException()
 
     return sheet
 
+def _find_sheet(sessionId: int, db: Session) -> Optional[ChatSheet]:
+    """세션의 시트를 조회합니다. (없으면 None)"""
+    return db.query(ChatSheet).filter(ChatSheet.sessionId == sessionId).first()
+
+def _update_sheet_if_version(sheet: ChatSheet, sheetData: bytes, expected_version: int, db: Session) -> None:
+    """버전이 expected_version일 때만 시트를 갱신합니다. (다른 프로세스가 먼저 커밋했으면 갱신되는 행이 없음)"""
+    updated = db.query(ChatSheet).filter(
+        ChatSheet.id == sheet.id,
+        ChatSheet.version == expected_version
+    ).update(
+        {ChatSheet.sheetData: sheetData, ChatSheet.version: expected_version + 1},
+        synchronize_session=False
+    )
+    if not updated:
+        raise SheetVersionConflictException()
+
+    # UPDATE로 이미 반영했으므로 flush 때 다시 쓰지 않도록 커밋된 값으로 맞춤
+    set_committed_value(sheet, "sheetData", sheetData)
+    set_committed_value(sheet, "version", expected_version + 1)
+
+def resolve_sheet_bytes(sessionId: int, sheetData: Optional[bytes], db: Session) -> bytes:
+    """
+    이번 요청에서 사용할 시트 바이트를 결정합니다.
+    업로드된 시트가 없으면 DB에 저장된 세션 시트를, 그것도 없으면 빈 엑셀 파일을 사용합니다.
+
+    Args:
+        sessionId (int): 세션 ID
+        sheetData (bytes | None): 업로드된 엑셀 데이터
+        db (Session): SQLAlchemy DB 세션
+
+    Returns:
+        bytes: 엑셀 시트 데이터
+    """
+    if sheetData:
+        return sheetData
+
+    sheet = db.query(ChatSheet).filter(ChatSheet.sessionId == sessionId).first()
+    if sheet and sheet.sheetData:
+        return sheet.sheetData
+
+    return create_empty_excel()
+
+def get_sheet_version(sessionId: int, db: Session) -> Optional[int]:
+    """
+    세션 시트의 현재 버전을 조회합니다.
+
+    Args:
+        sessionId (int): 세션 ID
+        db (Session): SQLAlchemy DB 세션
+
+    Returns:
+        int | None: 시트 버전 (시트가 없으면 None)
+    """
+    return db.query(ChatSheet.version).filter(ChatSheet.sessionId == sessionId).scalar()
+
+def build_sheet_delta(parsed_workbook: ParsedWorkbook, base_version: Optional[int], version: int) -> SheetDelta:
+    """
+    이번 요청에서 실행된 명령어가 변경한 셀과, 그 영향으로 다시 계산된 하위 수식 셀들로 시트 diff를 만듭니다.
+
+    Args:
+        parsed_workbook (ParsedWorkbook): 이번 요청의 워크북
+        base_version (int | None): diff 적용 기준 버전
+        version (int): diff 적용 후 버전
+
+    Returns:
+        SheetDelta: 셀 단위 변경 목록
+    """
+    changes = []
+    sheet_name = None
+    if parsed_workbook.cell_changes is not None:
+        # 엑셀 프로세스 워커에서 명령어를 실행한 경우 워커가 만든 변경 목록 사용
+        sheet_name = parsed_workbook.cell_changes["sheetName"]
+        changes = [CellChange(**change) for change in parsed_workbook.cell_changes["changes"]]
+    elif parsed_workbook.is_parsed and parsed_workbook.delta_cells:
+        worksheet = parsed_workbook.workbook.active
+        sheet_name = worksheet.title
+        changes = [CellChange(**change) for change in collect_cell_changes(worksheet, parsed_workbook.delta_cells)]
+
+    return SheetDelta(
+        baseVersion=base_version,
+        version=version,
+        sheetName=sheet_name,
+        changes=changes,
+        mergedRanges=parsed_workbook.merged_ranges,
+        unmergedRanges=parsed_workbook.unmerged_ranges
+    )
+
+def format_sse_event(event: str, data: Any) -> str:
+    """
+    Server-Sent Events 형식의 이벤트 문자열을 만듭니다.
+
+    Args:
+        event (str): 이벤트 이름 ("delta", "result", "error")
+        data (Any): JSON으로 직렬화할 데이터
+
+    Returns:
+        str: "event: ...\ndata: ...\n\n" 형식 문자열
+    """
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
 def update_session_summary(sessionId: int, summary: str, db: Session) -> None:
     """
         세션의 summary 필드를 업데이트합니다.
@@ -310,6 +888,20 @@ def validate_user_exists(userId: int, db: Session) -> None:
     if not db.query(User).filter(User.id == userId).first():
         raise UserNotFoundException()
 
+def validate_session_exists(sessionId: int, db: Session) -> None:
+    """
+       해당 세션 ID가 존재하는지 검증합니다.
+
+       Args:
+           sessionId (int): 세션 ID
+           db (Session): SQLAlchemy DB 세션
+
+       Raises:
+           SessionNotFoundException: 세션이 존재하지 않을 경우
+       """
+    if not db.query(ChatSession.id).filter(ChatSession.id == sessionId).first():
+        raise SessionNotFoundException()
+
 def touch_session(sessionId: int, db: Session):
     """
        세션의 modifiedAt 필드를 현재 시각으로 갱신합니다.
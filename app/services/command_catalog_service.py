@@ -0,0 +1,446 @@
+# app/services/command_catalog_service.py
+"""
+엑셀 명령어 카탈로그
+LLM이 사용할 수 있는 명령어의 설명과 예시를 데이터로 관리합니다.
+
+- 응답 스키마의 command_type enum과 시스템 프롬프트의 명령어 목록은 이 카탈로그에서 만듭니다.
+- 상세 예시는 매 요청 전부 보내지 않고, 사용자 명령(과 대화 요약)의 키워드로 관련 명령어만 골라 보냅니다.
+"""
+import os
+import re
+from typing import Dict, List, Optional, Sequence
+
+from app.services.command_encoding_service import to_compact
+
+# 요청 하나에 예시를 넣을 최대 명령어 수
+COMMAND_EXAMPLE_LIMIT = int(os.getenv("COMMAND_EXAMPLE_LIMIT", "5"))
+# 명령어 하나당 기본으로 넣을 예시 수 (키워드가 맞는 예시는 추가로 포함)
+EXAMPLES_PER_COMMAND = 2
+# 키워드가 하나도 맞지 않을 때 보여줄 명령어
+DEFAULT_COMMANDS = ("sum", "set_value", "clear")
+
+# 사용자 명령의 키워드는 대화 요약의 키워드보다 가중치를 크게 둠
+_COMMAND_WEIGHT = 2
+_SUMMARY_WEIGHT = 1
+
+_ASCII_WORD = re.compile(r"[a-z_]+")
+
+
+class CommandExample:
+    """명령어 사용 예시 하나"""
+
+    def __init__(self, description: str, command: str, keywords: Sequence[str] = ()):
+        """
+        Args:
+            description: 예시 설명
+            command: 예시 명령어 JSON 한 줄
+            keywords: (선택) 이 예시를 추가로 포함시킬 키워드 (복합 조건 예시 등)
+        """
+        self.description = description
+        self.command = command
+        self.keywords = tuple(keywords)
+
+
+class CommandSpec:
+    """명령어 하나의 설명과 예시"""
+
+    def __init__(
+            self,
+            name: str,
+            category: str,
+            label: Optional[str],
+            keywords: Sequence[str],
+            examples: List[CommandExample],
+            note: Optional[str] = None
+    ):
+        """
+        Args:
+            name: command_type 값
+            category: 시스템 프롬프트 목록에서 묶을 분류
+            label: 목록에 괄호로 붙일 짧은 설명 (없으면 이름만 표시)
+            keywords: 사용자 명령에서 이 명령어를 고를 한국어 키워드
+            examples: 사용 예시
+            note: (선택) 예시와 함께 항상 보여줄 주의사항
+        """
+        self.name = name
+        self.category = category
+        self.label = label
+        self.keywords = tuple(keywords)
+        self.examples = examples
+        self.note = note
+
+    def render(self, text: str = "", compact: bool = False) -> str:
+        """
+        명령어 예시 블록을 만듭니다. 기본 예시 EXAMPLES_PER_COMMAND개와 키워드가 맞는 추가 예시를 포함합니다.
+
+        Args:
+            text: 키워드 비교에 쓸 소문자 텍스트
+            compact: 예시 명령어를 compact 형식 배열로 표시할지 여부
+
+        Returns:
+            예시 텍스트
+        """
+        title = f"# {self.name.upper()}" + (f" ({self.label})" if self.label else "")
+        lines = [title]
+        if self.note:
+            lines.append(f"  {self.note}")
+        basic = [example for example in self.examples if not example.keywords][:EXAMPLES_PER_COMMAND]
+        matched = [
+            example for example in self.examples
+            if example.keywords and any(keyword in text for keyword in example.keywords)
+        ]
+        for example in basic + matched:
+            lines.append(f"- {example.description}")
+            lines.append(f"  {to_compact(example.command) if compact else example.command}")
+        return "\n".join(lines)
+
+
+COMMAND_CATALOG: List[CommandSpec] = [
+    # 기본 함수
+    CommandSpec("sum", "기본 함수", "합계", ("합계", "합산", "총합", "총계", "더해", "더하"), [
+        CommandExample("B2부터 B10까지의 모든 값을 더해서 B11에 합계 표시",
+                       '{"command_type": "sum", "target_cell": "B11", "parameters": ["B2:B10"]}'),
+    ]),
+    CommandSpec("average", "기본 함수", "평균", ("평균",), [
+        CommandExample("C2부터 C20까지 점수의 평균을 계산해서 C21에 표시 (빈 셀 제외하고 계산)",
+                       '{"command_type": "average", "target_cell": "C21", "parameters": ["C2:C20"]}'),
+    ]),
+    CommandSpec("count", "기본 함수", "개수", ("개수", "갯수", "몇 개", "세어", "카운트"), [
+        CommandExample("D2부터 D15까지 범위에서 숫자가 입력된 셀의 개수를 D16에 표시",
+                       '{"command_type": "count", "target_cell": "D16", "parameters": ["D2:D15"]}'),
+    ]),
+    CommandSpec("max", "기본 함수", "최대값", ("최대", "최댓값", "가장 큰", "최고"), [
+        CommandExample("E2부터 E50까지 범위에서 가장 큰 값을 찾아서 E51에 최댓값 표시",
+                       '{"command_type": "max", "target_cell": "E51", "parameters": ["E2:E50"]}'),
+    ]),
+    CommandSpec("min", "기본 함수", "최소값", ("최소", "최솟값", "가장 작은", "최저"), [
+        CommandExample("F2부터 F30까지 범위에서 가장 작은 값을 찾아서 F31에 최솟값 표시",
+                       '{"command_type": "min", "target_cell": "F31", "parameters": ["F2:F30"]}'),
+    ]),
+
+    # 데이터 조작
+    CommandSpec("set_value", "데이터 조작", "값 설정",
+                ("입력", "넣어", "적어", "써줘", "제목", "헤더", "표를 만", "표 만들", "새 표", "작성"), [
+        CommandExample('A1 셀에 "제품명"이라는 텍스트를 입력하여 헤더 설정',
+                       '{"command_type": "set_value", "target_cell": "A1", "parameters": ["제품명"]}'),
+    ]),
+    CommandSpec("clear", "데이터 조작", "내용 지우기", ("지워", "지우", "삭제", "비워", "초기화"), [
+        CommandExample("B5부터 D10까지 범위의 모든 내용을 지워서 데이터 초기화",
+                       '{"command_type": "clear", "target_cell": "B5:D10", "parameters": []}'),
+    ]),
+    CommandSpec("merge", "데이터 조작", "셀 병합", ("병합", "셀 합치", "셀을 합치"), [
+        CommandExample("A1부터 C1까지 3개 셀을 병합해서 제목 영역으로 만들기",
+                       '{"command_type": "merge", "target_cell": "A1:C1", "parameters": []}'),
+    ]),
+    CommandSpec("unmerge", "데이터 조작", "병합 해제", ("병합 해제", "병합을 풀", "병합 풀", "분리"), [
+        CommandExample("이전에 병합된 A1:C1 범위를 다시 개별 셀로 분리하기",
+                       '{"command_type": "unmerge", "target_cell": "A1:C1", "parameters": []}'),
+    ]),
+
+    # 논리 함수
+    CommandSpec("if", "논리 함수", "조건", ("이면", "라면", "경우", "조건", "판정", "만약", "아니면", "합격"), [
+        CommandExample('기본 합격/불합격: B2 점수가 60점 이상이면 "합격", 미만이면 "불합격"을 C2에 표시',
+                       '{"command_type": "if", "target_cell": "C2", "parameters": ["B2>=60", "합격", "불합격"]}'),
+        CommandExample('나이 기준 분류: D2 나이가 18세 이상이면 "성인", 미만이면 "미성년자"를 E2에 표시',
+                       '{"command_type": "if", "target_cell": "E2", "parameters": ["D2>=18", "성인", "미성년자"]}'),
+        CommandExample('재고 관리: F2 재고수량이 10개 미만이면 "주문필요", 이상이면 "충분"을 G2에 표시',
+                       '{"command_type": "if", "target_cell": "G2", "parameters": ["F2<10", "주문필요", "충분"]}'),
+        CommandExample("급여 계산: H2 근무시간이 40시간 초과면 초과수당 적용(시급*1.5), 아니면 기본시급을 I2에 계산",
+                       '{"command_type": "if", "target_cell": "I2", "parameters": ["H2>40", "H2*15000*1.5", "H2*15000"]}'),
+        # 복합 조건 (실무에서 자주 사용)
+        CommandExample('IF + AND 조합 - 보너스 지급: CE2 연봉이 5000만원 이상이고 CF2 평가가 "우수"일 때 연봉의 10%, 아니면 5%를 CG2에 계산',
+                       '{"command_type": "if", "target_cell": "CG2", "parameters": ["AND(CE2>=50000000,CF2=\\"우수\\")", "CE2*0.1", "CE2*0.05"]}',
+                       keywords=("그리고", "이고", "모두 만족", "둘 다")),
+        CommandExample('IF + OR 조합 - 할인 적용: CH2가 "VIP"이거나 CI2 구매금액이 50만원 이상일 때 10% 할인, 아니면 할인없음을 CJ2에 계산',
+                       '{"command_type": "if", "target_cell": "CJ2", "parameters": ["OR(CH2=\\"VIP\\",CI2>=500000)", "CI2*0.9", "CI2"]}',
+                       keywords=("또는", "이거나", "하나라도")),
+        CommandExample('중첩 IF - 배송 방법: CK2 무게가 30kg 이상이면 "화물배송", 10kg 이상이면 "택배", 나머지는 "일반우편"을 CL2에 표시',
+                       '{"command_type": "if", "target_cell": "CL2", "parameters": ["CK2>=30", "화물배송", "IF(CK2>=10,\\"택배\\",\\"일반우편\\")"]}',
+                       keywords=("중첩", "단계", "나머지는")),
+        CommandExample('COUNTIFS와 유사한 동작 - 조건부 카운트: CM2:CM100에서 "A등급"이고 CN2:CN100에서 "완료"인 항목 수를 계산하기 위한 보조열 CO2 생성',
+                       '{"command_type": "if", "target_cell": "CO2", "parameters": ["AND(CM2=\\"A등급\\",CN2=\\"완료\\")", 1, 0]}',
+                       keywords=("countifs", "여러 조건", "보조열")),
+    ]),
+    CommandSpec("and", "논리 함수", "모든 조건 참", ("그리고", "이고", "모두 만족", "둘 다"), [
+        CommandExample("장학금 대상자: J2 성적이 90점 이상이고 K2 출석률이 95% 이상일 때 TRUE를 L2에 표시",
+                       '{"command_type": "and", "target_cell": "L2", "parameters": ["J2>=90", "K2>=95"]}'),
+        CommandExample('할인 대상 상품: M2 가격이 10만원 이상이고 N2 카테고리가 "전자제품"일 때 TRUE를 O2에 표시',
+                       '{"command_type": "and", "target_cell": "O2", "parameters": ["M2>=100000", "N2=\\"전자제품\\""]}'),
+        CommandExample("대출 승인 조건: P2 연봉이 3000만원 이상이고 Q2 신용등급이 1~3등급일 때 TRUE를 R2에 표시",
+                       '{"command_type": "and", "target_cell": "R2", "parameters": ["P2>=30000000", "Q2<=3", "Q2>=1"]}'),
+        CommandExample("우수 사원: S2 근무년수가 3년 이상이고 T2 평가점수가 85점 이상이고 U2 지각횟수가 5회 미만일 때 TRUE를 V2에 표시",
+                       '{"command_type": "and", "target_cell": "V2", "parameters": ["S2>=3", "T2>=85", "U2<5"]}'),
+    ]),
+    CommandSpec("or", "논리 함수", "하나라도 참", ("또는", "이거나", "하나라도"), [
+        CommandExample('특별 고객: W2가 "VIP"이거나 X2 구매금액이 100만원 이상일 때 TRUE를 Y2에 표시',
+                       '{"command_type": "or", "target_cell": "Y2", "parameters": ["W2=\\"VIP\\"", "X2>=1000000"]}'),
+        CommandExample('긴급 처리: Z2 우선순위가 "긴급"이거나 AA2 마감일이 오늘 이전일 때 TRUE를 AB2에 표시',
+                       '{"command_type": "or", "target_cell": "AB2", "parameters": ["Z2=\\"긴급\\"", "AA2<TODAY()"]}'),
+        CommandExample('휴일 근무: AC2가 "토요일"이거나 AD2가 "일요일"이거나 AE2가 "공휴일"일 때 TRUE를 AF2에 표시',
+                       '{"command_type": "or", "target_cell": "AF2", "parameters": ["AC2=\\"토요일\\"", "AD2=\\"일요일\\"", "AE2=\\"공휴일\\""]}'),
+    ]),
+    CommandSpec("iferror", "논리 함수", "오류 처리", ("오류", "에러", "계산불가"), [
+        CommandExample('나눗셈 오류 방지: AG2를 AH2로 나눈 결과를 AI2에 표시하되, 0으로 나누기 등 오류 시 "계산불가" 표시',
+                       '{"command_type": "iferror", "target_cell": "AI2", "parameters": ["AG2/AH2", "계산불가"]}'),
+        CommandExample('VLOOKUP 오류 처리: AJ2 학번으로 학생정보를 찾되, 없는 학번이면 "미등록학생"을 AK2에 표시',
+                       '{"command_type": "iferror", "target_cell": "AK2", "parameters": ["VLOOKUP(AJ2,학생명단!A:C,2,0)", "미등록학생"]}'),
+        CommandExample("수식 오류 대응: AL2*AM2*AN2 곱셈 결과를 AO2에 표시하되, 텍스트 등으로 인한 오류 시 0 표시",
+                       '{"command_type": "iferror", "target_cell": "AO2", "parameters": ["AL2*AM2*AN2", 0]}'),
+    ]),
+    CommandSpec("ifna", "논리 함수", "#N/A 오류 처리", ("#n/a", "찾지 못", "없으면", "등록되지 않"), [
+        CommandExample('검색 결과 없음: AP2 제품코드로 제품명을 찾되, 등록되지 않은 제품이면 "신제품"을 AQ2에 표시',
+                       '{"command_type": "ifna", "target_cell": "AQ2", "parameters": ["VLOOKUP(AP2,제품목록!A:B,2,0)", "신제품"]}'),
+        CommandExample('매칭 데이터 없음: AR2 고객번호로 고객등급을 찾되, 신규고객이면 "일반등급"을 AS2에 표시',
+                       '{"command_type": "ifna", "target_cell": "AS2", "parameters": ["INDEX(고객정보!C:C,MATCH(AR2,고객정보!A:A,0))", "일반등급"]}'),
+    ]),
+    CommandSpec("ifs", "논리 함수", "다중 조건", ("등급", "다중 조건", "여러 조건", "구간"), [
+        CommandExample('성적 등급: AT2 점수에 따라 90이상="A", 80이상="B", 70이상="C", 60이상="D", 나머지="F"를 AU2에 표시',
+                       '{"command_type": "ifs", "target_cell": "AU2", "parameters": ["AT2>=90", "A", "AT2>=80", "B", "AT2>=70", "C", "AT2>=60", "D", "TRUE", "F"]}'),
+        CommandExample("배송비 계산: AV2 주문금액에 따라 10만원이상=무료, 5만원이상=2500원, 3만원이상=3500원, 나머지=5000원을 AW2에 표시",
+                       '{"command_type": "ifs", "target_cell": "AW2", "parameters": ["AV2>=100000", 0, "AV2>=50000", 2500, "AV2>=30000", "3500", "TRUE", 5000]}'),
+        CommandExample('근무 형태: AX2 근무시간에 따라 40시간이상="정규직", 20시간이상="파트타임", 10시간이상="아르바이트", 나머지="인턴"을 AY2에 표시',
+                       '{"command_type": "ifs", "target_cell": "AY2", "parameters": ["AX2>=40", "정규직", "AX2>=20", "파트타임", "AX2>=10", "아르바이트", "TRUE", "인턴"]}'),
+    ]),
+
+    # 조건부 연산
+    CommandSpec("countif", "조건부 연산", "조건부 개수", ("조건부 개수", "인원", "몇 명", "명 수", "사람 수", "건수", "인 개수"), [
+        CommandExample('성별 통계: AZ2:AZ100 범위에서 "남성"인 직원 수를 BA101에 계산',
+                       '{"command_type": "countif", "target_cell": "BA101", "parameters": ["AZ2:AZ100", "\\"남성\\""]}'),
+        CommandExample("합격자 수: BB2:BB50 성적에서 80점 이상인 학생 수를 BC51에 계산",
+                       '{"command_type": "countif", "target_cell": "BC51", "parameters": ["BB2:BB50", ">=80"]}'),
+        CommandExample("재고 부족: BD2:BD30 재고량에서 10개 미만인 상품 개수를 BE31에 계산",
+                       '{"command_type": "countif", "target_cell": "BE31", "parameters": ["BD2:BD30", "<10"]}'),
+        CommandExample("특정 날짜: BF2:BF200 입사일에서 2023년도 입사자 수를 BG201에 계산",
+                       '{"command_type": "countif", "target_cell": "BG201", "parameters": ["BF2:BF200", ">=2023-01-01"]}'),
+        CommandExample('부서별 인원: BH2:BH80 부서명에서 "개발팀"에 속한 직원 수를 BI81에 계산',
+                       '{"command_type": "countif", "target_cell": "BI81", "parameters": ["BH2:BH80", "\\"개발팀\\""]}'),
+    ]),
+    CommandSpec("sumif", "조건부 연산", "조건부 합계", ("조건부 합계", "별 합계", "별 총", "별 매출", "별 급여", "인 합계"), [
+        CommandExample('부서별 급여: BJ2:BJ50 부서에서 "영업부"인 직원들의 BK2:BK50 급여 합계를 BL51에 계산',
+                       '{"command_type": "sumif", "target_cell": "BL51", "parameters": ["BJ2:BJ50", "\\"영업부\\"", "BK2:BK50"]}'),
+        CommandExample('고득점 합계: BM2:BM40 과목에서 "수학"인 BN2:BN40 점수들의 합계를 BO41에 계산',
+                       '{"command_type": "sumif", "target_cell": "BO41", "parameters": ["BM2:BM40", "\\"수학\\"", "BN2:BN40"]}'),
+        CommandExample('매출 집계: BP2:BP100 지역이 "서울"인 BQ2:BQ100 매출액 합계를 BR101에 계산',
+                       '{"command_type": "sumif", "target_cell": "BR101", "parameters": ["BP2:BP100", "\\"서울\\"", "BQ2:BQ100"]}'),
+        CommandExample("기간별 매출: BS2:BS365 날짜가 2024년 1월인 BT2:BT365 매출 합계를 BU366에 계산",
+                       '{"command_type": "sumif", "target_cell": "BU366", "parameters": ["BS2:BS365", ">=2024-01-01", "BT2:BT365"]}'),
+    ]),
+    CommandSpec("averageif", "조건부 연산", "조건부 평균", ("조건부 평균", "별 평균", "인 평균"), [
+        CommandExample('성별 평균점수: BV2:BV60 성별이 "여성"인 BW2:BW60 점수들의 평균을 BX61에 계산',
+                       '{"command_type": "averageif", "target_cell": "BX61", "parameters": ["BV2:BV60", "\\"여성\\"", "BW2:BW60"]}'),
+        CommandExample("경력별 연봉: BY2:BY80 경력이 5년 이상인 BZ2:BZ80 연봉들의 평균을 CA81에 계산",
+                       '{"command_type": "averageif", "target_cell": "CA81", "parameters": ["BY2:BY80", ">=5", "BZ2:BZ80"]}'),
+        CommandExample('지역별 기온: CB2:CB120 지역이 "부산"인 CC2:CC120 기온들의 평균을 CD121에 계산',
+                       '{"command_type": "averageif", "target_cell": "CD121", "parameters": ["CB2:CB120", "\\"부산\\"", "CC2:CC120"]}'),
+    ]),
+
+    # 검색 및 참조
+    CommandSpec("vlookup", "검색 및 참조", None, ("찾아", "검색", "조회", "매칭"), [
+        CommandExample("I2 학번을 A2:C100 학생명단에서 찾아 3번째 열(이름)을 J2에 표시",
+                       '{"command_type": "vlookup", "target_cell": "J2", "parameters": ["I2", "A2:C100", 3, false]}'),
+    ]),
+    CommandSpec("hlookup", "검색 및 참조", None, ("가로로 찾", "행에서 찾", "가로 검색"), [
+        CommandExample("K2 월을 A1:M5 매출표에서 찾아 2번째 행(매출액)을 L2에 표시",
+                       '{"command_type": "hlookup", "target_cell": "L2", "parameters": ["K2", "A1:M5", 2, false]}'),
+    ]),
+    CommandSpec("index", "검색 및 참조", None, ("번째 행", "번째 열", "위치의 값"), [
+        CommandExample("M2:O20 범위에서 3번째 행, 2번째 열에 있는 값을 P2에 표시",
+                       '{"command_type": "index", "target_cell": "P2", "parameters": ["M2:O20", 3, 2]}'),
+    ]),
+    CommandSpec("match", "검색 및 참조", None, ("몇 번째", "위치"), [
+        CommandExample("Q2 값이 R2:R50 범위에서 몇 번째 위치에 있는지를 S2에 표시",
+                       '{"command_type": "match", "target_cell": "S2", "parameters": ["Q2", "R2:R50", 0]}'),
+    ]),
+    CommandSpec("xlookup", "검색 및 참조", "유연한 검색", ("찾아", "검색", "조회", "매칭"), [
+        CommandExample("T2 제품코드를 U2:U30에서 찾아 V2:V30의 제품명을 W2에 표시 (최신 검색함수)",
+                       '{"command_type": "xlookup", "target_cell": "W2", "parameters": ["T2", "U2:U30", "V2:V30"]}'),
+    ]),
+    CommandSpec("filter", "검색 및 참조", "조건 필터링", ("필터", "걸러", "골라", "추려"), [
+        CommandExample('X2:Z50 데이터에서 Y열이 "A등급"인 행들만 필터링해서 AA2부터 표시',
+                       '{"command_type": "filter", "target_cell": "AA2", "parameters": ["X2:Z50", "Y2:Y50=\\"A등급\\""]}'),
+    ]),
+    CommandSpec("unique", "검색 및 참조", "고유값 추출", ("중복 제거", "중복을 제거", "중복 없이", "고유"), [
+        CommandExample("AB2:AB100 범위에서 중복 제거된 고유한 값들만 AC2부터 세로로 표시",
+                       '{"command_type": "unique", "target_cell": "AC2", "parameters": ["AB2:AB100"]}'),
+    ]),
+
+    # 통계 함수
+    CommandSpec("median", "통계 함수", "중간값", ("중간값", "중앙값"), [
+        CommandExample("AD2:AD30 점수들의 중간값(50퍼센타일)을 계산해서 AE31에 표시",
+                       '{"command_type": "median", "target_cell": "AE31", "parameters": ["AD2:AD30"]}'),
+    ]),
+    CommandSpec("mode", "통계 함수", "최빈값", ("최빈값", "가장 많이 나온", "가장 자주"), [
+        CommandExample("AF2:AF40 데이터에서 가장 자주 나타나는 값(최빈값)을 AG41에 표시",
+                       '{"command_type": "mode", "target_cell": "AG41", "parameters": ["AF2:AF40"]}'),
+    ]),
+    CommandSpec("stdev", "통계 함수", "표준편차", ("표준편차", "편차", "분산"), [
+        CommandExample("AH2:AH35 숫자들의 표준편차를 계산해서 데이터의 분산 정도를 AI36에 표시",
+                       '{"command_type": "stdev", "target_cell": "AI36", "parameters": ["AH2:AH35"]}'),
+    ]),
+    CommandSpec("rank", "통계 함수", "순위", ("순위", "등수", "몇 등"), [
+        CommandExample("AJ2 학생의 점수가 AJ2:AJ50 전체 범위에서 몇 등인지를 AK2에 표시 (0=내림차순)",
+                       '{"command_type": "rank", "target_cell": "AK2", "parameters": ["AJ2", "AJ2:AJ50", 0]}'),
+    ]),
+
+    # 텍스트 함수
+    CommandSpec("concatenate", "텍스트 함수", "텍스트 합치기", ("합쳐", "합치", "이어", "붙여", "연결"), [
+        CommandExample('AL2(성)과 AM2(이름)을 합쳐서 "홍길동" 형태로 AN2에 표시',
+                       '{"command_type": "concatenate", "target_cell": "AN2", "parameters": ["AL2", "AM2"]}'),
+    ]),
+    CommandSpec("&", "텍스트 함수", "텍스트 합치기", ("구분자", "연결"), [
+        CommandExample('AO2와 AP2 문자열을 " - " 구분자와 함께 연결해서 AQ2에 표시',
+                       '{"command_type": "&", "target_cell": "AQ2", "parameters": ["AO2", "\\" - \\"", "AP2"]}'),
+    ]),
+    CommandSpec("left", "텍스트 함수", None, ("왼쪽", "앞 글자", "앞자리", "앞부분"), [
+        CommandExample('AR2 텍스트에서 왼쪽부터 3글자만 추출해서 AS2에 표시 (예: "홍길동"→"홍길동")',
+                       '{"command_type": "left", "target_cell": "AS2", "parameters": ["AR2", 3]}'),
+    ]),
+    CommandSpec("right", "텍스트 함수", None, ("오른쪽", "뒷자리", "끝자리", "뒷부분"), [
+        CommandExample("AT2 전화번호에서 오른쪽 끝 4자리만 추출해서 AU2에 표시",
+                       '{"command_type": "right", "target_cell": "AU2", "parameters": ["AT2", 4]}'),
+    ]),
+    CommandSpec("mid", "텍스트 함수", "텍스트 자르기", ("중간 글자", "번째 글자", "가운데", "잘라"), [
+        CommandExample("AV2 문자열에서 3번째 위치부터 2글자를 추출해서 AW2에 표시",
+                       '{"command_type": "mid", "target_cell": "AW2", "parameters": ["AV2", 3, 2]}'),
+    ]),
+    CommandSpec("len", "텍스트 함수", "길이", ("글자 수", "글자수", "길이"), [
+        CommandExample("AX2 텍스트의 전체 글자 수(공백 포함)를 계산해서 AY2에 표시",
+                       '{"command_type": "len", "target_cell": "AY2", "parameters": ["AX2"]}'),
+    ]),
+    CommandSpec("substitute", "텍스트 함수", "치환", ("바꿔", "치환", "대체"), [
+        CommandExample('AZ2 텍스트에서 "구버전"을 "신버전"으로 모두 바꿔서 BA2에 표시',
+                       '{"command_type": "substitute", "target_cell": "BA2", "parameters": ["AZ2", "구버전", "신버전"]}'),
+    ]),
+    CommandSpec("trim", "텍스트 함수", "공백 제거", ("공백",), [
+        CommandExample("BB2 텍스트의 앞뒤 공백과 중간의 연속 공백을 제거해서 BC2에 표시",
+                       '{"command_type": "trim", "target_cell": "BC2", "parameters": ["BB2"]}'),
+    ]),
+    CommandSpec("upper", "텍스트 함수", "대문자", ("대문자",), [
+        CommandExample('BD2 영문 텍스트를 모두 대문자로 변환해서 BE2에 표시 ("hello"→"HELLO")',
+                       '{"command_type": "upper", "target_cell": "BE2", "parameters": ["BD2"]}'),
+    ]),
+    CommandSpec("lower", "텍스트 함수", "소문자", ("소문자",), [
+        CommandExample('BF2 영문 텍스트를 모두 소문자로 변환해서 BG2에 표시 ("WORLD"→"world")',
+                       '{"command_type": "lower", "target_cell": "BG2", "parameters": ["BF2"]}'),
+    ]),
+
+    # 범위 채우기
+    CommandSpec("fill_value", "범위 채우기", "같은 값 채우기", ("모두", "전부", "같은 값", "일괄"), [
+        CommandExample('E2:E100 모든 셀에 "미확인" 입력',
+                       '{"command_type": "fill_value", "target_cell": "E2:E100", "parameters": ["미확인"]}'),
+        CommandExample("B2:D2에 0 입력",
+                       '{"command_type": "fill_value", "target_cell": "B2:D2", "parameters": [0]}'),
+    ]),
+    CommandSpec("fill_series", "범위 채우기", "연속값 채우기", ("부터", "번호", "순번", "일련", "연속", "날짜"), [
+        CommandExample("A1:A100에 1부터 100까지 입력",
+                       '{"command_type": "fill_series", "target_cell": "A1:A100", "parameters": [1]}'),
+        CommandExample("B1:M1에 2024-01-01부터 한 달 간격 날짜 입력",
+                       '{"command_type": "fill_series", "target_cell": "B1:M1", "parameters": ["2024-01-01", 1, "month"]}'),
+        CommandExample("C2:C11에 10부터 10씩 증가하는 값 입력",
+                       '{"command_type": "fill_series", "target_cell": "C2:C11", "parameters": [10, 10]}'),
+    ]),
+    CommandSpec("fill_formula", "범위 채우기", "수식 복사", ("각 행", "행마다", "모든 행", "아래로", "복사"), [
+        CommandExample("D2:D100 각 행에 B열 단가 x C열 수량 계산",
+                       '{"command_type": "fill_formula", "target_cell": "D2:D100", "parameters": ["=B2*C2"]}'),
+        CommandExample("E2:E50 각 행의 점수를 $G$1 기준점과 비교해 합격 표시",
+                       '{"command_type": "fill_formula", "target_cell": "E2:E50", "parameters": ["=IF(B2>=$G$1,\\"합격\\",\\"불합격\\")"]}'),
+    ], note="parameters[0]은 범위의 첫 셀 기준으로 작성하며, $가 붙지 않은 참조는 셀마다 엑셀 채우기처럼 이동합니다."),
+
+    # 기타 함수
+    CommandSpec("round", "기타 함수", "반올림", ("반올림", "소수점", "자리까지"), [
+        CommandExample("BI2 소수값을 소수점 첫째 자리까지 반올림해서 BI2에 표시 (예: 1.414 → 1.4)",
+                       '{"command_type": "round", "target_cell": "BI2", "parameters": [1]}'),
+    ], note="ROUND 함수는 기존에 그 셀에 있던 값을 그대로 사용하도록 기능을 제한해서 소수점 자리숫만 parameters[0]에 넣어야 합니다."),
+    CommandSpec("isblank", "기타 함수", "빈 셀 확인", ("비어있", "비어 있", "빈 셀", "빈칸"), [
+        CommandExample("BJ2 셀이 비어있는지 확인해서 TRUE/FALSE를 BK2에 표시",
+                       '{"command_type": "isblank", "target_cell": "BK2", "parameters": ["BJ2"]}'),
+    ]),
+]
+
+_CATALOG_BY_NAME: Dict[str, CommandSpec] = {spec.name: spec for spec in COMMAND_CATALOG}
+
+
+def command_types() -> List[str]:
+    """
+    응답 스키마 enum에 넣을 command_type 목록을 카탈로그 순서대로 반환합니다.
+
+    Returns:
+        command_type 목록
+    """
+    return [spec.name for spec in COMMAND_CATALOG]
+
+
+def render_command_overview() -> str:
+    """
+    시스템 프롬프트에 넣을 분류별 명령어 목록을 만듭니다. (요청마다 같은 텍스트)
+
+    Returns:
+        "- 기본 함수: sum(합계), ..." 형식의 여러 줄 텍스트
+    """
+    categories: Dict[str, List[str]] = {}
+    for spec in COMMAND_CATALOG:
+        name = f"{spec.name}({spec.label})" if spec.label else spec.name
+        categories.setdefault(spec.category, []).append(name)
+    return "\n".join(f"- {category}: {', '.join(names)}" for category, names in categories.items())
+
+
+def select_commands(
+        user_command: str,
+        session_summary: Optional[str] = None,
+        limit: Optional[int] = None
+) -> List[CommandSpec]:
+    """
+    사용자 명령과 대화 요약의 키워드로 예시를 보여줄 명령어를 고릅니다.
+    명령어 이름(sum, vlookup 등)이 직접 나오거나 한국어 키워드가 포함되면 점수를 주며,
+    사용자 명령의 키워드가 대화 요약의 키워드보다 우선합니다.
+
+    Args:
+        user_command: 사용자 명령
+        session_summary: (선택) 이전 대화 요약 텍스트
+        limit: 최대 명령어 수 (기본 COMMAND_EXAMPLE_LIMIT)
+
+    Returns:
+        점수가 높은 순의 CommandSpec 목록 (맞는 것이 없으면 DEFAULT_COMMANDS)
+    """
+    limit = COMMAND_EXAMPLE_LIMIT if limit is None else limit
+    command_text = (user_command or "").lower()
+    summary_text = (session_summary or "").lower()
+
+    scores: Dict[str, int] = {}
+    for text, weight in ((command_text, _COMMAND_WEIGHT), (summary_text, _SUMMARY_WEIGHT)):
+        if not text:
+            continue
+        words = set(_ASCII_WORD.findall(text))
+        for spec in COMMAND_CATALOG:
+            hits = sum(keyword in text for keyword in spec.keywords)
+            if spec.name in words or (spec.name == "&" and "&" in text):
+                hits += 1
+            if hits:
+                scores[spec.name] = scores.get(spec.name, 0) + hits * weight
+
+    if not scores:
+        return [_CATALOG_BY_NAME[name] for name in DEFAULT_COMMANDS][:limit]
+
+    order = {spec.name: index for index, spec in enumerate(COMMAND_CATALOG)}
+    ranked = sorted(scores, key=lambda name: (-scores[name], order[name]))
+    return [_CATALOG_BY_NAME[name] for name in ranked[:limit]]
+
+
+def render_command_examples(
+        user_command: str,
+        session_summary: Optional[str] = None,
+        compact: bool = False
+) -> str:
+    """
+    사용자 명령과 관련된 명령어의 예시 블록을 만듭니다.
+
+    Args:
+        user_command: 사용자 명령
+        session_summary: (선택) 이전 대화 요약 텍스트
+        compact: 예시 명령어를 compact 형식 배열로 표시할지 여부
+
+    Returns:
+        사용자 프롬프트에 넣을 예시 텍스트
+    """
+    text = f"{user_command or ''}\n{session_summary or ''}".lower()
+    return "\n\n".join(spec.render(text, compact) for spec in select_commands(user_command, session_summary))
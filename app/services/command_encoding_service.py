@@ -0,0 +1,135 @@
+# app/services/command_encoding_service.py
+"""
+LLM 명령어 인코딩 서비스
+구조화 출력(structured output)에서 명령어를 표현하는 두 가지 형식을 다룹니다.
+
+- object(기본): {"command_type": "sum", "target_cell": "B11", "parameters": ["B2:B10"]}
+- compact: ["sum", "B11", "B2:B10"]  (명령어 타입, 대상 셀, 파라미터... 순서의 배열)
+  범위 채우기: ["@fill", "D2:D100", "sum", "A2:C2"]
+  → 첫 셀(D2) 기준으로 쓴 명령을 범위의 모든 셀에 적용하며, 상대 참조는 엑셀 채우기처럼 셀마다 이동합니다.
+
+출력 토큰이 응답 지연을 좌우하므로, compact 형식은 키 이름 반복을 없애고 같은 패턴의 명령을 한 줄로 묶습니다.
+어느 형식으로 응답하든 normalize_commands()로 object 형식 딕셔너리 목록으로 펼쳐 처리합니다.
+"""
+import json
+import os
+from typing import Any, Dict, List
+
+from openpyxl.utils import get_column_letter
+
+from app.utils.cell_reference import iter_range_cells, range_size, shift_references
+
+# object | compact
+LLM_COMMAND_ENCODING = os.getenv("LLM_COMMAND_ENCODING", "object").lower()
+# 범위 채우기 하나로 만들 수 있는 최대 명령어 수 (fill_value/fill_series/fill_formula 명령어의 최대 셀 수도 같음)
+MAX_FILL_CELLS = int(os.getenv("LLM_MAX_FILL_CELLS", "5000"))
+
+FILL_MARKER = "@fill"
+
+# 파라미터가 수식/조건이 아닌 값이라 "="로 시작할 때만 참조를 이동하는 명령어
+_LITERAL_PARAMETER_COMMANDS = {"set_value"}
+
+if LLM_COMMAND_ENCODING not in ("object", "compact"):
+    raise ValueError(f"지원하지 않는 LLM_COMMAND_ENCODING입니다: {LLM_COMMAND_ENCODING}")
+
+
+def normalize_commands(commands: List[Any]) -> List[Dict[str, Any]]:
+    """
+    LLM 응답의 명령어 목록을 object 형식 딕셔너리 목록으로 정규화합니다.
+    compact 형식 배열과 범위 채우기(@fill)는 여기서 펼칩니다.
+
+    Args:
+        commands: 응답의 commands 값 (딕셔너리 또는 배열의 목록)
+
+    Returns:
+        [{"command_type", "target_cell", "parameters"}] 목록
+
+    Raises:
+        ValueError: 명령어 형식이 잘못된 경우
+    """
+    if not isinstance(commands, list):
+        raise ValueError("commands는 리스트여야 합니다")
+
+    normalized: List[Dict[str, Any]] = []
+    for command in commands:
+        if isinstance(command, dict):
+            if not all(key in command for key in ["command_type", "target_cell", "parameters"]):
+                raise ValueError("명령어에 필수 필드가 누락되었습니다")
+            if not isinstance(command["parameters"], list):
+                raise ValueError("parameters는 배열이어야 합니다")
+            normalized.append(command)
+        elif isinstance(command, list):
+            if len(command) >= 1 and command[0] == FILL_MARKER:
+                normalized.extend(expand_fill(command))
+            else:
+                normalized.append(_decode_tuple(command))
+        else:
+            raise ValueError(f"명령어 형식이 잘못되었습니다: {command!r}")
+    return normalized
+
+
+def _decode_tuple(command: List[Any]) -> Dict[str, Any]:
+    if len(command) < 2 or not isinstance(command[0], str) or not isinstance(command[1], str):
+        raise ValueError(f"명령어 배열은 [명령어 타입, 대상 셀, 파라미터...] 형식이어야 합니다: {command!r}")
+    return {"command_type": command[0], "target_cell": command[1], "parameters": list(command[2:])}
+
+
+def expand_fill(command: List[Any]) -> List[Dict[str, Any]]:
+    """
+    범위 채우기 ["@fill", 범위, 명령어 타입, 파라미터...]를 셀별 명령어로 펼칩니다.
+
+    Args:
+        command: 범위 채우기 배열 (파라미터는 범위의 첫 셀 기준으로 작성)
+
+    Returns:
+        셀마다 하나씩, 행 우선 순서의 명령어 딕셔너리 목록
+
+    Raises:
+        ValueError: 형식이 잘못되었거나 범위가 MAX_FILL_CELLS보다 큰 경우
+    """
+    if len(command) < 3 or not isinstance(command[1], str) or not isinstance(command[2], str):
+        raise ValueError(f"범위 채우기는 [\"{FILL_MARKER}\", 범위, 명령어 타입, 파라미터...] 형식이어야 합니다: {command!r}")
+    cell_range, command_type, parameters = command[1], command[2], list(command[3:])
+
+    if range_size(cell_range) > MAX_FILL_CELLS:
+        raise ValueError(f"범위 채우기는 최대 {MAX_FILL_CELLS}개 셀까지 가능합니다: {cell_range}")
+
+    literal = command_type.lower() in _LITERAL_PARAMETER_COMMANDS
+    cells = list(iter_range_cells(cell_range))
+    first_row, first_col = cells[0]
+    expanded = []
+    for row, col in cells:
+        row_offset, col_offset = row - first_row, col - first_col
+        expanded.append({
+            "command_type": command_type,
+            "target_cell": f"{get_column_letter(col)}{row}",
+            "parameters": [
+                _shift_parameter(value, row_offset, col_offset, literal) for value in parameters
+            ],
+        })
+    return expanded
+
+
+def _shift_parameter(value: Any, row_offset: int, col_offset: int, literal: bool) -> Any:
+    if not isinstance(value, str):
+        return value
+    if literal and not value.startswith("="):
+        return value
+    return shift_references(value, row_offset, col_offset)
+
+
+def to_compact(command_json: str) -> str:
+    """
+    object 형식 명령어 JSON 한 줄을 compact 형식으로 바꿉니다. (프롬프트 예시용)
+
+    Args:
+        command_json: '{"command_type": ..., "target_cell": ..., "parameters": [...]}'
+
+    Returns:
+        '["sum", "B11", "B2:B10"]' 형식의 JSON 한 줄
+    """
+    command = json.loads(command_json)
+    return json.dumps(
+        [command["command_type"], command["target_cell"], *command["parameters"]],
+        ensure_ascii=False
+    )
@@ -0,0 +1,275 @@
+# app/services/command_parser_service.py
+"""
+로컬 명령어 파서 (LLM 우회 경로)
+"B11에 B2:B10 합계", "A1:C1 병합", "C5 지워줘"처럼 엑셀 명령어 하나로 바로 대응되는 단순한 명령은
+GPT를 호출하지 않고 정해진 문법으로 해석해 명령어 목록과 응답 문구를 만듭니다.
+
+- 문장 전체가 문법 하나에 정확히 맞을 때만 처리하고, 조금이라도 애매하면 None을 반환해 LLM으로 넘깁니다.
+- 대화 요약에 "앞으로 ~ 적용해줘" 같은 지속 지시가 있으면 LLM이 반영해야 하므로 처리하지 않습니다.
+- 처리 비율(LLM 호출을 흡수한 비율)은 stats()로 확인합니다.
+"""
+import os
+import re
+import threading
+from typing import Any, Dict, List, Optional
+
+from openpyxl.utils import range_boundaries
+
+# 0이면 로컬 파서를 사용하지 않고 모든 명령을 LLM으로 보냄
+LOCAL_COMMAND_PARSER_ENABLED = os.getenv("LOCAL_COMMAND_PARSER", "1") != "0"
+
+# 대화 요약에 이 표현이 있으면 지속 지시(앞으로 반올림 등)가 있을 수 있으므로 LLM으로 보냄
+_STANDING_INSTRUCTION_KEYWORDS = ("앞으로", "계속", "항상", "from now on")
+
+_MAX_ROW = 1048576
+_MAX_COL = 16384
+
+_CELL = r"\$?[A-Za-z]{1,3}\$?\d+"
+_REF = rf"(?:{_CELL}(?::{_CELL})?)"
+
+# 문장 끝의 요청 어미 ("해줘", "주세요" 등) - 모든 문법 뒤에 붙여 매칭
+_ENDING = r"(?:\s*(?:해|하기)?\s*(?:줘|주세요|줄래|줄래요|요)?)?"
+_TRAILING_PUNCTUATION = re.compile(r"[\s.!~?]+$")
+_FILLER = re.compile(r"(?:^|\s)(?:좀|please)(?=\s|$)", re.IGNORECASE)
+
+# 집계 함수 이름 → command_type
+_AGGREGATES = {
+    "합계": "sum", "총합": "sum", "합산": "sum", "합": "sum",
+    "평균": "average",
+    "개수": "count",
+    "최댓값": "max", "최대값": "max", "최대": "max",
+    "최솟값": "min", "최소값": "min", "최소": "min",
+    "sum": "sum", "total": "sum", "average": "average", "avg": "average", "mean": "average",
+    "count": "count", "max": "max", "maximum": "max", "min": "min", "minimum": "min",
+}
+_AGGREGATE_LABELS = {"sum": "합계를", "average": "평균을", "count": "개수를", "max": "최댓값을", "min": "최솟값을"}
+_AGGREGATE = "|".join(sorted(map(re.escape, _AGGREGATES), key=len, reverse=True))
+
+_VALUE = r"(?:-?\d+(?:\.\d+)?|\"[^\"]*\"|'[^']*'|“[^”]*”)"
+_PUT = r"(?:입력|넣어|적어|써|기입)"
+_COMPUTE = r"(?:구해|계산|넣어|입력|표시|적어)"
+
+
+class LocalCommand:
+    """로컬 파서가 해석한 결과 (LLM 응답과 같은 형식의 명령어 목록과 응답 문구)"""
+
+    def __init__(self, commands: List[Dict[str, Any]], reply: str):
+        """
+        Args:
+            commands: [{"command_type", "target_cell", "parameters"}] 목록 (object 형식)
+            reply: 사용자에게 보여줄 응답 (요약에도 사용)
+        """
+        self.commands = commands
+        self.reply = reply
+
+    @property
+    def command_type(self) -> str:
+        return self.commands[0]["command_type"]
+
+
+def _command(command_type: str, target_cell: str, *parameters: Any) -> Dict[str, Any]:
+    return {"command_type": command_type, "target_cell": target_cell, "parameters": list(parameters)}
+
+
+def _normalize_ref(ref: str) -> Optional[str]:
+    """셀 주소/범위를 대문자로 바꾸고 시트 범위 안인지 확인합니다. (잘못되면 None)"""
+    ref = ref.upper()
+    try:
+        min_col, min_row, max_col, max_row = range_boundaries(ref)
+    except (ValueError, TypeError):
+        return None
+    if None in (min_col, min_row, max_col, max_row) or max_row > _MAX_ROW or max_col > _MAX_COL:
+        return None
+    return ref
+
+
+def _is_single_cell(ref: str) -> bool:
+    min_col, min_row, max_col, max_row = range_boundaries(ref)
+    return min_col == max_col and min_row == max_row
+
+
+def _contains(cell_range: str, cell: str) -> bool:
+    min_col, min_row, max_col, max_row = range_boundaries(cell_range)
+    col, row, _, _ = range_boundaries(cell)
+    return min_col <= col <= max_col and min_row <= row <= max_row
+
+
+def _parse_value(text: str) -> Any:
+    """숫자는 int/float로, 따옴표로 감싼 값은 따옴표를 벗겨 반환합니다."""
+    if text[0] in "\"'“":
+        return text[1:-1]
+    number = float(text)
+    return int(number) if number.is_integer() and "." not in text else number
+
+
+# ──────────────────────────────
+# 문법별 해석 함수 (match → LocalCommand 또는 None)
+# ──────────────────────────────
+def _aggregate(target: str, cell_range: str, name: str) -> Optional[LocalCommand]:
+    target, cell_range = _normalize_ref(target), _normalize_ref(cell_range)
+    if target is None or cell_range is None or not _is_single_cell(target) or _contains(cell_range, target):
+        return None
+    command_type = _AGGREGATES[name.lower()]
+    return LocalCommand(
+        [_command(command_type, target, cell_range)],
+        f"{target}에 {cell_range}의 {_AGGREGATE_LABELS[command_type]} 계산했습니다."
+    )
+
+
+def _merge(cell_range: str) -> Optional[LocalCommand]:
+    cell_range = _normalize_ref(cell_range)
+    if cell_range is None or _is_single_cell(cell_range):
+        return None
+    return LocalCommand([_command("merge", cell_range)], f"{cell_range} 셀을 병합했습니다.")
+
+
+def _unmerge(cell_range: str) -> Optional[LocalCommand]:
+    cell_range = _normalize_ref(cell_range)
+    if cell_range is None or _is_single_cell(cell_range):
+        return None
+    return LocalCommand([_command("unmerge", cell_range)], f"{cell_range} 셀 병합을 해제했습니다.")
+
+
+def _clear(ref: str) -> Optional[LocalCommand]:
+    ref = _normalize_ref(ref)
+    if ref is None:
+        return None
+    return LocalCommand([_command("clear", ref)], f"{ref}의 내용을 지웠습니다.")
+
+
+def _set_value(cell: str, value: str) -> Optional[LocalCommand]:
+    cell = _normalize_ref(cell)
+    if cell is None or not _is_single_cell(cell):
+        return None
+    parsed = _parse_value(value)
+    return LocalCommand([_command("set_value", cell, parsed)], f"{cell}에 {parsed}을(를) 입력했습니다.")
+
+
+def _fill_series(cell_range: str, start: str, end: str) -> Optional[LocalCommand]:
+    cell_range = _normalize_ref(cell_range)
+    if cell_range is None:
+        return None
+    min_col, min_row, max_col, max_row = range_boundaries(cell_range)
+    if min_col != max_col and min_row != max_row:
+        return None
+    count = max(max_row - min_row, max_col - min_col) + 1
+    first, last = int(start), int(end)
+    if count < 2 or (last - first) % (count - 1):
+        return None
+    step = (last - first) // (count - 1)
+    if step == 0:
+        return None
+    parameters = [first] if step == 1 else [first, step]
+    return LocalCommand(
+        [_command("fill_series", cell_range, *parameters)],
+        f"{cell_range}에 {first}부터 {last}까지 입력했습니다."
+    )
+
+
+# (문법, 해석 함수) - 문장 전체가 맞아야 함
+_GRAMMAR: List[tuple] = [
+    # B11에 B2:B10 합계 (구해줘) / B2:B10 합계를 B11에 (넣어줘)
+    (rf"(?P<target>{_CELL})\s*에\s*(?P<range>{_REF})\s*(?:의\s*)?(?P<name>{_AGGREGATE})\s*(?:을|를)?(?:\s*{_COMPUTE})?",
+     lambda m: _aggregate(m["target"], m["range"], m["name"])),
+    (rf"(?P<range>{_REF})\s*(?:의\s*)?(?P<name>{_AGGREGATE})\s*(?:을|를)?\s*(?P<target>{_CELL})\s*에(?:\s*{_COMPUTE})?",
+     lambda m: _aggregate(m["target"], m["range"], m["name"])),
+    # sum B2:B10 in B11 / put the sum of B2:B10 in B11
+    (rf"(?:put\s+|calculate\s+)?(?:the\s+)?(?P<name>{_AGGREGATE})\s+(?:of\s+)?(?P<range>{_REF})\s+(?:in|into|to|at)\s+(?P<target>{_CELL})",
+     lambda m: _aggregate(m["target"], m["range"], m["name"])),
+    # A1:C1 병합 해제 / unmerge A1:C1
+    (rf"(?P<range>{_REF})\s*(?:의\s*)?(?:셀\s*)?병합\s*(?:을|를)?\s*(?:해제|풀어)",
+     lambda m: _unmerge(m["range"])),
+    (rf"unmerge\s+(?P<range>{_REF})", lambda m: _unmerge(m["range"])),
+    # A1:C1 병합 / merge A1:C1
+    (rf"(?P<range>{_REF})\s*(?:을|를)?\s*(?:셀\s*)?병합", lambda m: _merge(m["range"])),
+    (rf"merge\s+(?:cells\s+)?(?P<range>{_REF})", lambda m: _merge(m["range"])),
+    # C5 지워 / clear C5
+    (rf"(?P<ref>{_REF})\s*(?:의\s*)?(?:내용\s*)?(?:을|를)?\s*(?:지워|삭제|비워)", lambda m: _clear(m["ref"])),
+    (rf"(?:clear|delete)\s+(?P<ref>{_REF})", lambda m: _clear(m["ref"])),
+    # A1:A100에 1부터 100까지 (입력)
+    (rf"(?P<range>{_REF})\s*에\s*(?P<start>-?\d+)\s*부터\s*(?P<end>-?\d+)\s*까지(?:\s*(?:{_PUT}|채워))?",
+     lambda m: _fill_series(m["range"], m["start"], m["end"])),
+    # A1에 100 입력 / set A1 to 100 / put 100 in A1
+    (rf"(?P<cell>{_CELL})\s*에\s*(?P<value>{_VALUE})\s*(?:을|를|이라고|라고)?\s*{_PUT}",
+     lambda m: _set_value(m["cell"], m["value"])),
+    (rf"set\s+(?P<cell>{_CELL})\s+to\s+(?P<value>{_VALUE})", lambda m: _set_value(m["cell"], m["value"])),
+    (rf"(?:put|enter|write)\s+(?P<value>{_VALUE})\s+(?:in|into)\s+(?P<cell>{_CELL})",
+     lambda m: _set_value(m["cell"], m["value"])),
+]
+_COMPILED_GRAMMAR: List[tuple] = [
+    (re.compile(pattern + _ENDING, re.IGNORECASE), build) for pattern, build in _GRAMMAR
+]
+
+
+def _normalize_text(text: str) -> str:
+    """앞뒤 공백, 끝의 문장 부호와 "좀"/"please"를 제거합니다."""
+    text = _FILLER.sub(" ", text or "").strip()
+    text = _TRAILING_PUNCTUATION.sub("", text)
+    return re.sub(r"\s+", " ", text)
+
+
+class LocalCommandParser:
+    """
+    단순 명령을 LLM 없이 해석하는 파서
+    parse()가 None을 반환하면 LLM으로 처리해야 합니다. 처리/위임 횟수를 집계합니다.
+    """
+
+    def __init__(self, grammar: Optional[List[tuple]] = None):
+        """
+        Args:
+            grammar: (선택) (컴파일된 정규식, 해석 함수) 목록 (기본 내장 문법)
+        """
+        self._grammar = grammar if grammar is not None else _COMPILED_GRAMMAR
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.handled = 0
+        self.by_command: Dict[str, int] = {}
+
+    def parse(self, user_command: str, session_summary: Optional[str] = None) -> Optional[LocalCommand]:
+        """
+        사용자 명령을 문법으로 해석합니다.
+
+        Args:
+            user_command: 사용자 명령
+            session_summary: (선택) 이전 대화 요약 (지속 지시가 있으면 처리하지 않음)
+
+        Returns:
+            LocalCommand 또는 None (LLM으로 처리해야 하는 경우)
+        """
+        result = self._match(user_command, session_summary)
+        with self._lock:
+            self.requests += 1
+            if result is not None:
+                self.handled += 1
+                self.by_command[result.command_type] = self.by_command.get(result.command_type, 0) + 1
+        if result is not None:
+            print(f"[로컬 파서] 처리 command_type={result.command_type} target={result.commands[0]['target_cell']}")
+        return result
+
+    def _match(self, user_command: str, session_summary: Optional[str]) -> Optional[LocalCommand]:
+        summary = (session_summary or "").lower()
+        if any(keyword in summary for keyword in _STANDING_INSTRUCTION_KEYWORDS):
+            return None
+        text = _normalize_text(user_command)
+        if not text:
+            return None
+        for pattern, build in self._grammar:
+            match = pattern.fullmatch(text)
+            if match:
+                return build(match)
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        """처리 지표를 반환합니다. (absorbed_ratio: LLM 호출 없이 처리한 비율)"""
+        with self._lock:
+            return {
+                "enabled": LOCAL_COMMAND_PARSER_ENABLED,
+                "requests": self.requests,
+                "handled": self.handled,
+                "fallbacks": self.requests - self.handled,
+                "absorbed_ratio": round(self.handled / self.requests, 4) if self.requests else 0.0,
+                "by_command": dict(self.by_command),
+            }
+
+
+local_command_parser = LocalCommandParser()
@@ -0,0 +1,144 @@
+# app/services/excel_command_registry.py
+"""
+엑셀 명령어 레지스트리
+command_type 문자열을 처리 핸들러에 O(1)로 매핑하고, 명령어별 실행 횟수와 누적 실행 시간을 기록합니다.
+"""
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from app.schemas.excel_schema import ExcelCommand
+
+# (manipulator, command) -> None
+HandlerFunc = Callable[[Any, ExcelCommand], None]
+
+
+class CommandHandler:
+    """
+    단일 command_type에 대한 핸들러 객체
+    실제 처리 함수와 실행 통계(횟수, 누적 시간, 오류 횟수)를 함께 보관합니다.
+    """
+
+    def __init__(self, command_type: str, func: HandlerFunc):
+        """
+        Args:
+            command_type: 명령어 타입 (소문자)
+            func: (manipulator, command)를 받아 명령어를 실행하는 함수
+        """
+        self.command_type = command_type
+        self.func = func
+        self.calls = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+
+    def __call__(self, manipulator: Any, command: ExcelCommand) -> None:
+        self.func(manipulator, command)
+
+    def stats(self) -> Dict[str, Any]:
+        """핸들러 실행 통계를 반환합니다."""
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "total_ms": round(self.total_seconds * 1000, 3),
+            "avg_ms": round(self.total_seconds * 1000 / self.calls, 3) if self.calls else 0.0,
+        }
+
+
+class CommandRegistry:
+    """
+    command_type → CommandHandler 레지스트리
+
+    사용 예:
+        registry = CommandRegistry()
+
+        @registry.register("sum")
+        def _apply_sum(manipulator, command): ...
+    """
+
+    def __init__(self):
+        self._handlers: Dict[str, CommandHandler] = {}
+        self._lock = threading.Lock()
+
+    def register(self, command_type: str, func: Optional[HandlerFunc] = None):
+        """
+        명령어 핸들러를 등록합니다. 데코레이터로도 사용할 수 있습니다.
+
+        Args:
+            command_type: 명령어 타입
+            func: (선택) 핸들러 함수. 생략하면 데코레이터를 반환합니다.
+
+        Returns:
+            func가 주어지면 func, 아니면 데코레이터
+        """
+        def decorator(handler_func: HandlerFunc) -> HandlerFunc:
+            self._handlers[command_type.lower()] = CommandHandler(command_type.lower(), handler_func)
+            return handler_func
+
+        if func is not None:
+            return decorator(func)
+        return decorator
+
+    def get(self, command_type: str) -> Optional[CommandHandler]:
+        """
+        command_type에 해당하는 핸들러를 반환합니다.
+
+        Args:
+            command_type: 명령어 타입
+
+        Returns:
+            CommandHandler 또는 None
+        """
+        return self._handlers.get(command_type.lower())
+
+    def command_types(self) -> List[str]:
+        """등록된 명령어 타입 목록을 반환합니다."""
+        return list(self._handlers.keys())
+
+    def execute(self, manipulator: Any, command: ExcelCommand) -> bool:
+        """
+        명령어를 실행하고 실행 시간을 기록합니다.
+
+        Args:
+            manipulator: 명령어를 적용할 ExcelManipulator
+            command: 실행할 ExcelCommand
+
+        Returns:
+            등록된 명령어라 실행했으면 True, 지원하지 않는 명령어면 False
+        """
+        handler = self.get(command.command_type)
+        if handler is None:
+            return False
+
+        started = time.perf_counter()
+        try:
+            handler(manipulator, command)
+        except Exception:
+            with self._lock:
+                handler.errors += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                handler.calls += 1
+                handler.total_seconds += elapsed
+        return True
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        한 번 이상 실행된 명령어의 통계를 누적 시간 내림차순으로 반환합니다.
+
+        Returns:
+            {command_type: {"calls", "errors", "total_ms", "avg_ms"}}
+        """
+        with self._lock:
+            handlers = [h for h in self._handlers.values() if h.calls]
+            handlers.sort(key=lambda h: h.total_seconds, reverse=True)
+            return {h.command_type: h.stats() for h in handlers}
+
+    def reset_stats(self) -> None:
+        """모든 실행 통계를 초기화합니다."""
+        with self._lock:
+            for handler in self._handlers.values():
+                handler.calls = 0
+                handler.errors = 0
+                handler.total_seconds = 0.0
@@ -0,0 +1,734 @@
+# app/services/excel_context_service.py
+"""
+LLM용 시트 컨텍스트 인코더
+토큰 예산 안에서 활성 시트의 구조와 내용을 최대한 많이 전달하는 텍스트를 만듭니다.
+
+- 시트 전체를 셀 단위로 나열해도 예산 안에 들어가면 그대로 나열합니다. ("A1: 값" 형식)
+- 넘치면 요약 모드로 전환합니다.
+  · 빈 행/열로 구분된 표 영역을 찾고, 첫 행이 제목 행인지(헤더) 판별합니다.
+  · 열마다 타입과 통계(개수, 최소/최대/평균, 고유값 수)를 NumPy로 한 번에 계산합니다.
+  · 반복 값과 연속 값(1, 2, 3, ...)은 run-length로 압축하고, 같은 패턴으로 채워진 수식은 범위로 묶습니다.
+  · 행은 앞부분/뒷부분만 샘플로 보여주며, 예산에 맞을 때까지 샘플 수를 줄입니다.
+- 만든 컨텍스트는 시트 내용 해시별로 LRU 캐시에 보관하여, 시트가 그대로인 동안 다시 만들지 않습니다.
+- 시트가 우리 명령어로만 바뀐 경우에는 이전 셀 스냅샷에 변경된 셀만 반영하여 새 해시의 컨텍스트를 미리 만듭니다.
+"""
+import datetime
+import os
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from openpyxl.utils import get_column_letter, column_index_from_string
+from openpyxl.utils.cell import coordinate_from_string
+from openpyxl.worksheet.worksheet import Worksheet
+
+from app.services.formula_service import ExcelError, format_computed_value, get_computed_values
+from app.services.llm_prompt_service import create_excel_context, create_compact_excel_context
+from app.services.workbook_service import ParsedWorkbook
+from app.utils.cell_reference import replace_references
+from app.utils.token_estimate import estimate_tokens, truncate_lines_to_tokens
+
+EXCEL_CONTEXT_TOKEN_BUDGET = int(os.getenv("EXCEL_CONTEXT_TOKEN_BUDGET", "3000"))
+EXCEL_CONTEXT_CACHE_SIZE = int(os.getenv("EXCEL_CONTEXT_CACHE_SIZE", "64"))
+
+# 이 개수 이하의 셀로 이루어진 영역(제목, 메모 등)은 표로 요약하지 않고 셀을 그대로 나열
+SMALL_REGION_CELLS = 12
+# 행 샘플 수 후보 (예산에 맞을 때까지 앞에서부터 시도)
+SAMPLE_ROW_STEPS = (8, 5, 3, 2, 1, 0)
+# 텍스트 열에서 분포를 모두 보여줄 최대 고유값 수
+MAX_CATEGORIES = 8
+
+
+def build_excel_context(worksheet: Worksheet, token_budget: Optional[int] = None) -> str:
+    """
+    시트 컨텍스트를 토큰 예산에 맞게 만듭니다. (캐시 없이 시트를 매번 새로 훑음)
+
+    Args:
+        worksheet: 대상 워크시트
+        token_budget: 토큰 예산 (기본 EXCEL_CONTEXT_TOKEN_BUDGET)
+
+    Returns:
+        LLM 프롬프트에 넣을 시트 설명 텍스트
+    """
+    budget = EXCEL_CONTEXT_TOKEN_BUDGET if token_budget is None else token_budget
+    sheet = _SheetCells(worksheet, get_computed_values(worksheet))
+    return _encode_sheet(worksheet, sheet, budget)
+
+
+def _encode_sheet(worksheet: Worksheet, sheet: "_SheetCells", budget: int) -> str:
+    computed_values = sheet.computed_values
+
+    # 1. 셀 단위 나열이 예산 안에 들어가면 그대로 사용 (셀 한 줄은 최소 약 3토큰이므로 셀이 많으면 바로 요약)
+    if len(sheet.cells) * 3 <= budget:
+        detailed = create_excel_context(
+            rows=worksheet.max_row,
+            cols=worksheet.max_column,
+            sample_data=sheet.value_lines(),
+            formula_data=sheet.formula_lines()
+        )
+        if estimate_tokens(detailed) <= budget:
+            return detailed
+
+    # 2. 요약 모드: 수식 그룹과 표 요약을 예산에 맞게 구성
+    formula_groups = group_formulas(sheet.formulas, computed_values)
+    formula_lines = truncate_lines_to_tokens(
+        [group.describe() for group in formula_groups], budget // 4, "... 외 수식 그룹 {count}개 생략"
+    )
+    regions = find_regions(list(sheet.cells))
+
+    summaries = [RegionSummary(sheet, region, index) for index, region in enumerate(regions, start=1)]
+
+    context = ""
+    for sample_rows in SAMPLE_ROW_STEPS:
+        tables = [summary.render(sample_rows) for summary in summaries]
+        context = create_compact_excel_context(
+            sheet_name=worksheet.title,
+            rows=worksheet.max_row,
+            cols=worksheet.max_column,
+            cell_count=len(sheet.cells),
+            tables=tables,
+            formula_data=formula_lines
+        )
+        if estimate_tokens(context) <= budget:
+            return context
+
+    lines = truncate_lines_to_tokens(context.split("\n"), budget, "... (토큰 예산 초과로 {count}줄 생략)")
+    return "\n".join(lines)
+
+
+# ──────────────────────────────
+# 컨텍스트 캐시
+# ──────────────────────────────
+class ExcelContextCache:
+    """
+    시트 컨텍스트 LRU 캐시
+    (시트 내용 해시, 토큰 예산)을 키로 완성된 컨텍스트 텍스트를 보관합니다.
+    """
+
+    def __init__(self, max_entries: int = 64):
+        """
+        Args:
+            max_entries: 최대 항목 수 (0이면 비활성)
+        """
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, int], str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.incremental_updates = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        """캐시 사용 여부"""
+        return self.max_entries > 0
+
+    def get(self, content_hash: str, token_budget: int) -> Optional[str]:
+        """
+        캐시된 컨텍스트를 조회합니다.
+
+        Args:
+            content_hash: 시트 내용 해시
+            token_budget: 토큰 예산
+
+        Returns:
+            컨텍스트 텍스트 또는 None
+        """
+        key = (content_hash, token_budget)
+        with self._lock:
+            context = self._entries.get(key)
+            if context is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return context
+
+    def put(self, content_hash: str, token_budget: int, context: str, incremental: bool = False) -> None:
+        """
+        컨텍스트를 저장합니다. 한도를 넘으면 가장 오래 사용되지 않은 항목부터 제거합니다.
+
+        Args:
+            content_hash: 시트 내용 해시
+            token_budget: 토큰 예산
+            context: 컨텍스트 텍스트
+            incremental: 증분 갱신으로 만든 컨텍스트인지 여부 (지표용)
+        """
+        if not self.enabled:
+            return
+        key = (content_hash, token_budget)
+        with self._lock:
+            self.incremental_updates += incremental
+            self._entries[key] = context
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """모든 항목을 제거합니다."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        캐시 적중/실패 등 지표를 반환합니다.
+
+        Returns:
+            지표 딕셔너리
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "incremental_updates": self.incremental_updates,
+                "evictions": self.evictions,
+            }
+
+
+excel_context_cache = ExcelContextCache(EXCEL_CONTEXT_CACHE_SIZE)
+
+# 워크시트별 마지막 셀 스냅샷 (워크북 캐시에 남아 있는 동안 다음 요청의 증분 갱신에 사용)
+_sheet_snapshots: "weakref.WeakKeyDictionary[Worksheet, _SheetCells]" = weakref.WeakKeyDictionary()
+
+
+def get_excel_context(
+        parsed: ParsedWorkbook,
+        token_budget: Optional[int] = None,
+        cache: Optional[ExcelContextCache] = None
+) -> str:
+    """
+    요청 워크북의 활성 시트 컨텍스트를 반환합니다.
+    같은 내용의 시트에 대해 만든 컨텍스트가 캐시에 있으면 워크북을 파싱하지 않고 그대로 반환합니다.
+
+    Args:
+        parsed: 요청 단위 ParsedWorkbook
+        token_budget: 토큰 예산 (기본 EXCEL_CONTEXT_TOKEN_BUDGET)
+        cache: (선택) 사용할 캐시 (기본 excel_context_cache)
+
+    Returns:
+        LLM 프롬프트에 넣을 시트 설명 텍스트
+    """
+    cache = excel_context_cache if cache is None else cache
+    budget = EXCEL_CONTEXT_TOKEN_BUDGET if token_budget is None else token_budget
+
+    # 원본 바이트가 없으면(이미 만든 워크북만 전달된 경우) 내용 해시로 식별할 수 없으므로 캐시하지 않음
+    if not parsed.source_bytes or not cache.enabled:
+        return build_excel_context(parsed.workbook.active, budget)
+
+    content_hash = parsed.source_hash
+    context = cache.get(content_hash, budget)
+    if context is not None:
+        return context
+
+    worksheet = parsed.workbook.active
+    sheet = _sheet_snapshots.get(worksheet)
+    if sheet is None or sheet.content_hash != content_hash:
+        sheet = _SheetCells(worksheet, get_computed_values(worksheet))
+        sheet.content_hash = content_hash
+        _sheet_snapshots[worksheet] = sheet
+    context = _encode_sheet(worksheet, sheet, budget)
+    cache.put(content_hash, budget, context)
+    return context
+
+
+def refresh_excel_context(
+        parsed: ParsedWorkbook,
+        token_budget: Optional[int] = None,
+        cache: Optional[ExcelContextCache] = None
+) -> Optional[str]:
+    """
+    명령어 실행 후, 이전 셀 스냅샷에 변경된 셀(touched_cells)만 반영하여 새 시트 상태의 컨텍스트를 캐시에 넣습니다.
+    스냅샷이 없거나, 추적하지 못한 변경이 있었으면 아무것도 하지 않습니다. (다음 요청에서 전체를 다시 만듦)
+
+    Args:
+        parsed: 명령어가 적용된 ParsedWorkbook (저장 전후 모두 가능)
+        token_budget: 토큰 예산 (기본 EXCEL_CONTEXT_TOKEN_BUDGET)
+        cache: (선택) 사용할 캐시 (기본 excel_context_cache)
+
+    Returns:
+        새로 만든 컨텍스트 텍스트 또는 None
+    """
+    cache = excel_context_cache if cache is None else cache
+    if not parsed.source_bytes or not cache.enabled or not parsed.is_parsed:
+        return None
+
+    worksheet = parsed.workbook.active
+    sheet = _sheet_snapshots.get(worksheet)
+    if sheet is None or sheet.content_hash != parsed.source_hash:
+        return None
+    if parsed.untracked_changes:
+        _sheet_snapshots.pop(worksheet, None)
+        return None
+
+    budget = EXCEL_CONTEXT_TOKEN_BUDGET if token_budget is None else token_budget
+    sheet.apply_changes(worksheet, parsed.touched_cells, get_computed_values(worksheet))
+    sheet.content_hash = parsed.content_hash
+    context = _encode_sheet(worksheet, sheet, budget)
+    cache.put(sheet.content_hash, budget, context, incremental=True)
+    print(f"[컨텍스트] 증분 갱신 cells={len(parsed.touched_cells)}")
+    return context
+
+
+class _SheetCells:
+    """시트의 채워진 셀을 한 번만 훑어 값/수식을 좌표별로 정리합니다."""
+
+    def __init__(self, worksheet: Worksheet, computed_values: Dict[str, Any]):
+        self.cells: Dict[Tuple[int, int], Any] = {}
+        self.formulas: Dict[Tuple[int, int], str] = {}
+        self.display: Dict[Tuple[int, int], Any] = {}
+        self.computed_values = computed_values
+        # 이 스냅샷이 반영하는 시트 내용 해시 (캐시된 스냅샷에서만 사용)
+        self.content_hash: Optional[str] = None
+
+        # ws.cell()로 좌표를 순회하면 빈 좌표마다 Cell 객체가 생기므로 내부 셀 맵에서 직접 읽음
+        for key in sorted(worksheet._cells):
+            value = worksheet._cells[key].value
+            if value is None:
+                continue
+            self.cells[key] = value
+            if isinstance(value, str) and value.startswith("="):
+                self.formulas[key] = value
+                coordinate = f"{get_column_letter(key[1])}{key[0]}"
+                self.display[key] = computed_values.get(coordinate)
+            else:
+                self.display[key] = value
+
+    def apply_changes(
+            self,
+            worksheet: Worksheet,
+            coordinates: Iterable[str],
+            computed_values: Dict[str, Any]
+    ) -> None:
+        """
+        변경된 셀만 다시 읽어 스냅샷을 갱신하고, 수식 셀의 표시 값을 새 계산 결과로 바꿉니다.
+
+        Args:
+            worksheet: 대상 워크시트
+            coordinates: 변경된 셀 주소 목록
+            computed_values: 재계산 후의 좌표 → 계산 값
+        """
+        inserted = False
+        for coordinate in coordinates:
+            letters, row = coordinate_from_string(coordinate)
+            key = (row, column_index_from_string(letters))
+            cell = worksheet._cells.get(key)
+            value = None if cell is None else cell.value
+
+            self.formulas.pop(key, None)
+            if value is None:
+                self.cells.pop(key, None)
+                self.display.pop(key, None)
+                continue
+            inserted = inserted or key not in self.cells
+            self.cells[key] = value
+            if isinstance(value, str) and value.startswith("="):
+                self.formulas[key] = value
+            else:
+                self.display[key] = value
+
+        # 새 셀이 생기면 시트 순서(행 → 열)를 다시 맞춤
+        if inserted:
+            self.cells = dict(sorted(self.cells.items()))
+        self.formulas = {key: self.cells[key] for key in self.cells if key in self.formulas}
+
+        self.computed_values = computed_values
+        for key in self.formulas:
+            self.display[key] = computed_values.get(f"{get_column_letter(key[1])}{key[0]}")
+
+    def value_lines(self) -> List[str]:
+        return [
+            f"{get_column_letter(col)}{row}: {value}"
+            for (row, col), value in self.cells.items()
+            if (row, col) not in self.formulas
+        ]
+
+    def formula_lines(self) -> List[str]:
+        lines = []
+        for (row, col), formula in self.formulas.items():
+            coordinate = f"{get_column_letter(col)}{row}"
+            if coordinate in self.computed_values:
+                lines.append(f"{coordinate}: {formula} → {format_computed_value(self.computed_values[coordinate])}")
+            else:
+                lines.append(f"{coordinate}: {formula}")
+        return lines
+
+
+# ──────────────────────────────
+# 표 영역
+# ──────────────────────────────
+class Region:
+    """빈 행/열로 구분된 셀 영역"""
+
+    def __init__(self, coordinates: List[Tuple[int, int]]):
+        self.coordinates = coordinates
+        self.min_row = min(row for row, _ in coordinates)
+        self.max_row = max(row for row, _ in coordinates)
+        self.min_col = min(col for _, col in coordinates)
+        self.max_col = max(col for _, col in coordinates)
+
+    @property
+    def ref(self) -> str:
+        return (
+            f"{get_column_letter(self.min_col)}{self.min_row}:"
+            f"{get_column_letter(self.max_col)}{self.max_row}"
+        )
+
+
+def find_regions(coordinates: List[Tuple[int, int]]) -> List[Region]:
+    """
+    채워진 셀 좌표를 빈 행/열 기준으로 나누어 표 영역 목록을 만듭니다.
+
+    Args:
+        coordinates: (행, 열) 좌표 목록
+
+    Returns:
+        위→아래, 왼쪽→오른쪽 순서의 영역 목록
+    """
+    if not coordinates:
+        return []
+    regions = [Region(part) for part in _split(coordinates)]
+    return sorted(regions, key=lambda region: (region.min_row, region.min_col))
+
+
+def _split(coordinates: List[Tuple[int, int]]) -> List[List[Tuple[int, int]]]:
+    for axis in (0, 1):
+        bands = _bands(coordinates, axis)
+        if len(bands) > 1:
+            return [part for band in bands for part in _split(band)]
+    return [coordinates]
+
+
+def _bands(coordinates: List[Tuple[int, int]], axis: int) -> List[List[Tuple[int, int]]]:
+    """한 축(0=행, 1=열)에서 빈 줄로 끊기는 구간별로 좌표를 나눕니다."""
+    ordered = sorted(coordinates, key=lambda key: key[axis])
+    bands = [[ordered[0]]]
+    for previous, current in zip(ordered, ordered[1:]):
+        if current[axis] - previous[axis] > 1:
+            bands.append([])
+        bands[-1].append(current)
+    return bands
+
+
+def detect_header(sheet: _SheetCells, region: Region) -> bool:
+    """
+    영역의 첫 행이 제목(헤더) 행인지 판별합니다.
+    첫 행이 모두 텍스트이고, 아래 행에 텍스트가 아닌 값이 있거나 첫 행의 값이 모두 서로 다르면 헤더로 봅니다.
+
+    Args:
+        sheet: 시트 셀 정보
+        region: 대상 영역
+
+    Returns:
+        헤더 여부
+    """
+    if region.max_row == region.min_row:
+        return False
+    first = [sheet.cells[key] for key in region.coordinates if key[0] == region.min_row]
+    if not first or not all(isinstance(value, str) and not value.startswith("=") for value in first):
+        return False
+    body_has_non_text = any(
+        not isinstance(sheet.display.get(key), str)
+        for key in region.coordinates if key[0] != region.min_row
+    )
+    return body_has_non_text or len(set(first)) == len(first)
+
+
+# ──────────────────────────────
+# 열 통계
+# ──────────────────────────────
+def describe_column(values: Sequence[Any]) -> str:
+    """
+    열의 값들을 타입과 통계로 요약합니다. 숫자 통계는 NumPy로 한 번에 계산합니다.
+
+    Args:
+        values: 열의 값 목록 (빈칸은 None, 수식은 계산 값)
+
+    Returns:
+        "숫자 120개, 최소 1, 최대 99, 평균 50.5" 형식의 요약
+    """
+    present = [value for value in values if value is not None]
+    blanks = len(values) - len(present)
+    if not present:
+        return "빈 열"
+
+    numbers = np.array(
+        [value if _is_number(value) else np.nan for value in present], dtype=float
+    )
+    number_mask = ~np.isnan(numbers)
+    number_count = int(number_mask.sum())
+    parts = []
+
+    if number_count:
+        nums = numbers[number_mask]
+        sequence = _describe_sequence(nums) if number_count == len(present) else None
+        if sequence:
+            parts.append(f"숫자 {number_count}개, {sequence}")
+        else:
+            parts.append(
+                f"숫자 {number_count}개, 최소 {_fmt(nums.min())}, 최대 {_fmt(nums.max())}, 평균 {_fmt(nums.mean())}"
+            )
+
+    texts = [str(value) for value in present if isinstance(value, str)]
+    if texts:
+        parts.append(f"텍스트 {len(texts)}개, {_describe_categories(texts)}")
+
+    dates = [value for value in present if isinstance(value, (datetime.date, datetime.datetime))]
+    if dates:
+        parts.append(f"날짜 {len(dates)}개, {min(dates)} ~ {max(dates)}")
+
+    booleans = [value for value in present if isinstance(value, bool)]
+    if booleans:
+        parts.append(f"TRUE/FALSE {len(booleans)}개")
+
+    errors = [value for value in present if isinstance(value, ExcelError)]
+    if errors:
+        parts.append(f"오류 {len(errors)}개({', '.join(sorted({error.code for error in errors}))})")
+
+    if blanks:
+        parts.append(f"빈칸 {blanks}개")
+    return ", ".join(parts)
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _describe_sequence(numbers: np.ndarray) -> Optional[str]:
+    """등차수열이면 "1→120 연속(간격 1)", 모두 같은 값이면 "모두 5" 를 반환합니다."""
+    if len(numbers) < 3:
+        return None
+    steps = np.diff(numbers)
+    if not np.allclose(steps, steps[0]):
+        return None
+    if steps[0] == 0:
+        return f"모두 {_fmt(numbers[0])}"
+    return f"{_fmt(numbers[0])}→{_fmt(numbers[-1])} 연속(간격 {_fmt(steps[0])})"
+
+
+def _describe_categories(texts: List[str]) -> str:
+    unique, counts = np.unique(np.array(texts, dtype=object).astype(str), return_counts=True)
+    order = np.argsort(-counts, kind="stable")
+    if len(unique) <= MAX_CATEGORIES:
+        return "값 분포: " + ", ".join(f"{_clip(unique[i])}×{counts[i]}" for i in order)
+    if len(unique) == len(texts):
+        examples = ", ".join(_clip(text) for text in texts[:3])
+        return f"모두 다른 값 (예: {examples})"
+    top = ", ".join(f"{_clip(unique[i])}×{counts[i]}" for i in order[:3])
+    return f"고유값 {len(unique)}개 (많은 값: {top})"
+
+
+def _fmt(value: Any) -> str:
+    if isinstance(value, (float, np.floating)):
+        value = float(value)
+        if value.is_integer():
+            return str(int(value))
+        return f"{value:.6g}"
+    return str(value)
+
+
+def _clip(text: Any, limit: int = 20) -> str:
+    text = str(text)
+    return text if len(text) <= limit else text[:limit] + "…"
+
+
+# ──────────────────────────────
+# 행 샘플
+# ──────────────────────────────
+def encode_row(values: Sequence[Any]) -> str:
+    """
+    한 행의 값을 " | "로 이어 붙입니다. 같은 값이 연속되면 "값 ×n"으로 압축합니다.
+
+    Args:
+        values: 행의 값 목록 (빈칸은 None)
+
+    Returns:
+        행 텍스트
+    """
+    runs: List[List[Any]] = []
+    for value in values:
+        text = "" if value is None else _clip(format_computed_value(value), 40)
+        if runs and runs[-1][0] == text:
+            runs[-1][1] += 1
+        else:
+            runs.append([text, 1])
+    return " | ".join(text if count == 1 else f"{text} ×{count}" for text, count in runs)
+
+
+class RegionSummary:
+    """
+    표 영역 하나의 요약
+    헤더와 열 통계는 한 번만 계산하고, 행 샘플 수만 바꿔 가며 다시 그릴 수 있습니다.
+    """
+
+    def __init__(self, sheet: _SheetCells, region: Region, index: int):
+        """
+        Args:
+            sheet: 시트 셀 정보
+            region: 대상 영역
+            index: 표 번호 (1부터)
+        """
+        self.sheet = sheet
+        self.region = region
+        self.index = index
+        self.columns = range(region.min_col, region.max_col + 1)
+        self.header_lines: List[str] = []
+        self.rows: List[int] = []
+
+        if len(region.coordinates) <= SMALL_REGION_CELLS:
+            cells = ", ".join(
+                f"{get_column_letter(col)}{row}: {_clip(format_computed_value(sheet.display.get((row, col))), 40)}"
+                for row, col in region.coordinates
+            )
+            self.header_lines = [f"영역 {index} ({region.ref}): {cells}"]
+            return
+
+        has_header = detect_header(sheet, region)
+        body_start = region.min_row + 1 if has_header else region.min_row
+        body_rows = region.max_row - body_start + 1
+
+        # 열별 값 수집 (영역 좌표만 방문)
+        column_values: Dict[int, List[Any]] = {col: [None] * body_rows for col in self.columns}
+        formula_counts: Dict[int, int] = {col: 0 for col in self.columns}
+        row_present = set()
+        for row, col in region.coordinates:
+            if row >= body_start:
+                column_values[col][row - body_start] = sheet.display.get((row, col))
+                formula_counts[col] += (row, col) in sheet.formulas
+                row_present.add(row)
+        self.rows = sorted(row_present)
+
+        lines = [f"표 {index}: {region.ref} ({'헤더 1행, ' if has_header else ''}데이터 {body_rows}행)", "  열:"]
+        for col in self.columns:
+            header = sheet.cells.get((region.min_row, col)) if has_header else None
+            name = f" '{_clip(header)}'" if header is not None else ""
+            formula_note = f" (수식 {formula_counts[col]}개)" if formula_counts[col] else ""
+            lines.append(f"  - {get_column_letter(col)}{name}: {describe_column(column_values[col])}{formula_note}")
+        self.header_lines = lines
+
+    def render(self, sample_rows: int) -> str:
+        """
+        요약 텍스트를 만듭니다.
+
+        Args:
+            sample_rows: 앞부분/뒷부분 각각 보여줄 행 수
+
+        Returns:
+            영역 요약 텍스트
+        """
+        lines = list(self.header_lines)
+        if sample_rows and self.rows:
+            if len(self.rows) <= sample_rows * 2:
+                head, tail, skipped = self.rows, [], 0
+            else:
+                head, tail = self.rows[:sample_rows], self.rows[-sample_rows:]
+                skipped = len(self.rows) - sample_rows * 2
+            first, last = get_column_letter(self.region.min_col), get_column_letter(self.region.max_col)
+            lines.append(f"  행 샘플 ({first}~{last}열 순서):")
+            lines.extend(self._row_line(row) for row in head)
+            if tail:
+                lines.append(f"  ... (중략 {skipped}행)")
+                lines.extend(self._row_line(row) for row in tail)
+        return "\n".join(lines)
+
+    def _row_line(self, row: int) -> str:
+        return f"  {row}행: {encode_row([self.sheet.display.get((row, col)) for col in self.columns])}"
+
+
+# ──────────────────────────────
+# 수식 그룹
+# ──────────────────────────────
+class FormulaGroup:
+    """같은 상대 패턴으로 연속 채워진 수식 묶음 (예: D2:D100 = B2+C2, B3+C3, ...)"""
+
+    def __init__(self, cells: List[Tuple[int, int]], formula: str, values: List[Any]):
+        self.cells = cells
+        self.formula = formula
+        self.values = values
+
+    def describe(self) -> str:
+        first_row, first_col = self.cells[0]
+        last_row, last_col = self.cells[-1]
+        start = f"{get_column_letter(first_col)}{first_row}"
+        computed = [value for value in self.values if value is not None]
+        if len(self.cells) == 1:
+            if computed:
+                return f"{start}: {self.formula} → {format_computed_value(computed[0])}"
+            return f"{start}: {self.formula}"
+
+        ref = f"{start}:{get_column_letter(last_col)}{last_row}"
+        line = f"{ref}: {self.formula} (같은 패턴 {len(self.cells)}개)"
+        if computed:
+            preview = ", ".join(_clip(format_computed_value(value), 20) for value in computed[:3])
+            line += f" → {preview}{', ...' if len(computed) > 3 else ''}"
+        return line
+
+
+def relative_formula(formula: str, row: int, col: int) -> str:
+    """
+    수식의 셀 참조를 R1C1 형식으로 바꿉니다. (상대 참조는 기준 셀로부터의 오프셋 R[dr]C[dc], $ 고정 참조는 R1C2)
+
+    Args:
+        formula: 수식 문자열
+        row: 수식이 있는 행
+        col: 수식이 있는 열
+
+    Returns:
+        채우기 패턴 비교용 문자열
+    """
+    def replace(match):
+        col_abs, letters, row_abs, digits = match.groups()
+        col_index = column_index_from_string(letters)
+        col_part = f"C{col_index}" if col_abs else f"C[{col_index - col}]"
+        row_part = f"R{digits}" if row_abs else f"R[{int(digits) - row}]"
+        return f"{row_part}{col_part}"
+
+    return replace_references(formula, replace)
+
+
+def group_formulas(formulas: Dict[Tuple[int, int], str], computed_values: Dict[str, Any]) -> List[FormulaGroup]:
+    """
+    같은 열에서 세로로, 또는 같은 행에서 가로로 연속된 같은 패턴의 수식을 하나의 그룹으로 묶습니다.
+
+    Args:
+        formulas: (행, 열) → 수식
+        computed_values: 좌표 → 계산 값
+
+    Returns:
+        FormulaGroup 목록 (시트 순서)
+    """
+    patterns = {key: relative_formula(formula, *key) for key, formula in formulas.items()}
+
+    def value_of(key):
+        return computed_values.get(f"{get_column_letter(key[1])}{key[0]}")
+
+    # 1. 세로 방향 묶음
+    vertical: List[List[Tuple[int, int]]] = []
+    for key in sorted(formulas, key=lambda k: (k[1], k[0])):
+        last = vertical[-1][-1] if vertical else None
+        if last and last[1] == key[1] and last[0] + 1 == key[0] and patterns[last] == patterns[key]:
+            vertical[-1].append(key)
+        else:
+            vertical.append([key])
+
+    # 2. 한 칸짜리는 가로 방향으로 다시 묶음 (합계 행 등)
+    runs = [run for run in vertical if len(run) > 1]
+    singles = sorted(run[0] for run in vertical if len(run) == 1)
+    horizontal: List[List[Tuple[int, int]]] = []
+    for key in singles:
+        last = horizontal[-1][-1] if horizontal else None
+        if last and last[0] == key[0] and last[1] + 1 == key[1] and patterns[last] == patterns[key]:
+            horizontal[-1].append(key)
+        else:
+            horizontal.append([key])
+    runs.extend(horizontal)
+
+    runs.sort(key=lambda run: run[0])
+    return [FormulaGroup(run, formulas[run[0]], [value_of(key) for key in run]) for run in runs]
@@ -3,14 +3,26 @@
 엑셀 파일 조작 서비스
 openpyxl을 사용하여 엑셀 파일을 직접 조작하는 기능을 제공합니다.
 """
+import calendar
+import datetime
 import io
 import re
-from typing import List, Any, Optional, Union
+from typing import List, Any, Optional, Union, Dict, Iterator
 from openpyxl import load_workbook, Workbook
-from openpyxl.utils import column_index_from_string
+from openpyxl.utils import column_index_from_string, get_column_letter, range_boundaries
 import re
 
 from app.schemas.excel_schema import ExcelCommand
+from app.services import command_encoding_service
+from app.services.excel_command_registry import CommandRegistry
+from app.services.excel_context_service import refresh_excel_context
+from app.services.formula_graph_service import recalculate_changes
+from app.services.formula_service import ExcelError, get_computed_values
+from app.services.workbook_service import ParsedWorkbook, ensure_parsed_workbook
+from app.utils.cell_reference import iter_range_cells, range_size, shift_references
+
+# command_type → 핸들러 매핑 (새 명령어는 @command_registry.register("이름")으로 등록)
+command_registry = CommandRegistry()
 
 
 class ExcelManipulator:
@@ -19,10 +31,23 @@ class ExcelManipulator:
     명령어를 받아서 실제 엑셀 파일을 수정합니다.
     """
 
-    def __init__(self):
-        """ExcelManipulator 초기화"""
+    def __init__(self, registry: Optional[CommandRegistry] = None):
+        """
+        ExcelManipulator 초기화
+
+        Args:
+            registry: (선택) 사용할 명령어 레지스트리. 생략하면 기본 command_registry 사용
+        """
         self.workbook: Optional[Workbook] = None
         self.active_sheet = None
+        self.registry = registry or command_registry
+
+        # 실행된 명령어가 건드린 셀 주소 (삽입 순서를 유지하는 집합) 및 병합 변경 내역
+        self.touched_cells: Dict[str, None] = {}
+        self.merged_ranges: List[str] = []
+        self.unmerged_ranges: List[str] = []
+        # 대상 주소를 해석하지 못해 touched_cells에 기록하지 못한 명령어가 있었는지 여부
+        self.untracked_changes = False
 
     def load_from_bytes(self, excel_bytes: bytes) -> None:
         """
@@ -34,6 +59,16 @@ class ExcelManipulator:
         self.workbook = load_workbook(io.BytesIO(excel_bytes))
         self.active_sheet = self.workbook.active
 
+    def load_from_workbook(self, workbook: Workbook) -> None:
+        """
+        이미 파싱된 워크북을 조작 대상으로 설정합니다. (재파싱 없음)
+
+        Args:
+            workbook: openpyxl 워크북 객체
+        """
+        self.workbook = workbook
+        self.active_sheet = self.workbook.active
+
     def save_to_bytes(self) -> bytes:
         """
         현재 워크북을 바이트 데이터로 저장합니다.
@@ -65,124 +100,60 @@ class ExcelManipulator:
     def _execute_single_command(self, command: ExcelCommand) -> None:
         """
         단일 명령어를 실행합니다.
+        command_type에 해당하는 핸들러를 레지스트리에서 찾아 실행합니다.
 
         Args:
             command: 실행할 ExcelCommand
         """
-        command_type = command.command_type.lower()
+        if not self.registry.execute(self, command):
+            print(f"지원하지 않는 명령어: {command.command_type.lower()}")
+            return
 
-        # 함수 관련 명령어
-        if command_type == "sum":
-            self._apply_sum(command)
-        elif command_type == "average":
-            self._apply_average(command)
-        elif command_type == "count":
-            self._apply_count(command)
-        elif command_type == "max":
-            self._apply_max(command)
-        elif command_type == "min":
-            self._apply_min(command)
-
-        # 텍스트 관련 명령어
-        elif command_type == "left":
-            self._apply_left(command)
-        elif command_type == "right":
-            self._apply_right(command)
-        elif command_type == "mid":
-            self._apply_mid(command)
-        elif command_type == "len":
-            self._apply_len(command)
-        elif command_type == "round":
-            self._apply_round(command)
-        elif command_type == "isblank":
-            self._apply_isblank(command)
-
-        # 논리 관련 명령어
-        elif command_type == "if":
-            self._apply_if(command)
-        elif command_type == "and":
-            self._apply_logical_formula(command, "AND")
-        elif command_type == "or":
-            self._apply_logical_formula(command, "OR")
-
-        # 검색 관련 명령어
-        elif command_type == "vlookup":
-            p = command.parameters
-            formula = f'=VLOOKUP({p["lookup_value"]}, {p["table_array"]}, {p["col_index"]}, {str(p["range_lookup"]).upper()})'
-            self.active_sheet[command.target_cell] = formula
-        elif command_type == "hlookup":
-            p = command.parameters
-            formula = f'=HLOOKUP({p["lookup_value"]}, {p["table_array"]}, {p["row_index"]}, {str(p["range_lookup"]).upper()})'
-            self.active_sheet[command.target_cell] = formula
-        elif command_type == "index":
-            p = command.parameters
-            formula = f'=INDEX({p["array"]}, {p["row_num"]}, {p["col_num"]})'
-            self.active_sheet[command.target_cell] = formula
-        elif command_type == "match":
-            p = command.parameters
-            formula = f'=MATCH({p["lookup_value"]}, {p["lookup_array"]}, {p["match_type"]})'
-            self.active_sheet[command.target_cell] = formula
+        self._record_touched(command)
 
-        # 데이터 관련 명령어
-        elif command_type == "set_value":
-            self._set_value(command)
-        elif command_type == "clear":
-            self._clear_cells(command)
-        elif command_type == "merge":
-            self._merge_cells(command)
+    def _record_touched(self, command: ExcelCommand) -> None:
+        """
+        명령어가 변경한 셀 주소와 병합 변경 내역을 기록합니다.
+
+        Args:
+            command: 실행된 ExcelCommand
+        """
+        command_type = command.command_type.lower()
+        if command_type == "merge":
+            self.merged_ranges.append(command.target_cell)
         elif command_type == "unmerge":
-            self._unmerge_cells(command)
-
-        # 조건부 함수 명령어
-        elif command_type == "countif":
-            self._apply_countif(command)
-        elif command_type == "sumif":
-            self._apply_sumif(command)
-        elif command_type == "averageif":
-            self._apply_averageif(command)
-
-        # 텍스트 처리 함수 명령어
-        elif command_type == "trim":
-            self._apply_trim(command)
-        elif command_type == "upper":
-            self._apply_upper(command)
-        elif command_type == "lower":
-            self._apply_lower(command)
-        elif command_type == "substitute":
-            self._apply_substitute(command)
-
-        # 고급 논리 함수
-        elif command_type == "iferror":
-            self._apply_iferror(command)
-        elif command_type == "ifna":
-            self._apply_ifna(command)
-        elif command_type == "ifs":
-            self._apply_ifs(command)
-
-        # 고급 검색 함수
-        elif command_type == "xlookup":
-            self._apply_xlookup(command)
-        elif command_type == "filter":
-            self._apply_filter(command)
-        elif command_type == "unique":
-            self._apply_unique(command)
-
-        # 통계 함수
-        elif command_type == "median":
-            self._apply_median(command)
-        elif command_type == "mode":
-            self._apply_mode(command)
-        elif command_type == "stdev":
-            self._apply_stdev(command)
-        elif command_type == "rank":
-            self._apply_rank(command)
+            self.unmerged_ranges.append(command.target_cell)
 
-        else:
-            print(f"지원하지 않는 명령어: {command_type}")
+        for coordinate in self._iter_coordinates(command.target_cell):
+            self.touched_cells[coordinate] = None
+
+    def _iter_coordinates(self, target_cell: str) -> Iterator[str]:
+        """
+        셀 주소 또는 범위에 포함된 모든 셀 주소를 순회합니다.
+        열/행 전체 참조(A:A, 1:1)는 현재 시트의 사용 범위로 제한합니다.
+
+        Args:
+            target_cell: 셀 주소 또는 범위 (예: "A1", "A1:B3", "A:A")
+        """
+        try:
+            min_col, min_row, max_col, max_row = range_boundaries(target_cell)
+        except (ValueError, TypeError):
+            self.untracked_changes = True
+            return
+
+        min_col = min_col or 1
+        min_row = min_row or 1
+        max_col = max_col or self.active_sheet.max_column
+        max_row = max_row or self.active_sheet.max_row
+
+        for row in range(min_row, max_row + 1):
+            for col in range(min_col, max_col + 1):
+                yield f"{get_column_letter(col)}{row}"
 
     # ──────────────────────────────
     # 수식 함수
     # ──────────────────────────────
+    @command_registry.register("sum")
     def _apply_sum(self, command: ExcelCommand) -> None:
         """SUM 함수를 적용합니다."""
         if command.parameters and "range" in command.parameters:
@@ -190,6 +161,7 @@ class ExcelManipulator:
             formula = f"=SUM({range_str})"
             self.active_sheet[command.target_cell] = formula
 
+    @command_registry.register("average")
     def _apply_average(self, command: ExcelCommand) -> None:
         """AVERAGE 함수를 적용합니다."""
         if command.parameters and "range" in command.parameters:
@@ -197,6 +169,7 @@ class ExcelManipulator:
             formula = f"=AVERAGE({range_str})"
             self.active_sheet[command.target_cell] = formula
 
+    @command_registry.register("count")
     def _apply_count(self, command: ExcelCommand) -> None:
         """COUNT 함수를 적용합니다."""
         if command.parameters and "range" in command.parameters:
@@ -204,6 +177,7 @@ class ExcelManipulator:
             formula = f"=COUNT({range_str})"
             self.active_sheet[command.target_cell] = formula
 
+    @command_registry.register("max")
     def _apply_max(self, command: ExcelCommand) -> None:
         """MAX 함수를 적용합니다."""
         if command.parameters and "range" in command.parameters:
@@ -211,6 +185,7 @@ class ExcelManipulator:
             formula = f"=MAX({range_str})"
             self.active_sheet[command.target_cell] = formula
 
+    @command_registry.register("min")
     def _apply_min(self, command: ExcelCommand) -> None:
         """MIN 함수를 적용합니다."""
         if command.parameters and "range" in command.parameters:
@@ -218,6 +193,8 @@ class ExcelManipulator:
             formula = f"=MIN({range_str})"
             self.active_sheet[command.target_cell] = formula
 
+    @command_registry.register("concatenate")
+    @command_registry.register("&")
     def _apply_concatenate(self, command: ExcelCommand):
         """CONCATENATE 함수를 적용합니다."""
         values = command.parameters.get("values", [])
@@ -227,6 +204,7 @@ class ExcelManipulator:
         arg_str = ",".join(str(v) for v in values)
         self.active_sheet[command.target_cell] = f"=CONCATENATE({arg_str})"
 
+    @command_registry.register("left")
     def _apply_left(self, command: ExcelCommand):
         """LEFT 함수를 적용합니다."""
         text = command.parameters.get("text", "")
@@ -238,14 +216,16 @@ class ExcelManipulator:
     # ──────────────────────────────
     # 조건부 함수
     # ──────────────────────────────
+    @command_registry.register("countif")
     def _apply_countif(self, command: ExcelCommand) -> None:
         """COUNTIF 함수를 적용합니다."""
         if command.parameters and "range" in command.parameters and "criteria" in command.parameters:
             range_str = command.parameters["range"]
-            criteria = command.parameters["criteria"]
+            criteria = self._format_criteria(command.parameters["criteria"])
             formula = f"=COUNTIF({range_str}, {criteria})"
             self.active_sheet[command.target_cell] = formula
 
+    @command_registry.register("right")
     def _apply_right(self, command: ExcelCommand):
         """RIGHT 함수를 적용합니다."""
         text = command.parameters.get("text", "")
@@ -254,24 +234,46 @@ class ExcelManipulator:
             return
         self.active_sheet[command.target_cell] = f"=RIGHT({text},{num_chars})"
 
+    @command_registry.register("sumif")
     def _apply_sumif(self, command: ExcelCommand) -> None:
         """SUMIF 함수를 적용합니다."""
         if command.parameters and "range" in command.parameters and "criteria" in command.parameters:
             range_str = command.parameters["range"]
-            criteria = command.parameters["criteria"]
+            criteria = self._format_criteria(command.parameters["criteria"])
             sum_range = command.parameters.get("sum_range", range_str)
             formula = f"=SUMIF({range_str}, {criteria}, {sum_range})"
             self.active_sheet[command.target_cell] = formula
 
+    @command_registry.register("averageif")
     def _apply_averageif(self, command: ExcelCommand) -> None:
         """AVERAGEIF 함수를 적용합니다."""
         if command.parameters and "range" in command.parameters and "criteria" in command.parameters:
             range_str = command.parameters["range"]
-            criteria = command.parameters["criteria"]
+            criteria = self._format_criteria(command.parameters["criteria"])
             avg_range = command.parameters.get("avg_range", range_str)
             formula = f"=AVERAGEIF({range_str}, {criteria}, {avg_range})"
             self.active_sheet[command.target_cell] = formula
 
+    def _format_criteria(self, criteria: Union[str, int, float]) -> str:
+        """
+        COUNTIF/SUMIF/AVERAGEIF 조건을 수식 인자로 변환합니다.
+        ">=80", "남성" 처럼 따옴표 없이 들어온 조건은 문자열로 감싸야 엑셀이 수식을 해석할 수 있습니다.
+
+        Args:
+            criteria: 조건 값
+
+        Returns:
+            수식에 넣을 조건 문자열
+        """
+        if not isinstance(criteria, str):
+            return str(criteria)
+        stripped = criteria.strip()
+        if (stripped.startswith('"') and stripped.endswith('"') and len(stripped) >= 2) \
+                or self._is_numeric_string(stripped) or self._is_cell_reference(stripped):
+            return stripped
+        return '"' + stripped.replace('"', '""') + '"'
+
+    @command_registry.register("mid")
     def _apply_mid(self, command: ExcelCommand):
         """MID 함수를 적용합니다."""
         text = command.parameters.get("text", "")
@@ -281,6 +283,7 @@ class ExcelManipulator:
             return
         self.active_sheet[command.target_cell] = f"=MID({text},{start_num},{num_chars})"
 
+    @command_registry.register("len")
     def _apply_len(self, command: ExcelCommand):
         """LEN 함수를 적용합니다."""
         text = command.parameters.get("text", "")
@@ -288,6 +291,7 @@ class ExcelManipulator:
             return
         self.active_sheet[command.target_cell] = f"=LEN({text})"
 
+    @command_registry.register("round")
     def _apply_round(self, command: ExcelCommand) -> None:
         """
         ROUND 함수를 적용합니다.
@@ -332,6 +336,7 @@ class ExcelManipulator:
         # 범위에 함수 적용
         self._apply_to_range(command.target_cell, apply_round_to_cell)
 
+    @command_registry.register("isblank")
     def _apply_isblank(self, command: ExcelCommand):
         """ISBLANK 함수를 적용합니다."""
         value = command.parameters.get("value", "")
@@ -339,6 +344,7 @@ class ExcelManipulator:
             return
         self.active_sheet[command.target_cell] = f"=ISBLANK({value})"
 
+    @command_registry.register("if")
     def _apply_if(self, command: ExcelCommand) -> None:
         c = command.parameters
         formula = f'=IF({c["condition"]}, "{c["true_value"]}", "{c["false_value"]}")'
@@ -350,9 +356,20 @@ class ExcelManipulator:
         formula = f"={func_name.upper()}({joined})"
         self.active_sheet[command.target_cell] = formula
 
+    @command_registry.register("and")
+    def _apply_and(self, command: ExcelCommand) -> None:
+        """AND 함수를 적용합니다."""
+        self._apply_logical_formula(command, "AND")
+
+    @command_registry.register("or")
+    def _apply_or(self, command: ExcelCommand) -> None:
+        """OR 함수를 적용합니다."""
+        self._apply_logical_formula(command, "OR")
+
     # ──────────────────────────────
     # 텍스트 처리 함수
     # ──────────────────────────────
+    @command_registry.register("trim")
     def _apply_trim(self, command: ExcelCommand) -> None:
         """TRIM 함수를 적용합니다."""
         if command.parameters and "source" in command.parameters:
@@ -360,7 +377,37 @@ class ExcelManipulator:
             formula = f"=TRIM({source})"
             self.active_sheet[command.target_cell] = formula
 
+    @command_registry.register("upper")
+    def _apply_upper(self, command: ExcelCommand) -> None:
+        """UPPER 함수를 적용합니다."""
+        if command.parameters and "source" in command.parameters:
+            source = command.parameters["source"]
+            self.active_sheet[command.target_cell] = f"=UPPER({source})"
+
+    @command_registry.register("lower")
+    def _apply_lower(self, command: ExcelCommand) -> None:
+        """LOWER 함수를 적용합니다."""
+        if command.parameters and "source" in command.parameters:
+            source = command.parameters["source"]
+            self.active_sheet[command.target_cell] = f"=LOWER({source})"
+
+    @command_registry.register("substitute")
+    def _apply_substitute(self, command: ExcelCommand) -> None:
+        """SUBSTITUTE 함수를 적용합니다. 치환할 텍스트는 필요한 경우 따옴표로 감쌉니다."""
+        p = command.parameters
+        if not p or "source" not in p or "old_text" not in p or "new_text" not in p:
+            return
+        formula_parts = [
+            str(p["source"]),
+            self._process_ifs_value(p["old_text"]),
+            self._process_ifs_value(p["new_text"])
+        ]
+        if p.get("Instance_number") not in (None, ""):
+            formula_parts.append(str(p["Instance_number"]))
+        self.active_sheet[command.target_cell] = f"=SUBSTITUTE({','.join(formula_parts)})"
+
     # 데이터 관련 명령어 구현
+    @command_registry.register("set_value")
     def _set_value(self, command: ExcelCommand) -> None:
         """셀에 값을 설정합니다."""
         if command.parameters and "value" in command.parameters:
@@ -373,18 +420,97 @@ class ExcelManipulator:
                 # 단일 셀에 값 설정
                 self.active_sheet[command.target_cell] = value
 
+    @command_registry.register("clear")
     def _clear_cells(self, command: ExcelCommand) -> None:
         """셀의 내용을 지웁니다."""
         self._apply_to_range(command.target_cell, lambda cell: setattr(cell, 'value', None))
 
+    @command_registry.register("merge")
     def _merge_cells(self, command: ExcelCommand) -> None:
         """셀을 병합합니다."""
         self.active_sheet.merge_cells(command.target_cell)
 
+    @command_registry.register("unmerge")
     def _unmerge_cells(self, command: ExcelCommand) -> None:
         """셀 병합을 해제합니다."""
         self.active_sheet.unmerge_cells(command.target_cell)
 
+    # ──────────────────────────────
+    # 범위 채우기 (셀마다 명령어를 나열하지 않고 한 번에 기록)
+    # ──────────────────────────────
+    @command_registry.register("fill_value")
+    def _fill_value(self, command: ExcelCommand) -> None:
+        """
+        범위의 모든 셀에 같은 값을 입력합니다.
+
+        Args:
+            command: ExcelCommand 객체
+                - target_cell: 채울 범위 (예: "B2:B100")
+                - parameters["value"]: 입력할 값
+        """
+        if not command.parameters or "value" not in command.parameters:
+            return
+        value = command.parameters["value"]
+        ws = self.active_sheet
+        for row, col in _fill_cells(command.target_cell):
+            ws.cell(row=row, column=col, value=value)
+
+    @command_registry.register("fill_series")
+    def _fill_series(self, command: ExcelCommand) -> None:
+        """
+        범위에 숫자 또는 날짜 연속값을 입력합니다.
+        범위가 여러 행이면 열마다 위→아래로, 한 행이면 왼쪽→오른쪽으로 증가합니다.
+
+        Args:
+            command: ExcelCommand 객체
+                - target_cell: 채울 범위 (예: "A1:A100")
+                - parameters["start"]: 시작 값 (숫자 또는 "2024-01-01" 형식 날짜)
+                - parameters["step"]: (선택) 증가량 (기본 1)
+                - parameters["unit"]: (선택) 날짜 증가 단위 day | week | month | year (기본 day)
+        """
+        if not command.parameters or "start" not in command.parameters:
+            return
+        start = command.parameters["start"]
+        step = command.parameters.get("step", 1)
+        unit = str(command.parameters.get("unit") or "day").lower()
+
+        cells = list(_fill_cells(command.target_cell))
+        first_row, first_col = cells[0]
+        down = any(row != first_row for row, _ in cells)
+
+        start = _series_start(start)
+        step = _series_start(step)
+        ws = self.active_sheet
+        for row, col in cells:
+            index = row - first_row if down else col - first_col
+            if isinstance(start, datetime.date):
+                value = _add_date_steps(start, index * int(step), unit)
+            else:
+                value = start + index * step
+            ws.cell(row=row, column=col, value=value)
+
+    @command_registry.register("fill_formula")
+    def _fill_formula(self, command: ExcelCommand) -> None:
+        """
+        범위의 첫 셀 기준으로 쓴 수식을 범위 전체에 복사합니다. (상대 참조는 엑셀 채우기처럼 이동)
+
+        Args:
+            command: ExcelCommand 객체
+                - target_cell: 채울 범위 (예: "D2:D100")
+                - parameters["formula"]: 첫 셀 기준 수식 (예: "=B2*C2")
+        """
+        if not command.parameters or not command.parameters.get("formula"):
+            return
+        formula = str(command.parameters["formula"])
+        if not formula.startswith("="):
+            formula = f"={formula}"
+
+        cells = list(_fill_cells(command.target_cell))
+        first_row, first_col = cells[0]
+        ws = self.active_sheet
+        for row, col in cells:
+            ws.cell(row=row, column=col, value=shift_references(formula, row - first_row, col - first_col))
+
 
     def _apply_to_range(self, target_cell: str, func) -> None:
         """범위의 모든 셀에 함수를 적용하는 헬퍼 메서드"""
@@ -430,6 +556,7 @@ class ExcelManipulator:
 
         raise ValueError(f"잘못된 셀 범위 형식: {range_str}")
 
+    @command_registry.register("iferror")
     def _apply_iferror(self, command: ExcelCommand) -> None:
         """
         IFERROR 함수를 적용합니다.
@@ -450,6 +577,7 @@ class ExcelManipulator:
             formula = f"=IFERROR({test_formula}, {error_value})"
             self.active_sheet[command.target_cell] = formula
 
+    @command_registry.register("ifna")
     def _apply_ifna(self, command: ExcelCommand) -> None:
         """
         IFNA 함수를 적용합니다.
@@ -468,6 +596,7 @@ class ExcelManipulator:
             formula = f"=IFNA({test_formula}, {na_value})"
             self.active_sheet[command.target_cell] = formula
 
+    @command_registry.register("ifs")
     def _apply_ifs(self, command: ExcelCommand) -> None:
         """
         IFS 함수를 적용합니다.
@@ -757,6 +886,35 @@ class ExcelManipulator:
         except ValueError:
             return False
 
+    @command_registry.register("vlookup")
+    def _apply_vlookup(self, command: ExcelCommand) -> None:
+        """VLOOKUP 함수를 적용합니다."""
+        p = command.parameters
+        formula = f'=VLOOKUP({p["lookup_value"]}, {p["table_array"]}, {p["col_index"]}, {str(p["range_lookup"]).upper()})'
+        self.active_sheet[command.target_cell] = formula
+
+    @command_registry.register("hlookup")
+    def _apply_hlookup(self, command: ExcelCommand) -> None:
+        """HLOOKUP 함수를 적용합니다."""
+        p = command.parameters
+        formula = f'=HLOOKUP({p["lookup_value"]}, {p["table_array"]}, {p["row_index"]}, {str(p["range_lookup"]).upper()})'
+        self.active_sheet[command.target_cell] = formula
+
+    @command_registry.register("index")
+    def _apply_index(self, command: ExcelCommand) -> None:
+        """INDEX 함수를 적용합니다."""
+        p = command.parameters
+        formula = f'=INDEX({p["array"]}, {p["row_num"]}, {p["col_num"]})'
+        self.active_sheet[command.target_cell] = formula
+
+    @command_registry.register("match")
+    def _apply_match(self, command: ExcelCommand) -> None:
+        """MATCH 함수를 적용합니다."""
+        p = command.parameters
+        formula = f'=MATCH({p["lookup_value"]}, {p["lookup_array"]}, {p["match_type"]})'
+        self.active_sheet[command.target_cell] = formula
+
+    @command_registry.register("xlookup")
     def _apply_xlookup(self, command: ExcelCommand) -> None:
         """
         XLOOKUP 함수를 적용합니다.
@@ -791,6 +949,7 @@ class ExcelManipulator:
             self.active_sheet[command.target_cell] = formula
 
 
+    @command_registry.register("filter")
     def _apply_filter(self, command: ExcelCommand) -> None:
         """
         FILTER 함수를 적용합니다.
@@ -814,6 +973,7 @@ class ExcelManipulator:
 
             self.active_sheet[command.target_cell] = formula
 
+    @command_registry.register("unique")
     def _apply_unique(self, command: ExcelCommand) -> None:
         """
         UNIQUE 함수를 적용합니다.
@@ -844,6 +1004,7 @@ class ExcelManipulator:
             self.active_sheet[command.target_cell] = formula
 
     # 통계 함수 관련 메소드들
+    @command_registry.register("median")
     def _apply_median(self, command: ExcelCommand) -> None:
         """
         MEDIAN 함수를 적용합니다.
@@ -858,6 +1019,7 @@ class ExcelManipulator:
             formula = f"=MEDIAN({range_str})"
             self.active_sheet[command.target_cell] = formula
 
+    @command_registry.register("mode")
     def _apply_mode(self, command: ExcelCommand) -> None:
         """
         MODE 함수를 적용합니다.
@@ -874,6 +1036,7 @@ class ExcelManipulator:
             formula = f"=MODE.SNGL({range_str})"
             self.active_sheet[command.target_cell] = formula
 
+    @command_registry.register("stdev")
     def _apply_stdev(self, command: ExcelCommand) -> None:
         """
         STDEV 함수를 적용합니다.
@@ -898,6 +1061,7 @@ class ExcelManipulator:
 
             self.active_sheet[command.target_cell] = formula
 
+    @command_registry.register("rank")
     def _apply_rank(self, command: ExcelCommand) -> None:
         """
         RANK 함수를 적용합니다.
@@ -991,24 +1155,79 @@ class ExcelManipulator:
         '''
 
 
+def _fill_cells(cell_range: str) -> Iterator[tuple]:
+    """
+    범위 채우기 명령어가 채울 셀의 (행, 열)을 순회합니다.
+    compact 형식의 @fill과 같은 최대 셀 수(LLM_MAX_FILL_CELLS)를 넘는 범위는 셀을 만들기 전에 거부합니다.
+
+    Args:
+        cell_range: 채울 범위 (예: "D2:D100")
+
+    Raises:
+        ValueError: 범위 형식이 잘못되었거나 최대 셀 수보다 큰 경우
+    """
+    max_cells = command_encoding_service.MAX_FILL_CELLS
+    if range_size(cell_range) > max_cells:
+        raise ValueError(f"범위 채우기는 최대 {max_cells}개 셀까지 가능합니다: {cell_range}")
+    return iter_range_cells(cell_range)
+
+def _series_start(value: Any) -> Union[int, float, datetime.date]:
+    """
+    연속값 시작 값을 숫자 또는 날짜로 변환합니다.
+
+    Args:
+        value: 숫자, 숫자 문자열 또는 "2024-01-01" 형식 날짜 문자열
+
+    Raises:
+        ValueError: 숫자나 날짜로 해석할 수 없는 경우
+    """
+    if isinstance(value, (int, float, datetime.date)):
+        return value
+    text = str(value).strip()
+    try:
+        return int(text) if re.fullmatch(r"-?\d+", text) else float(text)
+    except ValueError:
+        pass
+    try:
+        return datetime.date.fromisoformat(text)
+    except ValueError:
+        raise ValueError(f"연속값 시작 값은 숫자 또는 YYYY-MM-DD 형식 날짜여야 합니다: {value}")
+
+
+def _add_date_steps(start: datetime.date, steps: int, unit: str) -> datetime.date:
+    """날짜에 단위(day/week/month/year)만큼 더합니다. 월/연 단위는 말일을 넘지 않도록 맞춥니다."""
+    if unit == "day":
+        return start + datetime.timedelta(days=steps)
+    if unit == "week":
+        return start + datetime.timedelta(weeks=steps)
+    if unit in ("month", "year"):
+        months = steps * (12 if unit == "year" else 1)
+        month_index = start.month - 1 + months
+        year, month = start.year + month_index // 12, month_index % 12 + 1
+        day = min(start.day, calendar.monthrange(year, month)[1])
+        return start.replace(year=year, month=month, day=day)
+    raise ValueError(f"지원하지 않는 날짜 단위입니다: {unit}")
+
+
 def process_excel_with_commands(
-        excel_bytes: bytes,
+        excel_bytes: Union[bytes, ParsedWorkbook],
         commands: Any
 ) -> bytes:
     """
     엑셀 파일에 명령어를 적용하고 결과를 반환합니다.
 
     Args:
-        excel_bytes: 원본 엑셀 파일의 바이트 데이터
+        excel_bytes: 원본 엑셀 파일의 바이트 데이터 또는 요청 단위로 파싱된 ParsedWorkbook
         commands: 적용할 명령어 리스트
 
     Returns:
         수정된 엑셀 파일의 바이트 데이터
     """
+    parsed = ensure_parsed_workbook(excel_bytes)
     manipulator = ExcelManipulator()
 
-    # 엑셀 파일 로드
-    manipulator.load_from_bytes(excel_bytes)
+    # 엑셀 파일 로드 (LLM 분석 단계에서 이미 파싱했다면 그대로 재사용)
+    manipulator.load_from_workbook(parsed.workbook)
 
     # 🔹 수정 전 상태 로그 출력
     manipulator.log_worksheet_contents("명령어 적용 전 워크시트 상태")
@@ -1023,8 +1242,67 @@ def process_excel_with_commands(
 
     manipulator.log_worksheet_contents("명령어 적용 후 워크시트 상태")
 
-    # 결과 저장 및 반환
-    return manipulator.save_to_bytes()
+    # 셀 단위 diff 응답을 위해 변경 내역 기록
+    parsed.record_changes(manipulator.touched_cells, manipulator.merged_ranges, manipulator.unmerged_ranges)
+    parsed.untracked_changes = parsed.untracked_changes or manipulator.untracked_changes
+
+    # 결과 저장 및 반환 (요청당 한 번만 직렬화, 명령어가 없으면 원본 그대로)
+    # 저장 전에 수식을 계산해 두면 xlsx에 캐시 값이 함께 기록됩니다.
+    # (의존성 그래프로 변경된 셀의 하위 수식만 다시 계산, 추적하지 못한 변경이 있었으면 전체 재계산)
+    if commands:
+        recalculation = recalculate_changes(
+            parsed.workbook, manipulator.active_sheet, manipulator.touched_cells, full=parsed.untracked_changes
+        )
+        parsed.circular_references = recalculation.circular_references
+        parsed.record_recalculated(recalculation.dependents.get(manipulator.active_sheet.title, ()))
+        print(f"[수식] 재계산 full={recalculation.full} cells={recalculation.recalculated}")
+        parsed.mark_modified()
+        # 다음 메시지에서 쓸 시트 컨텍스트를 변경된 셀만 반영해 미리 갱신
+        refresh_excel_context(parsed)
+    return parsed.save()
+
+
+def collect_cell_changes(worksheet, addresses: List[str]) -> List[Dict[str, Any]]:
+    """
+    주어진 셀 주소들의 현재 값/수식/스타일을 셀 단위 변경 목록으로 만듭니다.
+
+    Args:
+        worksheet: openpyxl 워크시트
+        addresses: 변경된 셀 주소 목록
+
+    Returns:
+        [{"address", "value", "formula", "style"}] 형태의 변경 목록
+        (수식 셀의 value는 서버에서 계산한 값, 계산할 수 없으면 None)
+    """
+    computed_values = get_computed_values(worksheet)
+    changes = []
+    for address in addresses:
+        cell = worksheet[address]
+        value = cell.value
+        is_formula = isinstance(value, str) and value.startswith("=")
+        computed = computed_values.get(address) if is_formula else None
+        if isinstance(computed, ExcelError):
+            computed = computed.code
+
+        style = None
+        if cell.has_style:
+            font = cell.font
+            fill = cell.fill
+            style = {
+                "numberFormat": cell.number_format,
+                "bold": bool(font.b),
+                "italic": bool(font.i),
+                "fontColor": font.color.rgb if font.color is not None and font.color.type == "rgb" else None,
+                "fillColor": fill.fgColor.rgb if fill.fill_type and fill.fgColor.type == "rgb" else None,
+            }
+
+        changes.append({
+            "address": address,
+            "value": computed if is_formula else value,
+            "formula": value if is_formula else None,
+            "style": style,
+        })
+    return changes
 
 
 def create_empty_excel() -> bytes:
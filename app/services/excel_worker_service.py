@@ -0,0 +1,422 @@
+# app/services/excel_worker_service.py
+"""
+엑셀 작업 워커 풀 서비스
+워크북 파싱, 컨텍스트 분석, 명령어 실행·재계산·저장처럼 오래 걸리는 동기 작업을
+이벤트 루프 밖의 전용 스레드 풀에서 실행하여 다른 요청의 처리를 막지 않도록 합니다.
+
+EXCEL_WORKER_MODE=process이면 명령어 실행(워크북 로드·실행·저장)을 GIL 밖의 프로세스 워커에서 수행합니다.
+- 세션 ID로 항상 같은 워커에 보내(sticky) 그 워커의 워크북 캐시가 계속 적중하도록 합니다.
+- 작업마다 제한 시간이 있고, 넘기면 워커 프로세스를 종료하고 새로 띄웁니다.
+- N개 작업을 처리했거나 RSS가 한도를 넘은 워커는 교체(recycle)합니다.
+"""
+import asyncio
+import functools
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.exceptions.http_exceptions import ExcelJobTimeoutException
+from app.services.excel_context_service import EXCEL_CONTEXT_TOKEN_BUDGET, excel_context_cache, get_excel_context
+from app.services.excel_service import collect_cell_changes, process_excel_with_commands
+from app.services.workbook_service import ParsedWorkbook, open_session_workbook, release_session_workbook
+
+# thread(기본) | process
+EXCEL_WORKER_MODE = os.getenv("EXCEL_WORKER_MODE", "thread").lower()
+
+if EXCEL_WORKER_MODE not in ("thread", "process"):
+    raise ValueError(f"지원하지 않는 EXCEL_WORKER_MODE입니다: {EXCEL_WORKER_MODE}")
+
+
+class ExcelWorkerPool:
+    """
+    엑셀 작업 전용 스레드 풀
+    DB 접근용 기본 스레드 풀과 분리하여, 무거운 워크북 작업이 몰려도 DB 호출이 밀리지 않게 합니다.
+    """
+
+    def __init__(self, max_workers: int = 4):
+        """
+        Args:
+            max_workers: 최대 워커 스레드 수
+        """
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.active = 0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="excel-worker"
+                )
+            return self._executor
+
+    async def run(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        동기 함수를 워커 스레드에서 실행하고 결과를 기다립니다.
+
+        Args:
+            func: 실행할 동기 함수
+            *args, **kwargs: func에 전달할 인자
+
+        Returns:
+            func의 반환값 (예외는 그대로 전파)
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            self.submitted += 1
+        try:
+            result = await loop.run_in_executor(self._get_executor(), functools.partial(self._invoke, func, *args, **kwargs))
+        except Exception:
+            with self._lock:
+                self.failed += 1
+            raise
+        with self._lock:
+            self.completed += 1
+        return result
+
+    def _invoke(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        with self._lock:
+            self.active += 1
+        try:
+            return func(*args, **kwargs)
+        finally:
+            with self._lock:
+                self.active -= 1
+
+    def shutdown(self) -> None:
+        """워커 스레드를 정리합니다. (진행 중인 작업은 끝까지 실행)"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def stats(self) -> Dict[str, Any]:
+        """워커 풀 지표를 반환합니다."""
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "active": self.active,
+                "queued": self.submitted - self.completed - self.failed - self.active,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+            }
+
+
+excel_worker_pool = ExcelWorkerPool(max_workers=int(os.getenv("EXCEL_WORKER_THREADS", "4")))
+
+
+def _current_rss() -> int:
+    """현재 프로세스의 RSS(바이트)를 반환합니다. (/proc이 없으면 최대 RSS)"""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _invoke_in_process(func: Callable[..., Any], args: tuple, kwargs: dict) -> Tuple[Any, int]:
+    """워커 프로세스에서 작업을 실행하고 (결과, 실행 후 RSS)를 반환합니다."""
+    return func(*args, **kwargs), _current_rss()
+
+
+class _StickyWorker:
+    """프로세스 하나짜리 실행기와 그 워커의 지표"""
+
+    def __init__(self, index: int, mp_context):
+        self.index = index
+        self._mp_context = mp_context
+        self.executor: Optional[ProcessPoolExecutor] = None
+        self.jobs = 0          # 현재 프로세스가 처리한 작업 수 (교체 시 0)
+        self.total_jobs = 0
+        self.in_flight = 0
+        self.rss = 0
+        self.recycles = 0
+        self.timeouts = 0
+        self.failed = 0
+
+    def get_executor(self) -> ProcessPoolExecutor:
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(max_workers=1, mp_context=self._mp_context)
+            self.jobs = 0
+        return self.executor
+
+    def retire(self, kill: bool = False) -> None:
+        """
+        현재 프로세스를 교체 대상으로 돌립니다. 다음 작업은 새 프로세스에서 실행됩니다.
+
+        Args:
+            kill: True면 실행 중인 작업을 기다리지 않고 프로세스를 종료 (제한 시간 초과 시)
+        """
+        executor, self.executor = self.executor, None
+        if executor is None:
+            return
+        if kill:
+            for process in list((getattr(executor, "_processes", None) or {}).values()):
+                process.terminate()
+            executor.shutdown(wait=False, cancel_futures=True)
+        else:
+            # 이미 넘긴 작업은 끝까지 실행한 뒤 프로세스 종료
+            executor.shutdown(wait=False)
+
+    def pid(self) -> Optional[int]:
+        processes = getattr(self.executor, "_processes", None) or {}
+        return next(iter(processes), None)
+
+
+class ExcelProcessPool:
+    """
+    세션 고정(sticky) 프로세스 워커 풀
+    세션 ID를 워커 수로 나눈 나머지로 워커를 고르므로, 같은 세션의 작업은 항상 같은 프로세스에서 실행되어
+    그 프로세스의 워크북 캐시(workbook_cache)와 시트 컨텍스트 캐시가 계속 적중합니다.
+    """
+
+    def __init__(
+            self,
+            workers: int = 2,
+            job_timeout: float = 60.0,
+            max_jobs_per_worker: int = 200,
+            max_rss_bytes: int = 1024 * 1024 * 1024,
+            start_method: str = "spawn"
+    ):
+        """
+        Args:
+            workers: 워커 프로세스 수
+            job_timeout: 작업당 제한 시간 (초, 0 이하면 제한 없음)
+            max_jobs_per_worker: 이 수만큼 작업을 처리한 워커는 교체 (0 이하면 교체하지 않음)
+            max_rss_bytes: 작업 후 RSS가 이 값을 넘은 워커는 교체 (0 이하면 교체하지 않음)
+            start_method: 워커 프로세스 시작 방식 (스레드가 있는 서버에서 fork는 안전하지 않으므로 기본 spawn)
+        """
+        self.job_timeout = job_timeout
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self.max_rss_bytes = max_rss_bytes
+        mp_context = multiprocessing.get_context(start_method)
+        self._workers = [_StickyWorker(index, mp_context) for index in range(workers)]
+        self._lock = threading.Lock()
+
+    def worker_index(self, session_id: int) -> int:
+        """세션이 배정되는 워커 번호를 반환합니다."""
+        return int(session_id) % len(self._workers)
+
+    async def run(self, session_id: int, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        세션에 배정된 워커 프로세스에서 함수를 실행하고 결과를 기다립니다.
+
+        Args:
+            session_id: 채팅 세션 ID (워커 선택 기준)
+            func: 실행할 모듈 수준 함수 (프로세스 간 전달을 위해 pickle 가능해야 함)
+            *args, **kwargs: func에 전달할 인자 (pickle 가능해야 함)
+
+        Returns:
+            func의 반환값 (예외는 그대로 전파)
+
+        Raises:
+            ExcelJobTimeoutException: 제한 시간을 넘긴 경우 (해당 워커 프로세스는 종료 후 교체)
+        """
+        worker = self._workers[self.worker_index(session_id)]
+        with self._lock:
+            executor = worker.get_executor()
+            future = executor.submit(_invoke_in_process, func, args, kwargs)
+            worker.in_flight += 1
+
+        try:
+            timeout = self.job_timeout if self.job_timeout > 0 else None
+            result, rss = await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except asyncio.TimeoutError:
+            print(f"[엑셀 프로세스] worker={worker.index} session={session_id} 제한 시간 {self.job_timeout}s 초과, 워커 교체")
+            with self._lock:
+                worker.in_flight -= 1
+                worker.timeouts += 1
+                if worker.executor is executor:
+                    worker.retire(kill=True)
+                    worker.recycles += 1
+            raise ExcelJobTimeoutException()
+        except Exception:
+            with self._lock:
+                worker.in_flight -= 1
+                worker.failed += 1
+            raise
+
+        with self._lock:
+            worker.in_flight -= 1
+            worker.total_jobs += 1
+            if worker.executor is executor:
+                worker.jobs += 1
+                worker.rss = rss
+                self._recycle_if_needed(worker)
+        return result
+
+    def _recycle_if_needed(self, worker: _StickyWorker) -> None:
+        reason = None
+        if 0 < self.max_jobs_per_worker <= worker.jobs:
+            reason = f"jobs={worker.jobs}"
+        elif 0 < self.max_rss_bytes <= worker.rss:
+            reason = f"rss={worker.rss // (1024 * 1024)}MB"
+        if reason is None:
+            return
+        print(f"[엑셀 프로세스] worker={worker.index} 교체 ({reason})")
+        worker.retire()
+        worker.recycles += 1
+
+    def shutdown(self) -> None:
+        """워커 프로세스를 정리합니다. (진행 중인 작업은 끝까지 실행)"""
+        with self._lock:
+            executors = [worker.executor for worker in self._workers]
+            for worker in self._workers:
+                worker.executor = None
+        for executor in executors:
+            if executor is not None:
+                executor.shutdown(wait=True)
+
+    def stats(self) -> Dict[str, Any]:
+        """워커별 대기 작업 수(queue depth), 처리 수, RSS, 교체/시간 초과 횟수를 반환합니다."""
+        with self._lock:
+            workers: List[Dict[str, Any]] = [
+                {
+                    "index": worker.index,
+                    "pid": worker.pid(),
+                    "queue_depth": worker.in_flight,
+                    "jobs": worker.jobs,
+                    "total_jobs": worker.total_jobs,
+                    "rss_mb": round(worker.rss / (1024 * 1024), 1),
+                    "recycles": worker.recycles,
+                    "timeouts": worker.timeouts,
+                    "failed": worker.failed,
+                }
+                for worker in self._workers
+            ]
+        return {
+            "mode": EXCEL_WORKER_MODE,
+            "workers": len(workers),
+            "queue_depth": sum(worker["queue_depth"] for worker in workers),
+            "job_timeout": self.job_timeout,
+            "max_jobs_per_worker": self.max_jobs_per_worker,
+            "max_rss_mb": self.max_rss_bytes // (1024 * 1024),
+            "per_worker": workers,
+        }
+
+
+excel_process_pool = ExcelProcessPool(
+    workers=int(os.getenv("EXCEL_PROCESS_WORKERS", "2")),
+    job_timeout=float(os.getenv("EXCEL_JOB_TIMEOUT", "60")),
+    max_jobs_per_worker=int(os.getenv("EXCEL_WORKER_MAX_JOBS", "200")),
+    max_rss_bytes=int(os.getenv("EXCEL_WORKER_MAX_RSS_MB", "1024")) * 1024 * 1024
+)
+
+
+async def run_in_excel_worker(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    엑셀 작업을 공유 워커 풀에서 실행합니다.
+
+    Args:
+        func: 실행할 동기 함수
+        *args, **kwargs: func에 전달할 인자
+
+    Returns:
+        func의 반환값
+    """
+    return await excel_worker_pool.run(func, *args, **kwargs)
+
+
+def run_session_job(
+        session_id: int,
+        sheet_bytes: bytes,
+        commands: List[Any],
+        collect_changes: bool = False
+) -> Dict[str, Any]:
+    """
+    워커 프로세스에서 세션 워크북에 명령어를 실행합니다.
+    워커의 세션 캐시에서 워크북을 꺼내 실행하고, 결과 워크북을 다시 캐시에 넣어 다음 요청에 재사용합니다.
+
+    Args:
+        session_id: 채팅 세션 ID
+        sheet_bytes: 현재 시트 바이트 데이터
+        commands: 실행할 ExcelCommand 목록
+        collect_changes: 셀 단위 변경 목록(delta 응답용)도 만들지 여부
+
+    Returns:
+        {"excel_bytes"(변경 없으면 None), "content_hash", "touched_cells", "merged_ranges", "unmerged_ranges",
+         "recalculated_cells", "circular_references", "untracked_changes", "cell_changes", "excel_context"}
+    """
+    parsed = open_session_workbook(session_id, sheet_bytes)
+    modified_bytes = process_excel_with_commands(excel_bytes=parsed, commands=commands)
+
+    cell_changes = None
+    if collect_changes and parsed.delta_cells:
+        worksheet = parsed.workbook.active
+        cell_changes = {"sheetName": worksheet.title, "changes": collect_cell_changes(worksheet, parsed.delta_cells)}
+
+    result = {
+        "excel_bytes": None if modified_bytes is sheet_bytes else modified_bytes,
+        "content_hash": parsed.content_hash,
+        "touched_cells": parsed.touched_cells,
+        "merged_ranges": parsed.merged_ranges,
+        "unmerged_ranges": parsed.unmerged_ranges,
+        "recalculated_cells": parsed.recalculated_cells,
+        "circular_references": parsed.circular_references,
+        "untracked_changes": parsed.untracked_changes,
+        "cell_changes": cell_changes,
+        # 명령어 실행 후 갱신된 시트 컨텍스트 (요청 프로세스의 컨텍스트 캐시도 채워 다음 메시지의 재파싱을 생략)
+        "excel_context": get_excel_context(parsed) if parsed.is_parsed else None,
+    }
+    release_session_workbook(session_id, parsed)
+    return result
+
+
+def apply_session_job_result(parsed: ParsedWorkbook, result: Dict[str, Any]) -> bytes:
+    """
+    워커 프로세스의 실행 결과를 요청 프로세스의 ParsedWorkbook에 반영합니다.
+
+    Args:
+        parsed: 요청 단위 워크북
+        result: run_session_job의 반환값
+
+    Returns:
+        수정된 엑셀 바이트 데이터 (변경이 없으면 원본)
+    """
+    if result["excel_bytes"] is not None:
+        parsed.replace_source(result["excel_bytes"], result["content_hash"])
+    parsed.record_changes(result["touched_cells"], result["merged_ranges"], result["unmerged_ranges"])
+    parsed.record_recalculated(result["recalculated_cells"])
+    parsed.circular_references = result["circular_references"]
+    parsed.untracked_changes = parsed.untracked_changes or result["untracked_changes"]
+    parsed.cell_changes = result["cell_changes"]
+    if result["excel_context"] is not None:
+        excel_context_cache.put(result["content_hash"], EXCEL_CONTEXT_TOKEN_BUDGET, result["excel_context"])
+    return parsed.save()
+
+
+async def run_commands_in_process(
+        session_id: int,
+        parsed: ParsedWorkbook,
+        commands: List[Any],
+        collect_changes: bool = False
+) -> bytes:
+    """
+    명령어 실행(로드·실행·재계산·저장)을 세션에 배정된 프로세스 워커에서 수행하고 결과를 반영합니다.
+
+    Args:
+        session_id: 채팅 세션 ID
+        parsed: 요청 단위 워크북
+        commands: 실행할 ExcelCommand 목록
+        collect_changes: 셀 단위 변경 목록(delta 응답용)도 워커에서 만들지 여부
+
+    Returns:
+        수정된 엑셀 바이트 데이터
+
+    Raises:
+        ExcelJobTimeoutException: 제한 시간을 넘긴 경우
+    """
+    result = await excel_process_pool.run(
+        session_id, run_session_job, session_id, parsed.source_bytes, list(commands), collect_changes
+    )
+    return apply_session_job_result(parsed, result)
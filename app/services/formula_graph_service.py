@@ -0,0 +1,448 @@
+# app/services/formula_graph_service.py
+"""
+수식 의존성 그래프 서비스
+수식 셀이 참조하는 셀/범위를 그래프로 보관하여, 명령어가 변경한 셀의 하위(downstream) 수식만 다시 계산합니다.
+
+- 그래프는 워크북 객체에 묶여 보관되므로 세션 워크북 캐시에 워크북이 남아 있는 동안 함께 재사용됩니다.
+- 단일 셀 참조는 셀 → 의존 수식 역인덱스로, 범위 참조는 열 단위 버킷으로 찾습니다.
+- 재계산 순서는 위상 정렬로 정하며, 순환 참조는 루프를 돌지 않고 감지하여 보고합니다.
+"""
+import weakref
+from collections import defaultdict, deque
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from openpyxl import Workbook
+from openpyxl.utils import get_column_letter
+from openpyxl.utils.cell import coordinate_from_string, column_index_from_string
+from openpyxl.worksheet.worksheet import Worksheet
+
+from app.services.formula_service import FormulaEvaluator, FormulaEvaluationError, parse_formula, \
+    recalculate_workbook, has_computed_values, update_computed_values
+
+# (시트 이름, 행, 열)
+CellKey = Tuple[str, int, int]
+# (시트 이름, min_row, min_col, max_row, max_col)
+RangeKey = Tuple[str, int, int, int, int]
+
+# 엑셀 시트 최대 크기 (전체 열/행 참조의 경계로 사용)
+MAX_ROW = 1048576
+MAX_COLUMN = 16384
+# 이보다 넓은 범위는 열 버킷 대신 시트 단위 목록에서 찾습니다.
+WIDE_RANGE_COLUMNS = 64
+
+
+def _collect_references(node: tuple, found: List[tuple]) -> None:
+    """구문 트리에서 참조 노드를 모두 찾습니다."""
+    kind = node[0]
+    if kind == "ref":
+        found.append(node)
+    elif kind == "func":
+        for arg in node[2]:
+            _collect_references(arg, found)
+    elif kind == "binop":
+        _collect_references(node[2], found)
+        _collect_references(node[3], found)
+    elif kind in ("neg", "pos", "pct"):
+        _collect_references(node[1], found)
+
+
+def extract_references(formula: str, sheet_name: str) -> Tuple[List[CellKey], List[RangeKey]]:
+    """
+    수식이 참조하는 셀과 범위를 추출합니다.
+
+    Args:
+        formula: "=..." 형태의 수식
+        sheet_name: 시트 이름이 없는 참조가 가리킬 시트
+
+    Returns:
+        (단일 셀 참조 목록, 범위 참조 목록). 해석할 수 없는 수식이면 빈 목록
+    """
+    try:
+        node = parse_formula(formula)
+    except FormulaEvaluationError:
+        return [], []
+
+    references: List[tuple] = []
+    _collect_references(node, references)
+
+    cells, ranges = [], []
+    for _, ref_sheet, min_col, min_row, max_col, max_row in references:
+        ref_sheet = ref_sheet or sheet_name
+        max_row = MAX_ROW if max_row is None else max_row
+        max_col = MAX_COLUMN if max_col is None else max_col
+        if min_row == max_row and min_col == max_col:
+            cells.append((ref_sheet, min_row, min_col))
+        else:
+            ranges.append((ref_sheet, min_row, min_col, max_row, max_col))
+    return cells, ranges
+
+
+class DependencyGraph:
+    """
+    워크북 수식 의존성 그래프
+
+    - _precedents: 수식 셀 → (참조하는 셀들, 참조하는 범위들)
+    - _cell_dependents: 셀 → 그 셀을 직접 참조하는 수식 셀들
+    - _range_dependents: 범위 → 그 범위를 참조하는 수식 셀들
+    - _column_ranges / _wide_ranges: 셀이 속한 범위를 빠르게 찾기 위한 열 버킷 / 넓은 범위 목록
+    """
+
+    def __init__(self):
+        self._precedents: Dict[CellKey, Tuple[Tuple[CellKey, ...], Tuple[RangeKey, ...]]] = {}
+        self._cell_dependents: Dict[CellKey, Set[CellKey]] = defaultdict(set)
+        self._range_dependents: Dict[RangeKey, Set[CellKey]] = defaultdict(set)
+        self._column_ranges: Dict[Tuple[str, int], Set[RangeKey]] = defaultdict(set)
+        self._wide_ranges: Dict[str, Set[RangeKey]] = defaultdict(set)
+
+    @classmethod
+    def from_workbook(cls, workbook: Workbook) -> "DependencyGraph":
+        """
+        워크북의 모든 수식 셀로 그래프를 만듭니다.
+
+        Args:
+            workbook: openpyxl 워크북
+
+        Returns:
+            DependencyGraph 객체
+        """
+        graph = cls()
+        for worksheet in workbook.worksheets:
+            title = worksheet.title
+            for (row, col), cell in worksheet._cells.items():
+                if cell.data_type == "f" and isinstance(cell._value, str):
+                    graph.set_formula((title, row, col), cell._value)
+        return graph
+
+    def __contains__(self, key: CellKey) -> bool:
+        return key in self._precedents
+
+    def formula_cells(self) -> List[CellKey]:
+        """그래프에 등록된 수식 셀 목록"""
+        return list(self._precedents)
+
+    def set_formula(self, key: CellKey, formula: Optional[str]) -> None:
+        """
+        셀의 수식을 등록하거나 갱신합니다. formula가 None이면 수식 셀에서 제거합니다.
+
+        Args:
+            key: (시트 이름, 행, 열)
+            formula: 새 수식 문자열 또는 None
+        """
+        self._remove(key)
+        if formula is None:
+            return
+
+        cells, ranges = extract_references(formula, key[0])
+        self._precedents[key] = (tuple(cells), tuple(ranges))
+        for cell in cells:
+            self._cell_dependents[cell].add(key)
+        for rng in ranges:
+            if not self._range_dependents[rng]:
+                self._index_range(rng)
+            self._range_dependents[rng].add(key)
+
+    def _remove(self, key: CellKey) -> None:
+        precedents = self._precedents.pop(key, None)
+        if precedents is None:
+            return
+        cells, ranges = precedents
+        for cell in cells:
+            dependents = self._cell_dependents.get(cell)
+            if dependents is not None:
+                dependents.discard(key)
+                if not dependents:
+                    del self._cell_dependents[cell]
+        for rng in ranges:
+            dependents = self._range_dependents.get(rng)
+            if dependents is not None:
+                dependents.discard(key)
+                if not dependents:
+                    del self._range_dependents[rng]
+                    self._unindex_range(rng)
+
+    def _index_range(self, rng: RangeKey) -> None:
+        sheet, _, min_col, _, max_col = rng
+        if max_col - min_col + 1 > WIDE_RANGE_COLUMNS:
+            self._wide_ranges[sheet].add(rng)
+            return
+        for col in range(min_col, max_col + 1):
+            self._column_ranges[(sheet, col)].add(rng)
+
+    def _unindex_range(self, rng: RangeKey) -> None:
+        sheet, _, min_col, _, max_col = rng
+        if max_col - min_col + 1 > WIDE_RANGE_COLUMNS:
+            self._wide_ranges[sheet].discard(rng)
+            return
+        for col in range(min_col, max_col + 1):
+            bucket = self._column_ranges.get((sheet, col))
+            if bucket is not None:
+                bucket.discard(rng)
+                if not bucket:
+                    del self._column_ranges[(sheet, col)]
+
+    def dependents(self, key: CellKey) -> Set[CellKey]:
+        """
+        셀을 직접 참조하는(단일 셀 또는 범위로) 수식 셀 집합을 반환합니다.
+
+        Args:
+            key: (시트 이름, 행, 열)
+        """
+        sheet, row, col = key
+        result = set(self._cell_dependents.get(key, ()))
+        for rng in self._column_ranges.get((sheet, col), ()):
+            if rng[1] <= row <= rng[3]:
+                result |= self._range_dependents[rng]
+        for rng in self._wide_ranges.get(sheet, ()):
+            if rng[1] <= row <= rng[3] and rng[2] <= col <= rng[4]:
+                result |= self._range_dependents[rng]
+        return result
+
+    def evaluation_order(self, changed: Iterable[CellKey]) -> Tuple[List[CellKey], List[CellKey], List[List[CellKey]]]:
+        """
+        변경된 셀의 영향을 받는 수식 셀을 찾아 재계산 순서를 정합니다.
+
+        Args:
+            changed: 값이나 수식이 바뀐 셀 목록
+
+        Returns:
+            (재계산 순서, 순환 참조 때문에 계산할 수 없는 셀, 순환 참조 그룹 목록)
+        """
+        # 1) 영향 범위 탐색 (BFS) 하면서 수식 셀 사이의 간선을 기록
+        seen: Set[CellKey] = set(changed)
+        queue = deque(seen)
+        edges: Dict[CellKey, Set[CellKey]] = {}
+        while queue:
+            key = queue.popleft()
+            dependents = self.dependents(key)
+            if key in self._precedents:
+                edges[key] = dependents
+            for dependent in dependents:
+                if dependent not in seen:
+                    seen.add(dependent)
+                    queue.append(dependent)
+
+        formulas = [key for key in seen if key in self._precedents]
+
+        # 2) 위상 정렬 (Kahn)
+        indegree = dict.fromkeys(formulas, 0)
+        for key in formulas:
+            for dependent in edges.get(key, ()):
+                indegree[dependent] += 1
+
+        ready = deque(sorted(key for key, degree in indegree.items() if degree == 0))
+        order = []
+        while ready:
+            key = ready.popleft()
+            order.append(key)
+            for dependent in edges.get(key, ()):
+                indegree[dependent] -= 1
+                if indegree[dependent] == 0:
+                    ready.append(dependent)
+
+        # 3) 정렬되지 않고 남은 셀 = 순환 참조 안에 있거나 그 하위에 있는 셀
+        blocked = sorted(key for key, degree in indegree.items() if degree > 0)
+        cycles = self._find_cycles(blocked, edges) if blocked else []
+        return order, blocked, cycles
+
+    def _find_cycles(self, nodes: List[CellKey], edges: Dict[CellKey, Set[CellKey]]) -> List[List[CellKey]]:
+        """남은 셀 중 실제 순환을 이루는 강한 연결 요소(SCC)를 찾습니다. (반복형 Tarjan)"""
+        node_set = set(nodes)
+        index_of: Dict[CellKey, int] = {}
+        lowlink: Dict[CellKey, int] = {}
+        stack: List[CellKey] = []
+        on_stack: Set[CellKey] = set()
+        cycles = []
+        counter = 0
+
+        for root in nodes:
+            if root in index_of:
+                continue
+            work = [(root, iter(sorted(edges.get(root, set()) & node_set)))]
+            index_of[root] = lowlink[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack.add(root)
+
+            while work:
+                node, children = work[-1]
+                advanced = False
+                for child in children:
+                    if child not in index_of:
+                        index_of[child] = lowlink[child] = counter
+                        counter += 1
+                        stack.append(child)
+                        on_stack.add(child)
+                        work.append((child, iter(sorted(edges.get(child, set()) & node_set))))
+                        advanced = True
+                        break
+                    if child in on_stack:
+                        lowlink[node] = min(lowlink[node], index_of[child])
+                if advanced:
+                    continue
+
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+                if lowlink[node] == index_of[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    if len(component) > 1 or node in edges.get(node, ()):
+                        cycles.append(sorted(component))
+        return cycles
+
+    def stats(self) -> Dict[str, int]:
+        """그래프 크기 지표를 반환합니다."""
+        return {
+            "formulas": len(self._precedents),
+            "cell_edges": sum(len(v) for v in self._cell_dependents.values()),
+            "ranges": len(self._range_dependents),
+        }
+
+
+class RecalculationResult:
+    """재계산 결과 요약"""
+
+    def __init__(
+            self,
+            full: bool,
+            recalculated: int,
+            cycles: List[List[str]],
+            dependents: Optional[Dict[str, List[str]]] = None
+    ):
+        """
+        Args:
+            full: 워크북 전체를 다시 계산했는지 여부
+            recalculated: 다시 계산한 수식 셀 수
+            cycles: 감지된 순환 참조 그룹 (["Sheet!A1", "Sheet!A2"] 형태)
+            dependents: 변경된 셀의 영향으로 값이 바뀌었을 수 있는 수식 셀 (시트 이름 → 셀 주소 목록, 재계산 순서)
+        """
+        self.full = full
+        self.recalculated = recalculated
+        self.cycles = cycles
+        self.dependents = dependents or {}
+
+    @property
+    def circular_references(self) -> List[str]:
+        """순환 참조에 포함된 셀 주소 목록"""
+        return [address for cycle in self.cycles for address in cycle]
+
+
+# 워크북 → 의존성 그래프. 워크북(세션 캐시 항목)이 사라지면 함께 정리됩니다.
+_graphs: "weakref.WeakKeyDictionary[Workbook, DependencyGraph]" = weakref.WeakKeyDictionary()
+
+
+def get_dependency_graph(workbook: Workbook) -> DependencyGraph:
+    """
+    워크북의 의존성 그래프를 반환합니다. 없으면 새로 만듭니다.
+
+    Args:
+        workbook: openpyxl 워크북
+
+    Returns:
+        DependencyGraph 객체
+    """
+    graph = _graphs.get(workbook)
+    if graph is None:
+        graph = DependencyGraph.from_workbook(workbook)
+        _graphs[workbook] = graph
+    return graph
+
+
+def _format_key(key: CellKey) -> str:
+    return f"{key[0]}!{get_column_letter(key[2])}{key[1]}"
+
+
+def recalculate_changes(
+        workbook: Workbook,
+        worksheet: Worksheet,
+        coordinates: Iterable[str],
+        full: bool = False
+) -> RecalculationResult:
+    """
+    명령어가 변경한 셀을 기준으로 수식을 다시 계산합니다.
+    이전 계산 결과가 있으면 변경된 셀의 하위 수식만, 없으면 워크북 전체를 계산합니다.
+
+    Args:
+        workbook: openpyxl 워크북
+        worksheet: 명령어가 적용된 워크시트
+        coordinates: 변경된 셀 주소 목록
+        full: True면 그래프를 다시 만들고 워크북 전체를 계산 (coordinates로 추적하지 못한 변경이 있는 경우)
+
+    Returns:
+        RecalculationResult 객체
+    """
+    if full:
+        # 추적하지 못한 셀의 수식 변경은 그래프에도 반영되지 않았으므로 현재 워크북으로 다시 만듦
+        _graphs.pop(workbook, None)
+    # 그래프는 항상 현재 수식 상태를 반영하므로, 이전 계산 결과만 있으면 증분 재계산이 가능합니다.
+    incremental = not full and all(has_computed_values(ws) for ws in workbook.worksheets)
+    graph = get_dependency_graph(workbook)
+    title = worksheet.title
+    cells = worksheet._cells
+
+    # 변경된 셀의 수식을 그래프에 반영
+    changed = []
+    for coordinate in coordinates:
+        column, row = coordinate_from_string(coordinate)
+        col = column_index_from_string(column)
+        cell = cells.get((row, col))
+        formula = cell._value if cell is not None and cell.data_type == "f" and isinstance(cell._value, str) else None
+        graph.set_formula((title, row, col), formula)
+        changed.append((title, row, col))
+
+    if incremental:
+        order, blocked, cycles = graph.evaluation_order(changed)
+    else:
+        order, blocked, cycles = graph.evaluation_order(graph.formula_cells())
+    cycle_addresses = [[_format_key(key) for key in cycle] for cycle in cycles]
+    if cycle_addresses:
+        print(f"[수식] 순환 참조 감지: {cycle_addresses}")
+
+    if not incremental:
+        recalculate_workbook(workbook)
+        downstream, downstream_blocked, _ = graph.evaluation_order(changed)
+        return RecalculationResult(
+            full=True,
+            recalculated=len(order) + len(blocked),
+            cycles=cycle_addresses,
+            dependents=_group_by_sheet(downstream + downstream_blocked)
+        )
+
+    evaluator = FormulaEvaluator(workbook, dirty=set(order) | set(blocked))
+    updates: Dict[str, Dict[str, Any]] = defaultdict(dict)
+    removed: Dict[str, List[str]] = defaultdict(list)
+
+    # 수식이 지워진 셀은 계산 결과에서 제거
+    for sheet_title, row, col in changed:
+        if (sheet_title, row, col) not in graph:
+            removed[sheet_title].append(f"{get_column_letter(col)}{row}")
+
+    for key in order:
+        sheet_title, row, col = key
+        coordinate = f"{get_column_letter(col)}{row}"
+        try:
+            updates[sheet_title][coordinate] = evaluator.evaluate_cell(workbook[sheet_title], row, col)
+        except FormulaEvaluationError:
+            removed[sheet_title].append(coordinate)
+    for sheet_title, row, col in blocked:
+        removed[sheet_title].append(f"{get_column_letter(col)}{row}")
+
+    for sheet_title in set(updates) | set(removed):
+        update_computed_values(workbook[sheet_title], updates.get(sheet_title, {}), removed.get(sheet_title, ()))
+
+    return RecalculationResult(
+        full=False, recalculated=len(order), cycles=cycle_addresses, dependents=_group_by_sheet(order + blocked)
+    )
+
+
+def _group_by_sheet(keys: Iterable[CellKey]) -> Dict[str, List[str]]:
+    grouped: Dict[str, List[str]] = defaultdict(list)
+    for sheet_title, row, col in keys:
+        grouped[sheet_title].append(f"{get_column_letter(col)}{row}")
+    return dict(grouped)
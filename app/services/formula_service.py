@@ -0,0 +1,1481 @@
+# app/services/formula_service.py
+"""
+수식 계산 서비스
+ExcelManipulator가 작성한 수식(=SUM(B2:B10) 등)을 서버에서 직접 계산합니다.
+
+- 범위 참조는 한 번만 읽어 NumPy 배열(값 배열 + 숫자 배열)로 만들고, 집계·조건·조회 함수는 이 배열 위에서
+  벡터 연산으로 처리합니다. 같은 범위를 참조하는 수식이 많아도 범위 추출은 계산 패스당 한 번입니다.
+- 계산 결과는 워크시트별로 보관되어 LLM 컨텍스트 생성에 사용되고, ParsedWorkbook 저장 시(cached_value_writer)
+  xlsx의 캐시 값(<v>)으로 기록되어 엑셀을 열지 않아도 결과 값을 읽을 수 있습니다.
+- 지원하지 않는 함수(FILTER/UNIQUE 같은 동적 배열 등)나 순환 참조가 있는 수식은 계산하지 않고 건너뜁니다.
+"""
+import datetime
+import functools
+import inspect
+import math
+import re
+import threading
+import weakref
+from contextlib import contextmanager
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+from openpyxl import LXML, Workbook
+from openpyxl.cell._writer import _set_attributes
+from openpyxl.compat import safe_string
+from openpyxl.utils import column_index_from_string
+from openpyxl.utils.cell import coordinate_from_string
+from openpyxl.utils.datetime import to_excel
+from openpyxl.worksheet import _writer as worksheet_writer
+from openpyxl.worksheet.worksheet import Worksheet
+from openpyxl.xml.functions import Element, SubElement
+
+
+# ──────────────────────────────
+# 값 타입
+# ──────────────────────────────
+class ExcelError:
+    """엑셀 오류 값 (#DIV/0!, #N/A 등)"""
+
+    __slots__ = ("code",)
+
+    def __init__(self, code: str):
+        self.code = code
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, ExcelError) and other.code == self.code
+
+    def __hash__(self) -> int:
+        return hash(self.code)
+
+    def __repr__(self) -> str:
+        return self.code
+
+    __str__ = __repr__
+
+
+DIV0 = ExcelError("#DIV/0!")
+NA = ExcelError("#N/A")
+VALUE = ExcelError("#VALUE!")
+REF = ExcelError("#REF!")
+NUM = ExcelError("#NUM!")
+NAME = ExcelError("#NAME?")
+NULL = ExcelError("#NULL!")
+ERRORS_BY_CODE = {error.code: error for error in (DIV0, NA, VALUE, REF, NUM, NAME, NULL)}
+
+
+class FormulaEvaluationError(Exception):
+    """서버에서 계산할 수 없는 수식 (구문 오류, 지원하지 않는 함수 등)"""
+    pass
+
+
+class CircularReferenceError(FormulaEvaluationError):
+    """순환 참조가 있는 수식"""
+    pass
+
+
+class _ErrorSignal(Exception):
+    """계산 도중 엑셀 오류 값을 상위 함수/연산자 경계까지 전달하기 위한 내부 예외"""
+
+    def __init__(self, error: ExcelError):
+        super().__init__(error.code)
+        self.error = error
+
+
+# ──────────────────────────────
+# 토크나이저 / 파서
+# ──────────────────────────────
+_TOKEN_PATTERN = re.compile(r"""
+    (?P<space>\s+)
+  | (?P<string>"(?:[^"]|"")*")
+  | (?P<error>\#(?:NULL!|DIV/0!|VALUE!|REF!|NAME\?|NUM!|N/A))
+  | (?P<ref>(?:(?:'(?:[^']|'')+'|[^\W\d][\w.]*)!)?
+        (?:\$?[A-Za-z]{1,3}\$?\d+(?::\$?[A-Za-z]{1,3}\$?\d+)?
+          |\$?[A-Za-z]{1,3}:\$?[A-Za-z]{1,3}
+          |\$?\d+:\$?\d+)
+        (?![\w(]))
+  | (?P<bool>(?:TRUE|FALSE)(?![\w(.]))
+  | (?P<func>[^\W\d][\w.]*(?=\s*\())
+  | (?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)
+  | (?P<op><>|<=|>=|[-+*/^&=<>%])
+  | (?P<lparen>\()
+  | (?P<rparen>\))
+  | (?P<comma>,)
+""", re.VERBOSE | re.IGNORECASE)
+
+# 이항 연산자 우선순위 (엑셀 기준: 비교 < 연결 < 덧셈 < 곱셈 < 거듭제곱)
+_BINARY_PRECEDENCE = {
+    "=": 1, "<>": 1, "<": 1, ">": 1, "<=": 1, ">=": 1,
+    "&": 2,
+    "+": 3, "-": 3,
+    "*": 4, "/": 4,
+    "^": 5,
+}
+
+
+def _tokenize(text: str) -> List[Tuple[str, str]]:
+    """수식 문자열을 (종류, 원문) 토큰 목록으로 분리합니다."""
+    tokens = []
+    position = 0
+    while position < len(text):
+        match = _TOKEN_PATTERN.match(text, position)
+        if match is None:
+            raise FormulaEvaluationError(f"해석할 수 없는 수식입니다: {text[position:]}")
+        kind = match.lastgroup
+        if kind != "space":
+            tokens.append((kind, match.group()))
+        position = match.end()
+    return tokens
+
+
+def _parse_reference(text: str) -> tuple:
+    """
+    참조 문자열을 ("ref", 시트명, min_col, min_row, max_col, max_row) 노드로 변환합니다.
+    전체 열(A:A)은 max_row, 전체 행(1:1)은 max_col이 None입니다.
+    """
+    sheet_name = None
+    if "!" in text:
+        sheet_name, text = text.rsplit("!", 1)
+        if sheet_name.startswith("'"):
+            sheet_name = sheet_name[1:-1].replace("''", "'")
+
+    text = text.replace("$", "").upper()
+    start, end = text.split(":") if ":" in text else (text, text)
+
+    if start.isdigit():
+        rows = sorted((int(start), int(end)))
+        return "ref", sheet_name, 1, rows[0], None, rows[1]
+    if start.isalpha():
+        cols = sorted((column_index_from_string(start), column_index_from_string(end)))
+        return "ref", sheet_name, cols[0], 1, cols[1], None
+
+    start_col, start_row = coordinate_from_string(start)
+    end_col, end_row = coordinate_from_string(end)
+    cols = sorted((column_index_from_string(start_col), column_index_from_string(end_col)))
+    rows = sorted((start_row, end_row))
+    return "ref", sheet_name, cols[0], rows[0], cols[1], rows[1]
+
+
+class _Parser:
+    """토큰 목록을 튜플 기반 구문 트리로 변환하는 재귀 하강 파서"""
+
+    def __init__(self, tokens: List[Tuple[str, str]]):
+        self.tokens = tokens
+        self.position = 0
+
+    def peek(self) -> Optional[Tuple[str, str]]:
+        return self.tokens[self.position] if self.position < len(self.tokens) else None
+
+    def next(self) -> Tuple[str, str]:
+        token = self.peek()
+        if token is None:
+            raise FormulaEvaluationError("수식이 예상보다 일찍 끝났습니다.")
+        self.position += 1
+        return token
+
+    def expect(self, kind: str) -> None:
+        token = self.next()
+        if token[0] != kind:
+            raise FormulaEvaluationError(f"'{token[1]}' 위치에 {kind} 토큰이 필요합니다.")
+
+    def parse_expression(self, min_precedence: int = 1) -> tuple:
+        left = self.parse_unary()
+        while True:
+            token = self.peek()
+            if token is None or token[0] != "op" or token[1] not in _BINARY_PRECEDENCE:
+                return left
+            precedence = _BINARY_PRECEDENCE[token[1]]
+            if precedence < min_precedence:
+                return left
+            self.next()
+            right = self.parse_expression(precedence + 1)
+            left = ("binop", token[1], left, right)
+
+    def parse_unary(self) -> tuple:
+        token = self.peek()
+        if token is not None and token[0] == "op" and token[1] in ("-", "+"):
+            self.next()
+            operand = self.parse_unary()
+            return ("neg", operand) if token[1] == "-" else ("pos", operand)
+        return self.parse_postfix()
+
+    def parse_postfix(self) -> tuple:
+        node = self.parse_primary()
+        while self.peek() == ("op", "%"):
+            self.next()
+            node = ("pct", node)
+        return node
+
+    def parse_primary(self) -> tuple:
+        kind, text = self.next()
+        if kind == "number":
+            return "const", float(text)
+        if kind == "string":
+            return "const", text[1:-1].replace('""', '"')
+        if kind == "bool":
+            return "const", text.upper() == "TRUE"
+        if kind == "error":
+            return "const", ERRORS_BY_CODE[text.upper()]
+        if kind == "ref":
+            return _parse_reference(text)
+        if kind == "lparen":
+            node = self.parse_expression()
+            self.expect("rparen")
+            return node
+        if kind == "func":
+            return self.parse_function(text.upper())
+        raise FormulaEvaluationError(f"예상하지 못한 토큰입니다: {text}")
+
+    def parse_function(self, name: str) -> tuple:
+        self.expect("lparen")
+        args = []
+        if self.peek() is not None and self.peek()[0] == "rparen":
+            self.next()
+            return "func", name, args
+
+        while True:
+            token = self.peek()
+            if token is not None and token[0] in ("comma", "rparen"):
+                args.append(("blank",))
+            else:
+                args.append(self.parse_expression())
+            token = self.next()
+            if token[0] == "rparen":
+                return "func", name, args
+            if token[0] != "comma":
+                raise FormulaEvaluationError(f"함수 인자 위치에 예상하지 못한 토큰입니다: {token[1]}")
+
+
+@functools.lru_cache(maxsize=4096)
+def parse_formula(formula: str) -> tuple:
+    """
+    수식 문자열을 구문 트리로 변환합니다. (같은 수식은 캐시된 결과를 재사용)
+
+    Args:
+        formula: "=SUM(A1:A3)" 형태의 수식 문자열 (앞의 "="는 생략 가능)
+
+    Returns:
+        튜플 기반 구문 트리
+
+    Raises:
+        FormulaEvaluationError: 구문을 해석할 수 없는 경우
+    """
+    text = formula[1:] if formula.startswith("=") else formula
+    parser = _Parser(_tokenize(text))
+    node = parser.parse_expression()
+    if parser.peek() is not None:
+        raise FormulaEvaluationError(f"수식 끝에 해석하지 못한 부분이 있습니다: {parser.peek()[1]}")
+    return node
+
+
+# ──────────────────────────────
+# 범위 값
+# ──────────────────────────────
+class RangeValue:
+    """수식 안의 범위 참조 (A1:B10 등). 실제 값은 평가기에서 배열로 읽어 옵니다."""
+
+    __slots__ = ("worksheet", "min_row", "min_col", "max_row", "max_col")
+
+    def __init__(self, worksheet: Worksheet, min_row: int, min_col: int, max_row: int, max_col: int):
+        self.worksheet = worksheet
+        self.min_row = min_row
+        self.min_col = min_col
+        self.max_row = max_row
+        self.max_col = max_col
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return max(self.max_row - self.min_row + 1, 0), max(self.max_col - self.min_col + 1, 0)
+
+    @property
+    def key(self) -> tuple:
+        return self.worksheet.title, self.min_row, self.min_col, self.max_row, self.max_col
+
+    def resized(self, rows: int, cols: int) -> "RangeValue":
+        """왼쪽 위 셀을 기준으로 크기를 맞춘 범위를 반환합니다. (SUMIF의 sum_range 등)"""
+        return RangeValue(self.worksheet, self.min_row, self.min_col,
+                          self.min_row + rows - 1, self.min_col + cols - 1)
+
+
+class _RangeData:
+    """
+    범위의 값을 NumPy 배열로 보관합니다.
+    values는 원래 값(object), numbers는 숫자 셀만 담은 float 배열(숫자가 아니면 NaN)입니다.
+    """
+
+    __slots__ = ("values", "numbers", "error", "_texts")
+
+    def __init__(self, values: np.ndarray):
+        self.values = values
+        self.numbers = np.full(values.shape, np.nan)
+        self.error: Optional[ExcelError] = None
+        self._texts: Optional[np.ndarray] = None
+
+        for index, value in np.ndenumerate(values):
+            value_type = type(value)
+            if value_type is int or value_type is float:
+                self.numbers[index] = value
+            elif value_type is ExcelError and self.error is None:
+                self.error = value
+
+    @property
+    def texts(self) -> np.ndarray:
+        """문자열 셀은 소문자로, 나머지는 None으로 채운 배열 (대소문자 무시 비교용)"""
+        if self._texts is None:
+            self._texts = np.array(
+                [value.lower() if isinstance(value, str) else None for value in self.values.ravel()],
+                dtype=object
+            ).reshape(self.values.shape)
+        return self._texts
+
+    def numeric_values(self) -> np.ndarray:
+        """범위 안의 숫자 값만 1차원 배열로 반환합니다. (오류 값이 있으면 전파)"""
+        if self.error is not None:
+            raise _ErrorSignal(self.error)
+        flat = self.numbers.ravel()
+        return flat[~np.isnan(flat)]
+
+
+# ──────────────────────────────
+# 값 변환 헬퍼
+# ──────────────────────────────
+def _normalize_constant(value: Any, data_type: str) -> Any:
+    """셀에 저장된 상수 값을 계산용 값으로 변환합니다. (날짜 → 엑셀 일련번호, 오류 문자열 → ExcelError)"""
+    if data_type == "e":
+        return ERRORS_BY_CODE.get(str(value).upper(), VALUE)
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time, datetime.timedelta)):
+        return to_excel(value)
+    return value
+
+
+def _to_number(value: Any) -> float:
+    """산술 연산용 숫자 변환 (빈 셀 → 0, TRUE → 1, 숫자 문자열 → 숫자)"""
+    if isinstance(value, ExcelError):
+        raise _ErrorSignal(value)
+    if value is None:
+        return 0.0
+    if isinstance(value, (bool, int, float)):
+        return float(value)
+    try:
+        return float(str(value).strip())
+    except ValueError:
+        raise _ErrorSignal(VALUE)
+
+
+def _to_text(value: Any) -> str:
+    """문자열 연산용 변환 (숫자는 엑셀 일반 서식과 같은 모양으로)"""
+    if isinstance(value, ExcelError):
+        raise _ErrorSignal(value)
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, float):
+        return str(int(value)) if value.is_integer() else f"{value:.15g}"
+    return str(value)
+
+
+def _to_bool(value: Any) -> bool:
+    """논리 연산용 변환"""
+    if isinstance(value, ExcelError):
+        raise _ErrorSignal(value)
+    if value is None:
+        return False
+    if isinstance(value, (bool, int, float)):
+        return bool(value)
+    text = str(value).strip().upper()
+    if text in ("TRUE", "FALSE"):
+        return text == "TRUE"
+    raise _ErrorSignal(VALUE)
+
+
+def _to_int(value: Any) -> int:
+    """인자 위치(열 번호, 글자 수 등)용 정수 변환 (소수점 이하 버림)"""
+    return int(math.floor(_to_number(value)))
+
+
+def _compare_key(value: Any, other: Any) -> tuple:
+    """엑셀 비교 규칙(숫자 < 문자열 < 논리값, 문자열은 대소문자 무시)에 맞춘 정렬 키"""
+    if value is None:
+        if isinstance(other, str):
+            value = ""
+        elif isinstance(other, bool):
+            value = False
+        else:
+            value = 0.0
+    if isinstance(value, bool):
+        return 2, value
+    if isinstance(value, (int, float)):
+        return 0, value
+    return 1, str(value).lower()
+
+
+def _wildcard_pattern(text: str) -> "re.Pattern":
+    """엑셀 와일드카드(*, ?, ~)를 대소문자 무시 정규식으로 변환합니다."""
+    parts = []
+    index = 0
+    while index < len(text):
+        char = text[index]
+        if char == "~" and index + 1 < len(text):
+            parts.append(re.escape(text[index + 1]))
+            index += 2
+            continue
+        parts.append(".*" if char == "*" else "." if char == "?" else re.escape(char))
+        index += 1
+    return re.compile("".join(parts), re.IGNORECASE | re.DOTALL)
+
+
+def _round_half_away(number: float, digits: int) -> float:
+    """엑셀 ROUND와 같은 사사오입 (0에서 먼 쪽으로 반올림)"""
+    quantum = Decimal(1).scaleb(-digits)
+    return float(Decimal(repr(number)).quantize(quantum, rounding=ROUND_HALF_UP))
+
+
+def _normalize_result(value: Any) -> Any:
+    """계산 결과를 저장용 값으로 정리합니다. (정수 값 float → int, 빈 결과 → 0)"""
+    if value is None:
+        return 0
+    if isinstance(value, float):
+        if math.isnan(value) or math.isinf(value):
+            return NUM
+        if value.is_integer() and abs(value) < 1e15:
+            return int(value)
+    return value
+
+
+# ──────────────────────────────
+# 함수 레지스트리
+# ──────────────────────────────
+# 일반 함수: 인자를 모두 먼저 계산한 뒤 (evaluator, args) 로 호출
+_FUNCTIONS: Dict[str, Callable[["FormulaEvaluator", List[Any]], Any]] = {}
+# 지연 함수: IF/IFERROR 처럼 필요한 인자만 계산해야 하는 함수는 (evaluator, arg_nodes, worksheet) 로 호출
+_LAZY_FUNCTIONS: Dict[str, Callable[["FormulaEvaluator", List[tuple], Worksheet], Any]] = {}
+
+
+def _function(*names: str):
+    """일반 수식 함수를 등록합니다."""
+    def decorator(func):
+        for name in names:
+            _FUNCTIONS[name] = func
+        return func
+    return decorator
+
+
+def _lazy_function(*names: str):
+    """인자를 지연 계산하는 수식 함수를 등록합니다."""
+    def decorator(func):
+        for name in names:
+            _LAZY_FUNCTIONS[name] = func
+        return func
+    return decorator
+
+
+def supported_functions() -> List[str]:
+    """서버에서 계산할 수 있는 함수 이름 목록을 반환합니다."""
+    return sorted(set(_FUNCTIONS) | set(_LAZY_FUNCTIONS))
+
+
+# ──────────────────────────────
+# 평가기
+# ──────────────────────────────
+class FormulaEvaluator:
+    """
+    워크북 단위 수식 평가기
+    한 번의 계산 패스 동안 셀 계산 결과와 범위 배열을 메모이제이션합니다.
+    """
+
+    def __init__(self, workbook: Workbook, dirty: Optional[set] = None):
+        """
+        Args:
+            workbook: 계산할 openpyxl 워크북
+            dirty: (선택) 다시 계산할 셀 키 (시트 이름, 행, 열) 집합.
+                주어지면 이 집합에 없는 수식 셀은 보관된 계산 결과를 그대로 사용합니다. (증분 재계산)
+        """
+        self.workbook = workbook
+        self._dirty = dirty
+        self._values: Dict[tuple, Any] = {}
+        self._failures: Dict[tuple, FormulaEvaluationError] = {}
+        self._evaluating: set = set()
+        self._ranges: Dict[tuple, _RangeData] = {}
+
+    def evaluate_worksheet(self, worksheet: Worksheet) -> Dict[str, Any]:
+        """
+        워크시트의 모든 수식 셀을 계산합니다.
+        행/열 순서로 방문하므로 위에서 아래로 이어지는 누적 수식도 재귀가 깊어지지 않습니다.
+
+        Args:
+            worksheet: 계산할 워크시트
+
+        Returns:
+            {셀 주소: 계산 값} (계산할 수 없는 수식은 제외)
+        """
+        results = {}
+        for (row, col), cell in sorted(worksheet._cells.items()):
+            if cell.data_type != "f":
+                continue
+            try:
+                results[cell.coordinate] = self.evaluate_cell(worksheet, row, col)
+            except FormulaEvaluationError:
+                continue
+        return results
+
+    def evaluate_cell(self, worksheet: Worksheet, row: int, col: int) -> Any:
+        """
+        셀 하나의 값을 계산합니다. 수식이 아니면 저장된 값을 반환합니다.
+
+        Args:
+            worksheet: 워크시트
+            row: 행 번호
+            col: 열 번호
+
+        Returns:
+            셀 값 (수식 오류는 ExcelError 값)
+
+        Raises:
+            FormulaEvaluationError: 계산할 수 없는 수식인 경우
+        """
+        key = (worksheet.title, row, col)
+        if key in self._values:
+            return self._values[key]
+        if key in self._failures:
+            raise self._failures[key]
+
+        cell = worksheet._cells.get((row, col))
+        if cell is None:
+            return None
+        if cell.data_type != "f":
+            return _normalize_constant(cell._value, cell.data_type)
+        if not isinstance(cell._value, str):
+            raise FormulaEvaluationError("배열 수식은 지원하지 않습니다.")
+        if self._dirty is not None and key not in self._dirty:
+            stored = _computed_values.get(worksheet)
+            if stored is not None and cell.coordinate in stored:
+                return stored[cell.coordinate]
+
+        if key in self._evaluating:
+            raise CircularReferenceError(f"순환 참조: {worksheet.title}!{cell.coordinate}")
+
+        self._evaluating.add(key)
+        try:
+            result = self.evaluate_formula(cell._value, worksheet)
+        except RecursionError:
+            error = FormulaEvaluationError(f"참조가 너무 깊습니다: {worksheet.title}!{cell.coordinate}")
+            self._failures[key] = error
+            raise error
+        except FormulaEvaluationError as e:
+            self._failures[key] = e
+            raise
+        finally:
+            self._evaluating.discard(key)
+
+        self._values[key] = result
+        return result
+
+    def evaluate_formula(self, formula: str, worksheet: Worksheet) -> Any:
+        """
+        수식 문자열을 주어진 워크시트 기준으로 계산합니다.
+
+        Args:
+            formula: "=..." 형태의 수식
+            worksheet: 시트 이름이 없는 참조가 가리킬 워크시트
+
+        Returns:
+            계산 값 (빈 결과는 0, 오류는 ExcelError)
+
+        Raises:
+            FormulaEvaluationError: 계산할 수 없는 수식인 경우
+        """
+        try:
+            value = self._scalar(self._evaluate(parse_formula(formula), worksheet))
+        except _ErrorSignal as signal:
+            value = signal.error
+        return _normalize_result(value)
+
+    # ── 노드 계산 ──
+    def _evaluate(self, node: tuple, worksheet: Worksheet) -> Any:
+        kind = node[0]
+        if kind == "const":
+            return node[1]
+        if kind == "ref":
+            return self._reference(node, worksheet)
+        if kind == "func":
+            return self._call(node[1], node[2], worksheet)
+        if kind == "binop":
+            return self._binary(node[1], node[2], node[3], worksheet)
+        if kind == "blank":
+            return None
+
+        try:
+            operand = _to_number(self._scalar(self._evaluate(node[1], worksheet)))
+        except _ErrorSignal as signal:
+            return signal.error
+        if kind == "neg":
+            return -operand
+        if kind == "pct":
+            return operand / 100
+        return operand
+
+    def _reference(self, node: tuple, worksheet: Worksheet) -> Any:
+        _, sheet_name, min_col, min_row, max_col, max_row = node
+        if sheet_name is not None:
+            if sheet_name not in self.workbook.sheetnames:
+                return REF
+            worksheet = self.workbook[sheet_name]
+        if max_row is None:
+            max_row = max(worksheet.max_row, min_row)
+        if max_col is None:
+            max_col = max(worksheet.max_column, min_col)
+        return RangeValue(worksheet, min_row, min_col, max_row, max_col)
+
+    def _binary(self, op: str, left_node: tuple, right_node: tuple, worksheet: Worksheet) -> Any:
+        try:
+            left = self._scalar(self._evaluate(left_node, worksheet))
+            right = self._scalar(self._evaluate(right_node, worksheet))
+            for operand in (left, right):
+                if isinstance(operand, ExcelError):
+                    return operand
+
+            if op == "&":
+                return _to_text(left) + _to_text(right)
+            if op in ("=", "<>", "<", ">", "<=", ">="):
+                left_key, right_key = _compare_key(left, right), _compare_key(right, left)
+                return {
+                    "=": left_key == right_key,
+                    "<>": left_key != right_key,
+                    "<": left_key < right_key,
+                    ">": left_key > right_key,
+                    "<=": left_key <= right_key,
+                    ">=": left_key >= right_key,
+                }[op]
+
+            a, b = _to_number(left), _to_number(right)
+            if op == "+":
+                return a + b
+            if op == "-":
+                return a - b
+            if op == "*":
+                return a * b
+            if op == "/":
+                return DIV0 if b == 0 else a / b
+            try:
+                result = math.pow(a, b)
+            except (OverflowError, ValueError, ZeroDivisionError):
+                return NUM
+            return result
+        except _ErrorSignal as signal:
+            return signal.error
+
+    def _call(self, name: str, arg_nodes: List[tuple], worksheet: Worksheet) -> Any:
+        if name.startswith("_XLFN."):
+            name = name[len("_XLFN."):]
+        try:
+            if name in _LAZY_FUNCTIONS:
+                return _LAZY_FUNCTIONS[name](self, arg_nodes, worksheet)
+            if name not in _FUNCTIONS:
+                raise FormulaEvaluationError(f"지원하지 않는 함수입니다: {name}")
+            args = [self._evaluate(arg, worksheet) for arg in arg_nodes]
+            return _FUNCTIONS[name](self, args)
+        except _ErrorSignal as signal:
+            return signal.error
+        except (ValueError, TypeError, IndexError, OverflowError):
+            return VALUE
+
+    # ── 값 변환 ──
+    def _scalar(self, value: Any) -> Any:
+        """범위 값을 단일 값으로 변환합니다. (셀 하나짜리 범위만 허용)"""
+        if isinstance(value, RangeValue):
+            rows, cols = value.shape
+            if rows == 1 and cols == 1:
+                return self.evaluate_cell(value.worksheet, value.min_row, value.min_col)
+            raise _ErrorSignal(VALUE)
+        return value
+
+    def range_data(self, rng: RangeValue) -> _RangeData:
+        """
+        범위의 값을 NumPy 배열로 읽어 옵니다. (계산 패스 동안 범위별로 한 번만 추출)
+        범위가 시트의 실제 셀 수보다 크면 존재하는 셀만 순회합니다.
+        """
+        key = rng.key
+        data = self._ranges.get(key)
+        if data is not None:
+            return data
+
+        rows, cols = rng.shape
+        values = np.full((rows, cols), None, dtype=object)
+        worksheet = rng.worksheet
+        cells = worksheet._cells
+        if rows * cols > len(cells):
+            positions = [
+                (row, col) for (row, col) in cells
+                if rng.min_row <= row <= rng.max_row and rng.min_col <= col <= rng.max_col
+            ]
+        else:
+            positions = [
+                (row, col)
+                for row in range(rng.min_row, rng.max_row + 1)
+                for col in range(rng.min_col, rng.max_col + 1)
+                if (row, col) in cells
+            ]
+
+        for row, col in positions:
+            values[row - rng.min_row, col - rng.min_col] = self.evaluate_cell(worksheet, row, col)
+
+        data = _RangeData(values)
+        self._ranges[key] = data
+        return data
+
+    def as_data(self, value: Any) -> _RangeData:
+        """범위 또는 단일 값을 _RangeData로 변환합니다."""
+        if isinstance(value, RangeValue):
+            return self.range_data(value)
+        if isinstance(value, ExcelError):
+            raise _ErrorSignal(value)
+        return _RangeData(np.array([[value]], dtype=object))
+
+    def collect_numbers(self, args: List[Any], strict: bool = True) -> np.ndarray:
+        """
+        집계 함수 인자에서 숫자만 모읍니다.
+        범위 안의 문자열/논리값/빈 셀은 무시하고, 직접 입력한 인자는 숫자로 변환합니다.
+
+        Args:
+            args: 계산된 인자 목록
+            strict: False면 숫자로 바꿀 수 없는 직접 입력 인자를 오류 대신 무시 (COUNT)
+        """
+        parts = []
+        for arg in args:
+            if isinstance(arg, RangeValue):
+                parts.append(self.range_data(arg).numeric_values())
+            elif arg is None:
+                continue
+            elif strict:
+                parts.append(np.array([_to_number(arg)]))
+            else:
+                try:
+                    parts.append(np.array([_to_number(arg)]))
+                except _ErrorSignal:
+                    continue
+        return np.concatenate(parts) if parts else np.empty(0)
+
+
+# ──────────────────────────────
+# 조건(criteria) / 조회 헬퍼
+# ──────────────────────────────
+_CRITERIA_OPERATORS = (">=", "<=", "<>", "=", ">", "<")
+
+
+def _criteria_mask(data: _RangeData, criteria: Any) -> np.ndarray:
+    """
+    COUNTIF/SUMIF 조건에 맞는 셀을 True로 표시한 bool 배열을 만듭니다.
+    ">=80", "<>남성", "김*" 같은 문자열 조건과 숫자/논리값 조건을 지원합니다.
+    """
+    if isinstance(criteria, ExcelError):
+        raise _ErrorSignal(criteria)
+
+    op, operand = "=", criteria
+    if isinstance(criteria, str):
+        for candidate in _CRITERIA_OPERATORS:
+            if criteria.startswith(candidate):
+                op, operand = candidate, criteria[len(candidate):]
+                break
+        try:
+            operand = float(operand)
+        except ValueError:
+            upper = operand.upper()
+            if upper in ("TRUE", "FALSE"):
+                operand = upper == "TRUE"
+
+    values = data.values
+    if operand is None or operand == "":
+        blank = np.equal(values, None) | np.equal(values, "")
+        return blank if op == "=" else ~blank
+
+    if isinstance(operand, bool):
+        is_match = np.frompyfunc(lambda v: isinstance(v, bool) and v == operand, 1, 1)
+        mask = is_match(values).astype(bool)
+        return mask if op == "=" else ~mask if op == "<>" else np.zeros(values.shape, dtype=bool)
+
+    if isinstance(operand, (int, float)):
+        numbers = data.numbers
+        with np.errstate(invalid="ignore"):
+            if op == "<>":
+                return ~(numbers == operand)
+            return {
+                "=": np.equal, ">": np.greater, "<": np.less, ">=": np.greater_equal, "<=": np.less_equal,
+            }[op](numbers, operand)
+
+    texts = data.texts
+    if op in ("=", "<>"):
+        pattern = _wildcard_pattern(str(operand))
+        is_match = np.frompyfunc(lambda v: v is not None and pattern.fullmatch(v) is not None, 1, 1)
+        mask = is_match(texts).astype(bool)
+        return mask if op == "=" else ~mask
+
+    target = str(operand).lower()
+    compare = {">": str.__gt__, "<": str.__lt__, ">=": str.__ge__, "<=": str.__le__}[op]
+    is_match = np.frompyfunc(lambda v: v is not None and compare(v, target), 1, 1)
+    return is_match(texts).astype(bool)
+
+
+def _lookup_mask(data: _RangeData, lookup: Any, op: str = "=", wildcard: bool = True) -> np.ndarray:
+    """
+    조회 함수용 비교 마스크를 1차원으로 만듭니다.
+    숫자는 숫자 셀끼리, 문자열은 문자열 셀끼리(대소문자 무시) 비교합니다.
+    """
+    if isinstance(lookup, ExcelError):
+        raise _ErrorSignal(lookup)
+    if lookup is None:
+        lookup = 0.0
+
+    if isinstance(lookup, bool):
+        values = data.values.ravel()
+        compare = {"=": lambda v: v == lookup, "<=": lambda v: v <= lookup, ">=": lambda v: v >= lookup}[op]
+        is_match = np.frompyfunc(lambda v: isinstance(v, bool) and compare(v), 1, 1)
+        return is_match(values).astype(bool)
+
+    if isinstance(lookup, (int, float)):
+        numbers = data.numbers.ravel()
+        with np.errstate(invalid="ignore"):
+            return {"=": np.equal, "<=": np.less_equal, ">=": np.greater_equal}[op](numbers, lookup)
+
+    texts = data.texts.ravel()
+    target = str(lookup).lower()
+    if op == "=":
+        if wildcard and any(char in target for char in "*?~"):
+            pattern = _wildcard_pattern(target)
+            is_match = np.frompyfunc(lambda v: v is not None and pattern.fullmatch(v) is not None, 1, 1)
+        else:
+            is_match = np.frompyfunc(lambda v: v == target, 1, 1)
+    else:
+        compare = str.__le__ if op == "<=" else str.__ge__
+        is_match = np.frompyfunc(lambda v: v is not None and compare(v, target), 1, 1)
+    return is_match(texts).astype(bool)
+
+
+def _sorted_lookup_index(data: _RangeData, lookup: Any, op: str) -> Optional[int]:
+    """
+    정렬된 범위에서의 근사 일치(VLOOKUP TRUE, MATCH 1/-1) 위치를 찾습니다.
+    엑셀의 이진 탐색과 같이 조건을 만족하는 연속 구간의 마지막 위치를 반환합니다.
+    """
+    matches = np.flatnonzero(_lookup_mask(data, lookup, op))
+    return int(matches[-1]) if matches.size else None
+
+
+def _nearest_index(data: _RangeData, lookup: Any, op: str, reverse: bool) -> Optional[int]:
+    """XLOOKUP의 '정확히 일치 또는 다음으로 작은/큰 항목' 위치를 찾습니다. (정렬 불필요)"""
+    exact = np.flatnonzero(_lookup_mask(data, lookup, "="))
+    if exact.size:
+        return int(exact[-1] if reverse else exact[0])
+
+    candidates = np.flatnonzero(_lookup_mask(data, lookup, op))
+    if not candidates.size:
+        return None
+    if isinstance(lookup, (int, float)) and not isinstance(lookup, bool):
+        keys = data.numbers.ravel()[candidates]
+    else:
+        keys = np.array([data.texts.ravel()[i] or "" for i in candidates], dtype=object)
+    best = keys.max() if op == "<=" else keys.min()
+    positions = candidates[keys == best]
+    return int(positions[-1] if reverse else positions[0])
+
+
+def _vector_data(evaluator: FormulaEvaluator, value: Any) -> _RangeData:
+    """한 행 또는 한 열짜리 범위를 요구하는 인자를 검사합니다."""
+    data = evaluator.as_data(value)
+    if 1 not in data.values.shape:
+        raise _ErrorSignal(NA)
+    return data
+
+
+# ──────────────────────────────
+# 집계 / 통계 함수
+# ──────────────────────────────
+@_function("SUM")
+def _fn_sum(evaluator: FormulaEvaluator, args: List[Any]) -> float:
+    return float(evaluator.collect_numbers(args).sum())
+
+
+@_function("AVERAGE")
+def _fn_average(evaluator: FormulaEvaluator, args: List[Any]) -> Any:
+    numbers = evaluator.collect_numbers(args)
+    return float(numbers.mean()) if numbers.size else DIV0
+
+
+@_function("COUNT")
+def _fn_count(evaluator: FormulaEvaluator, args: List[Any]) -> int:
+    return int(evaluator.collect_numbers(args, strict=False).size)
+
+
+@_function("COUNTA")
+def _fn_counta(evaluator: FormulaEvaluator, args: List[Any]) -> int:
+    total = 0
+    for arg in args:
+        if isinstance(arg, RangeValue):
+            total += int(np.count_nonzero(np.not_equal(evaluator.range_data(arg).values, None)))
+        elif arg is not None:
+            total += 1
+    return total
+
+
+@_function("MAX")
+def _fn_max(evaluator: FormulaEvaluator, args: List[Any]) -> float:
+    numbers = evaluator.collect_numbers(args)
+    return float(numbers.max()) if numbers.size else 0.0
+
+
+@_function("MIN")
+def _fn_min(evaluator: FormulaEvaluator, args: List[Any]) -> float:
+    numbers = evaluator.collect_numbers(args)
+    return float(numbers.min()) if numbers.size else 0.0
+
+
+@_function("MEDIAN")
+def _fn_median(evaluator: FormulaEvaluator, args: List[Any]) -> Any:
+    numbers = evaluator.collect_numbers(args)
+    return float(np.median(numbers)) if numbers.size else NUM
+
+
+@_function("MODE", "MODE.SNGL")
+def _fn_mode(evaluator: FormulaEvaluator, args: List[Any]) -> Any:
+    numbers = evaluator.collect_numbers(args)
+    if not numbers.size:
+        return NA
+    unique, first_index, counts = np.unique(numbers, return_index=True, return_counts=True)
+    if counts.max() < 2:
+        return NA
+    # 최빈값이 여러 개면 범위에서 먼저 나온 값을 반환 (엑셀과 동일)
+    candidates = np.flatnonzero(counts == counts.max())
+    return float(unique[candidates[np.argmin(first_index[candidates])]])
+
+
+@_function("STDEV", "STDEV.S")
+def _fn_stdev_sample(evaluator: FormulaEvaluator, args: List[Any]) -> Any:
+    numbers = evaluator.collect_numbers(args)
+    return float(np.std(numbers, ddof=1)) if numbers.size >= 2 else DIV0
+
+
+@_function("STDEV.P", "STDEVP")
+def _fn_stdev_population(evaluator: FormulaEvaluator, args: List[Any]) -> Any:
+    numbers = evaluator.collect_numbers(args)
+    return float(np.std(numbers)) if numbers.size else DIV0
+
+
+@_function("RANK", "RANK.EQ")
+def _fn_rank(evaluator: FormulaEvaluator, args: List[Any]) -> Any:
+    number = _to_number(evaluator._scalar(args[0]))
+    numbers = evaluator.as_data(args[1]).numeric_values()
+    ascending = len(args) > 2 and args[2] is not None and _to_number(evaluator._scalar(args[2])) != 0
+    if not np.any(numbers == number):
+        return NA
+    better = numbers < number if ascending else numbers > number
+    return int(np.count_nonzero(better)) + 1
+
+
+# ──────────────────────────────
+# 조건부 집계 함수
+# ──────────────────────────────
+def _conditional_numbers(evaluator: FormulaEvaluator, args: List[Any]) -> np.ndarray:
+    """SUMIF/AVERAGEIF: 조건을 만족하는 위치의 합계 대상 숫자 배열"""
+    criteria_range = args[0]
+    criteria_data = evaluator.as_data(criteria_range)
+    mask = _criteria_mask(criteria_data, evaluator._scalar(args[1]))
+
+    target = args[2] if len(args) > 2 and args[2] is not None else criteria_range
+    if isinstance(target, RangeValue):
+        target = target.resized(*criteria_data.values.shape)
+    target_data = evaluator.as_data(target)
+    if target_data.values.shape != mask.shape:
+        raise _ErrorSignal(VALUE)
+
+    selected = target_data.numbers[mask]
+    if target_data.error is not None and np.any(np.equal(target_data.values[mask], target_data.error)):
+        raise _ErrorSignal(target_data.error)
+    return selected[~np.isnan(selected)]
+
+
+@_function("COUNTIF")
+def _fn_countif(evaluator: FormulaEvaluator, args: List[Any]) -> int:
+    return int(np.count_nonzero(_criteria_mask(evaluator.as_data(args[0]), evaluator._scalar(args[1]))))
+
+
+@_function("SUMIF")
+def _fn_sumif(evaluator: FormulaEvaluator, args: List[Any]) -> float:
+    return float(_conditional_numbers(evaluator, args).sum())
+
+
+@_function("AVERAGEIF")
+def _fn_averageif(evaluator: FormulaEvaluator, args: List[Any]) -> Any:
+    numbers = _conditional_numbers(evaluator, args)
+    return float(numbers.mean()) if numbers.size else DIV0
+
+
+# ──────────────────────────────
+# 논리 함수
+# ──────────────────────────────
+@_lazy_function("IF")
+def _fn_if(evaluator: FormulaEvaluator, nodes: List[tuple], worksheet: Worksheet) -> Any:
+    condition = _to_bool(evaluator._scalar(evaluator._evaluate(nodes[0], worksheet)))
+    branch = 1 if condition else 2
+    if branch >= len(nodes):
+        return condition
+    value = evaluator._evaluate(nodes[branch], worksheet)
+    return 0.0 if nodes[branch] == ("blank",) else value
+
+
+@_lazy_function("IFS")
+def _fn_ifs(evaluator: FormulaEvaluator, nodes: List[tuple], worksheet: Worksheet) -> Any:
+    if len(nodes) % 2:
+        raise FormulaEvaluationError("IFS 인자는 조건/값 쌍이어야 합니다.")
+    for index in range(0, len(nodes), 2):
+        if _to_bool(evaluator._scalar(evaluator._evaluate(nodes[index], worksheet))):
+            return evaluator._evaluate(nodes[index + 1], worksheet)
+    return NA
+
+
+def _error_fallback(evaluator: FormulaEvaluator, nodes: List[tuple], worksheet: Worksheet, only_na: bool) -> Any:
+    """IFERROR / IFNA 공통 구현: 첫 인자가 오류면 두 번째 인자를 계산합니다."""
+    try:
+        value = evaluator._scalar(evaluator._evaluate(nodes[0], worksheet))
+    except _ErrorSignal as signal:
+        value = signal.error
+    if isinstance(value, ExcelError) and (not only_na or value == NA):
+        return evaluator._evaluate(nodes[1], worksheet) if len(nodes) > 1 else 0.0
+    return value
+
+
+@_lazy_function("IFERROR")
+def _fn_iferror(evaluator: FormulaEvaluator, nodes: List[tuple], worksheet: Worksheet) -> Any:
+    return _error_fallback(evaluator, nodes, worksheet, only_na=False)
+
+
+@_lazy_function("IFNA")
+def _fn_ifna(evaluator: FormulaEvaluator, nodes: List[tuple], worksheet: Worksheet) -> Any:
+    return _error_fallback(evaluator, nodes, worksheet, only_na=True)
+
+
+def _logical_values(evaluator: FormulaEvaluator, args: List[Any]) -> List[bool]:
+    """AND/OR 인자를 논리값 목록으로 변환합니다. (범위 안의 문자열/빈 셀은 무시)"""
+    results = []
+    for arg in args:
+        if isinstance(arg, RangeValue):
+            data = evaluator.range_data(arg)
+            if data.error is not None:
+                raise _ErrorSignal(data.error)
+            for value in data.values.ravel():
+                if isinstance(value, (bool, int, float)):
+                    results.append(bool(value))
+        elif arg is not None:
+            results.append(_to_bool(arg))
+    if not results:
+        raise _ErrorSignal(VALUE)
+    return results
+
+
+@_function("AND")
+def _fn_and(evaluator: FormulaEvaluator, args: List[Any]) -> bool:
+    return all(_logical_values(evaluator, args))
+
+
+@_function("OR")
+def _fn_or(evaluator: FormulaEvaluator, args: List[Any]) -> bool:
+    return any(_logical_values(evaluator, args))
+
+
+@_function("NOT")
+def _fn_not(evaluator: FormulaEvaluator, args: List[Any]) -> bool:
+    return not _to_bool(evaluator._scalar(args[0]))
+
+
+# ──────────────────────────────
+# 조회 함수
+# ──────────────────────────────
+def _table_lookup(evaluator: FormulaEvaluator, args: List[Any], vertical: bool) -> Any:
+    """VLOOKUP / HLOOKUP 공통 구현"""
+    lookup = evaluator._scalar(args[0])
+    if not isinstance(args[1], RangeValue):
+        raise _ErrorSignal(VALUE if not isinstance(args[1], ExcelError) else args[1])
+    table = evaluator.range_data(args[1]).values
+    if not vertical:
+        table = table.T
+    index = _to_int(evaluator._scalar(args[2]))
+    approximate = len(args) < 4 or args[3] is None or _to_bool(evaluator._scalar(args[3]))
+
+    if index < 1:
+        return VALUE
+    if index > table.shape[1]:
+        return REF
+
+    key_data = _RangeData(table[:, :1])
+    if approximate:
+        position = _sorted_lookup_index(key_data, lookup, "<=")
+    else:
+        matches = np.flatnonzero(_lookup_mask(key_data, lookup))
+        position = int(matches[0]) if matches.size else None
+    if position is None:
+        return NA
+    return table[position, index - 1]
+
+
+@_function("VLOOKUP")
+def _fn_vlookup(evaluator: FormulaEvaluator, args: List[Any]) -> Any:
+    return _table_lookup(evaluator, args, vertical=True)
+
+
+@_function("HLOOKUP")
+def _fn_hlookup(evaluator: FormulaEvaluator, args: List[Any]) -> Any:
+    return _table_lookup(evaluator, args, vertical=False)
+
+
+@_function("MATCH")
+def _fn_match(evaluator: FormulaEvaluator, args: List[Any]) -> Any:
+    lookup = evaluator._scalar(args[0])
+    data = _vector_data(evaluator, args[1])
+    match_type = _to_int(evaluator._scalar(args[2])) if len(args) > 2 and args[2] is not None else 1
+
+    if match_type == 0:
+        matches = np.flatnonzero(_lookup_mask(data, lookup))
+        position = int(matches[0]) if matches.size else None
+    else:
+        position = _sorted_lookup_index(data, lookup, "<=" if match_type > 0 else ">=")
+    return NA if position is None else position + 1
+
+
+@_function("INDEX")
+def _fn_index(evaluator: FormulaEvaluator, args: List[Any]) -> Any:
+    values = evaluator.as_data(args[0]).values
+    row = _to_int(evaluator._scalar(args[1])) if len(args) > 1 and args[1] is not None else 0
+    col = _to_int(evaluator._scalar(args[2])) if len(args) > 2 and args[2] is not None else 0
+
+    # 한 행짜리 범위에 인자가 하나면 열 번호로 해석 (엑셀과 동일)
+    if values.shape[0] == 1 and len(args) == 2:
+        row, col = 1, row
+    if values.shape[1] == 1 and col == 0:
+        col = 1
+    if row == 0 and values.shape[0] == 1:
+        row = 1
+    if row < 1 or col < 1:
+        raise FormulaEvaluationError("INDEX의 행/열 전체 반환은 지원하지 않습니다.")
+    if row > values.shape[0] or col > values.shape[1]:
+        return REF
+    return values[row - 1, col - 1]
+
+
+@_function("XLOOKUP")
+def _fn_xlookup(evaluator: FormulaEvaluator, args: List[Any]) -> Any:
+    lookup = evaluator._scalar(args[0])
+    lookup_data = _vector_data(evaluator, args[1])
+    return_values = evaluator.as_data(args[2]).values
+    if_not_found = args[3] if len(args) > 3 else None
+    match_mode = _to_int(evaluator._scalar(args[4])) if len(args) > 4 and args[4] is not None else 0
+    search_mode = _to_int(evaluator._scalar(args[5])) if len(args) > 5 and args[5] is not None else 1
+    reverse = search_mode < 0
+
+    if match_mode in (-1, 1):
+        position = _nearest_index(lookup_data, lookup, "<=" if match_mode == -1 else ">=", reverse)
+    else:
+        matches = np.flatnonzero(_lookup_mask(lookup_data, lookup, wildcard=match_mode == 2))
+        position = (int(matches[-1]) if reverse else int(matches[0])) if matches.size else None
+
+    if position is None:
+        return evaluator._scalar(if_not_found) if if_not_found is not None else NA
+
+    vertical = lookup_data.values.shape[1] == 1
+    selected = return_values[position, :] if vertical else return_values[:, position]
+    if selected.size != 1:
+        raise FormulaEvaluationError("여러 셀을 반환하는 XLOOKUP은 지원하지 않습니다.")
+    return selected[0]
+
+
+# ──────────────────────────────
+# 텍스트 함수
+# ──────────────────────────────
+@_function("CONCATENATE")
+def _fn_concatenate(evaluator: FormulaEvaluator, args: List[Any]) -> str:
+    return "".join(_to_text(evaluator._scalar(arg)) for arg in args)
+
+
+@_function("CONCAT")
+def _fn_concat(evaluator: FormulaEvaluator, args: List[Any]) -> str:
+    parts = []
+    for arg in args:
+        if isinstance(arg, RangeValue):
+            parts.extend(_to_text(value) for value in evaluator.range_data(arg).values.ravel())
+        else:
+            parts.append(_to_text(arg))
+    return "".join(parts)
+
+
+@_function("LEFT")
+def _fn_left(evaluator: FormulaEvaluator, args: List[Any]) -> Any:
+    count = _to_int(evaluator._scalar(args[1])) if len(args) > 1 else 1
+    return VALUE if count < 0 else _to_text(evaluator._scalar(args[0]))[:count]
+
+
+@_function("RIGHT")
+def _fn_right(evaluator: FormulaEvaluator, args: List[Any]) -> Any:
+    count = _to_int(evaluator._scalar(args[1])) if len(args) > 1 else 1
+    if count < 0:
+        return VALUE
+    text = _to_text(evaluator._scalar(args[0]))
+    return text[len(text) - count:] if count else ""
+
+
+@_function("MID")
+def _fn_mid(evaluator: FormulaEvaluator, args: List[Any]) -> Any:
+    text = _to_text(evaluator._scalar(args[0]))
+    start = _to_int(evaluator._scalar(args[1]))
+    count = _to_int(evaluator._scalar(args[2]))
+    if start < 1 or count < 0:
+        return VALUE
+    return text[start - 1:start - 1 + count]
+
+
+@_function("LEN")
+def _fn_len(evaluator: FormulaEvaluator, args: List[Any]) -> int:
+    return len(_to_text(evaluator._scalar(args[0])))
+
+
+@_function("TRIM")
+def _fn_trim(evaluator: FormulaEvaluator, args: List[Any]) -> str:
+    return " ".join(part for part in _to_text(evaluator._scalar(args[0])).split(" ") if part)
+
+
+@_function("UPPER")
+def _fn_upper(evaluator: FormulaEvaluator, args: List[Any]) -> str:
+    return _to_text(evaluator._scalar(args[0])).upper()
+
+
+@_function("LOWER")
+def _fn_lower(evaluator: FormulaEvaluator, args: List[Any]) -> str:
+    return _to_text(evaluator._scalar(args[0])).lower()
+
+
+@_function("SUBSTITUTE")
+def _fn_substitute(evaluator: FormulaEvaluator, args: List[Any]) -> Any:
+    text, old, new = (_to_text(evaluator._scalar(arg)) for arg in args[:3])
+    if not old:
+        return text
+    if len(args) < 4 or args[3] is None:
+        return text.replace(old, new)
+
+    instance = _to_int(evaluator._scalar(args[3]))
+    if instance < 1:
+        return VALUE
+    position = -1
+    for _ in range(instance):
+        position = text.find(old, position + 1)
+        if position < 0:
+            return text
+    return text[:position] + new + text[position + len(old):]
+
+
+# ──────────────────────────────
+# 수학 / 정보 / 날짜 함수
+# ──────────────────────────────
+@_function("ROUND")
+def _fn_round(evaluator: FormulaEvaluator, args: List[Any]) -> float:
+    digits = _to_int(evaluator._scalar(args[1])) if len(args) > 1 else 0
+    return _round_half_away(_to_number(evaluator._scalar(args[0])), digits)
+
+
+@_function("ABS")
+def _fn_abs(evaluator: FormulaEvaluator, args: List[Any]) -> float:
+    return abs(_to_number(evaluator._scalar(args[0])))
+
+
+@_function("INT")
+def _fn_int(evaluator: FormulaEvaluator, args: List[Any]) -> float:
+    return float(math.floor(_to_number(evaluator._scalar(args[0]))))
+
+
+@_function("MOD")
+def _fn_mod(evaluator: FormulaEvaluator, args: List[Any]) -> Any:
+    number = _to_number(evaluator._scalar(args[0]))
+    divisor = _to_number(evaluator._scalar(args[1]))
+    return DIV0 if divisor == 0 else number - divisor * math.floor(number / divisor)
+
+
+@_function("ISBLANK")
+def _fn_isblank(evaluator: FormulaEvaluator, args: List[Any]) -> bool:
+    return isinstance(args[0], RangeValue) and evaluator._scalar(args[0]) is None
+
+
+@_function("ISNUMBER")
+def _fn_isnumber(evaluator: FormulaEvaluator, args: List[Any]) -> bool:
+    value = evaluator._scalar(args[0])
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+@_function("ISTEXT")
+def _fn_istext(evaluator: FormulaEvaluator, args: List[Any]) -> bool:
+    return isinstance(evaluator._scalar(args[0]), str)
+
+
+@_function("ISERROR")
+def _fn_iserror(evaluator: FormulaEvaluator, args: List[Any]) -> bool:
+    try:
+        return isinstance(evaluator._scalar(args[0]), ExcelError)
+    except _ErrorSignal:
+        return True
+
+
+@_function("TODAY")
+def _fn_today(evaluator: FormulaEvaluator, args: List[Any]) -> float:
+    return float(to_excel(datetime.date.today()))
+
+
+@_function("NOW")
+def _fn_now(evaluator: FormulaEvaluator, args: List[Any]) -> float:
+    return float(to_excel(datetime.datetime.now()))
+
+
+# ──────────────────────────────
+# 계산 결과 보관 / 저장
+# ──────────────────────────────
+# 워크시트 → {셀 주소: 계산 값}. 워크시트가 사라지면 함께 정리됩니다.
+_computed_values: "weakref.WeakKeyDictionary[Worksheet, Dict[str, Any]]" = weakref.WeakKeyDictionary()
+
+
+def recalculate_workbook(workbook: Workbook) -> Dict[str, Dict[str, Any]]:
+    """
+    워크북의 모든 수식을 다시 계산하고 결과를 보관합니다.
+
+    Args:
+        workbook: openpyxl 워크북
+
+    Returns:
+        {시트 이름: {셀 주소: 계산 값}}
+    """
+    evaluator = FormulaEvaluator(workbook)
+    results = {}
+    for worksheet in workbook.worksheets:
+        values = evaluator.evaluate_worksheet(worksheet)
+        _computed_values[worksheet] = values
+        results[worksheet.title] = values
+    return results
+
+
+def get_computed_values(worksheet: Worksheet) -> Dict[str, Any]:
+    """
+    워크시트의 수식 계산 결과를 반환합니다. 아직 계산하지 않았다면 워크북 전체를 계산합니다.
+
+    Args:
+        worksheet: openpyxl 워크시트
+
+    Returns:
+        {셀 주소: 계산 값}
+    """
+    values = _computed_values.get(worksheet)
+    if values is None:
+        recalculate_workbook(worksheet.parent)
+        values = _computed_values[worksheet]
+    return values
+
+
+def has_computed_values(worksheet: Worksheet) -> bool:
+    """워크시트의 수식 계산 결과가 보관되어 있는지 여부"""
+    return worksheet in _computed_values
+
+
+def update_computed_values(worksheet: Worksheet, values: Dict[str, Any], removed: Iterable[str] = ()) -> None:
+    """
+    워크시트의 수식 계산 결과 일부를 갱신합니다. (증분 재계산 결과 반영)
+
+    Args:
+        worksheet: openpyxl 워크시트
+        values: 새로 계산된 {셀 주소: 계산 값}
+        removed: 더 이상 계산 결과가 없는 셀 주소 (수식이 지워졌거나 계산할 수 없게 된 셀)
+    """
+    stored = _computed_values.setdefault(worksheet, {})
+    for coordinate in removed:
+        stored.pop(coordinate, None)
+    stored.update(values)
+
+
+def format_computed_value(value: Any) -> str:
+    """계산 값을 컨텍스트 표시용 문자열로 변환합니다."""
+    if isinstance(value, float):
+        return f"{value:.10g}"
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    return str(value)
+
+
+def _cached_value_xml(value: Any) -> Tuple[Optional[str], str]:
+    """계산 값을 <c>의 t 속성과 <v> 텍스트로 변환합니다."""
+    if isinstance(value, ExcelError):
+        return "e", value.code
+    if isinstance(value, bool):
+        return "b", "1" if value else "0"
+    if isinstance(value, (int, float)):
+        return None, safe_string(value)
+    return "str", str(value)
+
+
+# openpyxl 3.1 셀 writer 시그니처 (openpyxl.worksheet._writer.write_cell). 다르면 캐시 값 기록을 건너뜀
+_WRITE_CELL_PARAMETERS = ("xf", "worksheet", "cell", "styled")
+_original_write_cell = worksheet_writer.write_cell
+_writer_supported = tuple(inspect.signature(_original_write_cell).parameters) == _WRITE_CELL_PARAMETERS
+_writer_state = threading.local()
+_writer_lock = threading.Lock()
+_writer_users = 0
+
+if not _writer_supported:
+    print("[수식 계산] openpyxl 셀 writer 시그니처가 달라 저장 시 수식 캐시 값을 기록하지 않습니다")
+
+
+@contextmanager
+def cached_value_writer() -> Iterator[None]:
+    """
+    블록 안에서 현재 스레드가 저장하는 워크북의 수식 셀에 계산 값(<v>)을 함께 기록합니다.
+    openpyxl 셀 writer는 블록을 쓰는 스레드가 있는 동안만 교체되고, 교체된 동안에도
+    블록 밖의 저장(다른 스레드 포함)은 원래 writer로 기록됩니다.
+    """
+    global _writer_users
+    if not _writer_supported:
+        yield
+        return
+
+    with _writer_lock:
+        if _writer_users == 0:
+            worksheet_writer.write_cell = _write_cell_with_cached_value
+        _writer_users += 1
+    _writer_state.depth = getattr(_writer_state, "depth", 0) + 1
+    try:
+        yield
+    finally:
+        _writer_state.depth -= 1
+        with _writer_lock:
+            _writer_users -= 1
+            if _writer_users == 0:
+                worksheet_writer.write_cell = _original_write_cell
+
+
+def _write_cell_with_cached_value(xf, worksheet, cell, styled=None):
+    """
+    openpyxl 셀 writer 래퍼 (cached_value_writer 블록 안에서만 설치됨)
+    계산 결과가 있는 수식 셀은 <f>와 함께 캐시 값 <v>를 기록하고, 나머지 셀은 원래 writer에 맡깁니다.
+    """
+    if not getattr(_writer_state, "depth", 0):
+        return _original_write_cell(xf, worksheet, cell, styled)
+    values = _computed_values.get(worksheet)
+    if not values or cell.data_type != "f" or cell.coordinate not in values or not isinstance(cell._value, str):
+        return _original_write_cell(xf, worksheet, cell, styled)
+
+    formula, attributes = _set_attributes(cell, styled)
+    value_type, text = _cached_value_xml(values[cell.coordinate])
+    if value_type is not None:
+        attributes["t"] = value_type
+
+    if LXML:
+        with xf.element("c", attributes):
+            with xf.element("f"):
+                xf.write(formula[1:])
+            with xf.element("v"):
+                xf.write(text)
+        return
+
+    element = Element("c", attributes)
+    SubElement(element, "f").text = formula[1:]
+    SubElement(element, "v").text = text
+    xf.write(element)
@@ -0,0 +1,309 @@
+# app/services/job_service.py
+"""
+채팅 메시지 job 서비스
+job 모드 메시지 전송은 job ID를 바로 반환하고, 메시지 처리 파이프라인(save_message_and_response_async)을
+프로세스 내 작업 큐의 워커에서 실행합니다. 클라이언트는 폴링(GET /chat/jobs/{jobId}) 또는
+WebSocket(/chat/jobs/{jobId}/ws)으로 상태와 결과를 받습니다.
+
+HTTP 요청이 LLM 호출과 엑셀 처리 동안 열려 있지 않으므로 프록시 타임아웃과 커넥션 적체를 피할 수 있습니다.
+작업 큐는 프로세스 메모리에 있으므로 서버가 재시작되면 대기/실행 중인 job은 사라집니다.
+"""
+import asyncio
+import contextvars
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from fastapi import HTTPException
+
+from app.database import close_session, new_pipeline_session, rollback_session
+from app.schemas.chat_schema import ChatJobResponse, LLMMessageResponse
+from app.utils.timezone import KST
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+
+# 메시지 처리 워커 수 (동시에 실행할 job 수)
+CHAT_JOB_WORKERS = int(os.getenv("CHAT_JOB_WORKERS", "4"))
+# 완료된 job을 조회용으로 보관할 최대 개수 (넘으면 오래된 완료 job부터 제거)
+CHAT_JOB_RETENTION = int(os.getenv("CHAT_JOB_RETENTION", "1000"))
+
+
+class ChatJob:
+    """job 하나의 상태, 단계별 소요 시간, 결과"""
+
+    def __init__(
+            self,
+            session_id: int,
+            message: str,
+            sheet_data: Optional[bytes],
+            response_mode: str,
+            sheet_version: Optional[int] = None
+    ):
+        self.id = uuid.uuid4().hex
+        self.session_id = session_id
+        self.message = message
+        self.sheet_data = sheet_data
+        self.response_mode = response_mode
+        self.sheet_version = sheet_version
+
+        self.status = JOB_QUEUED
+        self.stage: Optional[str] = None
+        self.created_at = datetime.now(KST)
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.stage_latencies: Dict[str, float] = {}  # 단계 이름 → ms
+        self.result: Optional[LLMMessageResponse] = None
+        self.error: Optional[str] = None
+
+        self._stage_started = time.perf_counter()
+        self._watchers: List[asyncio.Queue] = []
+
+    @property
+    def done(self) -> bool:
+        return self.status in (JOB_SUCCEEDED, JOB_FAILED)
+
+    def enter_stage(self, stage: Optional[str]) -> None:
+        """이전 단계의 소요 시간을 기록하고 다음 단계로 넘어갑니다. (None이면 마지막 단계 종료)"""
+        now = time.perf_counter()
+        if self.stage is not None:
+            self.stage_latencies[self.stage] = round((now - self._stage_started) * 1000, 2)
+        self.stage = stage
+        self._stage_started = now
+
+    def snapshot(self) -> ChatJobResponse:
+        """현재 상태를 응답 스키마로 반환합니다."""
+        return ChatJobResponse(
+            jobId=self.id,
+            sessionId=self.session_id,
+            status=self.status,
+            stage=self.stage,
+            createdAt=self.created_at,
+            startedAt=self.started_at,
+            finishedAt=self.finished_at,
+            stageLatencies=dict(self.stage_latencies),
+            result=self.result,
+            error=self.error
+        )
+
+
+class ChatJobManager:
+    """
+    job 작업 큐와 워커
+    이벤트 루프 안에서 asyncio 작업으로 워커를 실행하며, 파이프라인의 DB 접근과 엑셀 처리는
+    파이프라인 내부에서 스레드/워커 풀로 넘어가므로 이벤트 루프를 막지 않습니다.
+    """
+
+    def __init__(
+            self,
+            workers: int = 4,
+            retention: int = 1000,
+            session_factory: Optional[Callable[[], Any]] = None,
+            pipeline: Optional[Callable[..., Awaitable[LLMMessageResponse]]] = None
+    ):
+        """
+        Args:
+            workers: 동시에 실행할 job 수
+            retention: 보관할 최대 job 수
+            session_factory: (선택) job용 DB 세션 생성 함수 (기본 app.database.new_pipeline_session)
+            pipeline: (선택) 메시지 처리 함수 (기본 chat_service.save_message_and_response_async)
+        """
+        self.workers = workers
+        self.retention = retention
+        self._session_factory = session_factory
+        self._pipeline = pipeline
+        self._jobs: "OrderedDict[str, ChatJob]" = OrderedDict()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._lock = threading.Lock()
+
+        self.submitted = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.running = 0
+        # 단계 이름 → [횟수, 합계 ms, 최대 ms]
+        self._stage_totals: Dict[str, List[float]] = {}
+
+    def _ensure_started(self) -> asyncio.Queue:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            # 워커는 처음 job을 넣은 요청보다 오래 살므로 그 요청의 컨텍스트(DB 세션 범위 등)를 물려받지 않게 함
+            self._tasks = [
+                contextvars.Context().run(loop.create_task, self._worker()) for _ in range(self.workers)
+            ]
+        return self._queue
+
+    def submit(
+            self,
+            session_id: int,
+            message: str,
+            sheet_data: Optional[bytes],
+            response_mode: str = "full",
+            sheet_version: Optional[int] = None
+    ) -> ChatJob:
+        """
+        메시지 처리를 작업 큐에 넣고 job을 반환합니다. (이벤트 루프 안에서 호출)
+
+        Args:
+            session_id: 채팅 세션 ID
+            message: 사용자 메시지
+            sheet_data: 업로드된 엑셀 데이터 (None이면 세션에 저장된 시트 사용)
+            response_mode: "full" 또는 "delta"
+            sheet_version: (선택) 업로드한 시트가 기준으로 한 세션 시트 버전
+
+        Returns:
+            대기 상태의 ChatJob
+        """
+        queue = self._ensure_started()
+        job = ChatJob(session_id, message, sheet_data, response_mode, sheet_version)
+        job.enter_stage("queue")
+        with self._lock:
+            self._jobs[job.id] = job
+            self.submitted += 1
+        queue.put_nowait(job)
+        print(f"[job] {job.id} session={session_id} 접수 queue_depth={queue.qsize()}")
+        return job
+
+    def get(self, job_id: str) -> Optional[ChatJob]:
+        """job ID로 job을 조회합니다. (없거나 보관 기간이 지났으면 None)"""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def watch(self, job: ChatJob) -> AsyncIterator[ChatJobResponse]:
+        """
+        job의 현재 상태를 먼저 내보내고, 이후 상태가 바뀔 때마다 내보냅니다. (완료 상태를 내보낸 뒤 종료)
+
+        Args:
+            job: 구독할 job
+
+        Yields:
+            ChatJobResponse
+        """
+        watcher: asyncio.Queue = asyncio.Queue()
+        job._watchers.append(watcher)
+        try:
+            snapshot = job.snapshot()
+            yield snapshot
+            while snapshot.status not in (JOB_SUCCEEDED, JOB_FAILED):
+                snapshot = await watcher.get()
+                yield snapshot
+        finally:
+            job._watchers.remove(watcher)
+
+    def _publish(self, job: ChatJob) -> None:
+        snapshot = job.snapshot()
+        for watcher in list(job._watchers):
+            watcher.put_nowait(snapshot)
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._run(job)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: ChatJob) -> None:
+        pipeline = self._get_pipeline()
+        job.status = JOB_RUNNING
+        job.started_at = datetime.now(KST)
+        with self._lock:
+            self.running += 1
+        self._publish(job)
+
+        def on_stage(stage: str) -> None:
+            job.enter_stage(stage)
+            self._publish(job)
+
+        db = self._get_session_factory()()
+        try:
+            job.result = await pipeline(
+                job.session_id, job.message, job.sheet_data, db,
+                response_mode=job.response_mode, on_stage=on_stage, sheet_version=job.sheet_version
+            )
+            job.status = JOB_SUCCEEDED
+        except Exception as e:
+            print(f"[job] {job.id} session={job.session_id} 처리 중 오류 발생: {str(e)}")
+            await rollback_session(db)
+            job.error = e.detail if isinstance(e, HTTPException) else "메시지를 처리하는 중 오류가 발생했습니다."
+            job.status = JOB_FAILED
+        finally:
+            await close_session(db)
+
+        job.enter_stage(None)
+        job.finished_at = datetime.now(KST)
+        job.sheet_data = None  # 업로드 데이터는 더 필요 없으므로 보관하지 않음
+        job.stage_latencies["total"] = round((job.finished_at - job.created_at).total_seconds() * 1000, 2)
+        self._finish(job)
+        self._publish(job)
+
+    def _finish(self, job: ChatJob) -> None:
+        with self._lock:
+            self.running -= 1
+            if job.status == JOB_SUCCEEDED:
+                self.succeeded += 1
+            else:
+                self.failed += 1
+            for stage, latency in job.stage_latencies.items():
+                totals = self._stage_totals.setdefault(stage, [0, 0.0, 0.0])
+                totals[0] += 1
+                totals[1] += latency
+                totals[2] = max(totals[2], latency)
+            # 보관 한도를 넘으면 오래된 완료 job부터 제거 (대기/실행 중인 job은 건너뜀)
+            overflow = len(self._jobs) - self.retention
+            if overflow > 0:
+                expired = [job_id for job_id, kept in self._jobs.items() if kept.done][:overflow]
+                for job_id in expired:
+                    del self._jobs[job_id]
+
+    def _get_pipeline(self) -> Callable[..., Awaitable[LLMMessageResponse]]:
+        if self._pipeline is None:
+            from app.services.chat_service import save_message_and_response_async
+            self._pipeline = save_message_and_response_async
+        return self._pipeline
+
+    def _get_session_factory(self) -> Callable[[], Any]:
+        return self._session_factory or new_pipeline_session
+
+    async def shutdown(self) -> None:
+        """워커 작업을 정리합니다. (대기 중인 job은 처리하지 않음)"""
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._loop = None
+        self._queue = None
+
+    def stats(self) -> Dict[str, Any]:
+        """대기 작업 수(queue depth), 처리 수, 단계별 평균/최대 소요 시간(ms)을 반환합니다."""
+        with self._lock:
+            stages = {
+                stage: {"count": int(count), "avg_ms": round(total / count, 2), "max_ms": round(maximum, 2)}
+                for stage, (count, total, maximum) in self._stage_totals.items()
+            }
+            return {
+                "workers": self.workers,
+                "queue_depth": self.queue_depth,
+                "running": self.running,
+                "submitted": self.submitted,
+                "succeeded": self.succeeded,
+                "failed": self.failed,
+                "retained": len(self._jobs),
+                "stages": stages,
+            }
+
+
+chat_job_manager = ChatJobManager(workers=CHAT_JOB_WORKERS, retention=CHAT_JOB_RETENTION)
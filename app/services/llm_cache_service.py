@@ -0,0 +1,312 @@
+# app/services/llm_cache_service.py
+"""
+LLM 응답 캐시 서비스
+같은 시트 상태에서 같은 명령을 다시 보낼 때(재시도 등) GPT를 다시 호출하지 않도록
+GPT 응답 원문(JSON)을 보관합니다.
+
+- 키: 프롬프트 버전 + 시스템 프롬프트/응답 스키마 지문 + 모델 + 세션 요약 + 사용자 명령 + 시트 내용 해시의 SHA-256
+- 항목마다 TTL이 있으며, 최대 항목 수를 넘으면 가장 오래 사용되지 않은 항목부터 제거합니다. (LRU)
+- 저장소는 교체할 수 있습니다: 프로세스 메모리(memory) 또는 로컬 디스크(disk)
+- 캐시를 사용하는 호출은 같은 입력에 같은 출력을 내도록 temperature 0으로 요청합니다.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from app.services.llm_prompt_service import PROMPT_VERSION, SYSTEM_PROMPT, RESPONSE_SCHEMA
+
+# 프롬프트 본문이 바뀌면 PROMPT_VERSION을 올리지 않아도 이전 캐시가 적중하지 않도록 지문을 키에 포함
+_PROMPT_FINGERPRINT = hashlib.sha256(
+    (SYSTEM_PROMPT + json.dumps(RESPONSE_SCHEMA, sort_keys=True, ensure_ascii=False)).encode("utf-8")
+).hexdigest()
+
+
+class LLMCacheBackend(ABC):
+    """
+    LLM 응답 캐시 저장소 인터페이스
+    값은 (저장 시각 기준) 만료 시각과 함께 보관하며, 만료 판정은 LLMResponseCache가 합니다.
+    메서드를 모두 구현하지 않은 저장소는 생성할 때 TypeError가 발생합니다.
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Tuple[float, str]]:
+        """키에 해당하는 (만료 시각, 응답) 을 반환합니다. 사용한 항목은 최근 사용으로 표시합니다."""
+
+    @abstractmethod
+    def set(self, key: str, expires_at: float, value: str) -> int:
+        """항목을 저장하고, 용량 초과로 제거한 항목 수를 반환합니다."""
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """항목을 제거합니다. (없으면 무시)"""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """모든 항목을 제거합니다."""
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """저장된 항목 수를 반환합니다."""
+
+
+class MemoryCacheBackend(LLMCacheBackend):
+    """프로세스 메모리 LRU 저장소"""
+
+    def __init__(self, max_entries: int = 256):
+        """
+        Args:
+            max_entries: 최대 항목 수
+        """
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Tuple[float, str]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, expires_at: float, value: str) -> int:
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            evicted = 0
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                evicted += 1
+            return evicted
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class DiskCacheBackend(LLMCacheBackend):
+    """
+    로컬 디스크 저장소
+    키마다 JSON 파일 하나를 두고, 파일 수정 시각을 최근 사용 시각으로 써서 LRU 순서를 정합니다.
+    서버를 재시작해도 캐시가 유지됩니다.
+    """
+
+    def __init__(self, directory: str, max_entries: int = 1024):
+        """
+        Args:
+            directory: 캐시 파일을 저장할 디렉터리 (없으면 생성)
+            max_entries: 최대 항목 수
+        """
+        self.directory = directory
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key: str) -> Optional[Tuple[float, str]]:
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+            os.utime(path)  # 최근 사용으로 표시
+        except (OSError, ValueError):
+            return None
+        return entry["expires_at"], entry["value"]
+
+    def set(self, key: str, expires_at: float, value: str) -> int:
+        path = self._path(key)
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        with self._lock:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump({"expires_at": expires_at, "value": value}, f, ensure_ascii=False)
+            os.replace(temp_path, path)
+            return self._evict()
+
+    def _evict(self) -> int:
+        files = self._files()
+        overflow = len(files) - self.max_entries
+        if overflow <= 0:
+            return 0
+        files.sort(key=lambda path: os.path.getmtime(path))
+        for path in files[:overflow]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        return overflow
+
+    def _files(self):
+        return [
+            os.path.join(self.directory, name)
+            for name in os.listdir(self.directory)
+            if name.endswith(".json")
+        ]
+
+    def delete(self, key: str) -> None:
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def clear(self) -> None:
+        with self._lock:
+            for path in self._files():
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def __len__(self) -> int:
+        return len(self._files())
+
+
+class LLMResponseCache:
+    """
+    TTL + LRU 기반 LLM 응답 캐시
+
+    사용 예:
+        key = llm_response_cache.make_key(model, summary, command, sheet_hash)
+        response = llm_response_cache.get(key)
+        if response is None:
+            response = call_gpt(...)
+            llm_response_cache.set(key, response)
+    """
+
+    def __init__(self, backend: LLMCacheBackend, ttl: float = 3600):
+        """
+        Args:
+            backend: 저장소 (MemoryCacheBackend 또는 DiskCacheBackend)
+            ttl: 항목 유효 시간 (초)
+        """
+        self.backend = backend
+        self.ttl = ttl
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(model: str, session_summary: Optional[str], user_command: str, sheet_hash: str) -> str:
+        """
+        캐시 키를 만듭니다.
+
+        Args:
+            model: 호출할 모델 이름
+            session_summary: 이전 대화 요약
+            user_command: 사용자 명령
+            sheet_hash: 시트 내용 해시
+
+        Returns:
+            SHA-256 16진수 문자열
+        """
+        payload = json.dumps(
+            [PROMPT_VERSION, _PROMPT_FINGERPRINT, model, session_summary or "", user_command, sheet_hash],
+            ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        캐시된 응답을 조회합니다. 만료된 항목은 제거하고 None을 반환합니다.
+
+        Args:
+            key: make_key로 만든 키
+
+        Returns:
+            GPT 응답 원문 또는 None
+        """
+        entry = self.backend.get(key)
+        if entry is not None and entry[0] <= time.time():
+            self.backend.delete(key)
+            with self._lock:
+                self.expirations += 1
+            entry = None
+
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return entry[1]
+
+    def set(self, key: str, response: str) -> None:
+        """
+        응답을 캐시에 저장합니다.
+
+        Args:
+            key: make_key로 만든 키
+            response: GPT 응답 원문 (검증을 통과한 응답만 저장)
+        """
+        evicted = self.backend.set(key, time.time() + self.ttl, response)
+        if evicted:
+            with self._lock:
+                self.evictions += evicted
+
+    def clear(self) -> None:
+        """모든 캐시 항목을 제거합니다."""
+        self.backend.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        캐시 적중/실패 등 지표를 반환합니다.
+
+        Returns:
+            지표 딕셔너리
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "backend": type(self.backend).__name__,
+                "entries": len(self.backend),
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "expirations": self.expirations,
+                "evictions": self.evictions,
+            }
+
+
+def create_llm_response_cache() -> Optional[LLMResponseCache]:
+    """
+    환경변수 설정으로 LLM 응답 캐시를 생성합니다.
+
+    - LLM_CACHE_BACKEND: memory(기본) | disk | none
+    - LLM_CACHE_TTL: 항목 유효 시간(초, 기본 3600)
+    - LLM_CACHE_MAX_ENTRIES: 최대 항목 수 (기본 256)
+    - LLM_CACHE_DIR: disk 저장소 디렉터리 (기본 .cache/llm)
+
+    Returns:
+        LLMResponseCache 또는 None (비활성)
+    """
+    backend_name = os.getenv("LLM_CACHE_BACKEND", "memory").lower()
+    max_entries = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "256"))
+    ttl = float(os.getenv("LLM_CACHE_TTL", "3600"))
+
+    if backend_name == "none" or max_entries <= 0 or ttl <= 0:
+        return None
+    if backend_name == "disk":
+        backend = DiskCacheBackend(os.getenv("LLM_CACHE_DIR", ".cache/llm"), max_entries=max_entries)
+    elif backend_name == "memory":
+        backend = MemoryCacheBackend(max_entries=max_entries)
+    else:
+        raise ValueError(f"지원하지 않는 LLM_CACHE_BACKEND입니다: {backend_name}")
+    return LLMResponseCache(backend, ttl=ttl)
+
+
+llm_response_cache = create_llm_response_cache()
@@ -0,0 +1,284 @@
+# app/services/llm_client_service.py
+"""
+LLM 클라이언트 관리 서비스
+프로세스 전체에서 공유하는 OpenAI 클라이언트와 HTTP 커넥션 풀을 관리합니다.
+
+- 앱 시작 시 한 번 생성하고(startup), 모든 요청이 같은 커넥션 풀(keep-alive)을 재사용하며, 종료 시 닫습니다(shutdown).
+- 동기 클라이언트(OpenAI)와 비동기 클라이언트(AsyncOpenAI)를 같은 설정으로 함께 생성합니다.
+- 풀 크기, keep-alive 유지 시간, 연결/요청 타임아웃, 재시도 횟수는 환경변수로 설정합니다.
+- 요청 수 대비 새로 연 TCP 연결 수를 기록하여 커넥션 재사용률을 확인할 수 있습니다.
+- 응답의 usage 블록에서 프롬프트 토큰 중 프롬프트 캐시로 처리된 토큰(cached_tokens) 수를 요청별로 기록합니다.
+"""
+import os
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+import httpx
+from openai import AsyncOpenAI, OpenAI
+
+
+class LLMClientConfig:
+    """OpenAI HTTP 클라이언트 설정 (환경변수 기반)"""
+
+    def __init__(self):
+        self.max_connections = int(os.getenv("LLM_HTTP_MAX_CONNECTIONS", "20"))
+        self.max_keepalive_connections = int(os.getenv("LLM_HTTP_MAX_KEEPALIVE", "10"))
+        self.keepalive_expiry = float(os.getenv("LLM_HTTP_KEEPALIVE_EXPIRY", "60"))
+        self.connect_timeout = float(os.getenv("LLM_HTTP_CONNECT_TIMEOUT", "5"))
+        self.request_timeout = float(os.getenv("LLM_REQUEST_TIMEOUT", "60"))
+        self.max_retries = int(os.getenv("LLM_MAX_RETRIES", "2"))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(self.__dict__)
+
+
+class ConnectionMetrics:
+    """
+    HTTP 요청/연결 지표
+    httpcore trace 이벤트로 새 TCP 연결 생성을 감지하므로, 요청 수 - 새 연결 수 = 재사용된 연결 수입니다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.connections_opened = 0
+        self.tls_handshakes = 0
+
+    def on_request(self, request: httpx.Request) -> None:
+        """httpx request 이벤트 훅: 요청 수를 세고 연결 trace 콜백을 붙입니다."""
+        with self._lock:
+            self.requests += 1
+        request.extensions["trace"] = self.trace
+
+    async def on_request_async(self, request: httpx.Request) -> None:
+        """httpx.AsyncClient용 request 이벤트 훅 (비동기 trace 콜백을 붙입니다)"""
+        with self._lock:
+            self.requests += 1
+        request.extensions["trace"] = self.trace_async
+
+    def trace(self, event_name: str, info: Dict[str, Any]) -> None:
+        """httpcore trace 콜백"""
+        if event_name == "connection.connect_tcp.complete":
+            with self._lock:
+                self.connections_opened += 1
+        elif event_name == "connection.start_tls.complete":
+            with self._lock:
+                self.tls_handshakes += 1
+
+    async def trace_async(self, event_name: str, info: Dict[str, Any]) -> None:
+        """비동기 httpcore trace 콜백"""
+        self.trace(event_name, info)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            reused = max(self.requests - self.connections_opened, 0)
+            return {
+                "requests": self.requests,
+                "connections_opened": self.connections_opened,
+                "tls_handshakes": self.tls_handshakes,
+                "connections_reused": reused,
+                "reuse_rate": reused / self.requests if self.requests else 0.0,
+            }
+
+
+class UsageMetrics:
+    """
+    LLM 토큰 사용량 지표
+    OpenAI는 같은 프롬프트 앞부분(1024토큰 이상)을 캐시하여 usage.prompt_tokens_details.cached_tokens로 알려 줍니다.
+    요청별 기록은 최근 recent_size개만 보관합니다.
+    """
+
+    def __init__(self, recent_size: int = 50):
+        """
+        Args:
+            recent_size: 보관할 최근 요청 기록 수
+        """
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.prompt_tokens = 0
+        self.cached_tokens = 0
+        self.completion_tokens = 0
+        self.recent: Deque[Dict[str, Any]] = deque(maxlen=recent_size)
+
+    def record(self, usage: Any, model: str, purpose: str = "chat") -> Optional[Dict[str, Any]]:
+        """
+        응답의 usage 블록을 기록합니다.
+
+        Args:
+            usage: completion.usage (스트리밍은 마지막 청크의 usage)
+            model: 호출한 모델 이름
+            purpose: 호출 목적 (예: "chat", "summary")
+
+        Returns:
+            이번 요청의 기록 (usage가 없으면 None)
+        """
+        prompt_tokens = _token_count(getattr(usage, "prompt_tokens", None))
+        if usage is None or prompt_tokens is None:
+            return None
+        details = getattr(usage, "prompt_tokens_details", None)
+        cached_tokens = _token_count(getattr(details, "cached_tokens", None)) or 0
+        completion_tokens = _token_count(getattr(usage, "completion_tokens", None)) or 0
+
+        entry = {
+            "model": model,
+            "purpose": purpose,
+            "prompt_tokens": prompt_tokens,
+            "cached_tokens": cached_tokens,
+            "completion_tokens": completion_tokens,
+        }
+        with self._lock:
+            self.requests += 1
+            self.prompt_tokens += prompt_tokens
+            self.cached_tokens += cached_tokens
+            self.completion_tokens += completion_tokens
+            self.recent.append(entry)
+        print(f"[LLM] usage {purpose} prompt={prompt_tokens} cached={cached_tokens} completion={completion_tokens}")
+        return entry
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "prompt_tokens": self.prompt_tokens,
+                "cached_tokens": self.cached_tokens,
+                "completion_tokens": self.completion_tokens,
+                "cached_ratio": self.cached_tokens / self.prompt_tokens if self.prompt_tokens else 0.0,
+                "recent": list(self.recent),
+            }
+
+
+def _token_count(value: Any) -> Optional[int]:
+    """usage 필드 값을 정수로 반환합니다. (없거나 정수가 아니면 None)"""
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    return None
+
+
+class LLMClientManager:
+    """
+    프로세스 공유 OpenAI 클라이언트 관리자
+
+    사용 예:
+        llm_client_manager.startup()      # 앱 시작 시
+        client = llm_client_manager.client
+        await llm_client_manager.shutdown_async()  # 앱 종료 시
+    """
+
+    def __init__(self, config: Optional[LLMClientConfig] = None):
+        """
+        Args:
+            config: (선택) 클라이언트 설정. 생략하면 환경변수에서 읽습니다.
+        """
+        self.config = config or LLMClientConfig()
+        self.metrics = ConnectionMetrics()
+        self.usage = UsageMetrics()
+        self.http_client: Optional[httpx.Client] = None
+        self.async_http_client: Optional[httpx.AsyncClient] = None
+        self._client: Optional[OpenAI] = None
+        self._async_client: Optional[AsyncOpenAI] = None
+        self._lock = threading.Lock()
+
+    @property
+    def client(self) -> Optional[OpenAI]:
+        """공유 OpenAI 클라이언트 (startup 전이거나 shutdown 후에는 None)"""
+        return self._client
+
+    @property
+    def async_client(self) -> Optional[AsyncOpenAI]:
+        """공유 AsyncOpenAI 클라이언트 (startup 전이거나 shutdown 후에는 None)"""
+        return self._async_client
+
+    @property
+    def request_timeout(self) -> float:
+        """API 호출 1회당 타임아웃 (초)"""
+        return self.config.request_timeout
+
+    def startup(self) -> OpenAI:
+        """
+        공유 HTTP 커넥션 풀과 OpenAI 클라이언트를 생성합니다. 이미 생성되어 있으면 그대로 반환합니다.
+
+        Returns:
+            공유 OpenAI 클라이언트
+
+        Raises:
+            ValueError: OPENAI_API_KEY 환경변수가 없는 경우
+        """
+        with self._lock:
+            if self._client is not None:
+                return self._client
+
+            api_key = os.getenv("OPENAI_API_KEY")
+            if not api_key:
+                raise ValueError("OPENAI_API_KEY 환경변수가 설정되지 않았습니다.")
+
+            config = self.config
+            limits = httpx.Limits(
+                max_connections=config.max_connections,
+                max_keepalive_connections=config.max_keepalive_connections,
+                keepalive_expiry=config.keepalive_expiry,
+            )
+            timeout = httpx.Timeout(config.request_timeout, connect=config.connect_timeout)
+
+            self.http_client = httpx.Client(
+                limits=limits,
+                timeout=timeout,
+                event_hooks={"request": [self.metrics.on_request]},
+            )
+            self._client = OpenAI(
+                api_key=api_key,
+                http_client=self.http_client,
+                max_retries=config.max_retries,
+                timeout=config.request_timeout,
+            )
+            self.async_http_client = httpx.AsyncClient(
+                limits=limits,
+                timeout=timeout,
+                event_hooks={"request": [self.metrics.on_request_async]},
+            )
+            self._async_client = AsyncOpenAI(
+                api_key=api_key,
+                http_client=self.async_http_client,
+                max_retries=config.max_retries,
+                timeout=config.request_timeout,
+            )
+            print(f"[LLM] 공유 클라이언트 생성: {config.to_dict()}")
+            return self._client
+
+    def shutdown(self) -> None:
+        """공유 동기 클라이언트와 커넥션 풀을 닫습니다."""
+        with self._lock:
+            if self._client is not None:
+                self._client.close()
+            elif self.http_client is not None:
+                self.http_client.close()
+            self._client = None
+            self.http_client = None
+
+    async def shutdown_async(self) -> None:
+        """공유 비동기/동기 클라이언트와 커넥션 풀을 모두 닫습니다. (앱 종료 시 호출)"""
+        async_client, async_http_client = self._async_client, self.async_http_client
+        self._async_client = None
+        self.async_http_client = None
+        if async_client is not None:
+            await async_client.close()
+        elif async_http_client is not None:
+            await async_http_client.aclose()
+        self.shutdown()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        공유 클라이언트 상태와 커넥션 재사용 지표를 반환합니다.
+
+        Returns:
+            지표 딕셔너리
+        """
+        return {
+            "initialized": self._client is not None,
+            "config": self.config.to_dict(),
+            **self.metrics.stats(),
+            "usage": self.usage.stats(),
+        }
+
+
+llm_client_manager = LLMClientManager()
@@ -2,22 +2,23 @@
 """
 LLM 프롬프트 템플릿 정의
 이 파일은 LLM과의 상호작용에서 사용되는 모든 프롬프트를 관리합니다.
+명령어 목록과 상세 예시는 command_catalog_service의 카탈로그에서 만듭니다.
 """
+import copy
 
+from app.services.command_catalog_service import command_types, render_command_examples, render_command_overview
+from app.services.command_encoding_service import FILL_MARKER, LLM_COMMAND_ENCODING
 
-# 시스템 프롬프트 - GPT의 역할과 사용 가능한 명령어를 정의
-SYSTEM_PROMPT = """당신은 엑셀 파일 편집을 도와주는 AI 어시스턴트입니다.
+
+# 프롬프트 버전 - SYSTEM_PROMPT/RESPONSE_SCHEMA의 의미가 바뀌면 올려서 이전 LLM 응답 캐시를 무효화
+PROMPT_VERSION = "5"
+
+# 시스템 프롬프트 본문 (응답 형식 안내 앞부분)
+_SYSTEM_PROMPT_BODY = """당신은 엑셀 파일 편집을 도와주는 AI 어시스턴트입니다.
 사용자의 자연어 명령을 이해하고, 이를 구체적인 엑셀 명령어 시퀀스로 변환합니다.
 
 사용 가능한 명령어 타입 (command_type에 사용할 수 있는 값):
-- 기본 함수: sum(합계), average(평균), count(개수), max(최대값), min(최소값)
-- 데이터 조작: set_value(값 설정), clear(내용 지우기)
-- 논리 함수: if(조건), and(모든 조건 참), or(하나라도 참), iferror(오류 처리), ifna(#N/A 오류 처리), ifs(다중 조건)
-- 조건부 연산: countif(조건부 개수), sumif(조건부 합계), averageif(조건부 평균)
-- 검색 및 참조: vlookup, hlookup, index, match, xlookup(유연한 검색), filter(조건 필터링), unique(고유값 추출)
-- 통계 함수: median(중간값), mode(최빈값), stdev(표준편차), rank(순위)
-- 텍스트 함수: concatenate(텍스트 합치기), &(텍스트 합치기), left, right, mid(텍스트 자르기), len(길이), substitute(치환), trim(공백 제거), upper(대문자), lower(소문자)
-- 기타 함수: round(반올림), isblank(빈 셀 확인)
+""" + render_command_overview() + """
 
 명령어 작성 규칙:
 1. command_type은 위에 나열된 값 중 하나여야 합니다 (소문자로 작성)
@@ -27,7 +28,7 @@ SYSTEM_PROMPT = """당신은 엑셀 파일 편집을 도와주는 AI 어시스
 5. 모든 명령어는 `parameters` 필드를 반드시 포함해야 합니다.
    - 파라미터가 필요한 명령어는 실제 값들을 배열로 입력합니다.
    - 파라미터가 필요 없는 명령어는 빈 배열 []을 사용합니다.
-6. target_cell은 반드시 엑셀 셀 주소 형식이어야 하며, 하나의 셀만을 지정합니다.
+6. target_cell은 반드시 엑셀 셀 주소 형식이어야 하며, 하나의 셀만을 지정합니다. (범위 채우기 명령어 fill_value, fill_series, fill_formula만 범위를 지정)
 7. clear 명령어는 항상 최우선 순위로 
 8. round 명령어는 항상 최후순위로 두기.
 9. 새로운 표를 만들 때 표의 제목, 각 통계 항목명 표시
@@ -40,6 +41,11 @@ SYSTEM_PROMPT = """당신은 엑셀 파일 편집을 도와주는 AI 어시스
 16. 이전에 적용했던 명령어(예: round)는 삭제하지 마세요. 삭제는 오직 사용자가 "이전에 적용한 [명령어]들을 모두 제거해줘"라고 명시적으로 요청했을 때만 수행하세요.
 17. clear 명령은 항상 최우선 순위로 적용하고, round와 같은 출력 포맷 명령은 항상 마지막에 적용하세요.
 18. 사용자의 발화가 명확하지 않을 경우, 데이터를 수정하는 명령은 내리지 마세요. 대신 비어있는 셀에 clear 명령을 사용하세요.
+19. 여러 셀에 같은 값, 연속된 숫자/날짜, 행마다 같은 형태의 수식을 넣을 때는 셀마다 set_value를 나열하지 말고
+    범위 채우기 명령어 하나를 사용하세요.
+    - fill_value: 범위의 모든 셀에 같은 값 (parameters: [값])
+    - fill_series: 연속값 (parameters: [시작 값, 증가량(기본 1), 날짜 단위 day|week|month|year(기본 day)])
+    - fill_formula: 첫 셀 기준 수식을 범위 전체에 복사, 상대 참조는 셀마다 이동 (parameters: [수식])
 
 데이터를 직접적으로 다루지 않는 요청 예시:
  상태 선언: 앞으로 어떤 작업을 계속 적용하거나 적용하지 말라고 선언하는 발화	
@@ -51,271 +57,108 @@ SYSTEM_PROMPT = """당신은 엑셀 파일 편집을 도와주는 AI 어시스
 
 
 상세 함수 예시:
-- SUM 함수 예시: B2부터 B10까지의 모든 값을 더해서 B11에 합계 표시
-  {"command_type": "sum", "target_cell": "B11", "parameters": ["B2:B10"]}
-
-- AVERAGE 함수 예시: C2부터 C20까지 점수의 평균을 계산해서 C21에 표시 (빈 셀 제외하고 계산)
-  {"command_type": "average", "target_cell": "C21", "parameters": ["C2:C20"]}
-
-- COUNT 함수 예시: D2부터 D15까지 범위에서 숫자가 입력된 셀의 개수를 D16에 표시
-  {"command_type": "count", "target_cell": "D16", "parameters": ["D2:D15"]}
-
-- MAX 함수 예시: E2부터 E50까지 범위에서 가장 큰 값을 찾아서 E51에 최댓값 표시
-  {"command_type": "max", "target_cell": "E51", "parameters": ["E2:E50"]}
-
-- MIN 함수 예시: F2부터 F30까지 범위에서 가장 작은 값을 찾아서 F31에 최솟값 표시
-  {"command_type": "min", "target_cell": "F31", "parameters": ["F2:F30"]}
-
-- SET_VALUE 함수 예시: A1 셀에 "제품명"이라는 텍스트를 입력하여 헤더 설정
-  {"command_type": "set_value", "target_cell": "A1", "parameters": ["제품명"]}
-
-- CLEAR 함수 예시: B5부터 D10까지 범위의 모든 내용을 지워서 데이터 초기화
-  {"command_type": "clear", "target_cell": "B5:D10", "parameters": []}
-
-- MERGE 함수 예시: A1부터 C1까지 3개 셀을 병합해서 제목 영역으로 만들기
-  {"command_type": "merge", "target_cell": "A1:C1", "parameters": []}
-
-- UNMERGE 함수 예시: 이전에 병합된 A1:C1 범위를 다시 개별 셀로 분리하기
-  {"command_type": "unmerge", "target_cell": "A1:C1", "parameters": []}
-
-
-논리 함수 상세 예시
-# IF 함수 - 단순 조건 판정
-- 기본 합격/불합격: B2 점수가 60점 이상이면 "합격", 미만이면 "불합격"을 C2에 표시
-  {"command_type": "if", "target_cell": "C2", "parameters": ["B2>=60", "합격", "불합격"]}
-
-- 나이 기준 분류: D2 나이가 18세 이상이면 "성인", 미만이면 "미성년자"를 E2에 표시
-  {"command_type": "if", "target_cell": "E2", "parameters": ["D2>=18", "성인", "미성년자"]}
-
-- 재고 관리: F2 재고수량이 10개 미만이면 "주문필요", 이상이면 "충분"을 G2에 표시
-  {"command_type": "if", "target_cell": "G2", "parameters": ["F2<10", "주문필요", "충분"]}
-
-- 급여 계산: H2 근무시간이 40시간 초과면 초과수당 적용(시급*1.5), 아니면 기본시급을 I2에 계산
-  {"command_type": "if", "target_cell": "I2", "parameters": ["H2>40", "H2*15000*1.5", "H2*15000"]}
-
-# AND 함수 - 모든 조건이 참일 때
-- 장학금 대상자: J2 성적이 90점 이상이고 K2 출석률이 95% 이상일 때 TRUE를 L2에 표시
-  {"command_type": "and", "target_cell": "L2", "parameters": ["J2>=90", "K2>=95"]}
-
-- 할인 대상 상품: M2 가격이 10만원 이상이고 N2 카테고리가 "전자제품"일 때 TRUE를 O2에 표시
-  {"command_type": "and", "target_cell": "O2", "parameters": ["M2>=100000", "N2=\"전자제품\""]}
-
-- 대출 승인 조건: P2 연봉이 3000만원 이상이고 Q2 신용등급이 1~3등급일 때 TRUE를 R2에 표시
-  {"command_type": "and", "target_cell": "R2", "parameters": ["P2>=30000000", "Q2<=3", "Q2>=1"]}
-
-- 우수 사원: S2 근무년수가 3년 이상이고 T2 평가점수가 85점 이상이고 U2 지각횟수가 5회 미만일 때 TRUE를 V2에 표시
-  {"command_type": "and", "target_cell": "V2", "parameters": ["S2>=3", "T2>=85", "U2<5"]}
-
-# OR 함수 - 하나라도 참이면 됨
-- 특별 고객: W2가 "VIP"이거나 X2 구매금액이 100만원 이상일 때 TRUE를 Y2에 표시
-  {"command_type": "or", "target_cell": "Y2", "parameters": ["W2=\"VIP\"", "X2>=1000000"]}
-
-- 긴급 처리: Z2 우선순위가 "긴급"이거나 AA2 마감일이 오늘 이전일 때 TRUE를 AB2에 표시
-  {"command_type": "or", "target_cell": "AB2", "parameters": ["Z2=\"긴급\"", "AA2<TODAY()"]}
-
-- 휴일 근무: AC2가 "토요일"이거나 AD2가 "일요일"이거나 AE2가 "공휴일"일 때 TRUE를 AF2에 표시
-  {"command_type": "or", "target_cell": "AF2", "parameters": ["AC2=\"토요일\"", "AD2=\"일요일\"", "AE2=\"공휴일\""]}
-
-# IFERROR 함수 - 오류 처리
-- 나눗셈 오류 방지: AG2를 AH2로 나눈 결과를 AI2에 표시하되, 0으로 나누기 등 오류 시 "계산불가" 표시
-  {"command_type": "iferror", "target_cell": "AI2", "parameters": ["AG2/AH2", "계산불가"]}
-
-- VLOOKUP 오류 처리: AJ2 학번으로 학생정보를 찾되, 없는 학번이면 "미등록학생"을 AK2에 표시
-  {"command_type": "iferror", "target_cell": "AK2", "parameters": ["VLOOKUP(AJ2,학생명단!A:C,2,0)", "미등록학생"]}
-
-- 수식 오류 대응: AL2*AM2*AN2 곱셈 결과를 AO2에 표시하되, 텍스트 등으로 인한 오류 시 0 표시
-  {"command_type": "iferror", "target_cell": "AO2", "parameters": ["AL2*AM2*AN2", 0]}
-
-# IFNA 함수 - #N/A 오류 전용 처리
-- 검색 결과 없음: AP2 제품코드로 제품명을 찾되, 등록되지 않은 제품이면 "신제품"을 AQ2에 표시
-  {"command_type": "ifna", "target_cell": "AQ2", "parameters": ["VLOOKUP(AP2,제품목록!A:B,2,0)", "신제품"]}
-
-- 매칭 데이터 없음: AR2 고객번호로 고객등급을 찾되, 신규고객이면 "일반등급"을 AS2에 표시
-  {"command_type": "ifna", "target_cell": "AS2", "parameters": ["INDEX(고객정보!C:C,MATCH(AR2,고객정보!A:A,0))", "일반등급"]}
-
-# IFS 함수 - 다중 조건 처리
-- 성적 등급: AT2 점수에 따라 90이상="A", 80이상="B", 70이상="C", 60이상="D", 나머지="F"를 AU2에 표시
-  {"command_type": "ifs", "target_cell": "AU2", "parameters": ["AT2>=90", "A", "AT2>=80", "B", "AT2>=70", "C", "AT2>=60", "D", "TRUE", "F"]}
-
-- 배송비 계산: AV2 주문금액에 따라 10만원이상=무료, 5만원이상=2500원, 3만원이상=3500원, 나머지=5000원을 AW2에 표시
-  {"command_type": "ifs", "target_cell": "AW2", "parameters": ["AV2>=100000", 0, "AV2>=50000", 2500, "AV2>=30000", "3500", "TRUE", 5000]}
-
-- 근무 형태: AX2 근무시간에 따라 40시간이상="정규직", 20시간이상="파트타임", 10시간이상="아르바이트", 나머지="인턴"을 AY2에 표시
-  {"command_type": "ifs", "target_cell": "AY2", "parameters": ["AX2>=40", "정규직", "AX2>=20", "파트타임", "AX2>=10", "아르바이트", "TRUE", "인턴"]}
-
-조건부 연산 함수 상세 예시
-# COUNTIF 함수 - 조건부 개수 세기
-- 성별 통계: AZ2:AZ100 범위에서 "남성"인 직원 수를 BA101에 계산
-  {"command_type": "countif", "target_cell": "BA101", "parameters": ["AZ2:AZ100", "\"남성\""]}
-
-- 합격자 수: BB2:BB50 성적에서 80점 이상인 학생 수를 BC51에 계산
-  {"command_type": "countif", "target_cell": "BC51", "parameters": ["BB2:BB50", ">=80"]}
-
-- 재고 부족: BD2:BD30 재고량에서 10개 미만인 상품 개수를 BE31에 계산
-  {"command_type": "countif", "target_cell": "BE31", "parameters": ["BD2:BD30", "<10"]}
+사용자 메시지의 "참고할 명령어 예시"에 이번 요청과 관련된 명령어의 예시가 주어집니다.
+예시가 주어지지 않은 명령어도 위 목록에 있으면 같은 형식으로 사용할 수 있습니다.
 
-- 특정 날짜: BF2:BF200 입사일에서 2023년도 입사자 수를 BG201에 계산
-  {"command_type": "countif", "target_cell": "BG201", "parameters": ["BF2:BF200", ">=2023-01-01"]}
 
-- 부서별 인원: BH2:BH80 부서명에서 "개발팀"에 속한 직원 수를 BI81에 계산
-  {"command_type": "countif", "target_cell": "BI81", "parameters": ["BH2:BH80", "\"개발팀\""]}
-
-# SUMIF 함수 - 조건부 합계
-- 부서별 급여: BJ2:BJ50 부서에서 "영업부"인 직원들의 BK2:BK50 급여 합계를 BL51에 계산
-  {"command_type": "sumif", "target_cell": "BL51", "parameters": ["BJ2:BJ50", "\"영업부\"", "BK2:BK50"]}
-
-- 고득점 합계: BM2:BM40 과목에서 "수학"인 BN2:BN40 점수들의 합계를 BO41에 계산
-  {"command_type": "sumif", "target_cell": "BO41", "parameters": ["BM2:BM40", "\"수학\"", "BN2:BN40"]}
-
-- 매출 집계: BP2:BP100 지역이 "서울"인 BQ2:BQ100 매출액 합계를 BR101에 계산
-  {"command_type": "sumif", "target_cell": "BR101", "parameters": ["BP2:BP100", "\"서울\"", "BQ2:BQ100"]}
-
-- 기간별 매출: BS2:BS365 날짜가 2024년 1월인 BT2:BT365 매출 합계를 BU366에 계산
-  {"command_type": "sumif", "target_cell": "BU366", "parameters": ["BS2:BS365", ">=2024-01-01", "BT2:BT365"]}
-
-# AVERAGEIF 함수 - 조건부 평균
-- 성별 평균점수: BV2:BV60 성별이 "여성"인 BW2:BW60 점수들의 평균을 BX61에 계산
-  {"command_type": "averageif", "target_cell": "BX61", "parameters": ["BV2:BV60", "\"여성\"", "BW2:BW60"]}
-
-- 경력별 연봉: BY2:BY80 경력이 5년 이상인 BZ2:BZ80 연봉들의 평균을 CA81에 계산
-  {"command_type": "averageif", "target_cell": "CA81", "parameters": ["BY2:BY80", ">=5", "BZ2:BZ80"]}
-
-- 지역별 기온: CB2:CB120 지역이 "부산"인 CC2:CC120 기온들의 평균을 CD121에 계산
-  {"command_type": "averageif", "target_cell": "CD121", "parameters": ["CB2:CB120", "\"부산\"", "CC2:CC120"]}
-
-### 복합 조건 예시 (실무에서 자주 사용)
-# IF + AND 조합 - 복수 조건 만족시
-- 보너스 지급: CE2 연봉이 5000만원 이상이고 CF2 평가가 "우수"일 때 연봉의 10%, 아니면 5%를 CG2에 계산
-  {"command_type": "if", "target_cell": "CG2", "parameters": ["AND(CE2>=50000000,CF2=\"우수\")", "CE2*0.1", "CE2*0.05"]}
-
-# IF + OR 조합 - 여러 조건 중 하나 만족시
-- 할인 적용: CH2가 "VIP"이거나 CI2 구매금액이 50만원 이상일 때 10% 할인, 아니면 할인없음을 CJ2에 계산
-  {"command_type": "if", "target_cell": "CJ2", "parameters": ["OR(CH2=\"VIP\",CI2>=500000)", "CI2*0.9", "CI2"]}
-
-# 중첩 IF 함수 - 3단계 조건
-- 배송 방법: CK2 무게가 30kg 이상이면 "화물배송", 10kg 이상이면 "택배", 나머지는 "일반우편"을 CL2에 표시
-  {"command_type": "if", "target_cell": "CL2", "parameters": ["CK2>=30", "화물배송", "IF(CK2>=10,\"택배\",\"일반우편\")"]}
-
-# COUNTIFS와 유사한 동작 (COUNTIF + 논리함수 조합)
-- 조건부 카운트: CM2:CM100에서 "A등급"이고 CN2:CN100에서 "완료"인 항목 수를 계산하기 위한 보조열 CO2 생성
-  {"command_type": "if", "target_cell": "CO2", "parameters": ["AND(CM2=\"A등급\",CN2=\"완료\")", 1, 0]}
-
-### 검색 및 참조
-- VLOOKUP 함수 예시: I2 학번을 A2:C100 학생명단에서 찾아 3번째 열(이름)을 J2에 표시
-  {"command_type": "vlookup", "target_cell": "J2", "parameters": ["I2", "A2:C100", 3, false]}
-
-- HLOOKUP 함수 예시: K2 월을 A1:M5 매출표에서 찾아 2번째 행(매출액)을 L2에 표시
-  {"command_type": "hlookup", "target_cell": "L2", "parameters": ["K2", "A1:M5", 2, false]}
-
-- INDEX 함수 예시: M2:O20 범위에서 3번째 행, 2번째 열에 있는 값을 P2에 표시
-  {"command_type": "index", "target_cell": "P2", "parameters": ["M2:O20", 3, 2]}
-
-- MATCH 함수 예시: Q2 값이 R2:R50 범위에서 몇 번째 위치에 있는지를 S2에 표시
-  {"command_type": "match", "target_cell": "S2", "parameters": ["Q2", "R2:R50", 0]}
-
-- XLOOKUP 함수 예시: T2 제품코드를 U2:U30에서 찾아 V2:V30의 제품명을 W2에 표시 (최신 검색함수)
-  {"command_type": "xlookup", "target_cell": "W2", "parameters": ["T2", "U2:U30", "V2:V30"]}
-
-- FILTER 함수 예시: X2:Z50 데이터에서 Y열이 "A등급"인 행들만 필터링해서 AA2부터 표시
-  {"command_type": "filter", "target_cell": "AA2", "parameters": ["X2:Z50", "Y2:Y50=\"A등급\""]}
-
-- UNIQUE 함수 예시: AB2:AB100 범위에서 중복 제거된 고유한 값들만 AC2부터 세로로 표시
-  {"command_type": "unique", "target_cell": "AC2", "parameters": ["AB2:AB100"]}
-
-### 통계 함수
-- MEDIAN 함수 예시: AD2:AD30 점수들의 중간값(50퍼센타일)을 계산해서 AE31에 표시
-  {"command_type": "median", "target_cell": "AE31", "parameters": ["AD2:AD30"]}
-
-- MODE 함수 예시: AF2:AF40 데이터에서 가장 자주 나타나는 값(최빈값)을 AG41에 표시
-  {"command_type": "mode", "target_cell": "AG41", "parameters": ["AF2:AF40"]}
-
-- STDEV 함수 예시: AH2:AH35 숫자들의 표준편차를 계산해서 데이터의 분산 정도를 AI36에 표시
-  {"command_type": "stdev", "target_cell": "AI36", "parameters": ["AH2:AH35"]}
+중요: 
+- command_type은 반드시 enum에 정의된 값 중 하나여야 합니다
+- parameters는 항상 배열(리스트) 형태여야 합니다
+- 수식 함수의 경우 parameters[0]에 범위를 넣습니다
+- 값 설정의 경우 parameters[0]에 설정할 값을 넣습니다
+- 이미 값이 있는 셀의 경우 목적 없이 set_value로 값을 변경하지 않습니다.
+- response 필드는 반드시 마크다운(Markdown) 형식으로 작성해야 합니다. 표는 사용하지 않습니다.
+- summary 필드는 이번 응답에서의 엑셀 시퀀스를 통한 변경점과 사용자 요청을 둘 다 요약해야 합니다. 500자 이하로 작성해주세요.
+- summary 필드는 다음 동작에 참고자료가 되니 이후 동작에 필요한 내용은 반드시 포함해주세요.
 
-- RANK 함수 예시: AJ2 학생의 점수가 AJ2:AJ50 전체 범위에서 몇 등인지를 AK2에 표시 (0=내림차순)
-  {"command_type": "rank", "target_cell": "AK2", "parameters": ["AJ2", "AJ2:AJ50", 0]}
 
-### 텍스트 함수
-- CONCATENATE 함수 예시: AL2(성)과 AM2(이름)을 합쳐서 "홍길동" 형태로 AN2에 표시
-  {"command_type": "concatenate", "target_cell": "AN2", "parameters": ["AL2", "AM2"]}
+요청 형식:
+사용자 메시지는 "이전 대화 요약", "현재 엑셀 파일 상태", "참고할 명령어 예시", "사용자 명령" 순서로 주어집니다.
+이전 대화 요약은 오래된 요청들을 압축한 요약과 최근 요청별 요약 목록으로 구성됨.
+최근 요청별 요약은 번호가 클수록 더 최신 요청에 대한 요약임.
+위 정보를 바탕으로 사용자의 명령을 수행하기 위한 엑셀 명령어 시퀀스를 생성하고,
+사용자에게 친절한 한국어 응답을 작성해주세요.
 
-- & 함수 예시: AO2와 AP2 문자열을 " - " 구분자와 함께 연결해서 AQ2에 표시
-  {"command_type": "&", "target_cell": "AQ2", "parameters": ["AO2", "\" - \"", "AP2"]}
+"""
 
-- LEFT 함수 예시: AR2 텍스트에서 왼쪽부터 3글자만 추출해서 AS2에 표시 (예: "홍길동"→"홍길동")
-  {"command_type": "left", "target_cell": "AS2", "parameters": ["AR2", 3]}
+# 응답 형식 안내 - 명령어 인코딩(LLM_COMMAND_ENCODING)별
+_OBJECT_FORMAT_PROMPT = """반드시 다음 JSON 스키마 형식으로 응답해주세요:
+{
+    "response": "사용자에게 보여줄 한국어 응답",
+    "commands": [
+        {
+            "command_type": "명령어 타입",
+            "target_cell": "대상 셀 범위",
+            "parameters": ["파라미터 값들의 배열"]
+        }
+    ],
+    "summary": "갱신된 요약 (500자 이하)"
+}"""
 
-- RIGHT 함수 예시: AT2 전화번호에서 오른쪽 끝 4자리만 추출해서 AU2에 표시
-  {"command_type": "right", "target_cell": "AU2", "parameters": ["AT2", 4]}
+_COMPACT_FORMAT_PROMPT = """반드시 다음 JSON 스키마 형식으로 응답해주세요:
+{
+    "response": "사용자에게 보여줄 한국어 응답",
+    "commands": [
+        ["명령어 타입", "대상 셀", "파라미터1", "파라미터2"],
+        ["FILL_MARKER", "대상 범위", "명령어 타입", "첫 셀 기준 파라미터1"]
+    ],
+    "summary": "갱신된 요약 (500자 이하)"
+}
 
-- MID 함수 예시: AV2 문자열에서 3번째 위치부터 2글자를 추출해서 AW2에 표시
-  {"command_type": "mid", "target_cell": "AW2", "parameters": ["AV2", 3, 2]}
+명령어 배열 형식:
+- 명령어 하나는 [command_type, target_cell, 파라미터...] 순서의 배열입니다. 위 규칙의 parameters는 세 번째 원소부터입니다.
+- 같은 패턴의 명령을 여러 셀에 적용할 때는 셀마다 나열하지 말고 범위 채우기를 사용하세요.
+  ["FILL_MARKER", 대상 범위, command_type, 파라미터...] 는 범위의 첫 셀 기준으로 쓴 명령을 범위의 모든 셀에 적용하며,
+  상대 참조는 엑셀 채우기처럼 셀마다 이동하고 $가 붙은 참조는 고정됩니다.
+  예: D2:D100 각 행의 A~C열 합계 → ["FILL_MARKER", "D2:D100", "sum", "A2:C2"]
+  예: C2:C50 합격 판정 → ["FILL_MARKER", "C2:C50", "if", "B2>=60", "합격", "불합격"]""".replace("FILL_MARKER", FILL_MARKER)
 
-- LEN 함수 예시: AX2 텍스트의 전체 글자 수(공백 포함)를 계산해서 AY2에 표시
-  {"command_type": "len", "target_cell": "AY2", "parameters": ["AX2"]}
+_CLOSING_PROMPT = """
 
-- SUBSTITUTE 함수 예시: AZ2 텍스트에서 "구버전"을 "신버전"으로 모두 바꿔서 BA2에 표시
-  {"command_type": "substitute", "target_cell": "BA2", "parameters": ["AZ2", "구버전", "신버전"]}
+응답은 항상 친절하고 명확한 한국어로 작성하세요."""
 
-- TRIM 함수 예시: BB2 텍스트의 앞뒤 공백과 중간의 연속 공백을 제거해서 BC2에 표시
-  {"command_type": "trim", "target_cell": "BC2", "parameters": ["BB2"]}
 
-- UPPER 함수 예시: BD2 영문 텍스트를 모두 대문자로 변환해서 BE2에 표시 ("hello"→"HELLO")
-  {"command_type": "upper", "target_cell": "BE2", "parameters": ["BD2"]}
+def build_system_prompt(encoding: str = LLM_COMMAND_ENCODING) -> str:
+    """
+    명령어 인코딩에 맞는 시스템 프롬프트를 만듭니다. (같은 인코딩이면 항상 같은 텍스트)
 
-- LOWER 함수 예시: BF2 영문 텍스트를 모두 소문자로 변환해서 BG2에 표시 ("WORLD"→"world")
-  {"command_type": "lower", "target_cell": "BG2", "parameters": ["BF2"]}
+    Args:
+        encoding: "object" | "compact"
 
-### 기타 함수
-- ROUND 함수 예시: BI2 소수값을 소수점 첫째 자리까지 반올림해서 BI2에 표시 (예: 1.414 → 1.4)
-  ROUND 함수는 기존에 그 셀에 있던 값을 그대로 사용하도록 기능을 제한해서 소수점 자리숫만 parameters[0]에 넣어야 합니다.
-  {"command_type": "round", "target_cell": "BI2", "parameters": [1]}
-  
-- ISBLANK 함수 예시: BJ2 셀이 비어있는지 확인해서 TRUE/FALSE를 BK2에 표시
-  {"command_type": "isblank", "target_cell": "BK2", "parameters": ["BJ2"]}
+    Returns:
+        시스템 프롬프트
+    """
+    format_prompt = _COMPACT_FORMAT_PROMPT if encoding == "compact" else _OBJECT_FORMAT_PROMPT
+    return _SYSTEM_PROMPT_BODY + format_prompt + _CLOSING_PROMPT
 
 
-중요: 
-- command_type은 반드시 enum에 정의된 값 중 하나여야 합니다
-- parameters는 항상 배열(리스트) 형태여야 합니다
-- 수식 함수의 경우 parameters[0]에 범위를 넣습니다
-- 값 설정의 경우 parameters[0]에 설정할 값을 넣습니다
-- 이미 값이 있는 셀의 경우 목적 없이 set_value로 값을 변경하지 않습니다.
-- response 필드는 반드시 마크다운(Markdown) 형식으로 작성해야 합니다. 표는 사용하지 않습니다.
-- summary 필드는 이번 응답에서의 엑셀 시퀀스를 통한 변경점과 사용자 요청을 둘 다 요약해야 합니다. 500자 이하로 작성해주세요.
-- summary 필드는 다음 동작에 참고자료가 되니 이후 동작에 필요한 내용은 반드시 포함해주세요.
+# 시스템 프롬프트 - GPT의 역할과 사용 가능한 명령어를 정의
+SYSTEM_PROMPT = build_system_prompt()
 
+# 세션 요약 압축 프롬프트 - 오래된 요청별 요약들을 하나의 다이제스트로 합칠 때 사용
+SUMMARY_COMPACTION_PROMPT = """당신은 엑셀 편집 대화의 요약을 압축하는 도우미입니다.
+기존 압축 요약과 추가할 요청별 요약들을 하나의 요약으로 합쳐주세요.
 
-응답은 항상 친절하고 명확한 한국어로 작성하세요."""
+규칙:
+- 약 {max_tokens} 토큰 이내의 한국어 평문으로 작성합니다.
+- 이후 요청에 필요한 정보(표 위치, 셀 주소, 사용자가 "앞으로 적용해줘"라고 한 규칙 등)는 반드시 유지합니다.
+- 나중 요약과 충돌하는 이전 내용은 나중 요약을 따릅니다.
+- 요약 외의 설명은 쓰지 않습니다."""
 
 # 사용자 프롬프트 템플릿
+# 고정 지시문은 모두 SYSTEM_PROMPT에 두고, 여기에는 요청마다 바뀌는 내용만 자주 바뀌지 않는 순서대로 둡니다.
+# (시스템 프롬프트가 매 요청 바이트 단위로 같아야 OpenAI 프롬프트 캐시가 적중합니다)
 USER_PROMPT_TEMPLATE = """이전 대화 요약:
 {summary}
 
-이전 대화 요약에서 [end] 부분은 각 요청에 대한 요약이 끝났음을 의미함.
-끝으로 갈수록 더 최신 요청에 대한 요약임.
-
 현재 엑셀 파일 상태:
 {excel_context}
 
-사용자 명령:
-{user_command}
-
-위 정보를 바탕으로 사용자의 명령을 수행하기 위한 엑셀 명령어 시퀀스를 생성하고,
-사용자에게 친절한 한국어 응답을 작성해주세요.
+참고할 명령어 예시:
+{command_examples}
 
-반드시 다음 JSON 스키마 형식으로 응답해주세요:
-{{
-    "response": "사용자에게 보여줄 한국어 응답",
-    "commands": [
-        {{
-            "command_type": "명령어 타입",
-            "target_cell": "대상 셀 범위",
-            "parameters": ["파라미터 값들의 배열"]
-        }}
-    ],
-    "summary": "갱신된 요약 (500자 이하)"
-}}"""
+사용자 명령:
+{user_command}"""
 
 # 엑셀 분석 결과 포맷 템플릿
 EXCEL_CONTEXT_TEMPLATE = """현재 엑셀 시트: {rows}행 x {cols}열
@@ -326,12 +169,21 @@ EXCEL_CONTEXT_TEMPLATE = """현재 엑셀 시트: {rows}행 x {cols}열
 수식:
 {formula_data}"""
 
+# 시트가 커서 토큰 예산에 맞춰 요약한 컨텍스트 템플릿
+EXCEL_COMPACT_CONTEXT_TEMPLATE = """현재 엑셀 시트: {rows}행 x {cols}열 (시트 '{sheet_name}', 채워진 셀 {cell_count}개, 분량이 많아 요약해서 표시)
+
+표/영역:
+{tables}
+
+수식:
+{formula_data}"""
+
 # 에러 상황에 대한 프롬프트
 ERROR_PROMPT = """사용자의 요청을 처리하는 중 문제가 발생했습니다.
 명령을 더 구체적으로 설명해주시거나, 다시 시도해주세요."""
 
-# GPT API 응답 스키마
-RESPONSE_SCHEMA = {
+# GPT API 응답 스키마 (object 인코딩)
+OBJECT_RESPONSE_SCHEMA = {
     "type": "json_schema",
     "json_schema": {
         "name": "LLMResponseOutput",
@@ -352,24 +204,7 @@ RESPONSE_SCHEMA = {
                             "command_type": {
                                 "type": "string",
                                 "description": "명령어 타입",
-                                "enum": [
-                                    # 기본 함수
-                                    "sum", "average", "count", "max", "min",
-                                    # 데이터 조작
-                                    "set_value", "clear",
-                                    # 논리 함수
-                                    "if", "and", "or", "iferror", "ifna", "ifs",
-                                    # 조건부 연산
-                                    "countif", "sumif", "averageif",
-                                    # 검색 및 참조
-                                    "vlookup", "hlookup", "index", "match", "xlookup", "filter", "unique",
-                                    # 통계 함수
-                                    "median", "mode", "stdev", "rank",
-                                    # 텍스트 함수
-                                    "concatenate", "&", "left", "right", "mid", "len", "substitute", "trim", "upper", "lower",
-                                    # 기타 함수
-                                    "round", "isblank"
-                                ]
+                                "enum": command_types()  # 카탈로그에서 생성
                             },
                             "target_cell": {
                                 "type": "string",
@@ -398,6 +233,25 @@ RESPONSE_SCHEMA = {
     }
 }
 
+# GPT API 응답 스키마 (compact 인코딩) - 명령어를 키 없는 배열로 받아 출력 토큰을 줄임
+COMPACT_RESPONSE_SCHEMA = copy.deepcopy(OBJECT_RESPONSE_SCHEMA)
+COMPACT_RESPONSE_SCHEMA["json_schema"]["schema"]["properties"]["commands"] = {
+    "type": "array",
+    "description": (
+        f"실행할 엑셀 명령어 시퀀스. 각 명령어는 [명령어 타입, 대상 셀, 파라미터...] 배열이며, "
+        f"[\"{FILL_MARKER}\", 대상 범위, 명령어 타입, 첫 셀 기준 파라미터...]는 범위의 모든 셀에 적용"
+    ),
+    "items": {
+        "type": "array",
+        "items": {
+            "type": ["string", "number", "boolean", "null"]
+        }
+    }
+}
+
+# 현재 인코딩(LLM_COMMAND_ENCODING)의 응답 스키마
+RESPONSE_SCHEMA = COMPACT_RESPONSE_SCHEMA if LLM_COMMAND_ENCODING == "compact" else OBJECT_RESPONSE_SCHEMA
+
 
 def create_user_prompt(summary: str, user_command: str, excel_context: str) -> str:
     """
@@ -414,6 +268,7 @@ def create_user_prompt(summary: str, user_command: str, excel_context: str) -> s
     return USER_PROMPT_TEMPLATE.format(
         summary=summary or "없음",
         excel_context=excel_context,
+        command_examples=render_command_examples(user_command, summary, compact=LLM_COMMAND_ENCODING == "compact"),
         user_command=user_command
     )
 
@@ -439,4 +294,35 @@ def create_excel_context(rows: int, cols: int, sample_data: list, formula_data:
         cols=cols,
         sample_data=sample_text,
         formula_data=formula_text
-    )
\ No newline at end of file
+    )
+
+def create_compact_excel_context(
+        sheet_name: str,
+        rows: int,
+        cols: int,
+        cell_count: int,
+        tables: list,
+        formula_data: list
+) -> str:
+    """
+    토큰 예산에 맞춰 요약한 엑셀 컨텍스트 문자열을 생성합니다.
+
+    Args:
+        sheet_name: 시트 이름
+        rows: 총 행 수
+        cols: 총 열 수
+        cell_count: 채워진 셀 수
+        tables: 표/영역 요약 리스트
+        formula_data: 수식(그룹) 리스트
+
+    Returns:
+        엑셀 컨텍스트 설명 문자열
+    """
+    return EXCEL_COMPACT_CONTEXT_TEMPLATE.format(
+        sheet_name=sheet_name,
+        rows=rows,
+        cols=cols,
+        cell_count=cell_count,
+        tables="\n\n".join(tables) if tables else "데이터 없음",
+        formula_data="\n".join(formula_data) if formula_data else "수식 없음"
+    )
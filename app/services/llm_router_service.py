@@ -0,0 +1,214 @@
+# app/services/llm_router_service.py
+"""
+LLM 모델 라우터
+요청을 로컬 휴리스틱으로 질문 / 상태 선언 / 단순 편집 / 복합 편집으로 분류하고,
+분류별로 설정된 모델 티어(small/large)로 보냅니다.
+
+- 질문("평균은 어떻게 계산돼?")과 상태 선언("앞으로 반올림해줘")은 빈 셀 clear 정도만 만들므로 작은 모델로 충분합니다.
+- 작은 모델의 응답이 검증(JSON 파싱/명령어 변환)에 실패하면 큰 모델로 한 번 더 요청합니다(에스컬레이션).
+- 티어별 요청 수, 실패/에스컬레이션 수, 지연 시간, 토큰 사용량을 stats()로 확인합니다.
+"""
+import os
+import re
+import threading
+from typing import Any, Dict, Optional
+
+# 0이면 라우팅하지 않고 모든 요청을 large 티어로 보냄
+LLM_ROUTING_ENABLED = os.getenv("LLM_ROUTING", "1") != "0"
+
+TIER_SMALL = "small"
+TIER_LARGE = "large"
+
+# 티어별 모델
+TIER_MODELS = {
+    TIER_SMALL: os.getenv("LLM_MODEL_SMALL", "gpt-4.1-mini"),
+    TIER_LARGE: os.getenv("LLM_MODEL_LARGE", "gpt-4.1"),
+}
+
+# 요청 분류
+QUESTION = "question"
+DECLARATION = "declaration"
+SIMPLE_EDIT = "simple_edit"
+COMPLEX = "complex"
+
+# 분류별 티어 (LLM_ROUTE_QUESTION=large 처럼 분류별로 바꿀 수 있음)
+ROUTE_TIERS = {
+    request_class: os.getenv(f"LLM_ROUTE_{request_class.upper()}", default).lower()
+    for request_class, default in (
+        (QUESTION, TIER_SMALL),
+        (DECLARATION, TIER_SMALL),
+        (SIMPLE_EDIT, TIER_SMALL),
+        (COMPLEX, TIER_LARGE),
+    )
+}
+
+for _request_class, _tier in ROUTE_TIERS.items():
+    if _tier not in TIER_MODELS:
+        raise ValueError(f"지원하지 않는 모델 티어입니다: LLM_ROUTE_{_request_class.upper()}={_tier}")
+
+# 이보다 긴 명령은 복합 편집으로 분류
+_COMPLEX_MIN_LENGTH = 60
+
+# 상태 선언: 앞으로 어떤 작업을 계속 적용하거나 적용하지 말라는 발화
+_DECLARATION = re.compile(r"앞으로|이제부터|지금부터|from now on|하지\s*마|적용하지\s*말")
+# 질문: 정보를 얻기 위한 발화
+_QUESTION = re.compile(
+    r"[?？]\s*$|어떻게|뭐야|무엇|무슨|왜|어떤|알려\s*줘|설명|차이|의미|what|how|why|explain",
+    re.IGNORECASE
+)
+# 데이터를 바꾸는 동사 (질문처럼 보여도 편집 요청인지 판단)
+_EDIT_VERB = re.compile(
+    r"넣어|입력|계산|구해|만들|추가|지워|삭제|바꿔|변경|정렬|병합|채워|표시|적어|합쳐|찾아|매겨|반올림|옮겨|복사|"
+    r"\b(?:put|set|add|fill|merge|clear|delete|sort|calculate|make|create)\b",
+    re.IGNORECASE
+)
+# 요청형 어미 (질문 표현이 있어도 편집 동사 + 요청형이면 편집 요청)
+_IMPERATIVE = re.compile(r"(?:줘|주세요|줄래|줄래요|해라|하자)\s*[.!?？~]*\s*$|^(?:please\s+)?[a-z]+\s", re.IGNORECASE)
+# 여러 단계 작업의 연결 표현
+_MULTI_STEP = re.compile(r"하고|그리고|다음에|그 다음|한 뒤|후에|각각|별로|표를|표로|정리|요약|비교|and then|then\b",
+                         re.IGNORECASE)
+
+
+def classify_request(user_command: str) -> str:
+    """
+    사용자 명령을 질문 / 상태 선언 / 단순 편집 / 복합 편집으로 분류합니다.
+
+    Args:
+        user_command: 사용자 명령
+
+    Returns:
+        QUESTION | DECLARATION | SIMPLE_EDIT | COMPLEX
+    """
+    text = (user_command or "").strip()
+    edit_verbs = len(_EDIT_VERB.findall(text))
+
+    if _DECLARATION.search(text):
+        return DECLARATION
+    if _QUESTION.search(text) and not (edit_verbs and _IMPERATIVE.search(text)):
+        return QUESTION
+    if edit_verbs > 1 or _MULTI_STEP.search(text) or len(text) > _COMPLEX_MIN_LENGTH:
+        return COMPLEX
+    return SIMPLE_EDIT
+
+
+class RouteDecision:
+    """라우팅 결과 (분류, 티어, 모델, 에스컬레이션 여부)"""
+
+    def __init__(self, request_class: str, tier: str, escalated: bool = False):
+        self.request_class = request_class
+        self.tier = tier
+        self.model = TIER_MODELS[tier]
+        self.escalated = escalated
+
+    def __repr__(self) -> str:
+        return f"RouteDecision({self.request_class}, {self.tier}, {self.model}, escalated={self.escalated})"
+
+
+class ModelRouter:
+    """
+    요청 분류에 따라 모델 티어를 고르고, 티어별 지연 시간과 토큰 사용량을 집계합니다.
+    """
+
+    def __init__(self, route_tiers: Optional[Dict[str, str]] = None, enabled: bool = LLM_ROUTING_ENABLED):
+        """
+        Args:
+            route_tiers: (선택) 분류 → 티어 매핑 (기본 ROUTE_TIERS)
+            enabled: False면 모든 요청을 large 티어로 보냄
+        """
+        self.route_tiers = dict(route_tiers or ROUTE_TIERS)
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._tiers: Dict[str, Dict[str, Any]] = {}
+        self.by_class: Dict[str, int] = {}
+
+    def route(self, user_command: str) -> RouteDecision:
+        """
+        사용자 명령을 분류해 보낼 모델 티어를 정합니다.
+
+        Args:
+            user_command: 사용자 명령
+
+        Returns:
+            RouteDecision
+        """
+        request_class = classify_request(user_command)
+        tier = self.route_tiers.get(request_class, TIER_LARGE) if self.enabled else TIER_LARGE
+        with self._lock:
+            self.by_class[request_class] = self.by_class.get(request_class, 0) + 1
+        return RouteDecision(request_class, tier)
+
+    def escalate(self, decision: RouteDecision) -> Optional[RouteDecision]:
+        """
+        검증에 실패한 요청을 큰 모델로 다시 보낼 결정을 만듭니다.
+
+        Args:
+            decision: 실패한 요청의 RouteDecision
+
+        Returns:
+            large 티어 RouteDecision (이미 large 티어였으면 None)
+        """
+        if decision.tier == TIER_LARGE:
+            return None
+        print(f"[LLM 라우터] 에스컬레이션 class={decision.request_class} {decision.model} → {TIER_MODELS[TIER_LARGE]}")
+        return RouteDecision(decision.request_class, TIER_LARGE, escalated=True)
+
+    def record(
+            self,
+            decision: RouteDecision,
+            latency: float,
+            usage: Optional[Dict[str, Any]] = None,
+            ok: bool = True
+    ) -> None:
+        """
+        티어별 호출 결과를 기록합니다.
+
+        Args:
+            decision: 호출에 사용한 RouteDecision
+            latency: 호출부터 검증까지 걸린 시간 (초)
+            usage: (선택) UsageMetrics.record가 반환한 토큰 기록
+            ok: 응답이 검증을 통과했는지 여부
+        """
+        with self._lock:
+            tier = self._tiers.setdefault(decision.tier, {
+                "model": decision.model,
+                "requests": 0,
+                "failures": 0,
+                "escalated_in": 0,
+                "total_latency": 0.0,
+                "max_latency": 0.0,
+                "prompt_tokens": 0,
+                "completion_tokens": 0,
+            })
+            tier["requests"] += 1
+            tier["failures"] += 0 if ok else 1
+            tier["escalated_in"] += 1 if decision.escalated else 0
+            tier["total_latency"] += latency
+            tier["max_latency"] = max(tier["max_latency"], latency)
+            if usage:
+                tier["prompt_tokens"] += usage.get("prompt_tokens", 0)
+                tier["completion_tokens"] += usage.get("completion_tokens", 0)
+
+    def stats(self) -> Dict[str, Any]:
+        """분류별 요청 수와 티어별 지표를 반환합니다."""
+        with self._lock:
+            tiers = {}
+            for name, tier in self._tiers.items():
+                tiers[name] = {
+                    "model": tier["model"],
+                    "requests": tier["requests"],
+                    "failures": tier["failures"],
+                    "escalated_in": tier["escalated_in"],
+                    "avg_latency_ms": round(tier["total_latency"] / tier["requests"] * 1000, 2),
+                    "max_latency_ms": round(tier["max_latency"] * 1000, 2),
+                    "prompt_tokens": tier["prompt_tokens"],
+                    "completion_tokens": tier["completion_tokens"],
+                }
+            return {
+                "enabled": self.enabled,
+                "routes": dict(self.route_tiers),
+                "by_class": dict(self.by_class),
+                "tiers": tiers,
+            }
+
+
+model_router = ModelRouter()
@@ -3,25 +3,36 @@
 LLM 서비스 모듈
 OpenAI GPT를 사용하여 자연어 명령을 엑셀 명령어로 변환하는 서비스
 """
+import asyncio
 import json
 import os
-from typing import List, Dict, Any, Optional
-from openai import OpenAI
-import io
-
-from openpyxl import load_workbook
+import time
+from typing import AsyncIterator, List, Dict, Any, Optional, Tuple, Union
+from openai import AsyncOpenAI, OpenAI
 
 from app.schemas.llm_schema import ResponseResult
 from app.services.llm_prompt_service import (
     SYSTEM_PROMPT,
     RESPONSE_SCHEMA,
-    create_user_prompt,
-    create_excel_context
+    create_user_prompt
 )
+from app.services.command_encoding_service import normalize_commands
+from app.services.command_parser_service import LOCAL_COMMAND_PARSER_ENABLED, LocalCommandParser, \
+    local_command_parser
+from app.services.excel_context_service import get_excel_context
+from app.services.excel_worker_service import run_in_excel_worker
+from app.services.llm_cache_service import LLMResponseCache, llm_response_cache
+from app.services.llm_client_service import llm_client_manager
+from app.services.llm_router_service import TIER_LARGE, TIER_MODELS, ModelRouter, RouteDecision, model_router
+from app.utils.json_stream import JsonStringFieldExtractor
+from app.services.summary_service import append_turn_summary, render_summary
+from app.services.workbook_service import ParsedWorkbook, ensure_parsed_workbook, compute_content_hash
 
 # 타입 힌트를 위한 임포트
 from app.schemas.excel_schema import ExcelCommand
 
+LLM_MODEL = "gpt-4.1"
+
 
 class LLMService:
     """
@@ -29,11 +40,36 @@ class LLMService:
     사용자의 자연어 명령을 엑셀 명령어로 변환합니다.
     """
 
-    def __init__(self):
+    def __init__(
+            self,
+            client: Optional[OpenAI] = None,
+            async_client: Optional[AsyncOpenAI] = None,
+            cache: Optional[LLMResponseCache] = None,
+            parser: Optional[LocalCommandParser] = None,
+            router: Optional[ModelRouter] = None
+    ):
         """
         LLMService 초기화
-        환경변수에서 OpenAI API 키를 가져와 클라이언트를 생성합니다.
+        공유 클라이언트가 주어지면 그대로 사용하고, 없으면 환경변수의 OpenAI API 키로 클라이언트를 생성합니다.
+
+        Args:
+            client: (선택) 프로세스 공유 OpenAI 클라이언트 (llm_client_manager.client)
+            async_client: (선택) 프로세스 공유 AsyncOpenAI 클라이언트 (없으면 비동기 호출도 동기 클라이언트를 스레드에서 사용)
+            cache: (선택) LLM 응답 캐시. 주어지면 같은 요청은 GPT를 호출하지 않고, 캐시할 호출은 temperature 0으로 요청
+            parser: (선택) 로컬 명령어 파서. 주어지면 단순한 명령은 GPT를 호출하지 않고 직접 해석
+            router: (선택) 모델 라우터. 주어지면 요청 분류별 모델로 호출하고 검증 실패 시 큰 모델로 재요청
         """
+        self.request_timeout = llm_client_manager.request_timeout
+        self.parser = parser
+        self.router = router
+        self._last_usage: Optional[Dict[str, Any]] = None
+        self.async_client = async_client
+        self.cache = cache
+        self.temperature = 0 if cache is not None else 0.7
+        if client is not None:
+            self.client = client
+            return
+
         api_key = os.getenv("OPENAI_API_KEY")
         if not api_key:
             raise ValueError("OPENAI_API_KEY 환경변수가 설정되지 않았습니다.")
@@ -43,7 +79,7 @@ class LLMService:
     def get_llm_response(
             self,
             user_command: str,
-            excel_bytes: bytes,
+            excel_bytes: Union[bytes, ParsedWorkbook],
             session_summary: Optional[str] = None
     ) -> ResponseResult:
         """
@@ -51,113 +87,397 @@ class LLMService:
 
         Args:
             user_command: 사용자가 입력한 자연어 명령
-            excel_bytes: 현재 엑셀 파일의 바이트 데이터
+            excel_bytes: 현재 엑셀 파일의 바이트 데이터 또는 요청 단위로 파싱된 ParsedWorkbook
             session_summary: 이전 대화 요약 (옵션)
 
         Returns:
             ResponseResult: LLM 응답 결과 (chat, cmd_seq, summary)
         """
+        # 0. 단순한 명령은 로컬 파서로 바로 처리, 같은 시트 상태에서 같은 명령이면 캐시된 응답 사용 (네트워크 호출 생략)
+        local = self._parse_locally(user_command, session_summary)
+        if local is not None:
+            return local
+
+        sheet_hash = self._sheet_hash(excel_bytes)
+        decision = self.router.route(user_command) if self.router is not None else None
+        cached = self._lookup_cache(decision, user_command, sheet_hash, session_summary)
+        if cached is not None:
+            return cached
+
         # 1. 엑셀 파일 분석하여 컨텍스트 생성
         excel_context = self._analyze_excel_context(excel_bytes)
 
         # 2. 사용자 프롬프트 생성
         user_prompt = create_user_prompt(
-            summary=session_summary or "",
+            summary=render_summary(session_summary),
             user_command=user_command,
             excel_context=excel_context
         )
 
-        # 3. GPT API 호출
+        # 3. GPT API 호출 (라우터가 있으면 분류별 모델로, 검증 실패 시 큰 모델로 재요청)
         try:
-            response = self._call_gpt_api(user_prompt)
-            # 4. 응답 파싱 및 검증
-            parsed_response = self._parse_gpt_response(response)
+            if decision is None:
+                response = self._call_gpt_api(user_prompt)
+                result = self._build_response_result(response, session_summary)
+            else:
+                while True:
+                    started = time.perf_counter()
+                    response = self._call_gpt_api(user_prompt, model=decision.model)
+                    result, decision = self._validate_routed(response, session_summary, decision, started)
+                    if result is not None:
+                        break
+            self._store_cache(decision, user_command, sheet_hash, session_summary, response)
+            return result
+        except Exception as e:
+            return self._build_error_result(e, session_summary)
 
-            # 5. ExcelCommand 객체 리스트로 변환
-            excel_commands = self._convert_to_excel_commands(parsed_response["commands"])
+    async def get_llm_response_async(
+            self,
+            user_command: str,
+            excel_bytes: Union[bytes, ParsedWorkbook],
+            session_summary: Optional[str] = None
+    ) -> ResponseResult:
+        """
+        get_llm_response의 비동기 버전
+        엑셀 컨텍스트 분석은 엑셀 워커 풀에서, GPT 호출은 비동기 클라이언트로 수행하여 이벤트 루프를 막지 않습니다.
 
-            # ("summary : " + session_summary + parsed_response["summary"] + " [end] ")
+        Args:
+            user_command: 사용자가 입력한 자연어 명령
+            excel_bytes: 현재 엑셀 파일의 바이트 데이터 또는 요청 단위로 파싱된 ParsedWorkbook
+            session_summary: 이전 대화 요약 (옵션)
 
+        Returns:
+            ResponseResult: LLM 응답 결과 (chat, cmd_seq, summary)
+        """
+        local = self._parse_locally(user_command, session_summary)
+        if local is not None:
+            return local
 
-            # print("더해진 로그")
-            # print(session_summary+parsed_response["summary"])
+        sheet_hash = self._sheet_hash(excel_bytes)
+        decision = self.router.route(user_command) if self.router is not None else None
+        cached = self._lookup_cache(decision, user_command, sheet_hash, session_summary)
+        if cached is not None:
+            return cached
 
-            # 6. 결과 반환
-            return ResponseResult(
-                chat=parsed_response["response"],
-                cmd_seq=excel_commands,  # ExcelCommand 객체 리스트를 그대로 반환
-                summary=session_summary + parsed_response["summary"] + " [end] "
-            )
+        excel_context = await run_in_excel_worker(self._analyze_excel_context, excel_bytes)
+
+        user_prompt = create_user_prompt(
+            summary=render_summary(session_summary),
+            user_command=user_command,
+            excel_context=excel_context
+        )
 
+        try:
+            if decision is None:
+                response = await self._call_gpt_api_async(user_prompt)
+                result = self._build_response_result(response, session_summary)
+            else:
+                while True:
+                    started = time.perf_counter()
+                    response = await self._call_gpt_api_async(user_prompt, model=decision.model)
+                    result, decision = self._validate_routed(response, session_summary, decision, started)
+                    if result is not None:
+                        break
+            self._store_cache(decision, user_command, sheet_hash, session_summary, response)
+            return result
         except Exception as e:
-            print(f"LLM 처리 중 오류 발생: {str(e)}")
-            # 에러 발생시 기본 응답 반환
-            return ResponseResult(
-                chat="죄송합니다. 명령을 처리하는 중 오류가 발생했습니다. 다시 시도해주세요.",
-                cmd_seq=[],
-                summary=session_summary or ""
-            )
+            return self._build_error_result(e, session_summary)
+
+    async def stream_llm_response_async(
+            self,
+            user_command: str,
+            excel_bytes: Union[bytes, ParsedWorkbook],
+            session_summary: Optional[str] = None
+    ) -> AsyncIterator[Union[str, ResponseResult]]:
+        """
+        GPT 응답을 스트리밍으로 받아 "response" 필드의 텍스트를 생성되는 대로 내보냅니다.
+        마지막 항목으로 전체 응답을 파싱한 ResponseResult를 내보냅니다.
+
+        Args:
+            user_command: 사용자가 입력한 자연어 명령
+            excel_bytes: 현재 엑셀 파일의 바이트 데이터 또는 요청 단위로 파싱된 ParsedWorkbook
+            session_summary: 이전 대화 요약 (옵션)
+
+        Yields:
+            str: 새로 생성된 응답 텍스트 조각
+            ResponseResult: 마지막 항목 (chat, cmd_seq, summary)
+        """
+        local = self._parse_locally(user_command, session_summary)
+        if local is not None:
+            yield local.chat
+            yield local
+            return
+
+        sheet_hash = self._sheet_hash(excel_bytes)
+        decision = self.router.route(user_command) if self.router is not None else None
+        cached = self._lookup_cache(decision, user_command, sheet_hash, session_summary)
+        if cached is not None:
+            if cached.chat:
+                yield cached.chat
+            yield cached
+            return
+
+        excel_context = await run_in_excel_worker(self._analyze_excel_context, excel_bytes)
+
+        user_prompt = create_user_prompt(
+            summary=render_summary(session_summary),
+            user_command=user_command,
+            excel_context=excel_context
+        )
+
+        model = decision.model if decision is not None else None
+        started = time.perf_counter()
+        extractor = JsonStringFieldExtractor("response")
+        try:
+            if self.async_client is None:
+                # 스트리밍 클라이언트가 없으면 전체 응답을 받은 뒤 한 번에 내보냄
+                response = await self._call_gpt_api_async(user_prompt, model=model)
+                text = extractor.feed(response)
+                if text:
+                    yield text
+            else:
+                chunks = []
+                stream = await self.async_client.chat.completions.create(
+                    stream=True,
+                    stream_options={"include_usage": True},  # 마지막 청크로 usage 수신
+                    **self._completion_kwargs(user_prompt, model)
+                )
+                async for chunk in stream:
+                    if not chunk.choices:
+                        self._record_usage(getattr(chunk, "usage", None), model)
+                        continue
+                    delta = chunk.choices[0].delta.content
+                    if not delta:
+                        continue
+                    chunks.append(delta)
+                    text = extractor.feed(delta)
+                    if text:
+                        yield text
+                response = "".join(chunks)
+
+            if decision is None:
+                result = self._build_response_result(response, session_summary)
+            else:
+                # 작은 모델 응답이 검증에 실패하면 큰 모델로 재요청 (이미 내보낸 조각과 달라도 최종 결과는 재요청 응답)
+                result, decision = self._validate_routed(response, session_summary, decision, started)
+                while result is None:
+                    started = time.perf_counter()
+                    response = await self._call_gpt_api_async(user_prompt, model=decision.model)
+                    result, decision = self._validate_routed(response, session_summary, decision, started)
+                if decision.escalated and not extractor.value:
+                    yield result.chat
+            self._store_cache(decision, user_command, sheet_hash, session_summary, response)
+        except Exception as e:
+            result = self._build_error_result(e, session_summary)
+            if not extractor.value:
+                yield result.chat
+
+        yield result
+
+    def _parse_locally(self, user_command: str, session_summary: Optional[str]) -> Optional[ResponseResult]:
+        """
+        로컬 파서로 해석할 수 있는 단순한 명령이면 GPT 호출 없이 ResponseResult를 만듭니다.
+
+        Args:
+            user_command: 사용자 명령
+            session_summary: 이전 대화 요약
+
+        Returns:
+            ResponseResult 또는 None (파서가 없거나 LLM으로 처리해야 하는 경우)
+        """
+        if self.parser is None:
+            return None
+        local = self.parser.parse(user_command, session_summary)
+        if local is None:
+            return None
+        return ResponseResult(
+            chat=local.reply,
+            cmd_seq=self._convert_to_excel_commands(local.commands),
+            summary=append_turn_summary(session_summary, f"사용자 요청: {user_command} / 변경: {local.reply}")
+        )
+
+    def _validate_routed(
+            self,
+            response: str,
+            session_summary: Optional[str],
+            decision: RouteDecision,
+            started: float
+    ) -> Tuple[Optional[ResponseResult], RouteDecision]:
+        """
+        라우팅된 모델의 응답을 검증하고 티어별 지표를 기록합니다.
+
+        Args:
+            response: GPT 응답 텍스트
+            session_summary: 이전 대화 요약
+            decision: 호출에 사용한 RouteDecision
+            started: 호출 시작 시각 (time.perf_counter)
+
+        Returns:
+            (ResponseResult, decision) 또는 검증 실패 시 (None, 에스컬레이션한 RouteDecision)
+
+        Raises:
+            Exception: 큰 모델의 응답도 검증에 실패한 경우 (검증 예외를 그대로 전파)
+        """
+        try:
+            result = self._build_response_result(response, session_summary)
+        except Exception:
+            self.router.record(decision, time.perf_counter() - started, self._last_usage, ok=False)
+            escalated = self.router.escalate(decision)
+            if escalated is None:
+                raise
+            return None, escalated
+        self.router.record(decision, time.perf_counter() - started, self._last_usage)
+        return result, decision
+
+    def _sheet_hash(self, excel_bytes: Union[bytes, ParsedWorkbook]) -> Optional[str]:
+        """응답 캐시 키에 넣을 시트 내용 해시를 계산합니다. (캐시를 쓰지 않으면 None)"""
+        if self.cache is None:
+            return None
+        if isinstance(excel_bytes, ParsedWorkbook):
+            return excel_bytes.source_hash
+        return compute_content_hash(excel_bytes)
+
+    def _cache_key(
+            self,
+            model: str,
+            user_command: str,
+            sheet_hash: str,
+            session_summary: Optional[str]
+    ) -> str:
+        """
+        응답 캐시 키를 만듭니다. 같은 요청이라도 응답을 만든 모델이 다르면 키가 다릅니다.
+
+        Args:
+            model: 응답을 만든 모델
+            user_command: 사용자 명령
+            sheet_hash: 시트 내용 해시
+            session_summary: 이전 대화 요약
+
+        Returns:
+            캐시 키
+        """
+        return self.cache.make_key(model, session_summary, user_command, sheet_hash)
+
+    def _lookup_cache(
+            self,
+            decision: Optional[RouteDecision],
+            user_command: str,
+            sheet_hash: Optional[str],
+            session_summary: Optional[str]
+    ) -> Optional[ResponseResult]:
+        """
+        캐시된 응답이 있으면 ResponseResult로 변환해 반환합니다. (변환에 실패한 항목은 무시)
+        라우팅된 모델의 응답을 먼저 찾고, 작은 모델로 라우팅된 요청이면 에스컬레이션했을 때 저장된 큰 모델의 응답도 찾습니다.
+
+        Args:
+            decision: 라우팅 결과 (라우터가 없으면 None)
+            user_command: 사용자 명령
+            sheet_hash: _sheet_hash로 계산한 해시 (캐시를 쓰지 않으면 None)
+            session_summary: 이전 대화 요약
 
-    def _analyze_excel_context(self, excel_bytes: bytes) -> str:
+        Returns:
+            ResponseResult 또는 None
+        """
+        if sheet_hash is None:
+            return None
+        models = [decision.model if decision is not None else LLM_MODEL]
+        if decision is not None and decision.tier != TIER_LARGE:
+            models.append(TIER_MODELS[TIER_LARGE])
+        for model in models:
+            cache_key = self._cache_key(model, user_command, sheet_hash, session_summary)
+            response = self.cache.get(cache_key)
+            if response is None:
+                continue
+            try:
+                result = self._build_response_result(response, session_summary)
+            except Exception as e:
+                print(f"[LLM 캐시] 캐시된 응답을 사용할 수 없습니다: {str(e)}")
+                continue
+            print(f"[LLM 캐시] 적중 model={model} key={cache_key[:12]}")
+            return result
+        return None
+
+    def _store_cache(
+            self,
+            decision: Optional[RouteDecision],
+            user_command: str,
+            sheet_hash: Optional[str],
+            session_summary: Optional[str],
+            response: str
+    ) -> None:
+        """검증을 통과한 GPT 응답을 응답을 만든 모델(에스컬레이션했으면 큰 모델)의 키로 캐시에 저장합니다."""
+        if sheet_hash is None:
+            return
+        model = decision.model if decision is not None else LLM_MODEL
+        self.cache.set(self._cache_key(model, user_command, sheet_hash, session_summary), response)
+
+    def _build_response_result(self, response: str, session_summary: Optional[str]) -> ResponseResult:
+        """
+        GPT 응답 텍스트를 파싱·검증하여 ResponseResult로 변환합니다.
+
+        Args:
+            response: GPT 응답 텍스트 (JSON)
+            session_summary: 이전 대화 요약
+
+        Returns:
+            ResponseResult 객체
+        """
+        # 4. 응답 파싱 및 검증
+        parsed_response = self._parse_gpt_response(response)
+
+        # 5. ExcelCommand 객체 리스트로 변환
+        excel_commands = self._convert_to_excel_commands(parsed_response["commands"])
+
+        # 6. 결과 반환
+        return ResponseResult(
+            chat=parsed_response["response"],
+            cmd_seq=excel_commands,  # ExcelCommand 객체 리스트를 그대로 반환
+            summary=append_turn_summary(session_summary, parsed_response["summary"])
+        )
+
+    def _build_error_result(self, error: Exception, session_summary: Optional[str]) -> ResponseResult:
+        """LLM 처리 중 오류가 발생했을 때의 기본 응답을 만듭니다."""
+        print(f"LLM 처리 중 오류 발생: {str(error)}")
+        return ResponseResult(
+            chat="죄송합니다. 명령을 처리하는 중 오류가 발생했습니다. 다시 시도해주세요.",
+            cmd_seq=[],
+            summary=session_summary or ""
+        )
+
+    def _analyze_excel_context(self, excel_bytes: Union[bytes, ParsedWorkbook]) -> str:
         """
         엑셀 파일을 분석하여 GPT가 이해할 수 있는 텍스트로 변환합니다.
 
         Args:
-            excel_bytes: 엑셀 파일의 바이트 데이터
+            excel_bytes: 엑셀 파일의 바이트 데이터 또는 ParsedWorkbook
+                (ParsedWorkbook을 넘기면 이후 명령어 실행 단계와 파싱 결과를 공유합니다)
 
         Returns:
-            엑셀 파일의 현재 상태를 설명하는 텍스트
+            엑셀 파일의 현재 상태를 설명하는 텍스트 (EXCEL_CONTEXT_TOKEN_BUDGET 이내)
         """
         try:
-            # 엑셀 파일 로드
-            workbook = load_workbook(io.BytesIO(excel_bytes))
-            ws = workbook.active
-
-            # 데이터가 있는 범위 확인
-            max_row = ws.max_row
-            max_col = ws.max_column
-
-            # 데이터 샘플 수집
-            sample_data = []
-            formula_cells = []
-
-            # 최대 100x20 범위까지 샘플링
-            for row in range(1, min(101, max_row + 1)):
-                for col in range(1, min(21, max_col + 1)):
-                    cell = ws.cell(row=row, column=col)
-                    if cell.value is not None:
-                        cell_ref = cell.coordinate
-
-                        # 수식인지 확인
-                        if isinstance(cell.value, str) and cell.value.startswith('='):
-                            formula_cells.append(f"{cell_ref}: {cell.value}")
-                        else:
-                            sample_data.append(f"{cell_ref}: {cell.value}")
-
-            # 컨텍스트 생성
-            return create_excel_context(
-                rows=max_row,
-                cols=max_col,
-                sample_data=sample_data[:2000],  # 최대 2000개 샘플
-                formula_data=formula_cells
-            )
+            # 같은 내용의 시트로 만든 컨텍스트가 캐시에 있으면 파싱 없이 재사용
+            # 없으면 토큰 예산 안에 들어가면 셀 단위로, 넘치면 표 구조·열 통계·행 샘플로 요약
+            return get_excel_context(ensure_parsed_workbook(excel_bytes))
 
         except Exception as e:
             return f"엑셀 파일 분석 중 오류: {str(e)}"
 
-    def _call_gpt_api(self, user_prompt: str) -> str:
+    def _completion_kwargs(self, user_prompt: str, model: Optional[str] = None) -> Dict[str, Any]:
         """
-        OpenAI GPT API를 호출합니다.
+        동기/비동기 GPT 호출에 공통으로 쓰는 요청 인자를 만듭니다.
+        시스템 프롬프트와 응답 스키마는 모든 요청에서 바이트 단위로 같으므로 OpenAI 프롬프트 캐시의 공통 접두부가 되고,
+        요청마다 바뀌는 요약/시트/명령은 사용자 메시지에만 들어갑니다.
 
         Args:
             user_prompt: 사용자 프롬프트
+            model: (선택) 호출할 모델 (기본 LLM_MODEL)
 
         Returns:
-            GPT의 응답 텍스트
+            chat.completions.create에 전달할 인자
         """
-        # API 호출
-        completion = self.client.chat.completions.create(
-            model="gpt-4.1",
+        return dict(
+            model=model or LLM_MODEL,
             messages=[
                 {"role": "system", "content": SYSTEM_PROMPT},
                 {"role": "user", "content": user_prompt}
@@ -166,9 +486,12 @@ class LLMService:
                 "type": "json_schema",
                 "json_schema": RESPONSE_SCHEMA["json_schema"]  # 내부 json_schema만 넘겨야 함
             },
-            temperature=0.7
+            temperature=self.temperature,
+            timeout=self.request_timeout
         )
 
+    def _extract_content(self, completion) -> str:
+        """GPT 응답 객체에서 본문 텍스트를 꺼냅니다."""
         response = completion.choices[0].message
         # If the model refuses to respond, you will get a refusal message
         if(response.refusal):
@@ -179,6 +502,47 @@ class LLMService:
         # 응답 반환
         return response.content
 
+    def _call_gpt_api(self, user_prompt: str, model: Optional[str] = None) -> str:
+        """
+        OpenAI GPT API를 호출합니다.
+
+        Args:
+            user_prompt: 사용자 프롬프트
+            model: (선택) 호출할 모델 (기본 LLM_MODEL)
+
+        Returns:
+            GPT의 응답 텍스트
+        """
+        # API 호출
+        completion = self.client.chat.completions.create(**self._completion_kwargs(user_prompt, model))
+        self._record_usage(completion.usage, model)
+        return self._extract_content(completion)
+
+    async def _call_gpt_api_async(self, user_prompt: str, model: Optional[str] = None) -> str:
+        """
+        OpenAI GPT API를 비동기로 호출합니다.
+        비동기 클라이언트가 없으면 동기 호출을 별도 스레드에서 실행합니다.
+
+        Args:
+            user_prompt: 사용자 프롬프트
+            model: (선택) 호출할 모델 (기본 LLM_MODEL)
+
+        Returns:
+            GPT의 응답 텍스트
+        """
+        if self.async_client is None:
+            if model is None:
+                return await asyncio.to_thread(self._call_gpt_api, user_prompt)
+            return await asyncio.to_thread(self._call_gpt_api, user_prompt, model)
+
+        completion = await self.async_client.chat.completions.create(**self._completion_kwargs(user_prompt, model))
+        self._record_usage(completion.usage, model)
+        return self._extract_content(completion)
+
+    def _record_usage(self, usage: Any, model: Optional[str] = None) -> None:
+        """응답 usage(프롬프트/캐시 적중/생성 토큰 수)를 공유 지표에 기록합니다. (라우터 지표용으로 마지막 기록 보관)"""
+        self._last_usage = llm_client_manager.usage.record(usage, model=model or LLM_MODEL)
+
     def _parse_gpt_response(self, response: str) -> Dict[str, Any]:
         """
         GPT의 응답을 파싱하여 딕셔너리로 변환합니다.
@@ -203,16 +567,8 @@ class LLMService:
                 if field not in parsed:
                     raise ValueError(f"필수 필드 누락: {field}")
 
-            # commands가 리스트인지 확인
-            if not isinstance(parsed["commands"], list):
-                raise ValueError("commands는 리스트여야 합니다")
-
-            # 각 명령어 검증
-            for cmd in parsed["commands"]:
-                if not all(key in cmd for key in ["command_type", "target_cell", "parameters"]):
-                    raise ValueError("명령어에 필수 필드가 누락되었습니다")
-                if not isinstance(cmd["parameters"], list):
-                    raise ValueError("parameters는 배열이어야 합니다")
+            # 명령어 검증 및 정규화 (compact 형식 배열과 범위 채우기는 셀별 명령어로 펼침)
+            parsed["commands"] = normalize_commands(parsed["commands"])
 
             return parsed
 
@@ -230,7 +586,8 @@ class LLMService:
         round 명령어는 항상 리스트의 맨 뒤로 이동시킵니다.
 
         Args:
-            commands: 파싱된 명령어 딕셔너리 리스트
+            commands: object 형식 명령어 딕셔너리 리스트 (GPT 응답은 _parse_gpt_response에서 normalize_commands로
+                정규화된 것, 로컬 파서 결과는 처음부터 object 형식)
 
         Returns:
             ExcelCommand 객체 리스트 (round 명령어는 맨 뒤에 위치)
@@ -433,12 +790,14 @@ class LLMService:
 
         if command_type == "substitute":
             if len(parameters) >= 3:
-                return {
+                result = {
                     "source": parameters[0],
                     "old_text": parameters[1],
-                    "new_text": parameters[2],
-                    "Instance_number": parameters[3]
+                    "new_text": parameters[2]
                 }
+                if len(parameters) >= 4:
+                    result["Instance_number"] = parameters[3]
+                return result
             return {}
 
         if command_type in ["concatenate", "&"]:
@@ -478,12 +837,31 @@ class LLMService:
             # ISBLANK(value)
             return {"value": parameters[0]} if parameters else {}
 
+        if command_type == "fill_value":
+            return {"value": parameters[0]} if parameters else {}
+
+        if command_type == "fill_series":
+            # [시작 값, 증가량(기본 1), 날짜 단위(기본 day)]
+            return {
+                "start": parameters[0],
+                "step": parameters[1] if len(parameters) > 1 else 1,
+                "unit": parameters[2] if len(parameters) > 2 else "day",
+            } if parameters else {}
+
+        if command_type == "fill_formula":
+            return {"formula": parameters[0]} if parameters else {}
+
         return {}
 
+def _default_parser() -> Optional[LocalCommandParser]:
+    """진입점 함수가 사용할 로컬 명령어 파서 (LOCAL_COMMAND_PARSER=0이면 None)"""
+    return local_command_parser if LOCAL_COMMAND_PARSER_ENABLED else None
+
+
 # 모듈 레벨 함수로 export
 def get_llm_response(
         user_command: str,
-        excel_bytes: bytes,
+        excel_bytes: Union[bytes, ParsedWorkbook],
         session_summary: Optional[str] = None
 ) -> ResponseResult:
     """
@@ -491,11 +869,68 @@ def get_llm_response(
 
     Args:
         user_command: 사용자가 입력한 자연어 명령
-        excel_bytes: 현재 엑셀 파일의 바이트 데이터
+        excel_bytes: 현재 엑셀 파일의 바이트 데이터 또는 ParsedWorkbook
         session_summary: 이전 대화 요약 (옵션)
 
     Returns:
         ResponseResult: LLM 응답 결과
     """
-    service = LLMService()
-    return service.get_llm_response(user_command, excel_bytes, session_summary)
\ No newline at end of file
+    # 앱 시작 시 생성된 공유 클라이언트(커넥션 풀)를 재사용 (없으면 LLMService가 직접 생성)
+    service = LLMService(
+        client=llm_client_manager.client,
+        cache=llm_response_cache,
+        parser=_default_parser(),
+        router=model_router
+    )
+    return service.get_llm_response(user_command, excel_bytes, session_summary)
+
+async def get_llm_response_async(
+        user_command: str,
+        excel_bytes: Union[bytes, ParsedWorkbook],
+        session_summary: Optional[str] = None
+) -> ResponseResult:
+    """
+    LLM 서비스의 비동기 진입점 함수
+
+    Args:
+        user_command: 사용자가 입력한 자연어 명령
+        excel_bytes: 현재 엑셀 파일의 바이트 데이터 또는 ParsedWorkbook
+        session_summary: 이전 대화 요약 (옵션)
+
+    Returns:
+        ResponseResult: LLM 응답 결과
+    """
+    service = LLMService(
+        client=llm_client_manager.client,
+        async_client=llm_client_manager.async_client,
+        cache=llm_response_cache,
+        parser=_default_parser(),
+        router=model_router
+    )
+    return await service.get_llm_response_async(user_command, excel_bytes, session_summary)
+
+
+def stream_llm_response_async(
+        user_command: str,
+        excel_bytes: Union[bytes, ParsedWorkbook],
+        session_summary: Optional[str] = None
+) -> AsyncIterator[Union[str, ResponseResult]]:
+    """
+    LLM 서비스의 스트리밍 진입점 함수
+
+    Args:
+        user_command: 사용자가 입력한 자연어 명령
+        excel_bytes: 현재 엑셀 파일의 바이트 데이터 또는 ParsedWorkbook
+        session_summary: 이전 대화 요약 (옵션)
+
+    Returns:
+        AsyncIterator: 응답 텍스트 조각(str)들과 마지막 ResponseResult
+    """
+    service = LLMService(
+        client=llm_client_manager.client,
+        async_client=llm_client_manager.async_client,
+        cache=llm_response_cache,
+        parser=_default_parser(),
+        router=model_router
+    )
+    return service.stream_llm_response_async(user_command, excel_bytes, session_summary)
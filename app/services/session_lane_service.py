@@ -0,0 +1,92 @@
+# app/services/session_lane_service.py
+"""
+세션 실행 레인(lane)
+같은 채팅 세션의 메시지 처리(시트 읽기 → LLM → 명령어 실행 → 시트 저장)를 도착 순서대로 하나씩 실행합니다.
+서로 다른 세션은 레인이 달라 그대로 병렬로 실행됩니다.
+
+레인을 거치는 것은 비동기 메시지 처리 경로(chat_service.save_message_and_response_async,
+stream_message_and_response, 이를 쓰는 job 워커)뿐입니다. 동기 경로(save_message_and_response, create_session)는
+레인 없이 실행되고 아래의 버전 검사로만 보호됩니다.
+
+레인의 잠금은 asyncio.Lock이므로 모든 hold() 호출이 같은 이벤트 루프(서버의 이벤트 루프)에서 일어난다고 가정합니다.
+다른 스레드나 다른 이벤트 루프에서 같은 세션의 레인을 잡으면 직렬화되지 않거나 RuntimeError가 납니다.
+
+레인은 한 프로세스 안에서만 직렬화합니다. 여러 서버 프로세스(워커) 사이의 동시 저장은
+ChatSheet.version을 이용한 낙관적 동시성 검사(chat_service.upsert_chat_sheet)가 409로 막습니다.
+"""
+import asyncio
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict
+
+
+class _Lane:
+    """세션 하나의 레인 (잠금과 대기/실행 중인 요청 수)"""
+
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        self.holders = 0
+
+
+class SessionLanes:
+    """
+    세션 ID별 asyncio 잠금으로 같은 세션의 요청을 직렬화합니다. (한 이벤트 루프 안에서만 사용)
+    대기/실행 중인 요청이 없는 세션의 레인은 바로 제거하므로 세션 수만큼 잠금이 쌓이지 않습니다.
+    """
+
+    def __init__(self):
+        self._lanes: Dict[int, _Lane] = {}
+        self._lock = threading.Lock()
+        self.acquired = 0
+        self.contended = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    @asynccontextmanager
+    async def hold(self, session_id: int) -> AsyncIterator[None]:
+        """
+        세션 레인을 잡고 있는 동안 같은 세션의 다른 요청은 대기합니다.
+
+        Args:
+            session_id: 채팅 세션 ID
+        """
+        with self._lock:
+            lane = self._lanes.setdefault(session_id, _Lane())
+            lane.holders += 1
+            contended = lane.holders > 1
+
+        started = time.perf_counter()
+        try:
+            async with lane.lock:
+                self._record(contended, time.perf_counter() - started)
+                yield
+        finally:
+            with self._lock:
+                lane.holders -= 1
+                if lane.holders == 0 and self._lanes.get(session_id) is lane:
+                    del self._lanes[session_id]
+
+    def _record(self, contended: bool, wait: float) -> None:
+        with self._lock:
+            self.acquired += 1
+            if contended:
+                self.contended += 1
+                self.total_wait += wait
+                self.max_wait = max(self.max_wait, wait)
+                print(f"[세션 레인] 같은 세션의 이전 요청을 {wait * 1000:.1f}ms 기다림")
+
+    def stats(self) -> Dict[str, Any]:
+        """활성 레인 수, 대기 중인 요청 수, 대기 횟수와 대기 시간(ms)을 반환합니다."""
+        with self._lock:
+            return {
+                "active_lanes": len(self._lanes),
+                "waiting": sum(lane.holders - 1 for lane in self._lanes.values() if lane.holders > 1),
+                "acquired": self.acquired,
+                "contended": self.contended,
+                "avg_wait_ms": round(self.total_wait / self.contended * 1000, 2) if self.contended else 0.0,
+                "max_wait_ms": round(self.max_wait * 1000, 2),
+            }
+
+
+session_lanes = SessionLanes()
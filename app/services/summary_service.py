@@ -0,0 +1,393 @@
+# app/services/summary_service.py
+"""
+세션 요약 관리 서비스
+ChatSession.summary가 대화가 길어질수록 끝없이 늘어나지 않도록,
+최근 요청별 요약(토큰 예산 내 윈도)과 오래된 요약을 압축한 다이제스트로 나누어 관리합니다.
+
+- 매 턴 LLM이 만든 요약을 윈도에 추가하고, 윈도가 예산(SUMMARY_WINDOW_TOKENS)을 넘으면
+  오래된 요약을 압축 대기(pending)로 옮깁니다. 프롬프트에는 다이제스트(압축 전 pending 포함)와 윈도만
+  각자의 토큰 예산 안에서 들어갑니다.
+- 압축(pending → digest)은 요청 경로 밖의 백그라운드 스레드에서 LLM으로 수행합니다.
+  압축이 밀려 pending이 상한을 넘으면 요청 경로에서 단순 절단 방식으로 즉시 합칩니다.
+- 이전 형식("... [end] ... [end] ")의 요약 문자열도 읽을 수 있습니다.
+"""
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from app.services.llm_prompt_service import SUMMARY_COMPACTION_PROMPT
+from app.utils.token_estimate import estimate_tokens, truncate_to_tokens
+
+SUMMARY_FORMAT_VERSION = 1
+LEGACY_TURN_SEPARATOR = "[end]"
+
+SUMMARY_WINDOW_TOKENS = int(os.getenv("SUMMARY_WINDOW_TOKENS", "800"))
+SUMMARY_DIGEST_TOKENS = int(os.getenv("SUMMARY_DIGEST_TOKENS", "400"))
+SUMMARY_COMPACTION_MODEL = os.getenv("SUMMARY_COMPACTION_MODEL", "gpt-4.1-mini")
+# 백그라운드 압축이 밀렸을 때 요청 경로에서 즉시 합치는 pending 상한
+SUMMARY_PENDING_MAX_TOKENS = SUMMARY_WINDOW_TOKENS * 4
+
+
+class SessionSummary:
+    """
+    세션 요약 구조
+    digest(압축된 오래된 요약), turns(최근 요청별 요약 윈도), pending(압축 대기 요약)으로 구성됩니다.
+    각 턴은 {"text": 요약, "tokens": 추정 토큰 수} 형태입니다.
+    """
+
+    def __init__(
+            self,
+            digest: str = "",
+            turns: Optional[List[Dict[str, Any]]] = None,
+            pending: Optional[List[Dict[str, Any]]] = None
+    ):
+        self.digest = digest
+        self.turns = turns or []
+        self.pending = pending or []
+
+    @classmethod
+    def parse(cls, raw: Optional[str]) -> "SessionSummary":
+        """
+        DB에 저장된 요약 문자열을 읽습니다. JSON 형식이 아니면 이전 "[end]" 구분 형식으로 해석합니다.
+
+        Args:
+            raw: ChatSession.summary 값
+
+        Returns:
+            SessionSummary 객체
+        """
+        if not raw or not raw.strip():
+            return cls()
+
+        if raw.lstrip().startswith("{"):
+            try:
+                data = json.loads(raw)
+            except ValueError:
+                data = None
+            if isinstance(data, dict) and data.get("format") == SUMMARY_FORMAT_VERSION:
+                return cls(
+                    digest=data.get("digest", ""),
+                    turns=data.get("turns", []),
+                    pending=data.get("pending", []),
+                )
+
+        texts = [part.strip() for part in raw.split(LEGACY_TURN_SEPARATOR)]
+        return cls(turns=[_make_turn(text) for text in texts if text])
+
+    def serialize(self) -> str:
+        """DB에 저장할 JSON 문자열로 변환합니다."""
+        return json.dumps({
+            "format": SUMMARY_FORMAT_VERSION,
+            "digest": self.digest,
+            "turns": self.turns,
+            "pending": self.pending,
+        }, ensure_ascii=False)
+
+    @property
+    def window_tokens(self) -> int:
+        return sum(turn["tokens"] for turn in self.turns)
+
+    @property
+    def pending_tokens(self) -> int:
+        return sum(turn["tokens"] for turn in self.pending)
+
+    @property
+    def digest_tokens(self) -> int:
+        return estimate_tokens(self.digest)
+
+    @property
+    def needs_compaction(self) -> bool:
+        """압축 대기 중인 요약이 있는지 여부"""
+        return bool(self.pending)
+
+    def append_turn(self, text: str, window_tokens: Optional[int] = None) -> Dict[str, Any]:
+        """
+        이번 턴의 요약을 윈도에 추가하고, 예산을 넘는 오래된 턴을 pending으로 옮깁니다.
+
+        Args:
+            text: 이번 턴의 요약
+            window_tokens: 윈도 토큰 예산 (기본 SUMMARY_WINDOW_TOKENS)
+
+        Returns:
+            추가된 턴 {"text", "tokens"}
+        """
+        budget = SUMMARY_WINDOW_TOKENS if window_tokens is None else window_tokens
+        turn = _make_turn(text.strip())
+        if turn["text"]:
+            self.turns.append(turn)
+
+        # 최신 턴 하나는 예산을 넘더라도 윈도에 남김
+        while len(self.turns) > 1 and self.window_tokens > budget:
+            self.pending.append(self.turns.pop(0))
+
+        if self.pending_tokens > SUMMARY_PENDING_MAX_TOKENS:
+            self.fold_pending(truncate_digest)
+        return turn
+
+    def fold_pending(self, summarize: Callable[[str, List[str]], str], count: Optional[int] = None) -> None:
+        """
+        pending의 앞쪽 count개 요약을 다이제스트에 합칩니다.
+
+        Args:
+            summarize: (기존 다이제스트, 합칠 요약 목록) → 새 다이제스트
+            count: 합칠 개수 (기본 전체)
+        """
+        count = len(self.pending) if count is None else count
+        folded = [turn["text"] for turn in self.pending[:count]]
+        if not folded:
+            return
+        self.digest = truncate_to_tokens(summarize(self.digest, folded), SUMMARY_DIGEST_TOKENS)
+        self.pending = self.pending[count:]
+
+    def render(self) -> str:
+        """
+        프롬프트에 넣을 요약 텍스트를 만듭니다. (다이제스트 + 압축 전 pending 일부 + 최근 윈도)
+
+        Returns:
+            요약 텍스트 (요약이 없으면 빈 문자열)
+        """
+        sections = []
+        older = self.digest
+        if self.pending:
+            # 압축이 끝나기 전에도 정보가 빠지지 않도록 pending을 다이제스트 예산 안에서 덧붙임
+            pending_text = "\n".join(turn["text"] for turn in self.pending)
+            older = truncate_to_tokens(f"{older}\n{pending_text}".strip(), SUMMARY_DIGEST_TOKENS)
+        if older:
+            sections.append(f"[이전 대화 압축 요약]\n{older}")
+        if self.turns:
+            recent = "\n".join(f"{index}. {turn['text']}" for index, turn in enumerate(self.turns, start=1))
+            sections.append(f"[최근 요청별 요약 (번호가 클수록 최신)]\n{recent}")
+        return "\n\n".join(sections)
+
+
+def _make_turn(text: str) -> Dict[str, Any]:
+    return {"text": text, "tokens": estimate_tokens(text)}
+
+
+def truncate_digest(digest: str, texts: List[str]) -> str:
+    """LLM 없이 다이제스트와 요약들을 이어 붙입니다. (예산 초과분은 fold_pending에서 앞부분부터 절단)"""
+    return "\n".join(part for part in [digest, *texts] if part)
+
+
+def render_summary(raw: Optional[str]) -> str:
+    """
+    저장된 요약 문자열을 프롬프트용 텍스트로 변환합니다.
+
+    Args:
+        raw: ChatSession.summary 값
+
+    Returns:
+        프롬프트용 요약 텍스트
+    """
+    return SessionSummary.parse(raw).render()
+
+
+def append_turn_summary(raw: Optional[str], turn_summary: str) -> str:
+    """
+    저장된 요약에 이번 턴의 요약을 추가하고 직렬화된 문자열을 반환합니다.
+
+    Args:
+        raw: 이전 ChatSession.summary 값
+        turn_summary: 이번 턴에 LLM이 만든 요약
+
+    Returns:
+        새 ChatSession.summary 값
+    """
+    summary = SessionSummary.parse(raw)
+    turn = summary.append_turn(turn_summary)
+    print(
+        f"[요약] turn_tokens={turn['tokens']} window_tokens={summary.window_tokens} "
+        f"pending_tokens={summary.pending_tokens} digest_tokens={summary.digest_tokens}"
+    )
+    return summary.serialize()
+
+
+class SummaryCompactor:
+    """
+    백그라운드 요약 압축기
+    요청이 커밋된 뒤 schedule()로 세션을 등록하면, 전용 스레드에서 pending 요약을 LLM으로 다이제스트에 합칩니다.
+    압축 중 다른 요청이 요약을 바꿨다면 압축한 부분만 반영하고(비교 후 갱신), 충돌하면 다음 턴으로 미룹니다.
+    """
+
+    def __init__(self, session_factory: Optional[Callable[[], Any]] = None):
+        """
+        Args:
+            session_factory: (선택) 백그라운드 작업용 DB 세션 생성 함수 (기본 app.database.SessionFactory)
+        """
+        self._session_factory = session_factory
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._in_flight: Set[int] = set()
+        self._lock = threading.Lock()
+
+        self.scheduled = 0
+        self.compactions = 0
+        self.conflicts = 0
+        self.failures = 0
+        self.tokens_folded = 0
+
+    def schedule(self, session_id: int) -> bool:
+        """
+        세션의 요약 압축을 백그라운드로 예약합니다. 이미 진행 중이면 무시합니다.
+
+        Args:
+            session_id: 채팅 세션 ID
+
+        Returns:
+            예약 여부
+        """
+        with self._lock:
+            if session_id in self._in_flight:
+                return False
+            self._in_flight.add(session_id)
+            self.scheduled += 1
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="summary-compactor")
+            executor = self._executor
+        executor.submit(self._run, session_id)
+        return True
+
+    def _run(self, session_id: int) -> None:
+        try:
+            self.compact_session(session_id)
+        except Exception as e:
+            with self._lock:
+                self.failures += 1
+            print(f"[요약] session={session_id} 압축 실패: {str(e)}")
+        finally:
+            with self._lock:
+                self._in_flight.discard(session_id)
+
+    def compact_session(self, session_id: int, summarize: Optional[Callable[[str, List[str]], str]] = None) -> bool:
+        """
+        세션의 pending 요약을 다이제스트에 합쳐 저장합니다.
+
+        Args:
+            session_id: 채팅 세션 ID
+            summarize: (선택) 요약 함수. 생략하면 LLM 압축(실패 시 절단 방식)을 사용
+
+        Returns:
+            저장 여부 (압축할 내용이 없거나 충돌하면 False)
+        """
+        from app.models import ChatSession
+
+        db = self._get_session_factory()()
+        try:
+            raw = db.query(ChatSession.summary).filter(ChatSession.id == session_id).scalar()
+            summary = SessionSummary.parse(raw)
+            if not summary.needs_compaction:
+                return False
+
+            folded_turns = list(summary.pending)
+            before_tokens = summary.pending_tokens + summary.digest_tokens
+            summary.fold_pending(summarize or compact_with_llm)
+
+            # 압축하는 동안 요약이 바뀌었으면, 압축한 pending이 그대로 앞에 남아 있을 때만 반영
+            current_raw = db.query(ChatSession.summary).filter(ChatSession.id == session_id).scalar()
+            if current_raw != raw:
+                current = SessionSummary.parse(current_raw)
+                if current.pending[:len(folded_turns)] != folded_turns:
+                    with self._lock:
+                        self.conflicts += 1
+                    return False
+                current.digest = summary.digest
+                current.pending = current.pending[len(folded_turns):]
+                summary = current
+
+            updated = (
+                db.query(ChatSession)
+                .filter(ChatSession.id == session_id, ChatSession.summary == current_raw)
+                .update({ChatSession.summary: summary.serialize()}, synchronize_session=False)
+            )
+            if not updated:
+                db.rollback()
+                with self._lock:
+                    self.conflicts += 1
+                return False
+
+            db.commit()
+            with self._lock:
+                self.compactions += 1
+                self.tokens_folded += max(before_tokens - summary.digest_tokens, 0)
+            print(f"[요약] session={session_id} 압축 완료 digest_tokens={summary.digest_tokens}")
+            return True
+        finally:
+            db.close()
+
+    def _get_session_factory(self) -> Callable[[], Any]:
+        if self._session_factory is None:
+            from app.database import SessionFactory
+            self._session_factory = SessionFactory
+        return self._session_factory
+
+    def shutdown(self) -> None:
+        """백그라운드 스레드를 정리합니다. (진행 중인 압축은 끝까지 실행)"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def stats(self) -> Dict[str, Any]:
+        """압축기 지표를 반환합니다."""
+        with self._lock:
+            return {
+                "in_flight": len(self._in_flight),
+                "scheduled": self.scheduled,
+                "compactions": self.compactions,
+                "conflicts": self.conflicts,
+                "failures": self.failures,
+                "tokens_folded": self.tokens_folded,
+            }
+
+
+def compact_with_llm(digest: str, texts: List[str]) -> str:
+    """
+    LLM으로 기존 다이제스트와 오래된 요청별 요약을 하나의 다이제스트로 압축합니다.
+    공유 클라이언트가 없거나 호출에 실패하면 절단 방식으로 합칩니다.
+
+    Args:
+        digest: 기존 다이제스트
+        texts: 합칠 요약 목록 (오래된 순)
+
+    Returns:
+        새 다이제스트
+    """
+    from app.services.llm_client_service import llm_client_manager
+
+    client = llm_client_manager.client
+    if client is None:
+        return truncate_digest(digest, texts)
+
+    summaries = "\n".join(f"- {text}" for text in texts)
+    try:
+        completion = client.chat.completions.create(
+            model=SUMMARY_COMPACTION_MODEL,
+            messages=[
+                {"role": "system", "content": SUMMARY_COMPACTION_PROMPT.format(max_tokens=SUMMARY_DIGEST_TOKENS)},
+                {"role": "user", "content": f"기존 압축 요약:\n{digest or '없음'}\n\n추가할 요약:\n{summaries}"}
+            ],
+            temperature=0,
+            timeout=llm_client_manager.request_timeout
+        )
+        llm_client_manager.usage.record(completion.usage, model=SUMMARY_COMPACTION_MODEL, purpose="summary")
+        content = completion.choices[0].message.content
+    except Exception as e:
+        print(f"[요약] LLM 압축 실패, 절단 방식 사용: {str(e)}")
+        return truncate_digest(digest, texts)
+    return (content or "").strip() or truncate_digest(digest, texts)
+
+
+summary_compactor = SummaryCompactor()
+
+
+def schedule_summary_compaction(session_id: int, raw: Optional[str]) -> None:
+    """
+    요약에 압축 대기 항목이 있으면 백그라운드 압축을 예약합니다. (요청 커밋 후 호출)
+
+    Args:
+        session_id: 채팅 세션 ID
+        raw: 방금 저장한 ChatSession.summary 값
+    """
+    if SessionSummary.parse(raw).needs_compaction:
+        summary_compactor.schedule(session_id)
@@ -0,0 +1,397 @@
+# app/services/workbook_service.py
+"""
+워크북 파싱 서비스
+하나의 요청 안에서 엑셀 바이트를 한 번만 파싱하여 LLM 분석과 명령어 실행이 공유하도록 하고,
+세션별로 파싱된 워크북을 프로세스 내 LRU 캐시에 보관하여 후속 메시지의 재파싱을 생략합니다.
+"""
+import hashlib
+import io
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional, Union, Dict, Any, List, Iterable
+
+from openpyxl import load_workbook, Workbook
+
+from app.services.formula_service import cached_value_writer
+
+# 셀 1개당 메모리 사용량 추정치 (openpyxl Cell 객체 + 값)
+CELL_MEMORY_ESTIMATE = 256
+
+
+def compute_content_hash(excel_bytes: bytes) -> str:
+    """
+    엑셀 바이트 데이터의 내용 해시를 계산합니다.
+
+    Args:
+        excel_bytes: 엑셀 파일의 바이트 데이터
+
+    Returns:
+        SHA-256 해시 문자열
+    """
+    return hashlib.sha256(excel_bytes).hexdigest()
+
+
+class ParsedWorkbook:
+    """
+    요청 단위(request-scoped) 워크북 객체
+    원본 바이트를 최초 접근 시 한 번만 파싱하고, 저장도 한 번만 수행합니다.
+    parse_count / save_count 로 요청당 파싱·직렬화 횟수를 확인할 수 있습니다.
+    """
+
+    def __init__(
+            self,
+            excel_bytes: bytes,
+            workbook: Optional[Workbook] = None,
+            content_hash: Optional[str] = None
+    ):
+        """
+        Args:
+            excel_bytes: 원본 엑셀 파일의 바이트 데이터
+            workbook: (선택) 이미 파싱된 워크북 (캐시 적중 시 전달, 파싱 생략)
+            content_hash: (선택) excel_bytes의 내용 해시
+        """
+        self.source_bytes = excel_bytes
+        self.parse_count = 0
+        self.save_count = 0
+        self.cache_hit = workbook is not None
+        self._workbook: Optional[Workbook] = workbook
+        self._source_hash = content_hash
+        self._saved_bytes: Optional[bytes] = None
+        self._saved_hash: Optional[str] = None
+        self._modified = False
+
+        # 이번 요청에서 명령어가 변경한 셀 주소와 병합 변경 내역 (셀 단위 diff 응답에 사용)
+        self.touched_cells: List[str] = []
+        self.merged_ranges: List[str] = []
+        self.unmerged_ranges: List[str] = []
+        # 변경된 셀의 영향으로 다시 계산된 활성 시트의 하위 수식 셀 주소 (셀 단위 diff 응답에 사용)
+        self.recalculated_cells: List[str] = []
+        # 재계산 중 감지된 순환 참조 셀 ("Sheet!A1" 형태)
+        self.circular_references: List[str] = []
+        # touched_cells로 추적하지 못한 변경이 있었는지 여부 (증분 갱신 대신 전체 재계산 필요)
+        self.untracked_changes = False
+        # 다른 프로세스(엑셀 프로세스 워커)에서 미리 만든 셀 단위 변경 목록 {"sheetName", "changes"}
+        self.cell_changes: Optional[Dict[str, Any]] = None
+
+    @property
+    def workbook(self) -> Workbook:
+        """파싱된 openpyxl 워크북 (최초 접근 시에만 파싱)"""
+        if self._workbook is None:
+            self._workbook = load_workbook(io.BytesIO(self.source_bytes))
+            self.parse_count += 1
+        return self._workbook
+
+    @property
+    def is_parsed(self) -> bool:
+        """워크북이 이미 파싱되었는지 여부"""
+        return self._workbook is not None
+
+    @property
+    def source_hash(self) -> str:
+        """원본 바이트의 내용 해시"""
+        if self._source_hash is None:
+            self._source_hash = compute_content_hash(self.source_bytes)
+        return self._source_hash
+
+    @property
+    def content_hash(self) -> str:
+        """현재 상태(save() 결과)의 내용 해시 (수정되지 않았으면 원본 해시)"""
+        saved_bytes = self.save()
+        if saved_bytes is self.source_bytes:
+            return self.source_hash
+        if self._saved_hash is None:
+            self._saved_hash = compute_content_hash(saved_bytes)
+        return self._saved_hash
+
+    def record_changes(
+            self,
+            touched_cells: Iterable[str],
+            merged_ranges: Iterable[str] = (),
+            unmerged_ranges: Iterable[str] = ()
+    ) -> None:
+        """
+        명령어 실행으로 변경된 셀 주소와 병합 변경 내역을 누적 기록합니다.
+
+        Args:
+            touched_cells: 변경된 셀 주소 목록
+            merged_ranges: 병합된 범위 목록
+            unmerged_ranges: 병합 해제된 범위 목록
+        """
+        seen = set(self.touched_cells)
+        for coordinate in touched_cells:
+            if coordinate not in seen:
+                seen.add(coordinate)
+                self.touched_cells.append(coordinate)
+        self.merged_ranges.extend(merged_ranges)
+        self.unmerged_ranges.extend(unmerged_ranges)
+
+    def record_recalculated(self, coordinates: Iterable[str]) -> None:
+        """
+        재계산된 하위 수식 셀 주소를 누적 기록합니다.
+
+        Args:
+            coordinates: 재계산된 셀 주소 목록
+        """
+        seen = set(self.recalculated_cells)
+        for coordinate in coordinates:
+            if coordinate not in seen:
+                seen.add(coordinate)
+                self.recalculated_cells.append(coordinate)
+
+    @property
+    def delta_cells(self) -> List[str]:
+        """셀 단위 diff에 넣을 셀 주소 (명령어가 변경한 셀, 이어서 재계산된 하위 수식 셀)"""
+        touched = set(self.touched_cells)
+        return self.touched_cells + [coordinate for coordinate in self.recalculated_cells if coordinate not in touched]
+
+    def replace_source(self, excel_bytes: bytes, content_hash: Optional[str] = None) -> None:
+        """
+        다른 프로세스에서 수정·저장된 결과로 원본 바이트를 교체합니다.
+        이 프로세스에서 파싱한 워크북은 더 이상 최신이 아니므로 버리고, 필요할 때 새 바이트로 다시 파싱합니다.
+
+        Args:
+            excel_bytes: 수정된 엑셀 바이트 데이터
+            content_hash: (선택) excel_bytes의 내용 해시
+        """
+        self.source_bytes = excel_bytes
+        self._source_hash = content_hash
+        self._workbook = None
+        self.cache_hit = False
+        self._modified = False
+        self._saved_bytes = None
+        self._saved_hash = None
+
+    def mark_modified(self) -> None:
+        """워크북이 수정되었음을 표시합니다. 다음 save() 호출 시 다시 직렬화됩니다."""
+        self._modified = True
+        self._saved_bytes = None
+        self._saved_hash = None
+
+    def save(self) -> bytes:
+        """
+        워크북을 바이트 데이터로 저장합니다.
+        수정되지 않았다면 원본 바이트를 그대로 반환하고, 같은 상태에서는 한 번만 직렬화합니다.
+
+        Returns:
+            엑셀 파일의 바이트 데이터
+        """
+        if not self._modified:
+            return self.source_bytes
+
+        if self._saved_bytes is None:
+            output = io.BytesIO()
+            # 수식 셀의 계산 값을 캐시 값(<v>)으로 함께 기록
+            with cached_value_writer():
+                self.workbook.save(output)
+            self._saved_bytes = output.getvalue()
+            self.save_count += 1
+        return self._saved_bytes
+
+
+def ensure_parsed_workbook(excel_data: Union[bytes, ParsedWorkbook]) -> ParsedWorkbook:
+    """
+    바이트 데이터 또는 ParsedWorkbook을 받아 ParsedWorkbook으로 반환합니다.
+
+    Args:
+        excel_data: 엑셀 바이트 데이터 또는 이미 생성된 ParsedWorkbook
+
+    Returns:
+        ParsedWorkbook 객체
+    """
+    if isinstance(excel_data, ParsedWorkbook):
+        return excel_data
+    return ParsedWorkbook(excel_data)
+
+
+class _CacheEntry:
+    """WorkbookCache 내부 항목"""
+
+    __slots__ = ("content_hash", "workbook", "size")
+
+    def __init__(self, content_hash: str, workbook: Workbook, size: int):
+        self.content_hash = content_hash
+        self.workbook = workbook
+        self.size = size
+
+
+class WorkbookCache:
+    """
+    세션별 파싱된 워크북 LRU 캐시
+    (세션 ID, 시트 내용 해시)를 키로 openpyxl Workbook 객체를 보관합니다.
+
+    - 세션당 최신 워크북 하나만 보관하며, 다른 해시의 시트가 들어오면 기존 항목을 무효화합니다.
+    - 항목 수(max_entries)와 추정 메모리(max_bytes) 한도를 넘으면 가장 오래 사용되지 않은 항목부터 제거합니다.
+    - checkout()은 항목을 캐시에서 꺼내 요청에 소유권을 넘깁니다. 요청이 성공하면 store()로 다시 넣고,
+      실패하면 꺼낸 상태로 버려지므로 반쯤 수정된 워크북이 캐시에 남지 않습니다.
+    """
+
+    def __init__(self, max_entries: int = 32, max_bytes: int = 512 * 1024 * 1024):
+        """
+        Args:
+            max_entries: 최대 보관 세션 수
+            max_bytes: 최대 추정 메모리 사용량 (바이트)
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[int, _CacheEntry]" = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        """캐시 사용 여부 (한도가 0이면 비활성)"""
+        return self.max_entries > 0 and self.max_bytes > 0
+
+    def checkout(self, session_id: int, content_hash: str) -> Optional[Workbook]:
+        """
+        캐시에서 워크북을 꺼냅니다. 적중하면 항목은 캐시에서 제거됩니다.
+
+        Args:
+            session_id: 채팅 세션 ID
+            content_hash: 요청 시트의 내용 해시
+
+        Returns:
+            적중 시 Workbook, 아니면 None
+        """
+        with self._lock:
+            entry = self._entries.pop(session_id, None)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self._total_bytes -= entry.size
+            if entry.content_hash != content_hash:
+                # 다른 시트가 업로드됨 → 기존 항목 무효화
+                self.invalidations += 1
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            return entry.workbook
+
+    def store(self, session_id: int, content_hash: str, workbook: Workbook) -> None:
+        """
+        워크북을 캐시에 보관합니다.
+
+        Args:
+            session_id: 채팅 세션 ID
+            content_hash: 저장된 시트 바이트의 내용 해시
+            workbook: 보관할 Workbook
+        """
+        if not self.enabled:
+            return
+
+        size = estimate_workbook_size(workbook)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            previous = self._entries.pop(session_id, None)
+            if previous is not None:
+                self._total_bytes -= previous.size
+
+            self._entries[session_id] = _CacheEntry(content_hash, workbook, size)
+            self._total_bytes += size
+
+            while self._entries and (
+                    len(self._entries) > self.max_entries or self._total_bytes > self.max_bytes
+            ):
+                _, evicted = self._entries.popitem(last=False)
+                self._total_bytes -= evicted.size
+                self.evictions += 1
+
+    def invalidate(self, session_id: int) -> None:
+        """
+        세션의 캐시 항목을 제거합니다.
+
+        Args:
+            session_id: 채팅 세션 ID
+        """
+        with self._lock:
+            entry = self._entries.pop(session_id, None)
+            if entry is not None:
+                self._total_bytes -= entry.size
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        """모든 캐시 항목을 제거합니다."""
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        캐시 적중/실패 등 지표를 반환합니다.
+
+        Returns:
+            지표 딕셔너리
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "estimated_bytes": self._total_bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+def estimate_workbook_size(workbook: Workbook) -> int:
+    """
+    워크북의 메모리 사용량을 셀 개수 기반으로 추정합니다.
+
+    Args:
+        workbook: openpyxl 워크북
+
+    Returns:
+        추정 바이트 수
+    """
+    cell_count = sum(len(ws._cells) for ws in workbook.worksheets)
+    return max(cell_count, 1) * CELL_MEMORY_ESTIMATE
+
+
+workbook_cache = WorkbookCache(
+    max_entries=int(os.getenv("WORKBOOK_CACHE_MAX_ENTRIES", "32")),
+    max_bytes=int(os.getenv("WORKBOOK_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+)
+
+
+def open_session_workbook(session_id: int, excel_bytes: bytes) -> ParsedWorkbook:
+    """
+    세션의 시트 바이트에 대한 ParsedWorkbook을 생성합니다.
+    캐시에 같은 내용의 워크북이 있으면 파싱 없이 재사용합니다.
+
+    Args:
+        session_id: 채팅 세션 ID
+        excel_bytes: 시트 바이트 데이터
+
+    Returns:
+        ParsedWorkbook 객체
+    """
+    content_hash = compute_content_hash(excel_bytes)
+    workbook = workbook_cache.checkout(session_id, content_hash)
+    return ParsedWorkbook(excel_bytes, workbook=workbook, content_hash=content_hash)
+
+
+def release_session_workbook(session_id: int, parsed: ParsedWorkbook) -> None:
+    """
+    요청이 끝난 워크북을 저장된 바이트의 해시와 함께 세션 캐시에 돌려놓습니다.
+
+    Args:
+        session_id: 채팅 세션 ID
+        parsed: 요청에서 사용한 ParsedWorkbook
+    """
+    if not parsed.is_parsed:
+        return
+    workbook_cache.store(session_id, parsed.content_hash, parsed.workbook)
@@ -0,0 +1,95 @@
+# app/utils/cell_reference.py
+"""
+셀 참조 유틸리티
+범위 채우기(한 명령을 여러 셀에 적용)에서 쓰는 범위 순회와 상대 참조 이동,
+수식 안의 셀 참조 치환(시트 컨텍스트의 수식 패턴 비교 등)을 제공합니다.
+"""
+import re
+from typing import Callable, Iterator, Tuple
+
+from openpyxl.utils import get_column_letter, column_index_from_string, range_boundaries
+
+# 셀 참조 (예: A1, $B$2, AA10) - 함수 이름(LOG10( 등)과 시트 이름/식별자 중간은 제외
+_CELL_REF = re.compile(r"(?<![A-Za-z_.\d])(\$?)([A-Z]{1,3})(\$?)(\d+)(?![\d(A-Za-z_])")
+# 큰따옴표 문자열 리터럴 (수식 안의 "A1" 같은 텍스트는 이동하지 않음)
+_STRING_LITERAL = re.compile(r'("(?:[^"]|"")*")')
+
+
+def iter_range_cells(cell_range: str) -> Iterator[Tuple[int, int]]:
+    """
+    범위에 포함된 셀의 (행, 열)을 행 우선 순서로 순회합니다.
+
+    Args:
+        cell_range: 셀 주소 또는 범위 (예: "A1", "D2:D100")
+
+    Raises:
+        ValueError: 범위 형식이 잘못되었거나 열/행 전체 참조(A:A, 1:1)인 경우
+    """
+    min_col, min_row, max_col, max_row = range_boundaries(cell_range)
+    if None in (min_col, min_row, max_col, max_row):
+        raise ValueError(f"열/행 전체 범위는 사용할 수 없습니다: {cell_range}")
+    for row in range(min_row, max_row + 1):
+        for col in range(min_col, max_col + 1):
+            yield row, col
+
+
+def range_size(cell_range: str) -> int:
+    """
+    범위의 셀 개수를 반환합니다.
+
+    Args:
+        cell_range: 셀 주소 또는 범위
+
+    Raises:
+        ValueError: 범위 형식이 잘못되었거나 열/행 전체 참조인 경우
+    """
+    min_col, min_row, max_col, max_row = range_boundaries(cell_range)
+    if None in (min_col, min_row, max_col, max_row):
+        raise ValueError(f"열/행 전체 범위는 사용할 수 없습니다: {cell_range}")
+    return (max_row - min_row + 1) * (max_col - min_col + 1)
+
+
+def shift_references(text: str, row_offset: int, col_offset: int) -> str:
+    """
+    텍스트 안의 상대 셀 참조를 엑셀 채우기처럼 이동합니다. $가 붙은 행/열과 문자열 리터럴 안은 그대로 둡니다.
+
+    Args:
+        text: 수식 또는 조건 문자열 (예: "=A2+B2", "B2>=60")
+        row_offset: 이동할 행 수
+        col_offset: 이동할 열 수
+
+    Returns:
+        참조가 이동된 문자열
+
+    Raises:
+        ValueError: 이동한 참조가 시트 밖(1행/A열 이전)으로 나가는 경우
+    """
+    if not row_offset and not col_offset:
+        return text
+
+    def replace(match):
+        col_abs, letters, row_abs, digits = match.groups()
+        col = column_index_from_string(letters) + (0 if col_abs else col_offset)
+        row = int(digits) + (0 if row_abs else row_offset)
+        if col < 1 or row < 1:
+            raise ValueError(f"참조가 시트 범위를 벗어났습니다: {match.group(0)}")
+        return f"{col_abs}{get_column_letter(col)}{row_abs}{row}"
+
+    return replace_references(text, replace)
+
+
+def replace_references(text: str, replace: Callable[["re.Match"], str]) -> str:
+    """
+    텍스트 안의 셀 참조를 replace 함수의 결과로 바꿉니다. 문자열 리터럴 안은 그대로 둡니다.
+
+    Args:
+        text: 수식 또는 조건 문자열
+        replace: 참조 매치를 받아 바꿀 문자열을 반환하는 함수
+            (groups: 열 $ 여부, 열 문자, 행 $ 여부, 행 번호)
+
+    Returns:
+        참조가 바뀐 문자열
+    """
+    parts = _STRING_LITERAL.split(text)
+    # split 결과에서 홀수 번째 항목이 문자열 리터럴
+    return "".join(part if index % 2 else _CELL_REF.sub(replace, part) for index, part in enumerate(parts))
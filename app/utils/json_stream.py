@@ -0,0 +1,155 @@
+# app/utils/json_stream.py
+"""
+스트리밍 JSON 파서
+structured output(JSON)이 조각(chunk) 단위로 도착할 때, 최상위 객체의 특정 문자열 필드 값을
+완성되기 전에 디코딩된 텍스트 조각으로 꺼냅니다.
+
+예:
+    extractor = JsonStringFieldExtractor("response")
+    extractor.feed('{"resp')            # -> ""
+    extractor.feed('onse": "안녕')       # -> "안녕"
+    extractor.feed('하세요\\n", "co')     # -> "하세요\n"
+"""
+from typing import List, Optional
+
+_SIMPLE_ESCAPES = {
+    '"': '"',
+    '\\': '\\',
+    '/': '/',
+    'b': '\b',
+    'f': '\f',
+    'n': '\n',
+    'r': '\r',
+    't': '\t',
+}
+
+
+class JsonStringFieldExtractor:
+    """
+    최상위 JSON 객체에서 지정한 문자열 필드의 값을 점진적으로 추출합니다.
+    중첩된 객체/배열 안의 같은 이름 필드는 무시하며, 이스케이프(\\uXXXX, 서로게이트 쌍 포함)가
+    조각 경계에서 잘려도 올바르게 디코딩합니다.
+    """
+
+    def __init__(self, field: str):
+        """
+        Args:
+            field: 추출할 최상위 문자열 필드 이름
+        """
+        self.field = field
+        self.done = False
+
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._unicode: Optional[str] = None  # \u 뒤의 16진수 누적
+        self._high_surrogate: Optional[int] = None
+        self._expect_key = False
+        self._string_role: Optional[str] = None  # "key" | "target" | None
+        self._key_chars: List[str] = []
+        self._last_key: Optional[str] = None
+        self._value_chars: List[str] = []
+
+    @property
+    def value(self) -> str:
+        """지금까지 추출된 필드 값 전체"""
+        return "".join(self._value_chars)
+
+    def feed(self, chunk: str) -> str:
+        """
+        JSON 조각을 입력하고, 이번 조각에서 새로 디코딩된 필드 값 텍스트를 반환합니다.
+
+        Args:
+            chunk: 스트림으로 받은 JSON 텍스트 조각
+
+        Returns:
+            str: 새로 추출된 텍스트 (없으면 빈 문자열)
+        """
+        emitted: List[str] = []
+        for ch in chunk:
+            if self._in_string:
+                self._consume_string_char(ch, emitted)
+            else:
+                self._consume_structure_char(ch)
+
+        text = "".join(emitted)
+        self._value_chars.append(text)
+        return text
+
+    def _consume_structure_char(self, ch: str) -> None:
+        if ch == '"':
+            self._in_string = True
+            if self._depth == 1 and self._expect_key:
+                self._string_role = "key"
+                self._key_chars = []
+            elif self._depth == 1 and self._last_key == self.field and not self.done:
+                self._string_role = "target"
+            else:
+                self._string_role = None
+        elif ch in "{[":
+            self._depth += 1
+            if self._depth == 1 and ch == "{":
+                self._expect_key = True
+        elif ch in "}]":
+            self._depth -= 1
+        elif self._depth == 1 and ch == ":":
+            self._expect_key = False
+        elif self._depth == 1 and ch == ",":
+            self._expect_key = True
+            self._last_key = None
+
+    def _consume_string_char(self, ch: str, emitted: List[str]) -> None:
+        if self._unicode is not None:
+            self._unicode += ch
+            if len(self._unicode) == 4:
+                self._append_code_point(int(self._unicode, 16), emitted)
+                self._unicode = None
+            return
+
+        if self._escape:
+            self._escape = False
+            if ch == "u":
+                self._unicode = ""
+            else:
+                self._append_text(_SIMPLE_ESCAPES.get(ch, ch), emitted)
+            return
+
+        if ch == "\\":
+            self._escape = True
+        elif ch == '"':
+            self._end_string(emitted)
+        else:
+            self._append_text(ch, emitted)
+
+    def _append_code_point(self, code: int, emitted: List[str]) -> None:
+        if 0xD800 <= code <= 0xDBFF:
+            self._high_surrogate = code
+            return
+        if 0xDC00 <= code <= 0xDFFF and self._high_surrogate is not None:
+            code = 0x10000 + ((self._high_surrogate - 0xD800) << 10) + (code - 0xDC00)
+            self._high_surrogate = None
+            self._append_text(chr(code), emitted)
+            return
+        self._append_text(chr(code), emitted)
+
+    def _append_text(self, text: str, emitted: List[str]) -> None:
+        if self._high_surrogate is not None:
+            # 짝이 없는 상위 서로게이트는 대체 문자로 출력
+            self._high_surrogate = None
+            text = "�" + text
+        if self._string_role == "key":
+            self._key_chars.append(text)
+        elif self._string_role == "target":
+            emitted.append(text)
+
+    def _end_string(self, emitted: List[str]) -> None:
+        if self._high_surrogate is not None:
+            self._high_surrogate = None
+            if self._string_role == "target":
+                emitted.append("�")
+        if self._string_role == "key":
+            self._last_key = "".join(self._key_chars)
+        elif self._string_role == "target":
+            self.done = True
+        self._in_string = False
+        self._string_role = None
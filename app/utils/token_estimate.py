@@ -0,0 +1,72 @@
+# app/utils/token_estimate.py
+"""
+토큰 수 추정 유틸리티
+토크나이저 없이 프롬프트 구성 요소(세션 요약, 시트 컨텍스트)의 토큰 예산을 맞추기 위한 보수적인 추정치를 제공합니다.
+"""
+import math
+from typing import List
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    텍스트의 토큰 수를 추정합니다.
+    ASCII는 약 4자당 1토큰, 한글 등 비ASCII 문자는 1자당 1토큰으로 보수적으로 계산합니다.
+
+    Args:
+        text: 대상 텍스트
+
+    Returns:
+        추정 토큰 수
+    """
+    if not text:
+        return 0
+    non_ascii = sum(1 for ch in text if ord(ch) > 127)
+    return math.ceil((len(text) - non_ascii) / 4) + non_ascii
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """
+    텍스트를 토큰 예산에 맞게 앞부분부터 잘라냅니다. (최신 내용인 뒷부분을 유지)
+
+    Args:
+        text: 대상 텍스트
+        max_tokens: 최대 토큰 수
+
+    Returns:
+        잘라낸 텍스트
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    budget = max_tokens - estimate_tokens("…")
+    low, high = 0, len(text)
+    while low < high:
+        mid = (low + high) // 2
+        if estimate_tokens(text[mid:]) <= budget:
+            high = mid
+        else:
+            low = mid + 1
+    return "…" + text[low:]
+
+
+def truncate_lines_to_tokens(lines: List[str], max_tokens: int, notice: str) -> List[str]:
+    """
+    줄 목록을 앞에서부터 토큰 예산만큼만 남깁니다. (잘린 경우 notice 줄을 덧붙임)
+
+    Args:
+        lines: 대상 줄 목록
+        max_tokens: 최대 토큰 수
+        notice: 잘린 경우 마지막에 붙일 안내 문구 ({count}에 생략된 줄 수)
+
+    Returns:
+        예산 안의 줄 목록
+    """
+    budget = max_tokens - estimate_tokens(notice) - 2
+    kept: List[str] = []
+    used = 0
+    for index, line in enumerate(lines):
+        cost = estimate_tokens(line) + 1  # 줄바꿈
+        if used + cost > budget:
+            return kept + [notice.format(count=len(lines) - index)]
+        kept.append(line)
+        used += cost
+    return kept
@@ -0,0 +1,112 @@
+# benchmark/db_session_benchmark.py
+"""
+DB 세션 경로 벤치마크
+로그인 API(POST /api/auth/login)를 같은 동시성으로 호출해 동기 경로(Session + 스레드 풀)와
+비동기 경로(DB_ASYNC=1, AsyncSession)의 초당 요청 수와 지연 시간을 비교합니다.
+기본은 임시 SQLite 파일(pysqlite / aiosqlite)이며, --database-url로 MySQL(pymysql / aiomysql) 등을 지정할 수 있습니다.
+
+실행:
+    python -m benchmark.db_session_benchmark [--requests 2000] [--concurrency 100] [--database-url URL]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+WARMUP = 50
+USERNAME = "benchmark"
+PASSWORD = "benchmark-pw"
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="동기/비동기 DB 세션 경로 처리량 비교")
+    parser.add_argument("--requests", type=int, default=2000, help="경로별 요청 수")
+    parser.add_argument("--concurrency", type=int, default=100, help="동시에 보내는 요청 수")
+    parser.add_argument("--database-url", default=None, help="동기 DB URL (기본: 임시 SQLite 파일)")
+    return parser.parse_args()
+
+
+async def run_load(api, total: int, concurrency: int) -> dict:
+    """api에 로그인 요청 total개를 concurrency개씩 동시에 보내고 처리량/지연 시간을 반환합니다."""
+    import httpx
+
+    latencies = []
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with httpx.AsyncClient(app=api, base_url="http://benchmark") as client:
+        async def one() -> None:
+            nonlocal errors
+            async with semaphore:
+                started = time.perf_counter()
+                response = await client.post("/api/auth/login", json={"username": USERNAME, "password": PASSWORD})
+                latencies.append(time.perf_counter() - started)
+                if response.status_code != 200:
+                    errors += 1
+
+        await asyncio.gather(*(one() for _ in range(WARMUP)))
+        latencies.clear()
+        errors = 0
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(total)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "rps": total / elapsed,
+        "p50": statistics.median(latencies) * 1000,
+        "p95": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        "errors": errors,
+    }
+
+
+async def run_async_path(api, total: int, concurrency: int) -> dict:
+    from app import database
+
+    try:
+        return await run_load(api, total, concurrency)
+    finally:
+        # 비동기 엔진의 커넥션은 이 이벤트 루프에 묶여 있으므로 루프가 끝나기 전에 정리
+        await database.get_async_engine().dispose()
+
+
+def main() -> None:
+    args = parse_args()
+    if args.database_url is None:
+        args.database_url = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'benchmark.db')}"
+    os.environ["DATABASE_URL"] = args.database_url  # app.database가 import 시점에 읽음
+
+    from fastapi import FastAPI
+
+    import app.models  # noqa: F401  (테이블 등록)
+    from app import database
+    from app.models import User
+    from app.routers import auth_router
+
+    database.Base.metadata.create_all(database.engine)
+    with database.db_session_scope() as db:
+        if not db.query(User).filter(User.username == USERNAME).first():
+            db.add(User(username=USERNAME, password=PASSWORD))
+            db.commit()
+
+    api = FastAPI()
+    api.include_router(auth_router.router, prefix="/api/auth")
+
+    print(f"DB: {args.database_url}  requests={args.requests}  concurrency={args.concurrency}")
+    print(f"{'path':<32}{'req/s':>10}{'p50':>12}{'p95':>12}{'errors':>8}")
+    for name, enabled, runner in [
+        ("sync (Session + threadpool)", False, run_load),
+        ("async (AsyncSession)", True, run_async_path),
+    ]:
+        database.DB_ASYNC_ENABLED = enabled
+        result = asyncio.run(runner(api, args.requests, args.concurrency))
+        print(
+            f"{name:<32}{result['rps']:>10.1f}{result['p50']:>9.2f} ms{result['p95']:>9.2f} ms{result['errors']:>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+# benchmark/excel_context_benchmark.py
+"""
+엑셀 컨텍스트 생성 벤치마크
+_analyze_excel_context의 기존 좌표 순회(ws.cell) 방식과 희소 스캔 방식을
+희소/밀집 시트에서 비교합니다. (시간, tracemalloc 최대 할당량, 생성된 Cell 객체 수)
+
+실행:
+    python -m benchmark.excel_context_benchmark
+"""
+import os
+import time
+import tracemalloc
+from unittest.mock import patch
+
+from openpyxl import Workbook
+
+from app.services.llm_prompt_service import create_excel_context
+from app.services.llm_service import LLMService
+from app.services.workbook_service import ParsedWorkbook
+
+REPEAT = 20
+
+with patch.dict(os.environ, {"OPENAI_API_KEY": "benchmark-key"}):
+    SERVICE = LLMService()
+
+
+def legacy_analyze(workbook: Workbook) -> str:
+    """기존 구현: 100x20 좌표를 모두 ws.cell()로 순회"""
+    ws = workbook.active
+    max_row = ws.max_row
+    max_col = ws.max_column
+    sample_data = []
+    formula_cells = []
+    for row in range(1, min(101, max_row + 1)):
+        for col in range(1, min(21, max_col + 1)):
+            cell = ws.cell(row=row, column=col)
+            if cell.value is not None:
+                if isinstance(cell.value, str) and cell.value.startswith('='):
+                    formula_cells.append(f"{cell.coordinate}: {cell.value}")
+                else:
+                    sample_data.append(f"{cell.coordinate}: {cell.value}")
+    return create_excel_context(max_row, max_col, sample_data[:2000], formula_cells)
+
+
+def sparse_analyze(workbook: Workbook) -> str:
+    """현재 구현: LLMService._analyze_excel_context (희소 스캔)"""
+    parsed = ParsedWorkbook(b"", workbook=workbook)
+    return SERVICE._analyze_excel_context(parsed)
+
+
+def build_sparse_workbook() -> Workbook:
+    """100x20 범위에 값이 20개 남짓 흩어져 있고, 먼 곳(T5000)에 값이 하나 있는 시트"""
+    workbook = Workbook()
+    ws = workbook.active
+    for i in range(1, 21):
+        ws.cell(row=i * 5, column=(i % 20) + 1, value=i)
+    ws["T5000"] = "end"
+    return workbook
+
+
+def build_dense_workbook() -> Workbook:
+    """100x20 범위가 모두 채워진 시트 (마지막 열은 수식)"""
+    workbook = Workbook()
+    ws = workbook.active
+    for row in range(1, 101):
+        for col in range(1, 20):
+            ws.cell(row=row, column=col, value=row * col)
+        ws.cell(row=row, column=20, value=f"=SUM(A{row}:S{row})")
+    return workbook
+
+
+def measure(name: str, builder, analyze) -> None:
+    """새 워크북에 대해 analyze를 REPEAT회 실행하여 시간/할당량/셀 생성 수를 출력합니다."""
+    elapsed = 0.0
+    peak = 0
+    created = 0
+    for _ in range(REPEAT):
+        workbook = builder()
+        cells_before = len(workbook.active._cells)
+
+        tracemalloc.start()
+        started = time.perf_counter()
+        analyze(workbook)
+        elapsed += time.perf_counter() - started
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+
+        created = len(workbook.active._cells) - cells_before
+
+    print(f"{name:<28}{elapsed / REPEAT * 1000:>10.3f} ms{peak / 1024:>12.1f} KiB{created:>14}")
+
+
+def main() -> None:
+    print(f"{'case':<28}{'avg time':>13}{'peak alloc':>16}{'cells created':>14}")
+    for sheet_name, builder in [("sparse", build_sparse_workbook), ("dense", build_dense_workbook)]:
+        measure(f"{sheet_name} / legacy ws.cell", builder, legacy_analyze)
+        measure(f"{sheet_name} / sparse scan", builder, sparse_analyze)
+
+
+if __name__ == "__main__":
+    main()
@@ -33,3 +33,44 @@ def test_login_wrong_password():
 
     with pytest.raises(UnauthorizedException):
         login(mock_db, "testuser", "wrongpass")
+
+
+# [ASYNC] AsyncSession(aiosqlite)으로 로그인하는지 테스트
+def test_login_async_with_async_session(tmp_path):
+    import asyncio
+    from sqlalchemy import create_engine
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+    from app.database import Base
+    from app.services.auth_service import login_async
+
+    sync_engine = create_engine(f"sqlite:///{tmp_path / 'auth.db'}")
+    Base.metadata.create_all(sync_engine)
+    with sync_engine.begin() as conn:
+        conn.execute(User.__table__.insert().values(id=1, username="testuser", password="testpass"))
+    sync_engine.dispose()
+
+    async def scenario():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'auth.db'}")
+        try:
+            async with AsyncSession(engine) as db:
+                user = await login_async(db, "testuser", "testpass")
+                with pytest.raises(UnauthorizedException):
+                    await login_async(db, "testuser", "wrongpass")
+                return user
+        finally:
+            await engine.dispose()
+
+    user = asyncio.run(scenario())
+    assert user.id == 1
+
+
+# [ASYNC] 동기 Session이 오면 login을 그대로 사용하는지 테스트
+def test_login_async_with_sync_session():
+    import asyncio
+    from app.services.auth_service import login_async
+
+    mock_db = MagicMock()
+    mock_user = User(id=1, username="testuser", password="testpass")
+    mock_db.query().filter().first.return_value = mock_user
+
+    assert asyncio.run(login_async(mock_db, "testuser", "testpass")) == mock_user
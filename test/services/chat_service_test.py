@@ -1,9 +1,10 @@
 import pytest
-from unittest.mock import MagicMock, patch
+from unittest.mock import ANY, MagicMock, patch
 from datetime import datetime
 from app.services import chat_service
 from app.models import ChatSession, Message, ChatSheet, User
-from app.exceptions.http_exceptions import SessionNotFoundException, UserNotFoundException
+from app.exceptions.http_exceptions import SessionNotFoundException, UserNotFoundException, \
+    SheetVersionConflictException
 from app.utils.timezone import KST
 from app.schemas.chat_schema import ChatSessionCreateResponse, LLMMessageResponse, MessageResponse
 
@@ -203,6 +204,7 @@ def test_save_message_and_response_flow(
         cmd_seq=[{"command_type": "sum"}]
     )
     mock_process_excel.return_value = b"new-excel-bytes"
+    mock_upsert.return_value = ChatSheet(sessionId=1, sheetData=b"new-excel-bytes", version=2)
 
     result = chat_service.save_message_and_response(1, "Hi", b"old-bytes", mock_db)
 
@@ -212,5 +214,348 @@ def test_save_message_and_response_flow(
     mock_get_llm.assert_called_once()
     mock_process_excel.assert_called_once()
     mock_update_summary.assert_called_once_with(sessionId=1, summary="updated-summary", db=mock_db)
-    mock_upsert.assert_called_once_with(1, b"new-excel-bytes", mock_db)
-    mock_db.commit.assert_called_once()
\ No newline at end of file
+    mock_upsert.assert_called_once_with(1, b"new-excel-bytes", mock_db, expected_version=ANY)
+    mock_db.commit.assert_called_once()
+    assert result.sheetVersion == 2
+    assert result.sheetDelta is None
+
+
+# [UPSERT] 시트 내용이 바뀌면 버전이 증가하고, 같으면 유지되는지 테스트
+def test_upsert_chat_sheet_version_increment():
+    mock_db = MagicMock()
+    existing_sheet = ChatSheet(sessionId=1, sheetData=b"old", version=3)
+    mock_db.query().filter().first.return_value = existing_sheet
+
+    chat_service.upsert_chat_sheet(1, b"old", mock_db)
+    assert existing_sheet.version == 3
+
+    chat_service.upsert_chat_sheet(1, b"new", mock_db)
+    assert existing_sheet.version == 4
+
+
+# [VERSION] 읽은 뒤 버전이 바뀌었으면 저장하지 않고 충돌 예외가 발생하는지 테스트
+def test_upsert_chat_sheet_version_conflict():
+    mock_db = MagicMock()
+    existing_sheet = ChatSheet(id=1, sessionId=1, sheetData=b"old", version=3)
+    mock_db.query().filter().first.return_value = existing_sheet
+
+    # 같은 프로세스에서 이미 보이는 변경
+    with pytest.raises(SheetVersionConflictException):
+        chat_service.upsert_chat_sheet(1, b"new", mock_db, expected_version=2)
+
+    # 다른 프로세스가 먼저 커밋해 조건부 UPDATE가 0행을 갱신한 경우
+    mock_db.query().filter().update.return_value = 0
+    with pytest.raises(SheetVersionConflictException):
+        chat_service.upsert_chat_sheet(1, b"new", mock_db, expected_version=3)
+    assert existing_sheet.sheetData == b"old"
+
+    mock_db.query().filter().update.return_value = 1
+    chat_service.upsert_chat_sheet(1, b"new", mock_db, expected_version=3)
+    assert existing_sheet.sheetData == b"new"
+    assert existing_sheet.version == 4
+
+
+# [VERSION] 업로드한 시트의 기준 버전이 현재 버전과 다르면 LLM 호출 전에 거절하는지 테스트
+@patch("app.services.chat_service.insert_message_to_db")
+@patch("app.services.chat_service.get_sheet_version", return_value=5)
+@patch("app.services.chat_service.get_llm_response")
+def test_save_message_and_response_stale_sheet_version(mock_get_llm, mock_get_version, mock_insert_msg):
+    mock_db = MagicMock()
+    mock_db.query().filter().first.return_value = ChatSession(id=1, userId=1, summary="")
+
+    with pytest.raises(SheetVersionConflictException):
+        chat_service.save_message_and_response(1, "합계", b"old-bytes", mock_db, sheet_version=4)
+    mock_get_llm.assert_not_called()
+
+
+# [DELTA] delta 모드에서는 전체 시트 대신 변경된 셀 목록을 반환하는지 테스트
+@patch("app.services.chat_service.insert_message_to_db")
+@patch("app.services.chat_service.get_llm_response")
+@patch("app.services.chat_service.update_session_summary")
+@patch("app.services.chat_service.get_sheet_version", return_value=4)
+@patch("app.services.chat_service.upsert_chat_sheet")
+def test_save_message_and_response_delta_mode(
+    mock_upsert,
+    mock_get_version,
+    mock_update_summary,
+    mock_get_llm,
+    mock_insert_msg
+):
+    import io
+    from openpyxl import Workbook
+    from app.schemas.excel_schema import ExcelCommand
+
+    workbook = Workbook()
+    workbook.active["B2"] = 10
+    workbook.active["B3"] = 20
+    stream = io.BytesIO()
+    workbook.save(stream)
+
+    mock_db = MagicMock()
+    mock_db.query().filter().first.return_value = ChatSession(id=1, userId=1, summary="")
+    mock_insert_msg.side_effect = [
+        MagicMock(id=10, content="user-message", createdAt=datetime.now(), senderType="USER"),
+        MagicMock(id=11, content="ai-reply", createdAt=datetime.now(), senderType="AI"),
+    ]
+    mock_get_llm.return_value = MagicMock(
+        chat="ai-reply",
+        summary="updated-summary",
+        cmd_seq=[
+            ExcelCommand(command_type="sum", target_cell="B4", parameters={"range": "B2:B3"}),
+            ExcelCommand(command_type="set_value", target_cell="A4", parameters={"value": "합계"}),
+        ]
+    )
+    mock_upsert.return_value = ChatSheet(sessionId=1, sheetData=b"", version=5)
+
+    result = chat_service.save_message_and_response(1, "합계", stream.getvalue(), mock_db, response_mode="delta")
+
+    assert result.sheetData is None
+    assert result.sheetVersion == 5
+    assert result.sheetDelta.baseVersion == 4
+    assert result.sheetDelta.version == 5
+    changes = {change.address: change for change in result.sheetDelta.changes}
+    assert changes["B4"].formula == "=SUM(B2:B3)"
+    assert changes["A4"].value == "합계"
+
+
+
+# [DELTA] 변경된 셀의 영향으로 다시 계산된 하위 수식 셀도 delta에 포함되는지 테스트
+@patch("app.services.chat_service.insert_message_to_db")
+@patch("app.services.chat_service.get_llm_response")
+@patch("app.services.chat_service.update_session_summary")
+@patch("app.services.chat_service.get_sheet_version", return_value=4)
+@patch("app.services.chat_service.upsert_chat_sheet")
+def test_delta_mode_includes_recalculated_dependents(
+    mock_upsert,
+    mock_get_version,
+    mock_update_summary,
+    mock_get_llm,
+    mock_insert_msg
+):
+    import io
+    from openpyxl import Workbook
+    from app.schemas.excel_schema import ExcelCommand
+
+    workbook = Workbook()
+    ws = workbook.active
+    ws["B2"], ws["B3"], ws["B4"] = 10, 20, "=SUM(B2:B3)"
+    ws["C3"], ws["C4"], ws["D1"] = "=B3*2", "=B4+C3", "=B2"
+    stream = io.BytesIO()
+    workbook.save(stream)
+
+    mock_db = MagicMock()
+    mock_db.query().filter().first.return_value = ChatSession(id=1, userId=1, summary="")
+    mock_insert_msg.side_effect = [
+        MagicMock(id=10, content="user-message", createdAt=datetime.now(), senderType="USER"),
+        MagicMock(id=11, content="ai-reply", createdAt=datetime.now(), senderType="AI"),
+    ]
+    mock_get_llm.return_value = MagicMock(
+        chat="ai-reply",
+        summary="updated-summary",
+        cmd_seq=[ExcelCommand(command_type="set_value", target_cell="B3", parameters={"value": 50})]
+    )
+    mock_upsert.return_value = ChatSheet(sessionId=1, sheetData=b"", version=5)
+
+    result = chat_service.save_message_and_response(1, "B3 수정", stream.getvalue(), mock_db, response_mode="delta")
+
+    changes = {change.address: change.value for change in result.sheetDelta.changes}
+    assert result.sheetDelta.changes[0].address == "B3"
+    assert changes == {"B3": 50, "B4": 60, "C3": 100, "C4": 160}  # D1은 B3과 무관
+
+# [ASYNC] 비동기 파이프라인이 LLM을 await하고 명령어 실행을 엑셀 워커 스레드에서 수행하는지 테스트
+@patch("app.services.chat_service.insert_message_to_db")
+@patch("app.services.chat_service.get_llm_response_async")
+@patch("app.services.chat_service.process_excel_with_commands")
+@patch("app.services.chat_service.update_session_summary")
+@patch("app.services.chat_service.upsert_chat_sheet")
+def test_save_message_and_response_async_flow(
+    mock_upsert,
+    mock_update_summary,
+    mock_process_excel,
+    mock_get_llm_async,
+    mock_insert_msg
+):
+    import asyncio
+    import threading
+
+    mock_db = MagicMock()
+    mock_db.query().filter().first.return_value = ChatSession(id=1, userId=1, summary="prev-summary")
+    mock_insert_msg.side_effect = [
+        MagicMock(id=10, content="user-message", createdAt=datetime.now(), senderType="USER"),
+        MagicMock(id=11, content="ai-reply", createdAt=datetime.now(), senderType="AI"),
+    ]
+
+    async def fake_llm(**kwargs):
+        return MagicMock(chat="ai-reply", summary="updated-summary", cmd_seq=[])
+    mock_get_llm_async.side_effect = fake_llm
+
+    worker_threads = []
+
+    def fake_process(**kwargs):
+        worker_threads.append(threading.current_thread().name)
+        return b"new-excel-bytes"
+    mock_process_excel.side_effect = fake_process
+    mock_upsert.return_value = ChatSheet(sessionId=1, sheetData=b"new-excel-bytes", version=2)
+
+    result = asyncio.run(chat_service.save_message_and_response_async(1, "Hi", b"old-bytes", mock_db))
+
+    assert result.message.content == "ai-reply"
+    assert result.sheetVersion == 2
+    mock_get_llm_async.assert_called_once()
+    assert mock_get_llm_async.call_args.kwargs["session_summary"] == "prev-summary"
+    assert worker_threads and worker_threads[0].startswith("excel-worker")
+    mock_update_summary.assert_called_once_with(sessionId=1, summary="updated-summary", db=mock_db)
+    mock_db.commit.assert_called_once()
+
+
+# [STREAM] 스트리밍 응답이 delta 이벤트들과 마지막 result 이벤트를 내보내는지 테스트
+@patch("app.services.chat_service.insert_message_to_db")
+@patch("app.services.chat_service.stream_llm_response_async")
+@patch("app.services.chat_service.process_excel_with_commands", return_value=b"new-excel-bytes")
+@patch("app.services.chat_service.update_session_summary")
+@patch("app.services.chat_service.get_sheet_version", return_value=1)
+@patch("app.services.chat_service.upsert_chat_sheet")
+def test_stream_message_and_response_events(
+    mock_upsert,
+    mock_get_version,
+    mock_update_summary,
+    mock_process_excel,
+    mock_stream_llm,
+    mock_insert_msg
+):
+    import asyncio
+    import json
+    from app.schemas.llm_schema import ResponseResult
+
+    mock_db = MagicMock()
+    mock_db.query().filter().first.return_value = ChatSession(id=1, userId=1, summary="")
+    mock_insert_msg.side_effect = [
+        MagicMock(id=10, content="user-message", createdAt=datetime.now(), senderType="USER"),
+        MagicMock(id=11, content="안녕하세요", createdAt=datetime.now(), senderType="AI"),
+    ]
+
+    async def fake_stream(**kwargs):
+        yield "안녕"
+        yield "하세요"
+        yield ResponseResult(chat="안녕하세요", cmd_seq=[], summary="요약")
+    mock_stream_llm.side_effect = fake_stream
+    mock_upsert.return_value = ChatSheet(sessionId=1, sheetData=b"new-excel-bytes", version=2)
+
+    async def collect():
+        events = await chat_service.stream_message_and_response(1, "인사", b"old-bytes", mock_db)
+        return [event async for event in events]
+
+    events = asyncio.run(collect())
+
+    assert events[0] == 'event: delta\ndata: {"text": "안녕"}\n\n'
+    assert events[1] == 'event: delta\ndata: {"text": "하세요"}\n\n'
+    assert events[2].startswith("event: result\n")
+    result = json.loads(events[2].split("data: ", 1)[1])
+    assert result["message"]["content"] == "안녕하세요"
+    assert result["sheetVersion"] == 2
+    assert result["sheetDelta"]["baseVersion"] == 1
+    mock_db.commit.assert_called_once()
+
+
+# [STREAM] 세션이 없으면 스트림 시작 전에 예외가 발생하는지 테스트
+@patch("app.services.chat_service.insert_message_to_db")
+def test_stream_message_and_response_session_not_found(mock_insert_msg):
+    import asyncio
+
+    mock_db = MagicMock()
+    mock_db.query().filter().first.return_value = None
+
+    with pytest.raises(SessionNotFoundException):
+        asyncio.run(chat_service.stream_message_and_response(1, "인사", b"bytes", mock_db))
+
+
+# [ASYNC DB] AsyncSession(aiosqlite)으로 메시지 처리 파이프라인 전체가 저장·버전 갱신까지 동작하는지 테스트
+@patch("app.services.chat_service.get_llm_response_async")
+def test_save_message_and_response_async_with_async_session(mock_get_llm_async, tmp_path):
+    import asyncio
+    import io
+    from openpyxl import Workbook, load_workbook
+    from sqlalchemy import create_engine, select
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+    from app.database import Base
+    from app.schemas.excel_schema import ExcelCommand
+    from app.schemas.llm_schema import ResponseResult
+
+    workbook = Workbook()
+    workbook.active["B2"] = 10
+    workbook.active["B3"] = 20
+    stream = io.BytesIO()
+    workbook.save(stream)
+
+    sync_engine = create_engine(f"sqlite:///{tmp_path / 'chat.db'}")
+    Base.metadata.create_all(sync_engine)
+    with sync_engine.begin() as conn:
+        conn.execute(User.__table__.insert().values(id=1, username="admin", password="pw"))
+        conn.execute(ChatSession.__table__.insert().values(id=1, userId=1, name="s", summary=""))
+        conn.execute(ChatSheet.__table__.insert().values(sessionId=1, sheetData=stream.getvalue(), version=1))
+    sync_engine.dispose()
+
+    async def fake_llm(**kwargs):
+        return ResponseResult(
+            chat="합계를 넣었습니다.",
+            summary="B4에 합계",
+            cmd_seq=[ExcelCommand(command_type="sum", target_cell="B4", parameters={"range": "B2:B3"})]
+        )
+    mock_get_llm_async.side_effect = fake_llm
+
+    async def scenario():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'chat.db'}")
+        try:
+            async with AsyncSession(engine, expire_on_commit=False) as db:
+                result = await chat_service.save_message_and_response_async(
+                    1, "B4에 합계", None, db, response_mode="delta", sheet_version=1
+                )
+            async with AsyncSession(engine) as db:
+                messages = (await db.execute(select(Message).order_by(Message.id))).scalars().all()
+                sheet = (await db.execute(select(ChatSheet))).scalars().one()
+                return result, [(m.senderType.value, m.content) for m in messages], sheet.version, sheet.sheetData
+        finally:
+            await engine.dispose()
+
+    result, messages, version, sheet_bytes = asyncio.run(scenario())
+
+    assert result.message.content == "합계를 넣었습니다."
+    assert result.sheetVersion == 2
+    assert result.sheetDelta.baseVersion == 1
+    assert messages == [("USER", "B4에 합계"), ("AI", "합계를 넣었습니다.")]
+    assert version == 2
+    assert load_workbook(io.BytesIO(sheet_bytes)).active["B4"].value == "=SUM(B2:B3)"
+
+
+# [VERSION] 시트가 없던 세션에 두 요청이 동시에 첫 시트를 저장하면 나중 요청은 409로 거부되는지 테스트
+def test_upsert_chat_sheet_concurrent_first_insert(tmp_path):
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import Session
+    from app.database import Base
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'sheet.db'}")
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        db.add(User(id=1, username="admin", password="pw"))
+        db.add(ChatSession(id=1, userId=1, name="세션"))
+        db.commit()
+
+    first, second = Session(engine), Session(engine)
+    chat_service.upsert_chat_sheet(1, b"first", first, expected_version=0)
+    first.commit()
+
+    second.add(Message(sessionId=1, content="두 번째 요청", senderType="USER"))
+    second.flush()
+    # 두 번째 요청은 첫 요청이 커밋되기 전에 시트가 없는 것을 본 상태
+    with patch("app.services.chat_service._find_sheet", return_value=None):
+        with pytest.raises(SheetVersionConflictException):
+            chat_service.upsert_chat_sheet(1, b"second", second, expected_version=0)
+    second.commit()  # 세이브포인트만 롤백되어 나머지 변경은 커밋 가능
+
+    with Session(engine) as db:
+        sheets = db.query(ChatSheet).filter(ChatSheet.sessionId == 1).all()
+        assert [(sheet.sheetData, sheet.version) for sheet in sheets] == [(b"first", 1)]
+        assert db.query(Message).filter(Message.content == "두 번째 요청").count() == 1
+    first.close()
+    second.close()
+    engine.dispose()
@@ -0,0 +1,49 @@
+from app.services.command_catalog_service import COMMAND_CATALOG, DEFAULT_COMMANDS, command_types, \
+    render_command_examples, select_commands
+from app.services.excel_service import command_registry
+from app.services.llm_prompt_service import RESPONSE_SCHEMA, SYSTEM_PROMPT, create_user_prompt
+
+
+# [SCHEMA] 응답 스키마 enum이 카탈로그에서 만들어지고, 모든 명령어에 실행 핸들러가 있는지 테스트
+def test_response_schema_enum_comes_from_catalog():
+    items = RESPONSE_SCHEMA["json_schema"]["schema"]["properties"]["commands"]["items"]
+
+    assert items["properties"]["command_type"]["enum"] == command_types()
+    assert len(set(command_types())) == len(COMMAND_CATALOG)
+    for spec in COMMAND_CATALOG:
+        assert spec.examples
+        assert command_registry.get(spec.name) is not None
+
+
+# [SELECT] 사용자 명령의 키워드로 관련 명령어만 고르는지 테스트
+def test_select_commands_by_keywords():
+    assert [spec.name for spec in select_commands("B열 합계랑 평균 구해줘")] == ["sum", "average"]
+    assert [spec.name for spec in select_commands("VLOOKUP으로 이름 가져와줘")][0] == "vlookup"
+    assert [spec.name for spec in select_commands("점수 순위 매겨줘")] == ["rank"]
+    assert [spec.name for spec in select_commands("안녕?")] == list(DEFAULT_COMMANDS)
+
+
+# [SELECT] 사용자 명령의 키워드가 대화 요약의 키워드보다 앞서고, 개수 제한을 지키는지 테스트
+def test_select_commands_prefers_command_over_summary():
+    names = [spec.name for spec in select_commands("평균 구해줘", "앞으로 모든 결과는 반올림", limit=2)]
+
+    assert names == ["average", "round"]
+
+
+# [PROMPT] 예시는 사용자 메시지에만 들어가고 시스템 프롬프트에는 목록만 남는지 테스트
+def test_examples_are_selected_per_request():
+    prompt = create_user_prompt("", "C열에서 중복 제거해줘", "A1: 1")
+
+    assert '"command_type": "unique"' in prompt
+    assert '"command_type": "vlookup"' not in prompt
+    assert '"command_type"' not in SYSTEM_PROMPT.split("요청 형식:")[0]
+    assert "unique(고유값 추출)" in SYSTEM_PROMPT
+
+
+# [PROMPT] 복합 조건 예시는 관련 키워드가 있을 때만 포함되는지 테스트
+def test_keyword_examples_are_added_when_matched():
+    plain = render_command_examples("점수가 60점 이상이면 합격으로 표시해줘")
+    combined = render_command_examples("점수가 60점 이상이고 출석이 90 이상이면 합격으로 표시해줘")
+
+    assert "IF + AND 조합" not in plain
+    assert "IF + AND 조합" in combined
@@ -0,0 +1,95 @@
+import json
+from unittest.mock import patch
+
+import pytest
+
+from app.services import command_encoding_service
+from app.services.command_encoding_service import normalize_commands, to_compact
+from app.services.llm_prompt_service import COMPACT_RESPONSE_SCHEMA, build_system_prompt
+from app.services.llm_service import LLMService
+
+
+# [COMPACT] 배열 형식 명령어를 object 형식으로 펼치는지 테스트
+def test_normalize_compact_tuples():
+    commands = normalize_commands([
+        ["sum", "B11", "B2:B10"],
+        ["clear", "A1:A3"],
+        {"command_type": "set_value", "target_cell": "A1", "parameters": ["제목"]},
+    ])
+
+    assert commands == [
+        {"command_type": "sum", "target_cell": "B11", "parameters": ["B2:B10"]},
+        {"command_type": "clear", "target_cell": "A1:A3", "parameters": []},
+        {"command_type": "set_value", "target_cell": "A1", "parameters": ["제목"]},
+    ]
+
+
+# [FILL] 범위 채우기가 셀마다 상대 참조를 이동한 명령어로 펼쳐지는지 테스트
+def test_fill_expands_with_relative_references():
+    commands = normalize_commands([
+        ["@fill", "D2:D4", "sum", "A2:C2"],
+        ["@fill", "E2:E3", "if", "B2>=$F$1", "합격", "불합격"],
+        ["@fill", "G2:G3", "set_value", "Q1"],
+    ])
+
+    assert [(c["target_cell"], c["parameters"]) for c in commands] == [
+        ("D2", ["A2:C2"]), ("D3", ["A3:C3"]), ("D4", ["A4:C4"]),
+        ("E2", ["B2>=$F$1", "합격", "불합격"]), ("E3", ["B3>=$F$1", "합격", "불합격"]),
+        ("G2", ["Q1"]), ("G3", ["Q1"]),  # set_value 값은 수식이 아니면 그대로
+    ]
+
+
+# [FILL] 형식 오류와 너무 큰 범위는 거부하는지 테스트
+def test_fill_rejects_invalid_commands(monkeypatch):
+    monkeypatch.setattr(command_encoding_service, "MAX_FILL_CELLS", 10)
+
+    with pytest.raises(ValueError):
+        normalize_commands([["@fill", "A1:A11", "set_value", 0]])
+    with pytest.raises(ValueError):
+        normalize_commands([["sum"]])
+    with pytest.raises(ValueError):
+        normalize_commands(["sum B11"])
+
+
+# [SERVICE] compact 응답이 ExcelCommand 목록으로 변환되는지 테스트
+def test_llm_service_parses_compact_response():
+    service = LLMService(client=object())
+    response = json.dumps({
+        "response": "완료",
+        "commands": [["round", "D2", 1], ["@fill", "D2:D3", "average", "A2:C2"]],
+        "summary": "평균 추가",
+    })
+
+    result = service._build_response_result(response, "")
+
+    assert [(c.command_type, c.target_cell, c.parameters) for c in result.cmd_seq] == [
+        ("average", "D2", {"range": "A2:C2"}),
+        ("average", "D3", {"range": "A3:C3"}),
+        ("round", "D2", {"num_digits": 1}),
+    ]
+
+
+# [SERVICE] 응답의 명령어(범위 채우기 포함)를 한 번만 펼치는지 테스트
+def test_llm_service_normalizes_commands_once():
+    service = LLMService(client=object())
+    response = json.dumps({"response": "완료", "commands": [["@fill", "D2:D500", "sum", "A2:C2"]], "summary": ""})
+
+    with patch("app.services.llm_service.normalize_commands", wraps=normalize_commands) as spy, \
+            patch("app.services.command_encoding_service.expand_fill", wraps=command_encoding_service.expand_fill) \
+            as expand:
+        result = service._build_response_result(response, "")
+
+    assert len(result.cmd_seq) == 499
+    assert spy.call_count == 1
+    assert expand.call_count == 1
+
+
+# [PROMPT] compact 인코딩의 시스템 프롬프트/스키마/예시가 배열 형식을 안내하는지 테스트
+def test_compact_prompt_and_schema():
+    items = COMPACT_RESPONSE_SCHEMA["json_schema"]["schema"]["properties"]["commands"]["items"]
+
+    assert items["type"] == "array"
+    assert '["@fill", "D2:D100", "sum", "A2:C2"]' in build_system_prompt("compact")
+    assert "@fill" not in build_system_prompt("object")
+    assert to_compact('{"command_type": "sum", "target_cell": "B11", "parameters": ["B2:B10"]}') == \
+        '["sum", "B11", "B2:B10"]'
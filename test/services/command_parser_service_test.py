@@ -0,0 +1,66 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.services.command_parser_service import LocalCommandParser
+from app.services.llm_service import LLMService
+
+
+# [PARSE] 단순한 한국어/영어 명령을 명령어 하나로 해석하는지 테스트
+@pytest.mark.parametrize("user_command, expected", [
+    ("B11에 B2:B10 합계 구해줘", {"command_type": "sum", "target_cell": "B11", "parameters": ["B2:B10"]}),
+    ("b2:b10 평균을 B11에 넣어줘.", {"command_type": "average", "target_cell": "B11", "parameters": ["B2:B10"]}),
+    ("put the sum of B2:B10 in B11", {"command_type": "sum", "target_cell": "B11", "parameters": ["B2:B10"]}),
+    ("A1:C1 병합해줘", {"command_type": "merge", "target_cell": "A1:C1", "parameters": []}),
+    ("A1:C1 병합 해제해줘", {"command_type": "unmerge", "target_cell": "A1:C1", "parameters": []}),
+    ("C5 지워줘", {"command_type": "clear", "target_cell": "C5", "parameters": []}),
+    ("A1에 \"합계\" 입력해줘", {"command_type": "set_value", "target_cell": "A1", "parameters": ["합계"]}),
+    ("A1:A100에 1부터 100까지 넣어줘", {"command_type": "fill_series", "target_cell": "A1:A100", "parameters": [1]}),
+])
+def test_parse_simple_commands(user_command, expected):
+    result = LocalCommandParser().parse(user_command)
+
+    assert result is not None
+    assert result.commands == [expected]
+    assert result.reply
+
+
+# [PARSE] 애매하거나 여러 작업이 섞인 명령은 LLM으로 넘기는지 테스트
+@pytest.mark.parametrize("user_command", [
+    "B11에 합계 구해줘",               # 범위 없음
+    "A1에 합계 넣어줘",                # 따옴표 없는 값은 명령인지 값인지 애매함
+    "B5에 B2:B10 합계",                # 대상 셀이 범위 안 (순환 참조)
+    "B2:B10 합계 구하고 A1:C1 병합해줘",  # 여러 작업
+    "A1:A3에 1부터 10까지",             # 간격이 정수로 나누어떨어지지 않음
+    "앞의 표 지워줘",
+])
+def test_ambiguous_commands_fall_back(user_command):
+    assert LocalCommandParser().parse(user_command) is None
+
+
+# [PARSE] 대화 요약에 지속 지시가 있으면 처리하지 않고, 처리 비율을 집계하는지 테스트
+def test_standing_instruction_and_stats():
+    parser = LocalCommandParser()
+
+    assert parser.parse("C5 지워줘", "앞으로 모든 결과는 반올림") is None
+    assert parser.parse("C5 지워줘") is not None
+
+    stats = parser.stats()
+    assert stats["requests"] == 2
+    assert stats["handled"] == 1
+    assert stats["absorbed_ratio"] == 0.5
+    assert stats["by_command"] == {"clear": 1}
+
+
+# [LLM] 로컬 파서가 처리한 명령은 GPT를 호출하지 않는지 테스트
+def test_llm_service_skips_gpt_for_local_command():
+    with patch.dict('os.environ', {'OPENAI_API_KEY': 'test-api-key'}):
+        service = LLMService(parser=LocalCommandParser())
+    service._call_gpt_api = MagicMock()
+
+    result = service.get_llm_response("B11에 B2:B10 합계", b"unused")
+
+    service._call_gpt_api.assert_not_called()
+    assert result.cmd_seq[0].command_type == "sum"
+    assert result.cmd_seq[0].parameters == {"range": "B2:B10"}
+    assert "합계" in result.chat
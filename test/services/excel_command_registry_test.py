@@ -0,0 +1,157 @@
+import datetime
+
+import pytest
+from openpyxl import Workbook
+
+from app.schemas.excel_schema import ExcelCommand
+from app.services import command_encoding_service
+from app.services.excel_command_registry import CommandRegistry
+from app.services.excel_service import ExcelManipulator, command_registry
+
+
+def create_manipulator(registry: CommandRegistry = None) -> ExcelManipulator:
+    manipulator = ExcelManipulator(registry=registry)
+    manipulator.load_from_workbook(Workbook())
+    return manipulator
+
+
+# [REGISTRY] 등록된 핸들러가 실행되고 횟수/시간이 기록되는지 테스트
+def test_registry_executes_and_records_stats():
+    registry = CommandRegistry()
+    called = []
+
+    @registry.register("custom")
+    def _custom(manipulator, command):
+        called.append(command.target_cell)
+
+    command = ExcelCommand(command_type="CUSTOM", target_cell="A1", parameters={})
+    assert registry.execute(None, command) is True
+    assert registry.execute(None, command) is True
+
+    assert called == ["A1", "A1"]
+    stats = registry.stats()
+    assert stats["custom"]["calls"] == 2
+    assert stats["custom"]["errors"] == 0
+
+
+# [REGISTRY] 등록되지 않은 명령어는 False를 반환하는지 테스트
+def test_registry_unknown_command():
+    registry = CommandRegistry()
+    command = ExcelCommand(command_type="unknown", target_cell="A1", parameters={})
+    assert registry.execute(None, command) is False
+    assert registry.stats() == {}
+
+
+# [REGISTRY] 핸들러 예외 시 오류 횟수가 기록되고 예외가 전파되는지 테스트
+def test_registry_records_errors():
+    registry = CommandRegistry()
+    registry.register("boom", lambda manipulator, command: 1 / 0)
+    command = ExcelCommand(command_type="boom", target_cell="A1", parameters={})
+
+    with pytest.raises(ZeroDivisionError):
+        registry.execute(None, command)
+
+    stats = registry.stats()["boom"]
+    assert stats["calls"] == 1
+    assert stats["errors"] == 1
+
+
+# [REGISTRY] 체인 수정 없이 새 명령어를 manipulator에 추가할 수 있는지 테스트
+def test_custom_registry_with_manipulator():
+    registry = CommandRegistry()
+    registry.register("double", lambda m, c: m.active_sheet.__setitem__(c.target_cell, c.parameters["value"] * 2))
+    manipulator = create_manipulator(registry)
+
+    manipulator.execute_commands([ExcelCommand(command_type="double", target_cell="B2", parameters={"value": 21})])
+
+    assert manipulator.active_sheet["B2"].value == 42
+
+
+# [DISPATCH] 기본 레지스트리에 스키마의 명령어들이 등록되어 있는지 테스트
+def test_default_registry_covers_formula_commands():
+    for command_type in ["sum", "vlookup", "hlookup", "index", "match", "and", "or",
+                         "upper", "lower", "substitute", "concatenate", "&"]:
+        assert command_registry.get(command_type) is not None
+
+
+# [DISPATCH] 기본 명령어들이 올바른 수식을 생성하는지 테스트
+@pytest.mark.parametrize("command_type, parameters, expected", [
+    ("sum", {"range": "A1:A3"}, "=SUM(A1:A3)"),
+    ("vlookup", {"lookup_value": "A2", "table_array": "B2:D10", "col_index": 3, "range_lookup": False},
+     "=VLOOKUP(A2, B2:D10, 3, FALSE)"),
+    ("match", {"lookup_value": "A1", "lookup_array": "B1:B9", "match_type": 0}, "=MATCH(A1, B1:B9, 0)"),
+    ("and", {"conditions": ["A1>1", "B1<2"]}, "=AND(A1>1,B1<2)"),
+    ("upper", {"source": "A1"}, "=UPPER(A1)"),
+    ("lower", {"source": "A1"}, "=LOWER(A1)"),
+    ("substitute", {"source": "A1", "old_text": "구버전", "new_text": "신버전"}, '=SUBSTITUTE(A1,"구버전","신버전")'),
+    ("&", {"values": ["A1", "B1"]}, "=CONCATENATE(A1,B1)"),
+])
+def test_default_commands_generate_formula(command_type, parameters, expected):
+    manipulator = create_manipulator()
+    manipulator.execute_commands([ExcelCommand(command_type=command_type, target_cell="Z1", parameters=parameters)])
+    assert manipulator.active_sheet["Z1"].value == expected
+
+
+# [FILL] 범위 채우기 명령어가 범위 전체를 한 번에 기록하고 변경 셀로 남기는지 테스트
+def test_fill_value_and_series_write_whole_range():
+    manipulator = create_manipulator()
+    manipulator.execute_commands([
+        ExcelCommand(command_type="fill_value", target_cell="B1:B3", parameters={"value": "미확인"}),
+        ExcelCommand(command_type="fill_series", target_cell="A1:A100", parameters={"start": 1, "step": 1}),
+        ExcelCommand(command_type="fill_series", target_cell="C1:E1", parameters={"start": "0.5", "step": "0.5"}),
+    ])
+    ws = manipulator.active_sheet
+
+    assert [ws.cell(row=row, column=2).value for row in range(1, 4)] == ["미확인"] * 3
+    assert [ws.cell(row=row, column=1).value for row in range(1, 101)] == list(range(1, 101))
+    assert [ws["C1"].value, ws["D1"].value, ws["E1"].value] == [0.5, 1.0, 1.5]
+    assert {"A1", "A100", "B3", "E1"} <= set(manipulator.touched_cells)
+
+
+# [FILL] 날짜 연속값이 단위별로 증가하고 월말을 넘지 않는지 테스트
+def test_fill_series_dates():
+    manipulator = create_manipulator()
+    manipulator.execute_commands([
+        ExcelCommand(command_type="fill_series", target_cell="A1:A3",
+                     parameters={"start": "2024-01-31", "step": 1, "unit": "month"}),
+        ExcelCommand(command_type="fill_series", target_cell="B1:B2",
+                     parameters={"start": "2024-01-01", "step": 1, "unit": "week"}),
+    ])
+    ws = manipulator.active_sheet
+
+    assert [ws["A1"].value, ws["A2"].value, ws["A3"].value] == [
+        datetime.date(2024, 1, 31), datetime.date(2024, 2, 29), datetime.date(2024, 3, 31)]
+    assert ws["B2"].value == datetime.date(2024, 1, 8)
+
+
+# [FILL] 수식 채우기가 상대 참조만 셀마다 이동하는지 테스트
+def test_fill_formula_shifts_relative_references():
+    manipulator = create_manipulator()
+    manipulator.execute_commands([
+        ExcelCommand(command_type="fill_formula", target_cell="D2:E3", parameters={"formula": "B2*$C$1"}),
+    ])
+    ws = manipulator.active_sheet
+
+    assert ws["D2"].value == "=B2*$C$1"
+    assert ws["E2"].value == "=C2*$C$1"
+    assert ws["D3"].value == "=B3*$C$1"
+    assert ws["E3"].value == "=C3*$C$1"
+
+
+# [FILL] 최대 셀 수를 넘는 범위 채우기는 셀을 만들기 전에 거부하는지 테스트
+@pytest.mark.parametrize("command_type, parameters", [
+    ("fill_value", {"value": 0}),
+    ("fill_series", {"start": 1}),
+    ("fill_formula", {"formula": "=A1"}),
+])
+def test_fill_rejects_range_over_max_cells(monkeypatch, command_type, parameters):
+    monkeypatch.setattr(command_encoding_service, "MAX_FILL_CELLS", 10)
+    manipulator = create_manipulator()
+
+    with pytest.raises(ValueError):
+        manipulator.execute_commands([
+            ExcelCommand(command_type=command_type, target_cell="A1:XFD1048576", parameters=parameters)
+        ])
+
+    assert manipulator.active_sheet.max_row == 1 and manipulator.active_sheet["A1"].value is None
+    assert manipulator.touched_cells == {}
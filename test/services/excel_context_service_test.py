@@ -0,0 +1,142 @@
+import io
+from unittest.mock import patch
+
+from openpyxl import Workbook
+
+import app.services.excel_context_service as excel_context_module
+from app.schemas.excel_schema import ExcelCommand
+from app.services.excel_context_service import build_excel_context, find_regions, describe_column, \
+    encode_row, group_formulas, relative_formula, get_excel_context, ExcelContextCache
+from app.services.excel_service import process_excel_with_commands
+from app.services.workbook_service import ParsedWorkbook
+from app.utils.cell_reference import shift_references
+from app.utils.token_estimate import estimate_tokens
+
+
+def create_large_workbook(rows: int = 2000) -> Workbook:
+    workbook = Workbook()
+    ws = workbook.active
+    ws.append(["번호", "이름", "부서", "점수", "합계"])
+    departments = ["영업", "개발", "인사"]
+    for index in range(1, rows + 1):
+        row = index + 1
+        ws.append([index, f"직원{index}", departments[index % 3], index % 100, f"=A{row}+D{row}"])
+    ws["H1"] = "메모"
+    ws["H2"] = "분기 실적"
+    return workbook
+
+
+def to_bytes(workbook: Workbook) -> bytes:
+    output = io.BytesIO()
+    workbook.save(output)
+    return output.getvalue()
+
+
+# [SMALL] 작은 시트는 셀 단위로 그대로 나열하는지 테스트
+def test_small_sheet_lists_cells():
+    workbook = Workbook()
+    ws = workbook.active
+    ws["A1"] = "이름"
+    ws["B1"] = 10
+    ws["B2"] = "=B1*2"
+
+    context = build_excel_context(ws)
+
+    assert "A1: 이름" in context
+    assert "B2: =B1*2 → 20" in context
+
+
+# [BUDGET] 큰 시트는 예산 안에서 표 구조·열 통계·행 샘플로 요약하는지 테스트
+def test_large_sheet_is_compacted_within_budget():
+    ws = create_large_workbook().active
+
+    context = build_excel_context(ws, token_budget=1500)
+
+    assert estimate_tokens(context) <= 1500
+    assert "표 1: A1:E2001 (헤더 1행, 데이터 2000행)" in context
+    assert "- A '번호': 숫자 2000개, 1→2000 연속(간격 1)" in context
+    assert "- C '부서': 텍스트 2000개, 값 분포: " in context
+    assert "- D '점수': 숫자 2000개, 최소 0, 최대 99, 평균 49.5" in context
+    assert "E2:E2001: =A2+D2 (같은 패턴 2000개)" in context
+    assert "2001행:" in context  # 마지막 행 샘플 (100행 이후도 보임)
+    assert "영역 2 (H1:H2): H1: 메모, H2: 분기 실적" in context
+
+
+# [REGION] 빈 행/열로 떨어진 영역을 각각의 표로 나누는지 테스트
+def test_find_regions_splits_on_blank_rows_and_columns():
+    coordinates = [(1, 1), (1, 2), (2, 1), (2, 2), (1, 4), (2, 4), (5, 1), (6, 1)]
+
+    refs = [region.ref for region in find_regions(coordinates)]
+
+    assert refs == ["A1:B2", "D1:D2", "A5:A6"]
+
+
+# [STATS] 열 통계와 반복값 압축 테스트
+def test_describe_column_and_encode_row():
+    assert describe_column([3, 1, 2, None]) == "숫자 3개, 최소 1, 최대 3, 평균 2, 빈칸 1개"
+    assert describe_column([5, 5, 5]) == "숫자 3개, 모두 5"
+    assert encode_row(["합계", 0, 0, 0, None, 1.5]) == "합계 | 0 ×3 |  | 1.5"
+
+
+# [FORMULA] 같은 패턴으로 채운 수식을 세로/가로 범위로 묶는지 테스트
+def test_group_formulas_vertical_and_horizontal():
+    formulas = {
+        (2, 3): "=A2+B2", (3, 3): "=A3+B3", (4, 3): "=A4+B4",
+        (5, 1): "=SUM(A2:A4)", (5, 2): "=SUM(B2:B4)",
+        (7, 1): "=$A$1*2",
+    }
+
+    descriptions = [group.describe() for group in group_formulas(formulas, {"C2": 3})]
+
+    assert descriptions == [
+        "C2:C4: =A2+B2 (같은 패턴 3개) → 3",
+        "A5:B5: =SUM(A2:A4) (같은 패턴 2개)",
+        "A7: =$A$1*2",
+    ]
+    assert relative_formula("=LOG10(A2)+$B$1", 2, 3) == "=LOG10(R[0]C[-2])+R1C2"
+
+
+# [FORMULA] 수식 패턴 비교가 채우기(shift_references)와 같은 규칙으로 셀 참조를 찾는지 테스트
+def test_relative_formula_matches_shift_reference_tokens():
+    # 숫자 뒤(1A1), 글자 앞(A1B), 문자열 리터럴 안("A1")은 셀 참조가 아님
+    assert relative_formula('=1A1+A1B+"A1"&A1', 2, 2) == '=1A1+A1B+"A1"&R[-1]C[-1]'
+    assert shift_references('=1A1+A1B+"A1"&A1', 1, 1) == '=1A1+A1B+"A1"&B2'
+
+
+# [CACHE] 같은 시트 바이트로 다시 요청하면 파싱·인코딩 없이 캐시된 컨텍스트를 반환하는지 테스트
+def test_context_cache_hit_skips_parsing():
+    excel_bytes = to_bytes(create_large_workbook(200))
+    cache = ExcelContextCache(max_entries=4)
+
+    first = get_excel_context(ParsedWorkbook(excel_bytes), token_budget=1500, cache=cache)
+    parsed = ParsedWorkbook(excel_bytes)
+    second = get_excel_context(parsed, token_budget=1500, cache=cache)
+
+    assert second == first
+    assert parsed.is_parsed is False
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+# [INCREMENTAL] 명령어 실행 후 증분 갱신한 컨텍스트가 새 시트를 처음부터 만든 컨텍스트와 같은지 테스트
+def test_incremental_refresh_matches_full_rebuild():
+    cache = ExcelContextCache(max_entries=4)
+    parsed = ParsedWorkbook(to_bytes(create_large_workbook(200)))
+    commands = [
+        ExcelCommand(command_type="set_value", target_cell="D2", parameters={"value": 500}),
+        ExcelCommand(command_type="clear", target_cell="B3", parameters={}),
+        ExcelCommand(command_type="sum", target_cell="D202", parameters={"range": "D2:D201"}),
+        ExcelCommand(command_type="set_value", target_cell="J1", parameters={"value": "새 메모"}),
+    ]
+
+    with patch.object(excel_context_module, "excel_context_cache", cache):
+        get_excel_context(parsed, token_budget=excel_context_module.EXCEL_CONTEXT_TOKEN_BUDGET)
+        saved_bytes = process_excel_with_commands(parsed, commands)
+
+        refreshed = ParsedWorkbook(saved_bytes)
+        cached = get_excel_context(refreshed)
+
+    assert refreshed.is_parsed is False
+    assert cache.stats()["incremental_updates"] == 1
+    assert cached == build_excel_context(ParsedWorkbook(saved_bytes).workbook.active)
+    assert "J1: 새 메모" in cached
@@ -0,0 +1,116 @@
+import asyncio
+import io
+import os
+import time
+
+import pytest
+from openpyxl import Workbook, load_workbook
+
+from app.exceptions.http_exceptions import ExcelJobTimeoutException
+from app.schemas.excel_schema import ExcelCommand
+from app.services.excel_worker_service import ExcelProcessPool, apply_session_job_result, run_session_job
+from app.services.workbook_service import ParsedWorkbook
+
+
+def _pid() -> int:
+    return os.getpid()
+
+
+def _sleep(seconds: float) -> float:
+    time.sleep(seconds)
+    return seconds
+
+
+def create_excel_bytes() -> bytes:
+    workbook = Workbook()
+    ws = workbook.active
+    ws["B2"] = 10
+    ws["B3"] = 20
+    output = io.BytesIO()
+    workbook.save(output)
+    return output.getvalue()
+
+
+# [PROCESS] 같은 세션은 같은 워커 프로세스에서, N개 작업 후에는 새 프로세스에서 실행되는지 테스트
+def test_sticky_worker_and_recycle_after_jobs():
+    pool = ExcelProcessPool(workers=2, max_jobs_per_worker=2, max_rss_bytes=0)
+
+    async def scenario():
+        first = await pool.run(1, _pid)
+        second = await pool.run(3, _pid)  # 1 % 2 == 3 % 2 → 같은 워커, 2개 처리 후 교체
+        third = await pool.run(1, _pid)
+        other = await pool.run(2, _pid)
+        return first, second, third, other
+
+    try:
+        first, second, third, other = asyncio.run(scenario())
+        stats = pool.stats()
+    finally:
+        pool.shutdown()
+
+    assert first == second
+    assert third != first
+    assert other not in (first, third)
+    assert stats["per_worker"][1]["recycles"] == 1
+    assert stats["per_worker"][1]["total_jobs"] == 3
+    assert stats["queue_depth"] == 0
+
+
+# [PROCESS] 제한 시간을 넘긴 작업은 워커를 종료하고 다음 작업은 새 프로세스에서 실행되는지 테스트
+def test_job_timeout_kills_worker():
+    pool = ExcelProcessPool(workers=1, job_timeout=5)
+
+    async def scenario():
+        before = await pool.run(1, _pid)
+        with pytest.raises(ExcelJobTimeoutException):
+            await pool.run(1, _sleep, 30)
+        after = await pool.run(1, _pid)
+        return before, after
+
+    try:
+        before, after = asyncio.run(scenario())
+        stats = pool.stats()["per_worker"][0]
+    finally:
+        pool.shutdown()
+
+    assert before != after
+    assert stats["timeouts"] == 1
+    assert stats["recycles"] == 1
+
+
+# [PROCESS] 워커에서 실행한 결과가 요청 워크북에 반영되어 delta/저장에 쓰이는지 테스트
+def test_session_job_result_is_applied_to_parsed_workbook():
+    source = create_excel_bytes()
+    commands = [ExcelCommand(command_type="sum", target_cell="B4", parameters={"range": "B2:B3"})]
+
+    result = run_session_job(7, source, commands, collect_changes=True)
+    parsed = ParsedWorkbook(source)
+    saved = apply_session_job_result(parsed, result)
+
+    assert saved == result["excel_bytes"]
+    assert parsed.source_hash == result["content_hash"]
+    assert parsed.touched_cells == ["B4"]
+    assert parsed.cell_changes["changes"][0]["formula"] == "=SUM(B2:B3)"
+    assert parsed.cell_changes["changes"][0]["value"] == 30
+    assert load_workbook(io.BytesIO(saved)).active["B4"].value == "=SUM(B2:B3)"
+
+
+# [PROCESS] 워커가 만든 delta에도 재계산된 하위 수식 셀이 포함되는지 테스트
+def test_session_job_changes_include_recalculated_dependents():
+    commands = [
+        ExcelCommand(command_type="sum", target_cell="B4", parameters={"range": "B2:B3"}),
+        ExcelCommand(command_type="set_value", target_cell="C4", parameters={"value": "=B4*2"}),
+    ]
+    first = run_session_job(8, create_excel_bytes(), commands)
+
+    result = run_session_job(
+        8, first["excel_bytes"], [ExcelCommand(command_type="set_value", target_cell="B2", parameters={"value": 100})],
+        collect_changes=True
+    )
+    parsed = ParsedWorkbook(first["excel_bytes"])
+    apply_session_job_result(parsed, result)
+
+    assert result["recalculated_cells"] == ["B4", "C4"]
+    assert parsed.delta_cells == ["B2", "B4", "C4"]
+    assert [(change["address"], change["value"]) for change in parsed.cell_changes["changes"]] == [
+        ("B2", 100), ("B4", 120), ("C4", 240)]
@@ -0,0 +1,145 @@
+import io
+from unittest.mock import patch
+
+from openpyxl import Workbook, load_workbook
+
+from app.schemas.excel_schema import ExcelCommand
+from app.services.excel_service import ExcelManipulator, process_excel_with_commands
+from app.services.formula_graph_service import DependencyGraph, recalculate_changes, extract_references
+from app.services.formula_service import FormulaEvaluator, get_computed_values
+from app.services.workbook_service import ParsedWorkbook
+
+
+def create_chain_workbook() -> Workbook:
+    workbook = Workbook()
+    ws = workbook.active
+    for row in range(1, 6):
+        ws.cell(row=row, column=1, value=row * 10)
+    ws["B1"] = "=SUM(A1:A5)"
+    ws["B2"] = "=B1*2"
+    ws["B3"] = "=A1+1"
+    return workbook
+
+
+# [GRAPH] 셀/범위 참조가 의존 관계로 등록되는지 테스트
+def test_dependents_include_cell_and_range_references():
+    graph = DependencyGraph.from_workbook(create_chain_workbook())
+
+    assert graph.dependents(("Sheet", 3, 1)) == {("Sheet", 1, 2)}
+    assert graph.dependents(("Sheet", 1, 1)) == {("Sheet", 1, 2), ("Sheet", 3, 2)}
+    assert graph.dependents(("Sheet", 1, 2)) == {("Sheet", 2, 2)}
+
+
+# [GRAPH] 수식이 바뀌면 이전 참조가 그래프에서 제거되는지 테스트
+def test_set_formula_replaces_previous_references():
+    graph = DependencyGraph.from_workbook(create_chain_workbook())
+
+    graph.set_formula(("Sheet", 3, 2), "=A2")
+    assert ("Sheet", 3, 2) not in graph.dependents(("Sheet", 1, 1))
+    assert graph.dependents(("Sheet", 2, 1)) == {("Sheet", 1, 2), ("Sheet", 3, 2)}
+
+    graph.set_formula(("Sheet", 3, 2), None)
+    assert ("Sheet", 3, 2) not in graph
+
+
+# [ORDER] 하위 수식만 위상 정렬 순서로 재계산 대상이 되는지 테스트
+def test_evaluation_order_is_downstream_only():
+    graph = DependencyGraph.from_workbook(create_chain_workbook())
+
+    order, blocked, cycles = graph.evaluation_order([("Sheet", 4, 1)])
+
+    assert order == [("Sheet", 1, 2), ("Sheet", 2, 2)]
+    assert blocked == [] and cycles == []
+
+
+# [CYCLE] 순환 참조를 루프 없이 감지하고 하위 셀은 계산 대상에서 제외하는지 테스트
+def test_cycles_are_detected_and_reported():
+    workbook = create_chain_workbook()
+    ws = workbook.active
+    ws["C1"] = "=C2+1"
+    ws["C2"] = "=C1+A1"
+    ws["C3"] = "=C2*2"
+    graph = DependencyGraph.from_workbook(workbook)
+
+    order, blocked, cycles = graph.evaluation_order([("Sheet", 1, 1)])
+
+    assert cycles == [[("Sheet", 1, 3), ("Sheet", 2, 3)]]
+    assert ("Sheet", 3, 3) in blocked
+    assert ("Sheet", 3, 3) not in order
+
+
+# [INCREMENTAL] 이전 계산 결과가 있으면 변경된 셀의 하위 수식만 다시 계산하는지 테스트
+def test_recalculate_changes_is_incremental():
+    workbook = create_chain_workbook()
+    ws = workbook.active
+    get_computed_values(ws)
+
+    ws["A5"] = 100
+    evaluated = set()
+    original = FormulaEvaluator.evaluate_cell
+
+    def spy(self, worksheet, row, col):
+        evaluated.add((row, col))
+        return original(self, worksheet, row, col)
+
+    with patch.object(FormulaEvaluator, "evaluate_cell", spy):
+        result = recalculate_changes(workbook, ws, ["A5"])
+
+    assert not result.full
+    assert result.recalculated == 2
+    assert result.dependents == {"Sheet": ["B1", "B2"]}
+    assert (3, 2) not in evaluated  # B3은 A5와 무관하므로 다시 계산하지 않음
+    assert get_computed_values(ws)["B1"] == 200
+    assert get_computed_values(ws)["B2"] == 400
+    assert get_computed_values(ws)["B3"] == 11
+
+
+
+# [FLOW] 추적하지 못한 변경이 있으면 증분 대신 전체 재계산해 저장된 캐시 값이 최신인지 테스트
+def test_process_excel_recalculates_fully_after_untracked_changes():
+    workbook = create_chain_workbook()
+    get_computed_values(workbook.active)
+    parsed = ParsedWorkbook(b"unused", workbook=workbook)
+
+    def record_untracked(manipulator, command):
+        manipulator.untracked_changes = True
+
+    with patch.object(ExcelManipulator, "_record_touched", record_untracked):
+        result = process_excel_with_commands(
+            excel_bytes=parsed,
+            commands=[ExcelCommand(command_type="set_value", target_cell="A1", parameters={"value": 1000})]
+        )
+
+    assert parsed.untracked_changes
+    cached = load_workbook(io.BytesIO(result), data_only=True).active
+    assert cached["B1"].value == 1140
+    assert cached["B2"].value == 2280
+    assert cached["B3"].value == 1001
+
+# [FLOW] 명령어 실행 후 순환 참조가 ParsedWorkbook에 보고되는지 테스트
+def test_process_excel_reports_circular_references():
+    workbook = create_chain_workbook()
+    output = io.BytesIO()
+    workbook.save(output)
+    parsed = ParsedWorkbook(output.getvalue())
+
+    result = process_excel_with_commands(
+        excel_bytes=parsed,
+        commands=[
+            ExcelCommand(command_type="sum", target_cell="D1", parameters={"range": "D2:D3"}),
+            ExcelCommand(command_type="sum", target_cell="D2", parameters={"range": "D1:D1"}),
+        ]
+    )
+
+    assert parsed.circular_references == ["Sheet!D1", "Sheet!D2"]
+    cached = load_workbook(io.BytesIO(result), data_only=True).active
+    assert cached["B1"].value == 150
+    assert cached["D1"].value is None
+
+
+# [PARSE] 시트 이름이 있는 참조와 전체 열 참조를 추출하는지 테스트
+def test_extract_references_with_sheet_and_full_column():
+    cells, ranges = extract_references("=VLOOKUP(A2, '학생 명단'!A:C, 2, FALSE)", "Sheet")
+
+    assert cells == [("Sheet", 2, 1)]
+    assert ranges == [("학생 명단", 1, 1, 1048576, 3)]
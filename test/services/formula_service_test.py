@@ -0,0 +1,166 @@
+import inspect
+import io
+from unittest.mock import patch
+
+from openpyxl import Workbook, load_workbook
+from openpyxl.worksheet import _writer as worksheet_writer
+
+from app.schemas.excel_schema import ExcelCommand
+from app.services.excel_service import process_excel_with_commands, collect_cell_changes
+from app.services import formula_service
+from app.services.formula_service import recalculate_workbook, parse_formula, FormulaEvaluationError, \
+    get_computed_values, DIV0, cached_value_writer
+from app.services.llm_service import LLMService
+from app.services.workbook_service import ParsedWorkbook
+
+
+def create_score_workbook() -> Workbook:
+    workbook = Workbook()
+    ws = workbook.active
+    for row in [("이름", "점수", "성별"), ("김철수", 90, "남성"), ("이영희", 80, "여성"),
+                ("박민수", 70, "남성"), ("최지은", 80, "여성")]:
+        ws.append(row)
+    return workbook
+
+
+def evaluate(formula: str):
+    workbook = create_score_workbook()
+    workbook.active["Z1"] = formula
+    return recalculate_workbook(workbook)[workbook.active.title].get("Z1")
+
+
+# [AGGREGATE] 집계/통계 함수 계산 테스트
+def test_aggregate_functions():
+    assert evaluate("=SUM(B2:B5)") == 320
+    assert evaluate("=AVERAGE(B2:B5)") == 80
+    assert evaluate("=COUNT(A1:B5)") == 4
+    assert evaluate("=MAX(B2:B5)") == 90
+    assert evaluate("=MIN(B:B)") == 70
+    assert evaluate("=MEDIAN(B2:B5)") == 80
+    assert evaluate("=MODE.SNGL(B2:B5)") == 80
+    assert round(evaluate("=STDEV.S(B2:B5)"), 6) == 8.164966
+    assert evaluate("=RANK.EQ(B3, B2:B5, 0)") == 2
+
+
+# [CONDITIONAL] 조건부 집계 함수 계산 테스트
+def test_conditional_functions():
+    assert evaluate('=COUNTIF(B2:B5, ">=80")') == 3
+    assert evaluate('=SUMIF(C2:C5, "남성", B2:B5)') == 160
+    assert evaluate('=AVERAGEIF(C2:C5, "여*", B2:B5)') == 80
+    assert evaluate('=COUNTIF(C2:C5, "<>남성")') == 2
+
+
+# [LOGICAL] 논리/오류 처리 함수 계산 테스트
+def test_logical_functions():
+    assert evaluate('=IF(B2>=85, "우수", "보통")') == "우수"
+    assert evaluate('=IFS(B4>=80, "A", B4>=70, "B")') == "B"
+    assert evaluate('=IFERROR(B2/0, "오류")') == "오류"
+    assert evaluate("=B2/0") == DIV0
+    assert evaluate("=AND(B2>0, B3>85)") is False
+
+
+# [LOOKUP] 조회 함수 계산 테스트
+def test_lookup_functions():
+    assert evaluate('=VLOOKUP("박민수", A2:C5, 2, FALSE)') == 70
+    assert evaluate('=INDEX(A2:A5, MATCH(80, B2:B5, 0))') == "이영희"
+    assert evaluate('=XLOOKUP("최지은", A2:A5, C2:C5)') == "여성"
+    assert evaluate('=IFNA(VLOOKUP("없음", A2:C5, 2, FALSE), "-")') == "-"
+
+
+# [TEXT] 텍스트/숫자 함수 계산 테스트
+def test_text_and_round_functions():
+    assert evaluate('=CONCATENATE(A2, "-", B2)') == "김철수-90"
+    assert evaluate('=LEFT(A2, 1)&RIGHT(A3, 1)') == "김희"
+    assert evaluate('=SUBSTITUTE("a-b-c", "-", "+", 2)') == "a-b+c"
+    assert evaluate('=TRIM("  a   b ")') == "a b"
+    assert evaluate("=ROUND(2.345, 2)") == 2.35
+    assert evaluate("=-2^2") == 4
+
+
+# [UNSUPPORTED] 지원하지 않는 함수와 순환 참조는 계산 결과에서 제외되는지 테스트
+def test_unsupported_and_circular_formulas_are_skipped():
+    workbook = create_score_workbook()
+    ws = workbook.active
+    ws["E1"] = "=FILTER(A2:A5, B2:B5>80)"
+    ws["E2"] = "=E3+1"
+    ws["E3"] = "=E2"
+    ws["E4"] = "=SUM(B2:B5)"
+
+    values = recalculate_workbook(workbook)[ws.title]
+
+    assert "E1" not in values
+    assert "E2" not in values and "E3" not in values
+    assert values["E4"] == 320
+
+
+# [PARSE] 잘못된 수식은 FormulaEvaluationError를 발생시키는지 테스트
+def test_parse_formula_rejects_invalid_syntax():
+    try:
+        parse_formula("=SUM(B2:B5")
+        assert False, "FormulaEvaluationError가 발생해야 합니다"
+    except FormulaEvaluationError:
+        pass
+
+
+# [SAVE] 명령어 실행 후 저장된 파일에 수식 캐시 값이 기록되는지 테스트
+def test_saved_workbook_contains_cached_values():
+    workbook = create_score_workbook()
+    output = io.BytesIO()
+    workbook.save(output)
+
+    result = process_excel_with_commands(
+        excel_bytes=output.getvalue(),
+        commands=[
+            ExcelCommand(command_type="sum", target_cell="B6", parameters={"range": "B2:B5"}),
+            ExcelCommand(command_type="countif", target_cell="B7", parameters={"range": "B2:B5", "criteria": ">=80"}),
+        ]
+    )
+
+    formulas = load_workbook(io.BytesIO(result)).active
+    cached = load_workbook(io.BytesIO(result), data_only=True).active
+    assert formulas["B6"].value == "=SUM(B2:B5)"
+    assert formulas["B7"].value == '=COUNTIF(B2:B5, ">=80")'
+    assert cached["B6"].value == 320
+    assert cached["B7"].value == 3
+
+
+
+# [SAVE] openpyxl 셀 writer 시그니처가 캐시 값 기록에서 가정한 형태인지 테스트 (openpyxl 업그레이드 시 확인)
+def test_openpyxl_cell_writer_signature_is_supported():
+    assert tuple(inspect.signature(worksheet_writer.write_cell).parameters) == \
+        formula_service._WRITE_CELL_PARAMETERS
+    assert formula_service._writer_supported
+
+
+# [SAVE] 캐시 값 writer는 cached_value_writer 블록 안에서만 쓰이고 블록이 끝나면 원래 writer로 돌아오는지 테스트
+def test_cached_value_writer_is_scoped():
+    workbook = create_score_workbook()
+    workbook.active["B6"] = "=SUM(B2:B5)"
+    recalculate_workbook(workbook)
+
+    plain = io.BytesIO()
+    workbook.save(plain)
+    scoped = io.BytesIO()
+    with cached_value_writer():
+        workbook.save(scoped)
+
+    assert worksheet_writer.write_cell is formula_service._original_write_cell
+    assert load_workbook(io.BytesIO(plain.getvalue()), data_only=True).active["B6"].value is None
+    assert load_workbook(io.BytesIO(scoped.getvalue()), data_only=True).active["B6"].value == 320
+
+# [CONTEXT] LLM 컨텍스트와 셀 변경 내역에 계산 값이 포함되는지 테스트
+def test_context_and_cell_changes_include_computed_values():
+    workbook = create_score_workbook()
+    workbook.active["B6"] = "=SUM(B2:B5)"
+    output = io.BytesIO()
+    workbook.save(output)
+    parsed = ParsedWorkbook(output.getvalue())
+
+    with patch.dict('os.environ', {'OPENAI_API_KEY': 'test-api-key'}):
+        context = LLMService()._analyze_excel_context(parsed)
+    changes = collect_cell_changes(parsed.workbook.active, ["B6"])
+
+    assert "B6: =SUM(B2:B5) → 320" in context
+    assert changes[0]["formula"] == "=SUM(B2:B5)"
+    assert changes[0]["value"] == 320
+    assert get_computed_values(parsed.workbook.active)["B6"] == 320
@@ -0,0 +1,126 @@
+import asyncio
+from datetime import datetime
+from unittest.mock import MagicMock
+
+from app.exceptions.http_exceptions import SessionNotFoundException
+from app.schemas.chat_schema import LLMMessageResponse, MessageResponse
+from app.services.job_service import JOB_FAILED, JOB_SUCCEEDED, ChatJobManager
+
+
+def _response() -> LLMMessageResponse:
+    message = MessageResponse(id=1, createdAt=datetime.now(), content="완료", senderType="AI")
+    return LLMMessageResponse(sheetData=None, message=message)
+
+
+# [JOB] job이 워커에서 처리되고 단계별 소요 시간과 결과가 기록되는지 테스트
+def test_job_runs_pipeline_and_records_stages():
+    db = MagicMock()
+    calls = []
+
+    async def pipeline(session_id, message, sheet_data, db_session, response_mode="full", on_stage=None,
+                       sheet_version=None):
+        calls.append((session_id, message, sheet_data, db_session, response_mode, sheet_version))
+        for stage in ("prepare", "llm", "excel", "save"):
+            on_stage(stage)
+            await asyncio.sleep(0)
+        return _response()
+
+    manager = ChatJobManager(workers=1, session_factory=lambda: db, pipeline=pipeline)
+
+    async def scenario():
+        job = manager.submit(7, "합계 구해줘", b"xlsx", response_mode="delta", sheet_version=3)
+        updates = [snapshot async for snapshot in manager.watch(job)]
+        await manager.shutdown()
+        return job, updates
+
+    job, updates = asyncio.run(scenario())
+
+    assert calls == [(7, "합계 구해줘", b"xlsx", db, "delta", 3)]
+    assert job.status == JOB_SUCCEEDED
+    assert job.result.message.content == "완료"
+    assert job.sheet_data is None
+    assert set(job.stage_latencies) == {"queue", "prepare", "llm", "excel", "save", "total"}
+    assert updates[0].status == "queued"
+    assert updates[-1].status == JOB_SUCCEEDED
+    assert [u.stage for u in updates if u.status == "running"][1:] == ["prepare", "llm", "excel", "save"]
+    db.close.assert_called_once()
+
+    stats = manager.stats()
+    assert stats["submitted"] == 1 and stats["succeeded"] == 1
+    assert stats["queue_depth"] == 0
+    assert stats["stages"]["llm"]["count"] == 1
+
+
+# [JOB] 처리 중 예외가 나면 롤백하고 실패 상태와 오류 메시지를 남기는지 테스트
+def test_job_failure_rolls_back_and_keeps_detail():
+    db = MagicMock()
+
+    async def pipeline(*args, **kwargs):
+        raise SessionNotFoundException()
+
+    manager = ChatJobManager(workers=1, session_factory=lambda: db, pipeline=pipeline)
+
+    async def scenario():
+        job = manager.submit(1, "안녕", None)
+        await manager._queue.join()
+        await manager.shutdown()
+        return job
+
+    job = asyncio.run(scenario())
+
+    assert job.status == JOB_FAILED
+    assert job.error == SessionNotFoundException().detail
+    assert job.result is None
+    db.rollback.assert_called_once()
+    db.close.assert_called_once()
+    assert manager.stats()["failed"] == 1
+
+
+# [JOB] 보관 한도를 넘으면 오래된 완료 job이 제거되는지 테스트
+def test_job_retention_drops_oldest_finished_jobs():
+    async def pipeline(*args, **kwargs):
+        return _response()
+
+    manager = ChatJobManager(workers=1, retention=2, session_factory=MagicMock, pipeline=pipeline)
+
+    async def scenario():
+        jobs = [manager.submit(1, f"메시지 {i}", None) for i in range(3)]
+        await manager._queue.join()
+        await manager.shutdown()
+        return jobs
+
+    jobs = asyncio.run(scenario())
+
+    assert manager.get(jobs[0].id) is None
+    assert manager.get(jobs[1].id) is jobs[1]
+    assert manager.get(jobs[2].id) is jobs[2]
+
+
+# [JOB] 가장 오래된 job이 끝나지 않아도 그 뒤의 완료 job은 보관 한도에 맞춰 제거되는지 테스트
+def test_job_retention_skips_unfinished_jobs():
+    gates = []
+
+    async def pipeline(session_id, message, *args, **kwargs):
+        if message == "느린 요청":
+            await gates[0].wait()
+        return _response()
+
+    manager = ChatJobManager(workers=2, retention=2, session_factory=MagicMock, pipeline=pipeline)
+
+    async def scenario():
+        gates.append(asyncio.Event())
+        stuck = manager.submit(1, "느린 요청", None)
+        done = [manager.submit(2, f"메시지 {i}", None) for i in range(4)]
+        while not all(job.done for job in done):
+            await asyncio.sleep(0)
+        retained = [manager.get(job.id) for job in [stuck, *done]]
+        gates[0].set()
+        await manager._queue.join()
+        await manager.shutdown()
+        return stuck, done, retained
+
+    stuck, done, retained = asyncio.run(scenario())
+
+    assert retained[0] is stuck                      # 실행 중인 job은 남아 있음
+    assert retained[1:4] == [None, None, None]       # 오래된 완료 job부터 제거
+    assert retained[4] is done[3]
@@ -0,0 +1,136 @@
+import json
+import os
+import time
+from unittest.mock import Mock, patch
+
+import pytest
+
+from app.services.llm_cache_service import LLMCacheBackend, LLMResponseCache, MemoryCacheBackend, \
+    DiskCacheBackend, create_llm_response_cache
+from app.services.llm_service import LLMService
+
+RESPONSE = json.dumps({
+    "response": "B열 평균을 구했습니다.",
+    "commands": [{"command_type": "average", "target_cell": "B10", "parameters": ["B2:B9"]}],
+    "summary": "평균 계산"
+}, ensure_ascii=False)
+
+
+def make_client(content: str = RESPONSE) -> Mock:
+    client = Mock()
+    client.chat.completions.create.return_value = Mock(
+        choices=[Mock(message=Mock(refusal=None, content=content))]
+    )
+    return client
+
+
+# [KEY] 요약, 명령, 시트 해시 중 하나라도 다르면 키가 달라지는지 테스트
+def test_make_key_depends_on_all_inputs():
+    base = LLMResponseCache.make_key("gpt-4.1", "요약", "B열 평균 구해줘", "hash-1")
+
+    assert base == LLMResponseCache.make_key("gpt-4.1", "요약", "B열 평균 구해줘", "hash-1")
+    assert base != LLMResponseCache.make_key("gpt-4.1", "요약2", "B열 평균 구해줘", "hash-1")
+    assert base != LLMResponseCache.make_key("gpt-4.1", "요약", "C열 평균 구해줘", "hash-1")
+    assert base != LLMResponseCache.make_key("gpt-4.1", "요약", "B열 평균 구해줘", "hash-2")
+    with patch("app.services.llm_cache_service.PROMPT_VERSION", "next"):
+        assert base != LLMResponseCache.make_key("gpt-4.1", "요약", "B열 평균 구해줘", "hash-1")
+
+
+# [TTL] 만료된 항목은 적중하지 않고 제거되는지 테스트
+def test_expired_entries_are_misses():
+    cache = LLMResponseCache(MemoryCacheBackend(), ttl=10)
+    with patch("app.services.llm_cache_service.time.time", return_value=1000):
+        cache.set("k", "v")
+    with patch("app.services.llm_cache_service.time.time", return_value=1005):
+        assert cache.get("k") == "v"
+    with patch("app.services.llm_cache_service.time.time", return_value=1011):
+        assert cache.get("k") is None
+
+    stats = cache.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1 and stats["expirations"] == 1
+    assert stats["entries"] == 0
+
+
+# [LRU] 최대 항목 수를 넘으면 가장 오래 사용되지 않은 항목부터 제거하는지 테스트
+@pytest.mark.parametrize("backend_factory", [
+    lambda tmp_path: MemoryCacheBackend(max_entries=2),
+    lambda tmp_path: DiskCacheBackend(str(tmp_path), max_entries=2),
+])
+def test_lru_eviction(tmp_path, backend_factory):
+    cache = LLMResponseCache(backend_factory(tmp_path), ttl=60)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    _age(cache.backend, "a", 1)
+    _age(cache.backend, "b", 2)
+    assert cache.get("a") == "1"  # a를 최근 사용으로 표시
+    cache.set("c", "3")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "1"
+    assert cache.get("c") == "3"
+    assert cache.stats()["evictions"] == 1
+
+
+def _age(backend, key, seconds_ago):
+    """디스크 저장소는 파일 수정 시각으로 LRU 순서를 정하므로 테스트에서 시각을 명시적으로 과거로 설정"""
+    if isinstance(backend, DiskCacheBackend):
+        past = time.time() - 100 + seconds_ago
+        os.utime(backend._path(key), (past, past))
+
+
+# [DISK] 디스크 저장소는 새 인스턴스에서도 항목을 읽을 수 있는지 테스트
+def test_disk_backend_persists(tmp_path):
+    LLMResponseCache(DiskCacheBackend(str(tmp_path)), ttl=60).set("k", RESPONSE)
+
+    assert LLMResponseCache(DiskCacheBackend(str(tmp_path)), ttl=60).get("k") == RESPONSE
+
+
+# [SERVICE] 같은 명령·시트·요약이면 두 번째 호출은 GPT를 호출하지 않는지 테스트
+def test_llm_service_cache_hit_skips_network():
+    client = make_client()
+    service = LLMService(client=client, cache=LLMResponseCache(MemoryCacheBackend(), ttl=60))
+
+    with patch.object(service, "_analyze_excel_context", return_value="context") as mock_context:
+        first = service.get_llm_response("B열 평균 구해줘", b"sheet", "")
+        second = service.get_llm_response("B열 평균 구해줘", b"sheet", "")
+        service.get_llm_response("B열 평균 구해줘", b"other-sheet", "")
+
+    assert client.chat.completions.create.call_count == 2
+    assert mock_context.call_count == 2
+    assert second.chat == first.chat
+    assert second.cmd_seq[0].target_cell == "B10"
+    assert client.chat.completions.create.call_args.kwargs["temperature"] == 0
+
+
+# [SERVICE] 검증에 실패한 응답은 캐시에 저장하지 않는지 테스트
+def test_llm_service_does_not_cache_invalid_response():
+    client = make_client(content='{"response": "x"}')
+    cache = LLMResponseCache(MemoryCacheBackend(), ttl=60)
+    service = LLMService(client=client, cache=cache)
+
+    with patch.object(service, "_analyze_excel_context", return_value="context"):
+        service.get_llm_response("명령", b"sheet", "")
+        service.get_llm_response("명령", b"sheet", "")
+
+    assert client.chat.completions.create.call_count == 2
+    assert cache.stats()["entries"] == 0
+
+
+# [CONFIG] 환경변수로 캐시를 끄거나 디스크 저장소를 고를 수 있는지 테스트
+def test_create_cache_from_environment(tmp_path):
+    with patch.dict("os.environ", {"LLM_CACHE_BACKEND": "none"}):
+        assert create_llm_response_cache() is None
+    with patch.dict("os.environ", {"LLM_CACHE_BACKEND": "disk", "LLM_CACHE_DIR": str(tmp_path), "LLM_CACHE_TTL": "5"}):
+        cache = create_llm_response_cache()
+    assert isinstance(cache.backend, DiskCacheBackend)
+    assert cache.ttl == 5
+
+
+# [BACKEND] 인터페이스 메서드를 모두 구현하지 않은 저장소는 생성할 때 실패하는지 테스트
+def test_incomplete_backend_cannot_be_created():
+    class GetOnlyBackend(LLMCacheBackend):
+        def get(self, key):
+            return None
+
+    with pytest.raises(TypeError):
+        GetOnlyBackend()
@@ -0,0 +1,219 @@
+from unittest.mock import patch, Mock
+
+import httpx
+import pytest
+
+from app.services.llm_client_service import LLMClientManager, ConnectionMetrics, UsageMetrics, llm_client_manager
+from app.services import llm_service as llm_service_module
+from app.services.llm_service import LLMService, get_llm_response
+
+
+# [STARTUP] startup은 공유 클라이언트를 한 번만 만들고 shutdown이 커넥션 풀을 닫는지 테스트
+def test_startup_creates_single_shared_client_and_shutdown_closes():
+    manager = LLMClientManager()
+    with patch.dict('os.environ', {'OPENAI_API_KEY': 'test-key'}):
+        first = manager.startup()
+        second = manager.startup()
+
+    assert first is second
+    assert manager.client is first
+    http_client = manager.http_client
+
+    manager.shutdown()
+
+    assert http_client.is_closed
+    assert manager.client is None
+
+
+# [STARTUP] API 키가 없으면 ValueError가 발생하는지 테스트
+def test_startup_without_api_key_raises():
+    manager = LLMClientManager()
+    with patch.dict('os.environ', {}, clear=True):
+        with pytest.raises(ValueError, match="OPENAI_API_KEY"):
+            manager.startup()
+
+
+# [CONFIG] 환경변수로 풀 크기와 타임아웃을 설정하는지 테스트
+def test_config_from_environment():
+    env = {
+        'OPENAI_API_KEY': 'test-key',
+        'LLM_HTTP_MAX_CONNECTIONS': '7',
+        'LLM_HTTP_MAX_KEEPALIVE': '3',
+        'LLM_REQUEST_TIMEOUT': '12.5',
+    }
+    with patch.dict('os.environ', env):
+        manager = LLMClientManager()
+        manager.startup()
+
+    assert manager.config.max_connections == 7
+    assert manager.config.max_keepalive_connections == 3
+    assert manager.request_timeout == 12.5
+    assert manager.http_client.timeout.read == 12.5
+    manager.shutdown()
+
+
+# [METRICS] 새 연결 trace 이벤트로 재사용률을 계산하는지 테스트
+def test_connection_metrics_reuse_rate():
+    metrics = ConnectionMetrics()
+    for _ in range(4):
+        metrics.on_request(httpx.Request("POST", "https://api.openai.com/v1/chat/completions"))
+    metrics.trace("connection.connect_tcp.complete", {})
+    metrics.trace("connection.start_tls.complete", {})
+
+    stats = metrics.stats()
+    assert stats["requests"] == 4
+    assert stats["connections_opened"] == 1
+    assert stats["connections_reused"] == 3
+    assert stats["reuse_rate"] == 0.75
+
+
+# [METRICS] request 훅이 요청에 trace 콜백을 붙이는지 테스트
+def test_request_hook_attaches_trace_callback():
+    metrics = ConnectionMetrics()
+    request = httpx.Request("GET", "https://example.com")
+
+    metrics.on_request(request)
+
+    assert request.extensions["trace"] == metrics.trace
+
+
+# [SERVICE] 공유 클라이언트가 주어지면 LLMService가 새 클라이언트를 만들지 않는지 테스트
+@patch('app.services.llm_service.OpenAI')
+def test_llm_service_uses_shared_client(mock_openai):
+    shared = Mock()
+    with patch.dict('os.environ', {}, clear=True):
+        service = LLMService(client=shared)
+
+    assert service.client is shared
+    mock_openai.assert_not_called()
+
+
+# [SERVICE] 모듈 진입점이 공유 클라이언트를 LLMService에 전달하는지 테스트
+@patch('app.services.llm_service.LLMService')
+def test_get_llm_response_passes_shared_client(mock_llm_service_class):
+    shared = Mock()
+    with patch('app.services.llm_service.llm_client_manager') as mock_manager:
+        mock_manager.client = shared
+        get_llm_response("명령", b"bytes", "요약")
+
+    mock_llm_service_class.assert_called_once_with(
+        client=shared,
+        cache=llm_service_module.llm_response_cache,
+        parser=llm_service_module._default_parser(),
+        router=llm_service_module.model_router
+    )
+
+
+# [ASYNC] 비동기 클라이언트가 없으면 동기 호출을 스레드에서 실행하는지 테스트
+def test_call_gpt_api_async_falls_back_to_thread():
+    import asyncio
+    import threading
+
+    service = LLMService(client=Mock())
+    threads = []
+
+    def fake_call(prompt):
+        threads.append(threading.current_thread())
+        return '{"response": "ok"}'
+
+    with patch.object(service, "_call_gpt_api", side_effect=fake_call):
+        result = asyncio.run(service._call_gpt_api_async("prompt"))
+
+    assert result == '{"response": "ok"}'
+    assert threads[0] is not threading.main_thread()
+
+
+# [ASYNC] 비동기 클라이언트가 있으면 await로 호출하는지 테스트
+def test_call_gpt_api_async_uses_async_client():
+    import asyncio
+
+    message = Mock(refusal=None, content='{"response": "ok"}')
+    completion = Mock(choices=[Mock(message=message)])
+
+    async def fake_create(**kwargs):
+        return completion
+
+    async_client = Mock()
+    async_client.chat.completions.create.side_effect = fake_create
+    service = LLMService(client=Mock(), async_client=async_client)
+
+    assert asyncio.run(service._call_gpt_api_async("prompt")) == '{"response": "ok"}'
+    kwargs = async_client.chat.completions.create.call_args.kwargs
+    assert kwargs["messages"][1]["content"] == "prompt"
+    assert kwargs["timeout"] == service.request_timeout
+
+
+# [STREAM] 스트리밍 응답에서 response 텍스트 조각과 마지막 ResponseResult를 내보내는지 테스트
+def test_stream_llm_response_yields_text_then_result():
+    import asyncio
+    import json as json_module
+    from app.schemas.llm_schema import ResponseResult
+
+    document = json_module.dumps({
+        "response": "B4에 합계를 넣었습니다.",
+        "commands": [{"command_type": "sum", "target_cell": "B4", "parameters": ["B2:B3"]}],
+        "summary": "합계 추가"
+    }, ensure_ascii=False)
+
+    async def fake_stream():
+        for i in range(0, len(document), 5):
+            yield Mock(choices=[Mock(delta=Mock(content=document[i:i + 5]))])
+
+    async def fake_create(**kwargs):
+        assert kwargs["stream"] is True
+        return fake_stream()
+
+    async_client = Mock()
+    async_client.chat.completions.create.side_effect = fake_create
+    service = LLMService(client=Mock(), async_client=async_client)
+
+    async def collect():
+        with patch.object(service, "_analyze_excel_context", return_value="context"):
+            return [item async for item in service.stream_llm_response_async("합계", b"bytes", "")]
+
+    items = asyncio.run(collect())
+
+    texts, result = items[:-1], items[-1]
+    assert len(texts) > 1
+    assert "".join(texts) == "B4에 합계를 넣었습니다."
+    assert isinstance(result, ResponseResult)
+    assert result.cmd_seq[0].target_cell == "B4"
+
+
+# [USAGE] usage 블록에서 프롬프트 캐시 적중 토큰 수를 요청별로 기록하는지 테스트
+def test_usage_metrics_records_cached_tokens():
+    metrics = UsageMetrics(recent_size=2)
+
+    metrics.record(Mock(prompt_tokens=3000, completion_tokens=100, prompt_tokens_details=Mock(cached_tokens=2816)), "gpt-4.1")
+    metrics.record(Mock(prompt_tokens=1000, completion_tokens=50, prompt_tokens_details=None), "gpt-4.1")
+    assert metrics.record(None, "gpt-4.1") is None
+
+    stats = metrics.stats()
+    assert stats["requests"] == 2
+    assert stats["cached_tokens"] == 2816
+    assert stats["cached_ratio"] == pytest.approx(2816 / 4000)
+    assert stats["recent"][0]["cached_tokens"] == 2816
+    assert stats["recent"][1]["cached_tokens"] == 0
+
+
+# [PREFIX] 요청마다 시스템 프롬프트(고정 접두부)가 같고, 바뀌는 내용은 사용자 메시지에만 들어가는지 테스트
+def test_requests_share_static_prompt_prefix():
+    from app.services.llm_prompt_service import SYSTEM_PROMPT, create_user_prompt
+
+    usage = Mock(prompt_tokens=3200, completion_tokens=80, prompt_tokens_details=Mock(cached_tokens=3072))
+    message = Mock(refusal=None, content='{"response": "ok"}')
+    client = Mock()
+    client.chat.completions.create.return_value = Mock(choices=[Mock(message=message)], usage=usage)
+    service = LLMService(client=client)
+    metrics = UsageMetrics()
+
+    with patch.object(llm_client_manager, "usage", metrics):
+        service._call_gpt_api(create_user_prompt("요약1", "합계", "A1: 1"))
+        service._call_gpt_api(create_user_prompt("요약2", "평균", "A1: 2"))
+
+    first, second = [call.kwargs for call in client.chat.completions.create.call_args_list]
+    assert first["messages"][0] == second["messages"][0] == {"role": "system", "content": SYSTEM_PROMPT}
+    assert first["response_format"] == second["response_format"]
+    assert first["messages"][1]["content"].startswith("이전 대화 요약:\n요약1")
+    assert first["messages"][1]["content"].endswith("사용자 명령:\n합계")
+    assert metrics.stats()["cached_tokens"] == 3072 * 2
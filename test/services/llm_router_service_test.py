@@ -0,0 +1,100 @@
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.services.llm_router_service import COMPLEX, DECLARATION, QUESTION, SIMPLE_EDIT, TIER_LARGE, TIER_MODELS, \
+    TIER_SMALL, ModelRouter, classify_request
+from app.services.llm_cache_service import LLMResponseCache, MemoryCacheBackend
+from app.services.llm_service import LLMService
+
+VALID_RESPONSE = json.dumps({
+    "response": "완료",
+    "commands": [{"command_type": "sum", "target_cell": "B11", "parameters": ["B2:B10"]}],
+    "summary": "합계",
+})
+
+
+def create_service(router: ModelRouter) -> LLMService:
+    with patch.dict('os.environ', {'OPENAI_API_KEY': 'test-api-key'}):
+        service = LLMService(router=router)
+    service._analyze_excel_context = MagicMock(return_value="A1: 1")
+    return service
+
+
+# [CLASSIFY] 요청을 질문/상태 선언/단순 편집/복합 편집으로 분류하는지 테스트
+@pytest.mark.parametrize("user_command, expected", [
+    ("평균은 어떻게 계산돼?", QUESTION),
+    ("RANK 함수는 어떤 식으로 동작해?", QUESTION),
+    ("앞으로 모든 결과는 반올림 해줘", DECLARATION),
+    ("앞으로는 글씨를 굵게 하지 마", DECLARATION),
+    ("B열 점수 평균을 B12에 넣어줘", SIMPLE_EDIT),
+    ("부서별로 매출 합계를 구하고 그 옆에 순위를 매겨줘", COMPLEX),
+])
+def test_classify_request(user_command, expected):
+    assert classify_request(user_command) == expected
+
+
+# [ROUTE] 분류별 티어로 보내고, 라우팅을 끄면 모두 큰 모델로 보내는지 테스트
+def test_route_by_class():
+    router = ModelRouter()
+
+    assert router.route("평균은 어떻게 계산돼?").model == TIER_MODELS[TIER_SMALL]
+    assert router.route("부서별로 합계를 구하고 순위를 매겨줘").model == TIER_MODELS[TIER_LARGE]
+    assert ModelRouter(enabled=False).route("평균은 어떻게 계산돼?").tier == TIER_LARGE
+    assert router.stats()["by_class"] == {QUESTION: 1, COMPLEX: 1}
+
+
+# [ESCALATE] 작은 모델 응답이 검증에 실패하면 큰 모델로 재요청하고 티어별로 기록하는지 테스트
+def test_llm_service_escalates_invalid_small_model_response():
+    router = ModelRouter()
+    service = create_service(router)
+    service._call_gpt_api = MagicMock(side_effect=["{not json", VALID_RESPONSE])
+
+    result = service.get_llm_response("B11에 합계 넣어줘", b"unused")
+
+    assert [call.kwargs["model"] for call in service._call_gpt_api.call_args_list] == [
+        TIER_MODELS[TIER_SMALL], TIER_MODELS[TIER_LARGE]]
+    assert result.cmd_seq[0].command_type == "sum"
+    tiers = router.stats()["tiers"]
+    assert tiers[TIER_SMALL]["failures"] == 1
+    assert tiers[TIER_LARGE]["requests"] == 1
+    assert tiers[TIER_LARGE]["escalated_in"] == 1
+
+
+# [ESCALATE] 큰 모델 응답도 실패하면 더 재요청하지 않고 오류 응답을 반환하는지 테스트
+def test_llm_service_gives_up_after_large_model():
+    router = ModelRouter()
+    service = create_service(router)
+    service._call_gpt_api = MagicMock(return_value="{not json")
+
+    result = service.get_llm_response("부서별로 합계를 구하고 순위를 매겨줘", b"unused")
+
+    assert service._call_gpt_api.call_count == 1
+    assert result.cmd_seq == []
+    assert router.stats()["tiers"][TIER_LARGE]["failures"] == 1
+
+
+# [CACHE] 응답 캐시 키가 응답을 만든 모델(에스컬레이션했으면 큰 모델)을 따르는지 테스트
+def test_llm_service_caches_by_responding_model():
+    cache = LLMResponseCache(MemoryCacheBackend(), ttl=60)
+    service = create_service(ModelRouter())
+    service.cache = cache
+    service._call_gpt_api = MagicMock(side_effect=["{not json", VALID_RESPONSE])
+
+    service.get_llm_response("B11에 합계 넣어줘", b"sheet", "")
+    # 작은 모델로 라우팅돼도 에스컬레이션해서 저장한 큰 모델 응답을 재사용
+    cached = service.get_llm_response("B11에 합계 넣어줘", b"sheet", "")
+
+    assert service._call_gpt_api.call_count == 2
+    assert cached.cmd_seq[0].command_type == "sum"
+    assert cache.stats()["entries"] == 1
+
+    # 작은 모델의 응답은 큰 모델로 라우팅된 요청에 쓰지 않음
+    service._call_gpt_api = MagicMock(return_value=VALID_RESPONSE)
+    service.get_llm_response("평균은 어떻게 계산돼?", b"sheet", "")
+    service.router = ModelRouter(enabled=False)
+    service.get_llm_response("평균은 어떻게 계산돼?", b"sheet", "")
+
+    assert [call.kwargs["model"] for call in service._call_gpt_api.call_args_list] == [
+        TIER_MODELS[TIER_SMALL], TIER_MODELS[TIER_LARGE]]
@@ -11,6 +11,7 @@ from unittest.mock import MagicMock, patch, Mock
 from openpyxl import Workbook
 
 from app.services.llm_service import LLMService, get_llm_response
+from app.services.workbook_service import ParsedWorkbook
 from app.schemas.excel_schema import ExcelCommand
 from app.schemas.llm_schema import ResponseResult
 
@@ -75,6 +76,22 @@ class TestLLMService:
         # 빈 파일도 기본 구조는 포함되어야 함
         assert "현재 엑셀 시트" in result
 
+    def test_analyze_excel_context_does_not_materialize_empty_cells(self):
+        """엑셀 파일 분석 - 빈 좌표에 Cell 객체를 만들지 않는지 확인"""
+        workbook = Workbook()
+        ws = workbook.active
+        ws['A1'] = '시작'
+        ws['T100'] = '끝'
+        ws['A500'] = '100행 밖'
+        parsed = ParsedWorkbook(b"", workbook=workbook)
+
+        result = self.llm_service._analyze_excel_context(parsed)
+
+        assert "A1: 시작" in result
+        assert "T100: 끝" in result
+        assert "A500: 100행 밖" in result  # 토큰 예산 안이면 100x20 창 밖의 셀도 포함
+        assert len(ws._cells) == 3
+
     def test_analyze_excel_context_invalid_data(self):
         """엑셀 파일 분석 - 잘못된 데이터인 경우"""
         invalid_bytes = b"invalid excel data"
@@ -0,0 +1,50 @@
+import asyncio
+
+from app.services.session_lane_service import SessionLanes
+
+
+async def _run(lanes: SessionLanes, session_id: int, name: str, events: list):
+    async with lanes.hold(session_id):
+        events.append(f"{name}:start")
+        await asyncio.sleep(0.01)
+        events.append(f"{name}:end")
+
+
+# [LANE] 같은 세션의 요청은 순서대로, 다른 세션의 요청은 겹쳐서 실행되는지 테스트
+def test_same_session_serialized_other_sessions_parallel():
+    lanes = SessionLanes()
+    same, other = [], []
+
+    async def scenario():
+        await asyncio.gather(_run(lanes, 1, "a", same), _run(lanes, 1, "b", same))
+        await asyncio.gather(_run(lanes, 1, "a", other), _run(lanes, 2, "b", other))
+
+    asyncio.run(scenario())
+
+    assert same == ["a:start", "a:end", "b:start", "b:end"]
+    assert other == ["a:start", "b:start", "a:end", "b:end"]
+
+    stats = lanes.stats()
+    assert stats["acquired"] == 4
+    assert stats["contended"] == 1
+    assert stats["active_lanes"] == 0  # 다 끝난 세션의 레인은 제거
+
+
+# [LANE] 레인 안에서 예외가 나도 다음 요청이 실행되는지 테스트
+def test_lane_released_on_error():
+    lanes = SessionLanes()
+    events = []
+
+    async def failing():
+        async with lanes.hold(1):
+            raise ValueError("boom")
+
+    async def scenario():
+        results = await asyncio.gather(failing(), _run(lanes, 1, "next", events), return_exceptions=True)
+        return results
+
+    results = asyncio.run(scenario())
+
+    assert isinstance(results[0], ValueError)
+    assert events == ["next:start", "next:end"]
+    assert lanes.stats()["active_lanes"] == 0
@@ -0,0 +1,136 @@
+import json
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base
+from app.models import ChatSession, User
+from app.services.summary_service import SessionSummary, SummaryCompactor, append_turn_summary, \
+    render_summary, estimate_tokens, schedule_summary_compaction
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(bind=engine)
+    db = factory()
+    db.add(User(id=1, username="tester", password="pw"))
+    db.add(ChatSession(id=1, userId=1, name="s"))
+    db.commit()
+    db.close()
+    return factory
+
+
+def store_summary(factory, summary: SessionSummary) -> str:
+    raw = summary.serialize()
+    db = factory()
+    db.query(ChatSession).filter(ChatSession.id == 1).update({ChatSession.summary: raw})
+    db.commit()
+    db.close()
+    return raw
+
+
+def load_summary(factory) -> SessionSummary:
+    db = factory()
+    raw = db.query(ChatSession.summary).filter(ChatSession.id == 1).scalar()
+    db.close()
+    return SessionSummary.parse(raw)
+
+
+# [LEGACY] 이전 "[end]" 구분 형식 요약을 턴 목록으로 읽는지 테스트
+def test_parse_legacy_summary():
+    summary = SessionSummary.parse("B열 합계 추가 [end] C열 평균 추가 [end] ")
+
+    assert [turn["text"] for turn in summary.turns] == ["B열 합계 추가", "C열 평균 추가"]
+    assert summary.digest == "" and summary.pending == []
+
+
+# [WINDOW] 윈도 예산을 넘으면 오래된 턴이 pending으로 옮겨지는지 테스트
+def test_append_turn_moves_old_turns_to_pending():
+    summary = SessionSummary()
+    for index in range(5):
+        summary.append_turn(f"{index}번째 요청 요약", window_tokens=20)
+
+    assert summary.window_tokens <= 20
+    assert summary.turns[-1]["text"] == "4번째 요청 요약"
+    assert [turn["text"] for turn in summary.pending][0] == "0번째 요청 요약"
+    assert summary.needs_compaction
+
+
+# [BOUND] 압축이 밀려도 저장 크기와 프롬프트 길이가 제한되는지 테스트
+def test_summary_stays_bounded_without_compaction():
+    raw = None
+    for index in range(500):
+        raw = append_turn_summary(raw, f"{index}번째 요청: B{index}셀에 합계를 넣고 표 제목을 추가함")
+
+    summary = SessionSummary.parse(raw)
+    assert summary.window_tokens <= 800
+    assert summary.pending_tokens <= 800 * 4
+    assert summary.digest_tokens <= 400
+    assert estimate_tokens(render_summary(raw)) <= 800 + 400 + 100  # 머리글·번호 포함
+    assert "499번째" in render_summary(raw)
+
+
+# [RENDER] 프롬프트용 요약에 압축 요약과 번호 붙은 최근 요약이 들어가는지 테스트
+def test_render_summary_sections():
+    summary = SessionSummary(digest="표는 A1에서 시작", turns=[{"text": "합계 추가", "tokens": 5}])
+
+    rendered = summary.render()
+
+    assert "[이전 대화 압축 요약]\n표는 A1에서 시작" in rendered
+    assert rendered.endswith("1. 합계 추가")
+    assert render_summary(None) == ""
+
+
+# [COMPACT] 백그라운드 압축이 pending을 다이제스트로 합쳐 저장하는지 테스트
+def test_compact_session_folds_pending(session_factory):
+    store_summary(session_factory, SessionSummary(
+        digest="이전",
+        turns=[{"text": "최근", "tokens": 2}],
+        pending=[{"text": "오래된1", "tokens": 3}, {"text": "오래된2", "tokens": 3}],
+    ))
+    compactor = SummaryCompactor(session_factory=session_factory)
+
+    saved = compactor.compact_session(1, summarize=lambda digest, texts: f"{digest}+{'+'.join(texts)}")
+
+    summary = load_summary(session_factory)
+    assert saved
+    assert summary.digest == "이전+오래된1+오래된2"
+    assert summary.pending == []
+    assert [turn["text"] for turn in summary.turns] == ["최근"]
+    assert compactor.stats()["compactions"] == 1
+
+
+# [COMPACT] 압축 중 새 턴이 추가되면 압축 결과와 새 턴을 모두 유지하는지 테스트
+def test_compact_session_merges_concurrent_turn(session_factory):
+    original = SessionSummary(pending=[{"text": "오래된", "tokens": 3}], turns=[{"text": "최근", "tokens": 2}])
+    store_summary(session_factory, original)
+    compactor = SummaryCompactor(session_factory=session_factory)
+
+    def summarize(digest, texts):
+        # 압축하는 동안 다른 요청이 새 턴을 저장
+        updated = SessionSummary.parse(original.serialize())
+        updated.turns.append({"text": "새 턴", "tokens": 2})
+        store_summary(session_factory, updated)
+        return "압축됨"
+
+    assert compactor.compact_session(1, summarize=summarize)
+
+    summary = load_summary(session_factory)
+    assert summary.digest == "압축됨"
+    assert summary.pending == []
+    assert [turn["text"] for turn in summary.turns] == ["최근", "새 턴"]
+
+
+# [SCHEDULE] pending이 있을 때만 백그라운드 압축을 예약하는지 테스트
+def test_schedule_only_when_pending():
+    with patch("app.services.summary_service.summary_compactor") as mock_compactor:
+        schedule_summary_compaction(1, SessionSummary(turns=[{"text": "a", "tokens": 1}]).serialize())
+        mock_compactor.schedule.assert_not_called()
+
+        schedule_summary_compaction(1, SessionSummary(pending=[{"text": "a", "tokens": 1}]).serialize())
+        mock_compactor.schedule.assert_called_once_with(1)
@@ -0,0 +1,144 @@
+import io
+from unittest.mock import patch
+
+from openpyxl import Workbook, load_workbook
+
+from app.schemas.excel_schema import ExcelCommand
+from app.services.excel_service import process_excel_with_commands
+from app.services.llm_service import LLMService
+from app.services.workbook_service import ParsedWorkbook, ensure_parsed_workbook, WorkbookCache, \
+    compute_content_hash, estimate_workbook_size
+
+
+def create_sample_excel_bytes() -> bytes:
+    workbook = Workbook()
+    ws = workbook.active
+    ws['A1'] = '점수'
+    ws['A2'] = 10
+    ws['A3'] = 20
+    output = io.BytesIO()
+    workbook.save(output)
+    return output.getvalue()
+
+
+# [PARSE] workbook에 여러 번 접근해도 파싱은 한 번만 일어나는지 테스트
+def test_parsed_workbook_parses_once():
+    parsed = ParsedWorkbook(create_sample_excel_bytes())
+    assert parsed.parse_count == 0
+
+    first = parsed.workbook
+    second = parsed.workbook
+
+    assert first is second
+    assert parsed.parse_count == 1
+
+
+# [SAVE] 수정되지 않은 워크북은 직렬화 없이 원본 바이트를 반환하는지 테스트
+def test_parsed_workbook_save_without_modification_returns_source():
+    excel_bytes = create_sample_excel_bytes()
+    parsed = ParsedWorkbook(excel_bytes)
+
+    assert parsed.save() is excel_bytes
+    assert parsed.parse_count == 0
+    assert parsed.save_count == 0
+
+
+# [SAVE] 수정된 워크북은 한 번만 직렬화되는지 테스트
+def test_parsed_workbook_save_once_after_modification():
+    parsed = ParsedWorkbook(create_sample_excel_bytes())
+    parsed.workbook.active['B1'] = 'new'
+    parsed.mark_modified()
+
+    first = parsed.save()
+    second = parsed.save()
+
+    assert first is second
+    assert parsed.save_count == 1
+    assert load_workbook(io.BytesIO(first)).active['B1'].value == 'new'
+
+
+# [ENSURE] 이미 ParsedWorkbook이면 그대로 반환하는지 테스트
+def test_ensure_parsed_workbook_passthrough():
+    parsed = ParsedWorkbook(create_sample_excel_bytes())
+    assert ensure_parsed_workbook(parsed) is parsed
+    assert isinstance(ensure_parsed_workbook(b"bytes"), ParsedWorkbook)
+
+
+# [FLOW] LLM 컨텍스트 분석과 명령어 실행이 한 번의 파싱을 공유하는지 테스트
+def test_context_and_commands_share_single_parse():
+    with patch.dict('os.environ', {'OPENAI_API_KEY': 'test-api-key'}):
+        service = LLMService()
+    parsed = ParsedWorkbook(create_sample_excel_bytes())
+
+    context = service._analyze_excel_context(parsed)
+    result = process_excel_with_commands(
+        excel_bytes=parsed,
+        commands=[ExcelCommand(command_type="sum", target_cell="A4", parameters={"range": "A2:A3"})]
+    )
+
+    assert "A1: 점수" in context
+    assert parsed.parse_count == 1
+    assert parsed.save_count == 1
+    assert load_workbook(io.BytesIO(result)).active['A4'].value == "=SUM(A2:A3)"
+
+
+# [CACHE] 같은 세션/같은 해시로 조회하면 적중하고, 꺼낸 항목은 캐시에서 빠지는지 테스트
+def test_workbook_cache_hit_and_checkout():
+    cache = WorkbookCache(max_entries=4)
+    workbook = Workbook()
+    cache.store(1, "hash-a", workbook)
+
+    assert cache.checkout(1, "hash-a") is workbook
+    assert cache.checkout(1, "hash-a") is None
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["entries"] == 0
+
+
+# [CACHE] 다른 시트(다른 해시)가 들어오면 기존 항목이 무효화되는지 테스트
+def test_workbook_cache_invalidates_on_different_sheet():
+    cache = WorkbookCache(max_entries=4)
+    cache.store(1, "hash-a", Workbook())
+
+    assert cache.checkout(1, "hash-b") is None
+    assert cache.stats()["invalidations"] == 1
+    assert cache.checkout(1, "hash-a") is None
+
+
+# [CACHE] 항목 수 한도를 넘으면 가장 오래 사용되지 않은 세션부터 제거되는지 테스트
+def test_workbook_cache_lru_eviction_by_entries():
+    cache = WorkbookCache(max_entries=2)
+    cache.store(1, "a", Workbook())
+    cache.store(2, "b", Workbook())
+    cache.store(1, "a2", Workbook())  # 1번 세션을 최근 사용으로 갱신
+    cache.store(3, "c", Workbook())
+
+    assert cache.checkout(2, "b") is None
+    assert cache.stats()["evictions"] == 1
+
+
+# [CACHE] 메모리 한도를 넘으면 오래된 항목이 제거되는지 테스트
+def test_workbook_cache_eviction_by_bytes():
+    size = estimate_workbook_size(Workbook())
+    cache = WorkbookCache(max_entries=10, max_bytes=size * 2)
+    for session_id in range(3):
+        cache.store(session_id, str(session_id), Workbook())
+
+    stats = cache.stats()
+    assert stats["entries"] == 2
+    assert stats["estimated_bytes"] <= size * 2
+
+
+# [CACHE] 캐시에서 꺼낸 워크북으로 만든 ParsedWorkbook은 파싱하지 않는지 테스트
+def test_parsed_workbook_from_cache_skips_parse():
+    excel_bytes = create_sample_excel_bytes()
+    cache = WorkbookCache()
+    cache.store(7, compute_content_hash(excel_bytes), load_workbook(io.BytesIO(excel_bytes)))
+
+    workbook = cache.checkout(7, compute_content_hash(excel_bytes))
+    parsed = ParsedWorkbook(excel_bytes, workbook=workbook)
+
+    assert parsed.workbook.active['A2'].value == 10
+    assert parsed.parse_count == 0
+    assert parsed.cache_hit
@@ -0,0 +1,25 @@
+import pytest
+
+from app.utils.cell_reference import iter_range_cells, range_size, shift_references
+
+
+# [SHIFT] 상대 참조만 이동하고 $ 고정 참조·문자열·함수 이름은 그대로 두는지 테스트
+def test_shift_references_moves_relative_references():
+    assert shift_references("=A2+$B$1*B2", 3, 0) == "=A5+$B$1*B5"
+    assert shift_references("SUM(A2:C2)", 0, 1) == "SUM(B2:D2)"
+    assert shift_references('IF(B2>=60,"A1 통과",LOG10(C2))', 1, 0) == 'IF(B3>=60,"A1 통과",LOG10(C3))'
+    assert shift_references("$A2+B$2", 2, 2) == "$A4+D$2"
+
+
+# [SHIFT] 시트 밖으로 나가는 이동은 오류인지 테스트
+def test_shift_references_out_of_sheet_raises():
+    with pytest.raises(ValueError):
+        shift_references("=A1", -1, 0)
+
+
+# [RANGE] 범위를 행 우선으로 순회하고 전체 열 참조는 거부하는지 테스트
+def test_iter_range_cells():
+    assert list(iter_range_cells("B2:C3")) == [(2, 2), (2, 3), (3, 2), (3, 3)]
+    assert range_size("A1:A100") == 100
+    with pytest.raises(ValueError):
+        range_size("A:A")
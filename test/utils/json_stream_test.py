@@ -0,0 +1,52 @@
+import json
+
+from app.utils.json_stream import JsonStringFieldExtractor
+
+
+def feed_all(extractor: JsonStringFieldExtractor, chunks) -> list:
+    return [extractor.feed(chunk) for chunk in chunks]
+
+
+# [STREAM] 조각 경계와 무관하게 response 필드만 점진적으로 추출하는지 테스트
+def test_extracts_field_incrementally():
+    document = json.dumps({"response": "합계를 계산했습니다.", "commands": [], "summary": "요약"}, ensure_ascii=False)
+    extractor = JsonStringFieldExtractor("response")
+
+    pieces = feed_all(extractor, [document[i:i + 3] for i in range(0, len(document), 3)])
+
+    assert "".join(pieces) == "합계를 계산했습니다."
+    assert extractor.value == "합계를 계산했습니다."
+    assert extractor.done
+
+
+# [ESCAPE] 이스케이프와 \\u 시퀀스(서로게이트 쌍 포함)가 조각 사이에서 잘려도 디코딩하는지 테스트
+def test_decodes_escapes_split_across_chunks():
+    text = 'A "인용" \\ 줄바꿈\n탭\t이모지 😀'
+    document = json.dumps({"response": text})  # ensure_ascii=True → \uXXXX 사용
+    extractor = JsonStringFieldExtractor("response")
+
+    feed_all(extractor, list(document))
+
+    assert extractor.value == text
+
+
+# [NESTED] 중첩 객체의 같은 이름 필드와 다른 필드는 무시하는지 테스트
+def test_ignores_nested_and_other_fields():
+    document = json.dumps({
+        "commands": [{"response": "중첩", "parameters": {"value": "\"}"}}],
+        "summary": "response",
+        "response": "최상위",
+    }, ensure_ascii=False)
+    extractor = JsonStringFieldExtractor("response")
+
+    assert extractor.feed(document) == "최상위"
+
+
+# [PARTIAL] 값이 끝나기 전에는 done이 False인지 테스트
+def test_partial_value_not_done():
+    extractor = JsonStringFieldExtractor("response")
+
+    assert extractor.feed('{"response": "진행') == "진행"
+    assert not extractor.done
+    assert extractor.feed('중", ') == "중"
+    assert extractor.done